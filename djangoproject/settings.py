@@ -168,3 +168,115 @@ class Environments(Enum):
 
 
 CURRENT_ENVIRONMENT = Environments[os.getenv("CURRENT_ENVIRONMENT", "DEV")]
+
+
+# Simulation settings
+
+# Maximum amount of sweep points simulated concurrently by the batch sweep endpoint
+SIMULATION_SWEEP_MAX_WORKERS = int(
+    os.getenv("SIMULATION_SWEEP_MAX_WORKERS", os.cpu_count() or 1)
+)
+
+# Retention of simulation_results: quota in bytes (0 disables the quota), maximum age in days (0 disables age
+# eviction), idle hours before a run folder is compressed (0 disables compression) and minutes during which a
+# recently accessed run is never evicted nor compressed, so its zip download keeps working
+SIMULATION_RESULTS_QUOTA_BYTES = int(
+    os.getenv("SIMULATION_RESULTS_QUOTA_BYTES", 5 * 1024**3)
+)
+SIMULATION_RESULTS_MAX_AGE_DAYS = float(
+    os.getenv("SIMULATION_RESULTS_MAX_AGE_DAYS", 30)
+)
+SIMULATION_RESULTS_COMPRESS_AFTER_HOURS = float(
+    os.getenv("SIMULATION_RESULTS_COMPRESS_AFTER_HOURS", 24)
+)
+SIMULATION_RESULTS_PROTECTED_MINUTES = float(
+    os.getenv("SIMULATION_RESULTS_PROTECTED_MINUTES", 60)
+)
+# Minimum seconds between two retention passes triggered in background after a simulation (0 disables them)
+SIMULATION_RETENTION_INTERVAL_SECONDS = int(
+    os.getenv(
+        "SIMULATION_RETENTION_INTERVAL_SECONDS",
+        0 if Environments.is_testing(CURRENT_ENVIRONMENT) else 600,
+    )
+)
+
+# Identical simulation requests arriving while one of them runs share its results instead of running ngspice again.
+# Shared results are kept for the followers during SIMULATION_COALESCING_RESULT_TTL_SECONDS
+SIMULATION_COALESCING_ENABLED = os.getenv(
+    "SIMULATION_COALESCING_ENABLED", "true"
+).lower() in ("true", "1", "yes")
+SIMULATION_COALESCING_RESULT_TTL_SECONDS = int(
+    os.getenv("SIMULATION_COALESCING_RESULT_TTL_SECONDS", 300)
+)
+
+# Admission control budgets in seconds of estimated simulation time (0 disables each budget). Requests above the warn
+# budget run with a warning header, above the low priority budget they wait for one of the
+# SIMULATION_LOW_PRIORITY_SLOTS shared by every worker, above the reject budget they are rejected
+SIMULATION_COST_WARN_SECONDS = float(os.getenv("SIMULATION_COST_WARN_SECONDS", 60))
+SIMULATION_COST_LOW_PRIORITY_SECONDS = float(
+    os.getenv("SIMULATION_COST_LOW_PRIORITY_SECONDS", 600)
+)
+SIMULATION_COST_REJECT_SECONDS = float(
+    os.getenv("SIMULATION_COST_REJECT_SECONDS", 3600)
+)
+SIMULATION_LOW_PRIORITY_SLOTS = int(os.getenv("SIMULATION_LOW_PRIORITY_SLOTS", 1))
+
+# Results ZIP archives: deflate level for text files (figures are stored uncompressed), and text files of at least
+# SIMULATION_ZIP_PARALLEL_MIN_BYTES are read ahead by up to SIMULATION_ZIP_MAX_WORKERS threads while others are deflated
+SIMULATION_ZIP_DEFLATE_LEVEL = int(os.getenv("SIMULATION_ZIP_DEFLATE_LEVEL", 5))
+SIMULATION_ZIP_PARALLEL_MIN_BYTES = int(
+    os.getenv("SIMULATION_ZIP_PARALLEL_MIN_BYTES", 1024**2)
+)
+SIMULATION_ZIP_MAX_WORKERS = int(
+    os.getenv("SIMULATION_ZIP_MAX_WORKERS", min(os.cpu_count() or 1, 4))
+)
+
+# Scratch root (e.g. /dev/shm) where the circuit, subcircuit and ngspice output files of a run are written. Once
+# ngspice finishes the files of the run are moved to SIMULATIONS_DIR, figures are written there directly. Unset, runs
+# are written to SIMULATIONS_DIR from the start
+SIMULATION_SCRATCH_DIR = os.getenv("SIMULATION_SCRATCH_DIR") or None
+
+# Command running the circuit files. memristorsimulation_app/fake_ngspice.py writes synthetic results instead, for load
+# tests and benchmarks on hosts without ngspice (FAKE_NGSPICE_POINTS and FAKE_NGSPICE_LATENCY_SECONDS tune its output)
+NGSPICE_EXECUTABLE = os.getenv("NGSPICE_EXECUTABLE", "ngspice")
+
+# Prometheus metrics served at /metrics. Every worker process writes its counters, gauges and histograms to its own file
+# in SIMULATION_METRICS_DIR (unset, .metrics in the simulation results folder), the endpoint sums them
+SIMULATION_METRICS_ENABLED = os.getenv(
+    "SIMULATION_METRICS_ENABLED", "true"
+).lower() in ("true", "1", "yes")
+SIMULATION_METRICS_DIR = os.getenv("SIMULATION_METRICS_DIR") or None
+
+# Timing of simulations run more than once: SIMULATION_TIMING_WARMUP_ITERATIONS runs are discarded before measuring,
+# and measuring stops once the SIMULATION_TIMING_CONFIDENCE_LEVEL bootstrap interval of the median real time is within
+# SIMULATION_TIMING_TARGET_PRECISION of the median (0 runs every iteration), after SIMULATION_TIMING_MIN_ITERATIONS
+SIMULATION_TIMING_WARMUP_ITERATIONS = int(
+    os.getenv("SIMULATION_TIMING_WARMUP_ITERATIONS", 1)
+)
+SIMULATION_TIMING_MIN_ITERATIONS = int(
+    os.getenv("SIMULATION_TIMING_MIN_ITERATIONS", 10)
+)
+SIMULATION_TIMING_TARGET_PRECISION = float(
+    os.getenv("SIMULATION_TIMING_TARGET_PRECISION", 0.01)
+)
+SIMULATION_TIMING_CONFIDENCE_LEVEL = float(
+    os.getenv("SIMULATION_TIMING_CONFIDENCE_LEVEL", 0.95)
+)
+
+# Appends "rusage all" to the control block of every circuit, so ngspice reports its timepoints, Newton iterations,
+# matrix size and load/solve times, which are parsed from its output and stored with the run
+SIMULATION_NGSPICE_RUSAGE = os.getenv("SIMULATION_NGSPICE_RUSAGE", "true").lower() in (
+    "true",
+    "1",
+    "yes",
+)
+
+# Requests profiled by admins (X-Simulation-Profile: true header or ?profile=true) store the SIMULATION_PROFILE_TOP
+# functions with the highest cumulative time and the source lines allocating the most memory in their profile summary
+SIMULATION_PROFILE_TOP = int(os.getenv("SIMULATION_PROFILE_TOP", 30))
+
+# TOLERANCE output decimation runs a control language loop with one statement per magnitude on every timepoint, its
+# cost grows with timepoints x magnitudes, so requests are limited to this amount of magnitudes
+SIMULATION_DECIMATION_TOLERANCE_MAX_MAGNITUDES = int(
+    os.getenv("SIMULATION_DECIMATION_TOLERANCE_MAX_MAGNITUDES", 8)
+)
@@ -2,10 +2,38 @@ from django.contrib import admin
 from django.urls import path
 
 from memristorsimulation_app.views import (
+    MetricsView,
+    SimulationProfileView,
+    SimulationProgressView,
+    SimulationSeriesView,
     SimulationView,
+    SimulationWindowView,
+    SweepSimulationView,
 )
 
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("", SimulationView.as_view(), name="form"),
+    path("sweep/", SweepSimulationView.as_view(), name="sweep"),
+    path("metrics", MetricsView.as_view(), name="metrics"),
+    path(
+        "simulations/progress/<str:progress_id>/",
+        SimulationProgressView.as_view(),
+        name="simulation_progress",
+    ),
+    path(
+        "simulations/<str:model_simulation_folder>/<str:folder_name>/series/",
+        SimulationSeriesView.as_view(),
+        name="simulation_series",
+    ),
+    path(
+        "simulations/<str:model_simulation_folder>/<str:folder_name>/window/",
+        SimulationWindowView.as_view(),
+        name="simulation_window",
+    ),
+    path(
+        "simulations/<str:model_simulation_folder>/<str:folder_name>/profile/",
+        SimulationProfileView.as_view(),
+        name="simulation_profile",
+    ),
 ]
@@ -36,8 +36,9 @@ mkdir -p /app/logs
 
 echo "Configuration complete."
 
-echo "Starting Django server on port 8000..."
+echo "Starting Django ASGI server on port 8000..."
 echo "The application will be available at: http://localhost:8000"
 echo "Admin panel at: http://localhost:8000/admin (admin/admin123)"
 
-exec python manage.py runserver 0.0.0.0:8000
\ No newline at end of file
+# The simulation view is async, under an ASGI server one worker supervises many ngspice processes at once
+exec uvicorn djangoproject.asgi:application --host 0.0.0.0 --port 8000 --workers "${UVICORN_WORKERS:-1}"
\ No newline at end of file
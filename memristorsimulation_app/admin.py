@@ -1,3 +1,28 @@
 from django.contrib import admin
+from memristorsimulation_app.models import SimulationRun, SimulationRunFile
 
-# Register your models here.
+
+class SimulationRunFileInline(admin.TabularInline):
+    model = SimulationRunFile
+    extra = 0
+    readonly_fields = ["archive_name", "path", "size_bytes"]
+    can_delete = False
+
+
+@admin.register(SimulationRun)
+class SimulationRunAdmin(admin.ModelAdmin):
+    list_display = [
+        "folder_name",
+        "model",
+        "network_type",
+        "amount_edges",
+        "status",
+        "python_execution_time",
+        "started_at",
+        "compressed_at",
+        "evicted_at",
+    ]
+    list_filter = ["model", "network_type", "status"]
+    search_fields = ["input_hash", "folder_name"]
+    date_hierarchy = "started_at"
+    inlines = [SimulationRunFileInline]
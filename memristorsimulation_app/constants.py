@@ -11,6 +11,7 @@ PATH = (
 )
 MODELS_DIR = f"{PATH}/models"
 SIMULATIONS_DIR = f"{PATH}/simulation_results"
+FAKE_NGSPICE_EXECUTABLE = f"{os.path.dirname(__file__)}/fake_ngspice.py"
 
 
 class MemristorModels(Enum):
@@ -84,6 +85,7 @@ class PlotType(Enum):
     STATE_AND_VIN_VS_TIME = "STATE_AND_VIN_VS_TIME"
     MEMRISTIVE_STATES_OVERLAPPED = "MEMRISTIVE_STATES_OVERLAPPED"
     GRAPH = "GRAPH"
+    GRID_STATES_ANIMATED = "GRID_STATES_ANIMATED"
 
 
 class MeasuredMagnitude(Enum):
@@ -92,6 +94,57 @@ class MeasuredMagnitude(Enum):
     OTHER = "OTHER"
 
 
+class ArtifactStage(Enum):
+    SUBCIRCUIT = "subcircuit"
+    CIRCUIT = "circuit"
+    RESULTS = "results"
+    LOG = "log"
+    FIGURE = "figure"
+    INDEX = "index"
+
+
+class SeriesFormat(Enum):
+    JSON = "json"
+    BINARY = "binary"
+    CSV = "csv"
+
+
+class AdmissionDecision(Enum):
+    ACCEPT = "ACCEPT"
+    WARN = "WARN"
+    LOW_PRIORITY = "LOW_PRIORITY"
+    REJECT = "REJECT"
+
+
+class SimulationStatus(Enum):
+    RUNNING = "RUNNING"
+    FINISHED = "FINISHED"
+    FAILED = "FAILED"
+    CANCELLED = "CANCELLED"
+
+    @classmethod
+    def get_final_statuses(cls):
+        return [cls.FINISHED, cls.FAILED, cls.CANCELLED]
+
+
+class SweepMode(Enum):
+    CARTESIAN = "CARTESIAN"
+    ZIP = "ZIP"
+
+
+class OutputDecimation(Enum):
+    NONE = "NONE"
+    LINEARIZE = "LINEARIZE"
+    EVERY_NTH = "EVERY_NTH"
+    TOLERANCE = "TOLERANCE"
+
+
+class MetricType(Enum):
+    COUNTER = "counter"
+    GAUGE = "gauge"
+    HISTOGRAM = "histogram"
+
+
 class NetworkType(Enum):
     SINGLE_DEVICE = "SINGLE_DEVICE"
     GRID_2D_GRAPH = "GRID_2D_GRAPH"
@@ -117,3 +170,7 @@ class WaveFormNotImplemented(Exception):
 
 class InvalidNetworkType(Exception):
     pass
+
+
+class InvalidSweep(Exception):
+    pass
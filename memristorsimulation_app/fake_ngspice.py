@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Stand-in for the ngspice executable, selected with the NGSPICE_EXECUTABLE setting. It reads the transient analysis and
+the wrdata command of the circuit file and writes a synthetic but well formed results file, so the API, file handling,
+plotting and zipping can be load tested and benchmarked without ngspice and its runtime noise. A "rusage all" command
+prints synthetic statistics in the ngspice format. Output decimation is honoured like ngspice does: "linearize" writes
+the rows on the tstep grid and the EVERY_NTH loop keeps every Nth timepoint, TOLERANCE decimation writes every row.
+
+Environment variables:
+    FAKE_NGSPICE_POINTS: Timepoints of the transient analysis, rows of the results file unless decimated (default
+        tstop / tstep + 1)
+    FAKE_NGSPICE_LATENCY_SECONDS: Time the fake simulation takes, progress is printed meanwhile (default 0)
+    FAKE_NGSPICE_EXIT_CODE: Exit code after writing the results (default 0)
+"""
+import os
+import re
+import resource
+import sys
+import time
+import numpy as np
+
+from typing import List, NamedTuple, Optional
+
+
+PROGRESS_STEPS = 10
+RON = 2e3
+ROFF = 200e3
+# Statement of the EVERY_NTH loop written by CircuitFileService that picks the kept timepoints
+EVERY_NTH_PATTERN = re.compile(r"let\s+dtime\[i\]\s*=\s*time\[i\s*\*\s*(\d+)\]")
+
+
+class CircuitFile(NamedTuple):
+    tstep: float
+    tstop: float
+    results_file_path: Optional[str]
+    magnitudes: List[str]
+    rusage: bool
+    linearize: bool
+    decimation_factor: Optional[int]
+
+
+def parse_circuit_file(circuit_file_path: str) -> CircuitFile:
+    tstep, tstop, results_file_path, magnitudes, rusage = None, None, None, [], False
+    linearize, decimation_factor = False, None
+
+    with open(circuit_file_path, "r") as f:
+        for line in f:
+            tokens = line.split()
+            if not tokens:
+                continue
+
+            if tokens[0].lower() == ".tran":
+                tstep, tstop = float(tokens[1]), float(tokens[2])
+            elif tokens[0].lower() == "wrdata":
+                results_file_path, magnitudes = tokens[1], tokens[2:]
+            elif tokens[0].lower() == "rusage":
+                rusage = True
+            elif tokens[0].lower() == "linearize":
+                linearize = True
+            elif match := EVERY_NTH_PATTERN.match(line.strip()):
+                decimation_factor = int(match.group(1))
+
+    if tstep is None or tstop is None:
+        raise ValueError(f"No .tran analysis found in {circuit_file_path}")
+
+    return CircuitFile(
+        tstep,
+        tstop,
+        results_file_path,
+        magnitudes,
+        rusage,
+        linearize,
+        decimation_factor,
+    )
+
+
+def get_amount_points(tstep: float, tstop: float) -> int:
+    amount_points = os.getenv("FAKE_NGSPICE_POINTS")
+    if amount_points:
+        return max(int(amount_points), 2)
+
+    return max(int(round(tstop / tstep)) + 1, 2)
+
+
+def get_time_values(circuit_file: CircuitFile, amount_points: int) -> np.ndarray:
+    """
+    :return: Times of the rows written by wrdata, the amount_points transient timepoints after the output decimation
+    """
+    if circuit_file.linearize:
+        # linearize interpolates onto the tstep grid, whatever the timepoints of the transient analysis were
+        amount_points = max(int(round(circuit_file.tstop / circuit_file.tstep)) + 1, 2)
+    time_values = np.linspace(0, circuit_file.tstop, amount_points)
+
+    if circuit_file.decimation_factor:
+        return time_values[:: circuit_file.decimation_factor]
+
+    return time_values
+
+
+def simulate_progress(tstop: float, latency: float) -> None:
+    # ngspice terminates its progress lines with a carriage return
+    for step in range(1, PROGRESS_STEPS + 1):
+        time.sleep(latency / PROGRESS_STEPS)
+        sys.stdout.write(f"Reference value : {tstop * step / PROGRESS_STEPS:.5e}\r")
+        sys.stdout.flush()
+    sys.stdout.write("\n")
+
+
+def get_magnitude_values(
+    magnitude: str, index: int, time_values: np.ndarray, tstop: float
+) -> np.ndarray:
+    vin = np.sin(2 * np.pi * time_values / tstop)
+
+    if magnitude == "vin":
+        return vin
+    if magnitude.lower().startswith("i("):
+        return -vin / RON
+    # Memristive states switch between RON and ROFF, each one a bit later than the previous one
+    return RON + (ROFF - RON) / (1 + np.exp(-vin * 10 + (index % 10) / 10))
+
+
+def write_results_file(
+    results_file_path: str, magnitudes: List[str], time_values: np.ndarray, tstop: float
+) -> None:
+    columns = [time_values] + [
+        get_magnitude_values(magnitude, index, time_values, tstop)
+        for index, magnitude in enumerate(magnitudes)
+    ]
+
+    with open(results_file_path, "w") as f:
+        f.write(" ".join(["time"] + magnitudes) + "\n")
+        np.savetxt(f, np.column_stack(columns), fmt="%.12e")
+
+
+def print_rusage(amount_points: int, amount_magnitudes: int, start_time: float) -> None:
+    elapsed_time = time.perf_counter() - start_time
+    # ru_maxrss is in KiB on Linux
+    program_size = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    print(f"Total analysis time (seconds) = {elapsed_time:.3f}")
+    print(f"Total elapsed time (seconds) = {elapsed_time:.3f}")
+    print(f"Maximum ngspice program size = {program_size:8.3f} MB.")
+    print(f"Total iterations = {2 * amount_points + 3}")
+    print(f"Transient iterations = {2 * amount_points}")
+    print(f"Circuit Equations = {amount_magnitudes + 1}")
+    print(f"Transient timepoints = {amount_points}")
+    print(f"Accepted timepoints = {amount_points - 1}")
+    print("Rejected timepoints = 0")
+    print(f"Total analysis time = {elapsed_time:.3f}")
+    print(f"Transient time = {elapsed_time:.3f}")
+    print("matrix reordering time = 0")
+    print("L-U decomposition time = 0")
+    print("Matrix solve time = 0")
+    print(f"Load time = {elapsed_time:.3f}")
+
+
+def main(argv: List[str]) -> int:
+    if len(argv) < 2:
+        sys.stderr.write("Usage: fake_ngspice.py <circuit file>\n")
+        return 1
+
+    start_time = time.perf_counter()
+    circuit_file_path = argv[-1]
+    try:
+        circuit_file = parse_circuit_file(circuit_file_path)
+    except (OSError, ValueError, IndexError) as e:
+        sys.stderr.write(f"Error: {str(e)}\n")
+        return 1
+
+    print(f"Circuit: {circuit_file_path}")
+    print("Doing analysis at TEMP = 27.000000 and TNOM = 27.000000")
+    simulate_progress(
+        circuit_file.tstop, float(os.getenv("FAKE_NGSPICE_LATENCY_SECONDS", 0))
+    )
+
+    amount_points = get_amount_points(circuit_file.tstep, circuit_file.tstop)
+    if circuit_file.results_file_path:
+        write_results_file(
+            circuit_file.results_file_path,
+            circuit_file.magnitudes,
+            get_time_values(circuit_file, amount_points),
+            circuit_file.tstop,
+        )
+    print(f"No. of Data Rows : {amount_points}")
+    if circuit_file.rusage:
+        print_rusage(amount_points, len(circuit_file.magnitudes), start_time)
+
+    return int(os.getenv("FAKE_NGSPICE_EXIT_CODE", 0))
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -0,0 +1,98 @@
+from django.core.management.base import BaseCommand, CommandError
+from memristorsimulation_app.services.benchmarkservice import (
+    BenchmarkService,
+    InvalidBenchmarkBaseline,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Times every stage of the simulation pipeline on networks of growing size, writes the results as JSON and "
+        "optionally compares them against a baseline"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            type=int,
+            nargs="+",
+            help=f"Grid sides to benchmark (default {BenchmarkService.DEFAULT_SIZES})",
+        )
+        parser.add_argument(
+            "--points",
+            type=int,
+            help=f"Timepoints of the results file (default {BenchmarkService.DEFAULT_AMOUNT_POINTS})",
+        )
+        parser.add_argument(
+            "--repeats",
+            type=int,
+            help=f"Runs of every stage (default {BenchmarkService.DEFAULT_REPEATS})",
+        )
+        parser.add_argument(
+            "--stages",
+            nargs="+",
+            help="Stages to run, for example network plot:IV zip, a group like plot runs all its stages (default every stage)",
+        )
+        parser.add_argument(
+            "--output",
+            default="benchmark.json",
+            help="JSON file where the results are written",
+        )
+        parser.add_argument(
+            "--baseline",
+            help="JSON results of a previous run, fails if a stage regressed against it",
+        )
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=BenchmarkService.DEFAULT_REGRESSION_THRESHOLD,
+            help="Relative slowdown of the median time reported as a regression (default 0.2)",
+        )
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options["baseline"]:
+            try:
+                baseline = BenchmarkService.load_baseline(options["baseline"])
+            except InvalidBenchmarkBaseline as e:
+                raise CommandError(str(e))
+
+        benchmark_service = BenchmarkService(
+            sizes=options["sizes"],
+            amount_points=options["points"],
+            repeats=options["repeats"],
+            stages=options["stages"],
+        )
+        results = benchmark_service.run()
+
+        for result in results:
+            self.stdout.write(
+                f"{result.stage:<40} size={result.size:<4} median={result.get_median_time():.2f} ms"
+            )
+        for skipped_stage in benchmark_service.skipped_stages:
+            self.stdout.write(self.style.WARNING(f"Skipped {skipped_stage}"))
+
+        benchmark_service.save_results(results, options["output"])
+        self.stdout.write(
+            self.style.SUCCESS(f"Benchmark results saved in {options['output']}")
+        )
+
+        if baseline is None:
+            return
+
+        regressions = BenchmarkService.compare(
+            results, baseline, threshold=options["threshold"]
+        )
+        for regression in regressions:
+            self.stdout.write(
+                self.style.ERROR(
+                    f"{regression.stage} size={regression.size}: {regression.baseline_time:.2f} ms -> "
+                    f"{regression.time:.2f} ms (x{regression.get_ratio():.2f})"
+                )
+            )
+        if regressions:
+            raise CommandError(
+                f"{len(regressions)} stages regressed more than {options['threshold']:.0%} against "
+                f"{options['baseline']}"
+            )
+        self.stdout.write(self.style.SUCCESS("No regressions against the baseline"))
@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand
+from memristorsimulation_app.services.retentionservice import RetentionService
+
+
+class Command(BaseCommand):
+    help = (
+        "Compresses cold simulation folders and evicts old or least recently used ones until "
+        "simulation_results fits in its quota"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--quota-bytes", type=int, help="Overrides SIMULATION_RESULTS_QUOTA_BYTES"
+        )
+        parser.add_argument(
+            "--max-age-days",
+            type=float,
+            help="Overrides SIMULATION_RESULTS_MAX_AGE_DAYS",
+        )
+        parser.add_argument(
+            "--compress-after-hours",
+            type=float,
+            help="Overrides SIMULATION_RESULTS_COMPRESS_AFTER_HOURS",
+        )
+        parser.add_argument(
+            "--protected-minutes",
+            type=float,
+            help="Overrides SIMULATION_RESULTS_PROTECTED_MINUTES",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only reports what would be compressed or deleted",
+        )
+
+    def handle(self, *args, **options):
+        retention_service = RetentionService(
+            quota_bytes=options["quota_bytes"],
+            max_age_days=options["max_age_days"],
+            compress_after_hours=options["compress_after_hours"],
+            protected_minutes=options["protected_minutes"],
+            dry_run=options["dry_run"],
+        )
+        report = retention_service.enforce_retention()
+
+        prefix = "[DRY RUN] " if options["dry_run"] else ""
+        for folder in report.compressed:
+            self.stdout.write(f"{prefix}Compressed {folder}")
+        for folder in report.deleted:
+            self.stdout.write(f"{prefix}Deleted {folder}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{prefix}Freed {report.freed_bytes} bytes, simulation results use {report.total_bytes} bytes"
+            )
+        )
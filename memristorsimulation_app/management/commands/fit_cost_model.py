@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+from memristorsimulation_app.services.costestimatorservice import CostEstimatorService
+
+
+class Command(BaseCommand):
+    help = (
+        "Fits the simulation cost model used by the admission control on the execution times "
+        "logged by previous runs"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Prints the fitted cost model without saving it",
+        )
+
+    def handle(self, *args, **options):
+        cost_estimator_service = CostEstimatorService()
+        samples = cost_estimator_service.collect_samples()
+        cost_model = cost_estimator_service.fit(samples)
+
+        if cost_model.amount_samples != len(samples):
+            self.stdout.write(
+                self.style.WARNING(
+                    f"Not enough timed runs to fit the cost model ({len(samples)} found, "
+                    f"{CostEstimatorService.MIN_FIT_SAMPLES} needed)"
+                )
+            )
+            return
+
+        for k, v in cost_model.to_dict().items():
+            self.stdout.write(f"# {k} = {v}")
+
+        if not options["dry_run"]:
+            cost_estimator_service.save_cost_model()
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Cost model fitted on {len(samples)} runs saved in {CostEstimatorService.COST_MODEL_FILE_PATH}"
+                )
+            )
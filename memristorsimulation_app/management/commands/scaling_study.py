@@ -0,0 +1,105 @@
+from django.core.management.base import BaseCommand, CommandError
+from memristorsimulation_app.constants import NetworkType
+from memristorsimulation_app.services.scalingstudyservice import (
+    NGSpiceNotFound,
+    ScalingStudyService,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Simulates networks of growing size, records wall time, ngspice times, peak RSS and output size, fits their "
+        "complexity exponents and writes a JSON report with a plot per metric"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--network-types",
+            nargs="+",
+            choices=[
+                network_type.value
+                for network_type in ScalingStudyService.DEFAULT_NETWORK_TYPES
+            ],
+            help="Network types to study (default every network type)",
+        )
+        parser.add_argument(
+            "--sizes",
+            type=int,
+            nargs="+",
+            help=f"Grid sides to study, other networks get as many nodes (default {ScalingStudyService.DEFAULT_SIZES})",
+        )
+        parser.add_argument(
+            "--connections",
+            type=int,
+            nargs="+",
+            help=(
+                "Connections per node of random regular and Watts-Strogatz networks "
+                f"(default {ScalingStudyService.DEFAULT_CONNECTIONS})"
+            ),
+        )
+        parser.add_argument(
+            "--points",
+            type=int,
+            help=f"Timepoints of every simulation (default {ScalingStudyService.DEFAULT_AMOUNT_POINTS})",
+        )
+        parser.add_argument(
+            "--repeats",
+            type=int,
+            help=f"Runs of every configuration (default {ScalingStudyService.DEFAULT_REPEATS})",
+        )
+        parser.add_argument(
+            "--output-dir",
+            default="scaling_study",
+            help="Folder where the JSON report and the figures are written",
+        )
+        parser.add_argument(
+            "--keep-results",
+            action="store_true",
+            help="Keep the simulation folders of the runs",
+        )
+
+    def handle(self, *args, **options):
+        scaling_study_service = ScalingStudyService(
+            network_types=(
+                [NetworkType(value) for value in options["network_types"]]
+                if options["network_types"]
+                else None
+            ),
+            sizes=options["sizes"],
+            connections=options["connections"],
+            amount_points=options["points"],
+            repeats=options["repeats"],
+            keep_results=options["keep_results"],
+        )
+        try:
+            measurements = scaling_study_service.run()
+        except NGSpiceNotFound as e:
+            raise CommandError(str(e))
+
+        report = scaling_study_service.save_report(measurements, options["output_dir"])
+
+        for row in report["aggregated"]:
+            self.stdout.write(
+                f"{row['network_type']:<22} nodes={row['amount_nodes']:<5} edges={row['amount_edges']:<5} "
+                f"wall={row['wall_time']:.2f} ms user={row['ngspice_user_time']} ms "
+                f"rss={row['ngspice_peak_rss']} B output={row['output_size']} B"
+            )
+        for fit in report["fits"]:
+            self.stdout.write(
+                f"{fit['network_type']:<22} {fit['metric']:<18} ~ {fit['variable']}^{fit['exponent']:.2f} "
+                f"(r2={fit['r_squared']:.3f})"
+            )
+        for skipped_configuration in scaling_study_service.skipped_configurations:
+            self.stdout.write(self.style.WARNING(f"Skipped {skipped_configuration}"))
+        for measurement in measurements:
+            if measurement.is_failed():
+                self.stdout.write(
+                    self.style.ERROR(
+                        f"{measurement.network_type} size={measurement.size} repeat={measurement.repeat}: "
+                        f"{measurement.error}"
+                    )
+                )
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Scaling study saved in {options['output_dir']}")
+        )
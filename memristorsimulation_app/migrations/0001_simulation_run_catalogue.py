@@ -0,0 +1,135 @@
+# Generated by Django 5.1.6 on 2026-10-19 14:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="SimulationRun",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("input_hash", models.CharField(max_length=64)),
+                (
+                    "model",
+                    models.CharField(
+                        choices=[
+                            ("pershin.sub", "PERSHIN"),
+                            ("vourkas.sub", "VOURKAS"),
+                            ("biolek.sub", "BIOLEK"),
+                        ],
+                        max_length=32,
+                    ),
+                ),
+                (
+                    "network_type",
+                    models.CharField(
+                        choices=[
+                            ("SINGLE_DEVICE", "SINGLE_DEVICE"),
+                            ("GRID_2D_GRAPH", "GRID_2D_GRAPH"),
+                            ("RANDOM_REGULAR_GRAPH", "RANDOM_REGULAR_GRAPH"),
+                            ("WATTS_STROGATZ_GRAPH", "WATTS_STROGATZ_GRAPH"),
+                        ],
+                        max_length=32,
+                    ),
+                ),
+                (
+                    "model_simulation_folder",
+                    models.CharField(
+                        choices=[
+                            ("pershin_simulations", "PERSHIN_SIMULATIONS"),
+                            ("vourkas_simulations", "VOURKAS_SIMULATIONS"),
+                            ("biolek_simulations", "BIOLEK_SIMULATIONS"),
+                        ],
+                        max_length=64,
+                    ),
+                ),
+                ("folder_name", models.CharField(max_length=255)),
+                ("inputs", models.JSONField()),
+                ("amount_nodes", models.PositiveIntegerField(null=True)),
+                ("amount_edges", models.PositiveIntegerField(null=True)),
+                ("amount_iterations", models.PositiveIntegerField(default=1)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("RUNNING", "RUNNING"),
+                            ("FINISHED", "FINISHED"),
+                            ("FAILED", "FAILED"),
+                            ("CANCELLED", "CANCELLED"),
+                        ],
+                        max_length=16,
+                    ),
+                ),
+                ("error", models.TextField(blank=True, default="")),
+                ("python_execution_time", models.FloatField(null=True)),
+                ("linux_real_execution_time", models.FloatField(null=True)),
+                ("linux_user_execution_time", models.FloatField(null=True)),
+                ("linux_sys_execution_time", models.FloatField(null=True)),
+                ("time_measures", models.JSONField(default=list)),
+                ("started_at", models.DateTimeField()),
+                ("finished_at", models.DateTimeField()),
+            ],
+            options={
+                "ordering": ["-started_at"],
+                "indexes": [
+                    models.Index(fields=["input_hash"], name="simulation_run_hash_idx"),
+                    models.Index(fields=["model"], name="simulation_run_model_idx"),
+                    models.Index(
+                        fields=["network_type"], name="simulation_run_network_idx"
+                    ),
+                    models.Index(
+                        fields=["model_simulation_folder", "folder_name"],
+                        name="simulation_run_folder_idx",
+                    ),
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="SimulationRunFile",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("archive_name", models.CharField(max_length=255)),
+                ("path", models.CharField(max_length=1024)),
+                ("size_bytes", models.BigIntegerField()),
+                (
+                    "run",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="files",
+                        to="memristorsimulation_app.simulationrun",
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("run", "archive_name"),
+                        name="simulation_run_file_unique",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.6 on 2026-10-19 15:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("memristorsimulation_app", "0001_simulation_run_catalogue"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="simulationrun",
+            name="ngspice_statistics",
+            field=models.JSONField(default=dict),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.6 on 2026-10-19 15:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("memristorsimulation_app", "0002_simulation_run_ngspice_statistics"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="simulationrun",
+            name="max_rss_bytes",
+            field=models.BigIntegerField(null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.6 on 2026-10-19 15:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("memristorsimulation_app", "0004_simulation_run_evicted_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="simulationrun",
+            name="compressed_at",
+            field=models.DateTimeField(null=True),
+        ),
+    ]
@@ -1,3 +1,92 @@
 from django.db import models
+from memristorsimulation_app.constants import (
+    MemristorModels,
+    ModelsSimulationFolders,
+    NetworkType,
+    SimulationStatus,
+)
 
-# Create your models here.
+
+class SimulationRun(models.Model):
+    """
+    Catalogue entry of a simulation run: canonical inputs and their hash, network size, ngspice timings and the files
+    left in simulation_results
+    """
+
+    input_hash = models.CharField(max_length=64)
+    model = models.CharField(
+        max_length=32, choices=[(model.value, model.name) for model in MemristorModels]
+    )
+    network_type = models.CharField(
+        max_length=32,
+        choices=[
+            (network_type.value, network_type.name) for network_type in NetworkType
+        ],
+    )
+    model_simulation_folder = models.CharField(
+        max_length=64,
+        choices=[(folder.value, folder.name) for folder in ModelsSimulationFolders],
+    )
+    folder_name = models.CharField(max_length=255)
+    inputs = models.JSONField()
+    amount_nodes = models.PositiveIntegerField(null=True)
+    amount_edges = models.PositiveIntegerField(null=True)
+    amount_iterations = models.PositiveIntegerField(default=1)
+    status = models.CharField(
+        max_length=16,
+        choices=[
+            (run_status.value, run_status.name) for run_status in SimulationStatus
+        ],
+    )
+    error = models.TextField(blank=True, default="")
+    # Averages over the iterations in ms, every iteration is kept in time_measures
+    python_execution_time = models.FloatField(null=True)
+    linux_real_execution_time = models.FloatField(null=True)
+    linux_user_execution_time = models.FloatField(null=True)
+    linux_sys_execution_time = models.FloatField(null=True)
+    time_measures = models.JSONField(default=list)
+    # Peak resident memory of ngspice over the iterations, for capacity planning
+    max_rss_bytes = models.BigIntegerField(null=True)
+    # ngspice "rusage all" statistics of the last iteration that succeeded, empty if ngspice did not report them
+    ngspice_statistics = models.JSONField(default=dict)
+    started_at = models.DateTimeField()
+    finished_at = models.DateTimeField()
+    # Set when the retention deletes the run folder, the row is kept for its inputs and timings
+    evicted_at = models.DateTimeField(null=True)
+    # Set while the retention keeps the run folder compressed into <folder_name>.zip, the paths of its files are
+    # readable again once the folder is restored on access
+    compressed_at = models.DateTimeField(null=True)
+
+    class Meta:
+        ordering = ["-started_at"]
+        indexes = [
+            models.Index(fields=["input_hash"], name="simulation_run_hash_idx"),
+            models.Index(fields=["model"], name="simulation_run_model_idx"),
+            models.Index(fields=["network_type"], name="simulation_run_network_idx"),
+            models.Index(
+                fields=["model_simulation_folder", "folder_name"],
+                name="simulation_run_folder_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.model_simulation_folder}/{self.folder_name} ({self.status})"
+
+
+class SimulationRunFile(models.Model):
+    run = models.ForeignKey(
+        SimulationRun, related_name="files", on_delete=models.CASCADE
+    )
+    archive_name = models.CharField(max_length=255)
+    path = models.CharField(max_length=1024)
+    size_bytes = models.BigIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["run", "archive_name"], name="simulation_run_file_unique"
+            )
+        ]
+
+    def __str__(self):
+        return self.archive_name
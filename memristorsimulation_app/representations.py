@@ -1,17 +1,23 @@
 import time
+import uuid
 import networkx as nx
+import numpy as np
 import pandas as pd
 
 from abc import ABC, abstractmethod
-from dataclasses import fields, dataclass, asdict, field
+from dataclasses import fields, dataclass, asdict, field, replace
+from io import BytesIO
 from typing import Any, Dict, List, Tuple
 from memristorsimulation_app.constants import (
     MemristorModels,
     NetworkType,
     PlotType,
     WaveForms,
+    AdmissionDecision,
     AnalysisType,
+    SimulationStatus,
     ModelsSimulationFolders,
+    OutputDecimation,
     SpiceDevices,
     SpiceModel,
 )
@@ -22,6 +28,26 @@ class WaveForm(ABC):
     def to_string(self) -> str:
         pass
 
+    @abstractmethod
+    def get_auto_tstep(self) -> float:
+        """
+        :return: Largest time step resolving the waveform content, inf for waveforms that do not limit the step
+        """
+        pass
+
+
+def _get_pulse_auto_tstep(
+    tr: float, tf: float, pw: float, per: float, points_per_plateau: int
+) -> float:
+    # Pulse corners are breakpoints where ngspice always places a timepoint and shortens its step, so edges are
+    # resolved by ngspice itself and only the plateaus limit the step
+    off_time = per - tr - pw - tf
+    plateaus = [plateau for plateau in (pw, off_time) if plateau > 0]
+    if not plateaus:
+        return float("inf")
+
+    return min(plateaus) / points_per_plateau
+
 
 @dataclass
 class SinWaveForm(WaveForm):
@@ -32,12 +58,20 @@ class SinWaveForm(WaveForm):
     theta: float = 0.0
     phase: float = 0.0
 
+    AUTO_STEP_POINTS_PER_PERIOD = 100
+
     def to_string(self) -> str:
         return (
             f"{WaveForms.SIN.value} {self.vo} {self.amplitude} {self.frequency} {self.td} {self.theta} {self.phase}"
             f"\n"
         )
 
+    def get_auto_tstep(self) -> float:
+        if not self.frequency:
+            return float("inf")
+
+        return 1 / (abs(self.frequency) * self.AUTO_STEP_POINTS_PER_PERIOD)
+
 
 @dataclass
 class PulseWaveForm(WaveForm):
@@ -50,6 +84,13 @@ class PulseWaveForm(WaveForm):
     per: float = 1
     np: int = 0
 
+    AUTO_STEP_POINTS_PER_PLATEAU = 20
+
+    def get_auto_tstep(self) -> float:
+        return _get_pulse_auto_tstep(
+            self.tr, self.tf, self.pw, self.per, self.AUTO_STEP_POINTS_PER_PLATEAU
+        )
+
     def to_string(self) -> str:
         return (
             f"{WaveForms.PULSE.value} {self.v1} {self.v2} {self.td} {self.tr} {self.tf} {self.pw} {self.per} "
@@ -68,6 +109,13 @@ class AlternatingPulseWaveForm(WaveForm):
     per: float = 1
     np: int = 0
 
+    AUTO_STEP_POINTS_PER_PLATEAU = 20
+
+    def get_auto_tstep(self) -> float:
+        return _get_pulse_auto_tstep(
+            self.tr, self.tf, self.pw, self.per, self.AUTO_STEP_POINTS_PER_PLATEAU
+        )
+
     def to_string(self) -> str:
         wave_form_string = f"{WaveForms.PWL.value}(\n+ {self.td}\t {self.v1}\n"
 
@@ -159,6 +207,26 @@ class SimulationParameters:
     tstart: float = None
     tmax: float = None
     uic: bool = None
+    # tstep and tmax are derived from the waveform by resolve_auto_step
+    auto_step: bool = None
+
+    AUTO_STEP_MIN_POINTS = 100
+
+    def resolve_auto_step(self, wave_form: WaveForm) -> "SimulationParameters":
+        """
+        Automatic step: tstep and tmax are set to the waveform step (100 points per sine period, 20 per pulse plateau),
+        with at least AUTO_STEP_MIN_POINTS points in the simulated span. ngspice writes its accepted timepoints
+        without interpolation and always steps onto the pulse and PWL corners, so the output grid is the coarse
+        uniform grid refined only around the breakpoints.
+        :return: Copy with tstep and tmax resolved, the same parameters when the automatic step is off
+        """
+        if not self.auto_step:
+            return self
+
+        span = self.tstop - (self.tstart or 0)
+        tstep = min(wave_form.get_auto_tstep(), span / self.AUTO_STEP_MIN_POINTS)
+
+        return replace(self, tstep=tstep, tmax=tstep)
 
     def get_analysis(self) -> str:
         return (
@@ -176,11 +244,14 @@ class SimulationParameters:
 
         return cls(
             analysis_type=analysis_type,
-            tstep=float(data["tstep"]),
+            tstep=float(data["tstep"]) if data.get("tstep") is not None else None,
             tstop=float(data["tstop"]),
             tstart=float(data["tstart"]) if data.get("tstart") is not None else None,
             tmax=float(data["tmax"]) if data.get("tmax") is not None else None,
             uic=bool(data["uic"]) if data.get("uic") is not None else None,
+            auto_step=(
+                bool(data["auto_step"]) if data.get("auto_step") is not None else None
+            ),
         )
 
 
@@ -190,13 +261,29 @@ class ExportParameters:
     folder_name: str
     file_name: str
     magnitudes: List[str]
+    # Export parameters sharing a run id are written into the same run folder
+    run_id: str = None
+    # Timepoints written by ngspice: every accepted one, interpolated onto tstep, every decimation_factor-th or the
+    # ones where a magnitude moved more than decimation_tolerance of its range since the last written one
+    output_decimation: OutputDecimation = None
+    decimation_factor: int = None
+    decimation_tolerance: float = None
 
     def get_export_magnitudes(self) -> str:
         return " ".join(self.magnitudes)
 
+    @staticmethod
+    def create_run_id() -> str:
+        """
+        Timestamp keeps run folders sorted by creation, the random suffix keeps runs started in the same second with
+        the same folder name apart
+        """
+        return f"{int(time.time())}_{uuid.uuid4().hex[:12]}"
+
     def __post_init__(self):
-        timestamp = int(time.time())
-        self.folder_name = self.folder_name + "_" + str(timestamp)
+        if self.run_id is None:
+            self.run_id = self.create_run_id()
+        self.folder_name = self.folder_name + "_" + self.run_id
 
     @classmethod
     def from_dict(
@@ -205,11 +292,26 @@ class ExportParameters:
         model_simulation_folder = (
             ModelsSimulationFolders.get_simulation_folder_by_model(model)
         )
+        output_decimation = data.get("output_decimation")
+        if isinstance(output_decimation, str):
+            output_decimation = OutputDecimation(output_decimation)
+
         return cls(
             model_simulation_folder=model_simulation_folder,
             folder_name=data["folder_name"],
             file_name=data["file_name"],
             magnitudes=data["magnitudes"],
+            output_decimation=output_decimation,
+            decimation_factor=(
+                int(data["decimation_factor"])
+                if data.get("decimation_factor") is not None
+                else None
+            ),
+            decimation_tolerance=(
+                float(data["decimation_tolerance"])
+                if data.get("decimation_tolerance") is not None
+                else None
+            ),
         )
 
 
@@ -279,6 +381,42 @@ class Component:
         return attr_str
 
 
+@dataclass()
+class NGSpiceStatistics:
+    """
+    Statistics ngspice reports with "rusage all", times in ms and sizes in bytes
+    """
+
+    total_iterations: int = None
+    transient_iterations: int = None
+    circuit_equations: int = None
+    transient_timepoints: int = None
+    accepted_timepoints: int = None
+    rejected_timepoints: int = None
+    total_analysis_time: float = None
+    total_elapsed_time: float = None
+    transient_time: float = None
+    load_time: float = None
+    reordering_time: float = None
+    decomposition_time: float = None
+    solve_time: float = None
+    max_program_size: int = None
+
+    def get_rejected_timepoints_ratio(self) -> float:
+        if not self.accepted_timepoints or self.rejected_timepoints is None:
+            return None
+
+        return self.rejected_timepoints / (
+            self.accepted_timepoints + self.rejected_timepoints
+        )
+
+    def get_iterations_per_timepoint(self) -> float:
+        if not self.transient_timepoints or self.transient_iterations is None:
+            return None
+
+        return self.transient_iterations / self.transient_timepoints
+
+
 @dataclass()
 class TimeMeasure:
     start_time: float = None
@@ -286,6 +424,19 @@ class TimeMeasure:
     linux_real_execution_time: float = None
     linux_user_execution_time: float = None
     linux_sys_execution_time: float = None
+    return_code: int = None
+    ngspice_statistics: NGSpiceStatistics = None
+    # Resource usage of the ngspice process reported by os.wait4
+    max_rss_bytes: int = None
+    minor_page_faults: int = None
+    major_page_faults: int = None
+    voluntary_context_switches: int = None
+    involuntary_context_switches: int = None
+    block_input_operations: int = None
+    block_output_operations: int = None
+
+    def is_failed(self) -> bool:
+        return self.return_code not in (None, 0)
 
 
 @dataclass()
@@ -303,6 +454,38 @@ class DataLoader:
     csv_file_name_no_extension: str
 
 
+@dataclass()
+class SimulationSeries:
+    csv_file_name_no_extension: str
+    columns: List[str]
+    values: Dict[str, np.ndarray]
+    total_points: int
+
+    @property
+    def returned_points(self) -> int:
+        return len(self.values[self.columns[0]]) if self.columns else 0
+
+
+@dataclass()
+class SimulationProgress:
+    progress_id: str
+    status: SimulationStatus = SimulationStatus.RUNNING
+    tstop: float = None
+    simulated_time: float = 0.0
+    percentage: float = 0.0
+    start_time: float = None
+    elapsed_time: float = 0.0
+    estimated_time_remaining: float = None
+    error: str = None
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "SimulationProgress":
+        return cls(**{**data, "status": SimulationStatus(data["status"])})
+
+    def to_dict(self) -> dict:
+        return {**asdict(self), "status": self.status.value}
+
+
 @dataclass()
 class NetworkParameters:
     n: int = None
@@ -319,6 +502,80 @@ class Graph:
     vin_minus: Tuple[int, int]
     vin_plus: Tuple[int, int]
     seed: int = None
+    state_edges: Dict[str, Tuple[Any, Any]] = None
+
+
+@dataclass
+class SweepPointResult:
+    index: int
+    parameter_values: Dict[str, Any]
+    folder_name: str = None
+    file_paths: List[Tuple[str, str]] = field(default_factory=list)
+    error: str = None
+    run_fields: Dict[str, Any] = None
+
+
+@dataclass
+class SimulationCostFeatures:
+    model: MemristorModels
+    amount_edges: int
+    amount_timepoints: float
+    amount_magnitudes: int
+    amount_iterations: int = 1
+
+
+@dataclass
+class CostModel:
+    """
+    Power law of the simulation time: log(ms) = intercept + edges_exponent * log(edges) +
+    timepoints_exponent * log(timepoints) + magnitudes_exponent * log(1 + magnitudes) + model offset
+    """
+
+    intercept: float
+    edges_exponent: float
+    timepoints_exponent: float
+    magnitudes_exponent: float
+    model_offsets: Dict[str, float] = field(default_factory=dict)
+    amount_samples: int = 0
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "CostModel":
+        return cls(**data)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass
+class SimulationCostEstimate:
+    features: SimulationCostFeatures
+    estimated_time_ms: float
+    decision: AdmissionDecision = AdmissionDecision.ACCEPT
+
+
+@dataclass
+class SimulationArtifact:
+    zip_buffer: BytesIO
+    folder_name: str
+    coalesced: bool = False
+
+
+@dataclass
+class SimulationFolderUsage:
+    model_simulation_folder: ModelsSimulationFolders
+    folder_name: str
+    path: str
+    size_bytes: int
+    last_access: float
+    compressed: bool = False
+
+
+@dataclass
+class RetentionReport:
+    total_bytes: int = 0
+    freed_bytes: int = 0
+    deleted: List[str] = field(default_factory=list)
+    compressed: List[str] = field(default_factory=list)
 
 
 @dataclass
@@ -332,3 +589,128 @@ class SimulationInputs:
     network_parameters: NetworkParameters = None
     amount_iterations: int = 1
     plot_types: List[PlotType] = None
+
+
+@dataclass
+class TimingStatistics:
+    """
+    Robust statistics in ms of one time measure over the measured iterations. outliers holds the indexes of the
+    iterations whose modified z-score exceeds the outlier threshold.
+    """
+
+    amount_samples: int
+    mean: float
+    median: float
+    p5: float
+    p95: float
+    std: float
+    mad: float
+    ci_low: float
+    ci_high: float
+    outliers: List[int] = field(default_factory=list)
+
+    def get_relative_ci_half_width(self) -> float:
+        if not self.median:
+            return float("inf")
+
+        return (self.ci_high - self.ci_low) / 2 / abs(self.median)
+
+
+@dataclass
+class TimingReport:
+    max_iterations: int
+    amount_warmup_iterations: int
+    amount_iterations: int
+    amount_failed_iterations: int
+    stopped_early: bool
+    confidence_level: float
+    statistics: Dict[str, TimingStatistics] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass
+class TimingSpan:
+    name: str
+    start_ms: float
+    duration_ms: float
+
+    def get_end_ms(self) -> float:
+        return self.start_ms + self.duration_ms
+
+
+@dataclass
+class BenchmarkResult:
+    stage: str
+    size: int
+    times: List[float]
+
+    def get_median_time(self) -> float:
+        return float(np.median(self.times))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "stage": self.stage,
+            "size": self.size,
+            "median_ms": self.get_median_time(),
+            "min_ms": min(self.times),
+            "max_ms": max(self.times),
+            "times_ms": self.times,
+        }
+
+
+@dataclass
+class BenchmarkRegression:
+    stage: str
+    size: int
+    baseline_time: float
+    time: float
+
+    def get_ratio(self) -> float:
+        return self.time / self.baseline_time
+
+
+@dataclass
+class ScalingMeasurement:
+    network_type: str
+    size: int
+    amount_connections: int
+    repeat: int
+    amount_nodes: int = None
+    amount_edges: int = None
+    wall_time: float = None
+    ngspice_real_time: float = None
+    ngspice_user_time: float = None
+    ngspice_sys_time: float = None
+    ngspice_peak_rss: int = None
+    python_peak_rss: int = None
+    output_size: int = None
+    error: str = None
+
+    def is_failed(self) -> bool:
+        return self.error is not None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass
+class ScalingFit:
+    """
+    Power law metric = coefficient * variable ^ exponent fitted by least squares in log-log space
+    """
+
+    network_type: str
+    metric: str
+    variable: str
+    exponent: float
+    coefficient: float
+    r_squared: float
+    amount_points: int
+
+    def predict(self, value: float) -> float:
+        return self.coefficient * value**self.exponent
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
@@ -2,12 +2,20 @@ from memristorsimulation_app.constants import (
     MemristorModels,
     ModelsSimulationFolders,
     NetworkType,
+    OutputDecimation,
     PlotType,
+    SeriesFormat,
+    SimulationStatus,
+    SweepMode,
     WaveForms,
 )
+from django.conf import settings
 from rest_framework import serializers
 from rest_enumfield import EnumField
-from memristorsimulation_app.serializers.baseserializers import CamelCaseSerializer
+from memristorsimulation_app.serializers.baseserializers import (
+    CamelCaseSerializer,
+    CaseAdapter,
+)
 
 
 class ModelParametersSerializer(CamelCaseSerializer):
@@ -72,11 +80,27 @@ class InputParametersSerializer(CamelCaseSerializer):
 
 class SimulationParametersSerializer(CamelCaseSerializer):
     analysis_type = serializers.CharField(default=".tran")
-    tstep = serializers.FloatField()
+    tstep = serializers.FloatField(required=False, allow_null=True)
     tstop = serializers.FloatField()
     tstart = serializers.FloatField(required=False, allow_null=True)
     tmax = serializers.FloatField(required=False, allow_null=True)
     uic = serializers.BooleanField(required=False, allow_null=True, default=True)
+    auto_step = serializers.BooleanField(required=False, default=False)
+
+    def validate(self, data):
+        # tstep and tmax are derived from the waveform in the automatic step mode
+        if not data.get("auto_step") and data.get("tstep") is None:
+            raise serializers.ValidationError(
+                {"tstep": "tstep is required unless autoStep is enabled"}
+            )
+        if data.get("tstep") is not None and data["tstep"] <= 0:
+            raise serializers.ValidationError({"tstep": "tstep must be positive"})
+        if data["tstop"] <= (data.get("tstart") or 0):
+            raise serializers.ValidationError(
+                {"tstop": "tstop must be greater than tstart"}
+            )
+
+        return data
 
 
 class ExportParametersSerializer(CamelCaseSerializer):
@@ -84,14 +108,62 @@ class ExportParametersSerializer(CamelCaseSerializer):
     folder_name = serializers.CharField()
     file_name = serializers.CharField()
     magnitudes = serializers.ListField(child=serializers.CharField())
+    output_decimation = EnumField(
+        choices=OutputDecimation, required=False, default=OutputDecimation.NONE
+    )
+    decimation_factor = serializers.IntegerField(
+        required=False, allow_null=True, min_value=2
+    )
+    decimation_tolerance = serializers.FloatField(
+        required=False, allow_null=True, min_value=0
+    )
+
+    def validate(self, data):
+        if (
+            data.get("output_decimation") == OutputDecimation.EVERY_NTH
+            and data.get("decimation_factor") is None
+        ):
+            raise serializers.ValidationError(
+                {"decimation_factor": "decimationFactor is required by EVERY_NTH"}
+            )
+        if (
+            data.get("output_decimation") == OutputDecimation.TOLERANCE
+            and data.get("decimation_tolerance") is None
+        ):
+            raise serializers.ValidationError(
+                {"decimation_tolerance": "decimationTolerance is required by TOLERANCE"}
+            )
+        max_magnitudes = settings.SIMULATION_DECIMATION_TOLERANCE_MAX_MAGNITUDES
+        if (
+            data.get("output_decimation") == OutputDecimation.TOLERANCE
+            and len(data.get("magnitudes", [])) > max_magnitudes
+        ):
+            raise serializers.ValidationError(
+                {
+                    "magnitudes": f"TOLERANCE decimation accepts up to {max_magnitudes} magnitudes"
+                }
+            )
+
+        return data
 
 
 class NetworkParametersSerializer(CamelCaseSerializer):
-    n = serializers.IntegerField(required=False, allow_null=True)
-    m = serializers.IntegerField(required=False, allow_null=True)
-    amount_connections = serializers.IntegerField(required=False, allow_null=True)
-    amount_nodes = serializers.IntegerField(required=False, allow_null=True)
-    shortcut_probability = serializers.FloatField(required=False, allow_null=True)
+    # Bounds keep the network inside what admission control can price, the cost budgets reject the expensive ones
+    n = serializers.IntegerField(
+        required=False, allow_null=True, min_value=1, max_value=1000
+    )
+    m = serializers.IntegerField(
+        required=False, allow_null=True, min_value=1, max_value=1000
+    )
+    amount_connections = serializers.IntegerField(
+        required=False, allow_null=True, min_value=1, max_value=1000
+    )
+    amount_nodes = serializers.IntegerField(
+        required=False, allow_null=True, min_value=1, max_value=1000000
+    )
+    shortcut_probability = serializers.FloatField(
+        required=False, allow_null=True, min_value=0, max_value=1
+    )
     seed = serializers.IntegerField(required=False, allow_null=True)
 
 
@@ -107,3 +179,102 @@ class SimulationInputsSerializer(CamelCaseSerializer):
     plot_types = serializers.ListField(
         child=EnumField(choices=PlotType), required=False, default=[]
     )
+
+
+class SimulationSeriesQuerySerializer(CamelCaseSerializer):
+    columns = serializers.CharField(required=False, allow_blank=True)
+    max_points = serializers.IntegerField(
+        required=False, default=2000, min_value=2, max_value=200000
+    )
+    file_name = serializers.CharField(required=False)
+    response_format = EnumField(
+        choices=SeriesFormat, required=False, default=SeriesFormat.JSON
+    )
+
+    def validate_columns(self, value):
+        return [column.strip() for column in value.split(",") if column.strip()]
+
+
+class SimulationWindowQuerySerializer(CamelCaseSerializer):
+    columns = serializers.CharField(required=False, allow_blank=True)
+    t0 = serializers.FloatField(required=False)
+    t1 = serializers.FloatField(required=False)
+    max_points = serializers.IntegerField(
+        required=False, min_value=2, max_value=10000000
+    )
+    file_name = serializers.CharField(required=False)
+    response_format = EnumField(
+        choices=SeriesFormat, required=False, default=SeriesFormat.CSV
+    )
+
+    def validate_columns(self, value):
+        return [column.strip() for column in value.split(",") if column.strip()]
+
+    def validate(self, data):
+        if data.get("t0") is not None and data.get("t1") is not None:
+            if data["t0"] > data["t1"]:
+                raise serializers.ValidationError({"t1": "t1 must be >= t0"})
+
+        return data
+
+
+class SimulationSeriesSerializer(CamelCaseSerializer):
+    csv_file_name_no_extension = serializers.CharField()
+    columns = serializers.ListField(child=serializers.CharField())
+    total_points = serializers.IntegerField()
+    returned_points = serializers.IntegerField()
+    series = serializers.SerializerMethodField()
+
+    def get_series(self, instance):
+        # Column names like i(v1) must not be camel cased, so they are returned as ordered lists
+        return [instance.values[column].tolist() for column in instance.columns]
+
+
+class SimulationProgressSerializer(CamelCaseSerializer):
+    progress_id = serializers.CharField()
+    status = EnumField(choices=SimulationStatus)
+    tstop = serializers.FloatField(allow_null=True)
+    simulated_time = serializers.FloatField()
+    percentage = serializers.FloatField()
+    elapsed_time = serializers.FloatField()
+    estimated_time_remaining = serializers.FloatField(allow_null=True)
+    error = serializers.CharField(allow_null=True)
+
+
+class SweepParameterSerializer(CamelCaseSerializer):
+    path = serializers.CharField()
+    values = serializers.ListField(child=serializers.JSONField(), required=False)
+    start = serializers.FloatField(required=False)
+    stop = serializers.FloatField(required=False)
+    num = serializers.IntegerField(required=False, min_value=1)
+
+    def validate_path(self, value):
+        # Paths use the same camel case keys as the request body, e.g. subcircuit.modelParameters.alpha
+        return ".".join(
+            CaseAdapter.snake_case_adapter(key) for key in value.split(".") if key
+        )
+
+    def validate(self, attrs):
+        has_values = attrs.get("values") is not None
+        has_range = all(attrs.get(k) is not None for k in ("start", "stop", "num"))
+        if has_values == has_range:
+            raise serializers.ValidationError(
+                "Either values or start, stop and num must be provided"
+            )
+        if has_values and not attrs["values"]:
+            raise serializers.ValidationError("values cannot be empty")
+
+        return attrs
+
+
+class SweepSimulationInputsSerializer(CamelCaseSerializer):
+    base = serializers.DictField()
+    parameters = SweepParameterSerializer(many=True)
+    mode = EnumField(choices=SweepMode, required=False, default=SweepMode.CARTESIAN)
+    max_workers = serializers.IntegerField(required=False, min_value=1)
+
+    def validate_parameters(self, value):
+        if not value:
+            raise serializers.ValidationError("At least one parameter is required")
+
+        return value
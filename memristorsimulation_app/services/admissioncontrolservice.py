@@ -0,0 +1,158 @@
+import asyncio
+import fcntl
+import os
+import time
+
+from contextlib import asynccontextmanager, contextmanager
+from typing import Iterator, List, Optional, TextIO
+from django.conf import settings
+from memristorsimulation_app.constants import SIMULATIONS_DIR, AdmissionDecision
+from memristorsimulation_app.representations import (
+    SimulationCostEstimate,
+    SimulationInputs,
+)
+from memristorsimulation_app.services.costestimatorservice import CostEstimatorService
+
+
+class AdmissionControlService:
+    """
+    Decides how a simulation request is admitted from its estimated cost and the SIMULATION_COST_* budgets. Low priority
+    simulations run in a lane of SIMULATION_LOW_PRIORITY_SLOTS flock slots shared by every worker process.
+    """
+
+    LANE_DIR = f"{SIMULATIONS_DIR}/.lanes"
+    SLOT_POLL_INTERVAL = 1.0
+
+    def __init__(
+        self,
+        simulation_inputs: SimulationInputs,
+        cost_estimator_service: CostEstimatorService = None,
+    ):
+        self.simulation_inputs = simulation_inputs
+        self.cost_estimator_service = cost_estimator_service or CostEstimatorService()
+
+    @staticmethod
+    def get_decision(estimated_time_ms: float) -> AdmissionDecision:
+        estimated_time_seconds = estimated_time_ms / 1000
+
+        for budget, decision in [
+            (settings.SIMULATION_COST_REJECT_SECONDS, AdmissionDecision.REJECT),
+            (
+                settings.SIMULATION_COST_LOW_PRIORITY_SECONDS,
+                AdmissionDecision.LOW_PRIORITY,
+            ),
+            (settings.SIMULATION_COST_WARN_SECONDS, AdmissionDecision.WARN),
+        ]:
+            if budget and estimated_time_seconds > budget:
+                return decision
+
+        return AdmissionDecision.ACCEPT
+
+    def evaluate(self) -> SimulationCostEstimate:
+        features = self.cost_estimator_service.get_features(self.simulation_inputs)
+        estimated_time_ms = self.cost_estimator_service.estimate_time_ms(features)
+
+        return SimulationCostEstimate(
+            features=features,
+            estimated_time_ms=estimated_time_ms,
+            decision=self.get_decision(estimated_time_ms),
+        )
+
+    @classmethod
+    def evaluate_batch(
+        cls,
+        simulations_inputs: List[SimulationInputs],
+        cost_estimator_service: CostEstimatorService = None,
+    ) -> SimulationCostEstimate:
+        """
+        Prices every simulation of a batch (the points of a sweep) and admits the batch on their summed cost, as they
+        all run for a single request
+        :return: Summed estimate, with the features of the most expensive simulation
+        """
+        if not simulations_inputs:
+            raise ValueError("No simulations to evaluate")
+
+        cost_estimator_service = cost_estimator_service or CostEstimatorService()
+        cost_estimates = [
+            cls(simulation_inputs, cost_estimator_service).evaluate()
+            for simulation_inputs in simulations_inputs
+        ]
+        estimated_time_ms = sum(
+            cost_estimate.estimated_time_ms for cost_estimate in cost_estimates
+        )
+
+        return SimulationCostEstimate(
+            features=max(
+                cost_estimates,
+                key=lambda cost_estimate: cost_estimate.estimated_time_ms,
+            ).features,
+            estimated_time_ms=estimated_time_ms,
+            decision=cls.get_decision(estimated_time_ms),
+        )
+
+    @classmethod
+    def _open_slot_files(cls) -> List[TextIO]:
+        os.makedirs(cls.LANE_DIR, exist_ok=True)
+
+        return [
+            open(f"{cls.LANE_DIR}/low_priority_{slot}.lock", "a+")
+            for slot in range(max(settings.SIMULATION_LOW_PRIORITY_SLOTS, 1))
+        ]
+
+    @staticmethod
+    def _try_acquire_slot(slot_files: List[TextIO]) -> Optional[TextIO]:
+        for slot_file in slot_files:
+            try:
+                fcntl.flock(slot_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return slot_file
+            except BlockingIOError:
+                continue
+
+        return None
+
+    @staticmethod
+    def _release_slot(
+        acquired_slot_file: Optional[TextIO], slot_files: List[TextIO]
+    ) -> None:
+        if acquired_slot_file is not None:
+            fcntl.flock(acquired_slot_file, fcntl.LOCK_UN)
+        for slot_file in slot_files:
+            slot_file.close()
+
+    @classmethod
+    @asynccontextmanager
+    async def low_priority_slot(cls):
+        """
+        Waits until one of the low priority slots is free and holds it while the simulation runs
+        """
+        slot_files = cls._open_slot_files()
+        acquired_slot_file = None
+
+        try:
+            while acquired_slot_file is None:
+                acquired_slot_file = cls._try_acquire_slot(slot_files)
+                if acquired_slot_file is None:
+                    await asyncio.sleep(cls.SLOT_POLL_INTERVAL)
+
+            yield
+        finally:
+            cls._release_slot(acquired_slot_file, slot_files)
+
+    @classmethod
+    @contextmanager
+    def low_priority_slot_blocking(cls) -> Iterator[None]:
+        """
+        low_priority_slot for the sync views, the waiting blocks the calling thread
+        """
+        slot_files = cls._open_slot_files()
+        acquired_slot_file = None
+
+        try:
+            while acquired_slot_file is None:
+                acquired_slot_file = cls._try_acquire_slot(slot_files)
+                if acquired_slot_file is None:
+                    time.sleep(cls.SLOT_POLL_INTERVAL)
+
+            yield
+        finally:
+            cls._release_slot(acquired_slot_file, slot_files)
@@ -0,0 +1,115 @@
+import os
+import zipfile
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple
+from django.conf import settings
+
+
+class ArchiveService:
+    """
+    Writes simulation files into ZIP archives choosing the compression per file type. Figures are already compressed
+    formats and are stored as they are, text files (CSV, logs, circuit files) are deflated at
+    SIMULATION_ZIP_DEFLATE_LEVEL. Text members over SIMULATION_ZIP_PARALLEL_MIN_BYTES are read ahead in a thread pool
+    while the previous ones are deflated, overlapping disk reads with compression. Members are only written through
+    the public ZipFile API, which deflates them in the writing thread.
+    """
+
+    STORED_EXTENSIONS = (".jpg", ".jpeg", ".png", ".gif", ".zip", ".gz", ".npy")
+    CHUNK_SIZE = 1024 * 1024
+
+    def __init__(
+        self,
+        deflate_level: int = None,
+        parallel_min_bytes: int = None,
+        max_workers: int = None,
+    ):
+        self.deflate_level = (
+            deflate_level
+            if deflate_level is not None
+            else settings.SIMULATION_ZIP_DEFLATE_LEVEL
+        )
+        self.parallel_min_bytes = (
+            parallel_min_bytes
+            if parallel_min_bytes is not None
+            else settings.SIMULATION_ZIP_PARALLEL_MIN_BYTES
+        )
+        self.max_workers = max(
+            (
+                max_workers
+                if max_workers is not None
+                else settings.SIMULATION_ZIP_MAX_WORKERS
+            ),
+            1,
+        )
+
+    def get_compress_type(self, archive_name: str) -> int:
+        if archive_name.lower().endswith(self.STORED_EXTENSIONS):
+            return zipfile.ZIP_STORED
+
+        return zipfile.ZIP_DEFLATED
+
+    def writestr(self, zip_file: zipfile.ZipFile, archive_name: str, data) -> None:
+        zip_file.writestr(
+            archive_name,
+            data,
+            compress_type=self.get_compress_type(archive_name),
+            compresslevel=self.deflate_level,
+        )
+
+    def write_files(
+        self, zip_file: zipfile.ZipFile, file_paths: List[Tuple[str, str]]
+    ) -> None:
+        """
+        Writes the existing files of (file_path, archive_name) into the archive, keeping their order
+        """
+        file_paths = [
+            (file_path, archive_name)
+            for file_path, archive_name in file_paths
+            if os.path.exists(file_path)
+        ]
+        # Inputs are identified by their position, archive names may repeat
+        read_ahead_indexes = [
+            index
+            for index, (file_path, archive_name) in enumerate(file_paths)
+            if self.get_compress_type(archive_name) == zipfile.ZIP_DEFLATED
+            and os.path.getsize(file_path) >= self.parallel_min_bytes
+        ]
+
+        if len(read_ahead_indexes) < 2 or self.max_workers == 1:
+            read_ahead_indexes = []
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            pending_indexes = iter(read_ahead_indexes)
+            read_files = {}
+
+            def read_next_file() -> None:
+                index = next(pending_indexes, None)
+                if index is not None:
+                    read_files[index] = executor.submit(
+                        self.read_file, file_paths[index][0]
+                    )
+
+            # At most max_workers large files are held in memory ahead of the writer
+            for _ in range(self.max_workers):
+                read_next_file()
+
+            for index, (file_path, archive_name) in enumerate(file_paths):
+                if index in read_files:
+                    data = read_files.pop(index).result()
+                    read_next_file()
+                    zip_info = zipfile.ZipInfo.from_file(file_path, archive_name)
+                    zip_info.compress_type = zipfile.ZIP_DEFLATED
+                    zip_file.writestr(zip_info, data, compresslevel=self.deflate_level)
+                else:
+                    zip_file.write(
+                        file_path,
+                        archive_name,
+                        compress_type=self.get_compress_type(archive_name),
+                        compresslevel=self.deflate_level,
+                    )
+
+    @staticmethod
+    def read_file(file_path: str) -> bytes:
+        with open(file_path, "rb") as f:
+            return f.read()
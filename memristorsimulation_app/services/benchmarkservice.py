@@ -0,0 +1,400 @@
+import json
+import os
+import platform
+import shutil
+import sys
+import time
+import matplotlib.pyplot as plt
+import numpy as np
+
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List
+from django.conf import settings
+from memristorsimulation_app.constants import (
+    SIMULATIONS_DIR,
+    MemristorModels,
+    NetworkType,
+    PlotType,
+    TimeMeasures,
+)
+from memristorsimulation_app.representations import (
+    BenchmarkRegression,
+    BenchmarkResult,
+    DataLoader,
+    NetworkParameters,
+)
+from memristorsimulation_app.services.networkservice import NetworkService
+from memristorsimulation_app.services.plotterservice import PlotterService
+from memristorsimulation_app.services.simulationservice import SimulationService
+
+
+class BenchmarkService:
+    """
+    Times every stage of the simulation pipeline (network generation, circuit file writing, results loading, every
+    plot type, ZIP creation and the whole simulation) on networks of growing size. Stages after the circuit file run on
+    a synthetic results file, so only the end-to-end stage needs ngspice.
+    Sizes are the side of a square grid, random regular and Watts-Strogatz networks get the same amount of nodes.
+    """
+
+    DEFAULT_SIZES = [3, 6, 10]
+    DEFAULT_AMOUNT_POINTS = 200
+    DEFAULT_REPEATS = 3
+    DEFAULT_REGRESSION_THRESHOLD = 0.2
+    # Changes below this many ms are timer noise, they are never reported as regressions
+    MIN_REGRESSION_MS = 1.0
+    AMOUNT_CONNECTIONS = 4
+    SHORTCUT_PROBABILITY = 0.1
+    FOLDER_NAME = "benchmark"
+    FILE_NAME = "benchmark"
+
+    def __init__(
+        self,
+        sizes: List[int] = None,
+        amount_points: int = None,
+        repeats: int = None,
+        stages: List[str] = None,
+    ):
+        self.sizes = sizes or self.DEFAULT_SIZES
+        self.amount_points = amount_points or self.DEFAULT_AMOUNT_POINTS
+        self.repeats = repeats or self.DEFAULT_REPEATS
+        # Stages to run, a group name like "plot" runs all its stages ("plot:IV", ...). Every stage runs when empty
+        self.stages = stages or []
+        self.skipped_stages: List[str] = []
+        self.simulation_folder_paths: List[str] = []
+
+    def should_run(self, stage: str) -> bool:
+        return not self.stages or any(
+            stage == s or stage.startswith(f"{s}:") for s in self.stages
+        )
+
+    def get_network_parameters(
+        self, network_type: NetworkType, size: int
+    ) -> NetworkParameters:
+        if network_type == NetworkType.GRID_2D_GRAPH:
+            return NetworkParameters(n=size, m=size)
+
+        amount_nodes = size * size
+        # Random regular graphs need less connections than nodes and an even amount of connection ends
+        amount_connections = min(self.AMOUNT_CONNECTIONS, amount_nodes - 1)
+        amount_connections -= (amount_nodes * amount_connections) % 2
+
+        return NetworkParameters(
+            amount_nodes=amount_nodes,
+            amount_connections=amount_connections,
+            shortcut_probability=self.SHORTCUT_PROBABILITY,
+            seed=0,
+        )
+
+    def get_request_parameters(self, size: int) -> dict:
+        """
+        Simulation request of a size x size grid exporting every state, with one timepoint per benchmark point
+        """
+        tstop = 1.0
+        amount_edges = 2 * size * (size - 1)
+
+        return {
+            "model": MemristorModels.PERSHIN.value,
+            "subcircuit": {
+                "model_parameters": {
+                    "alpha": 0.0,
+                    "beta": 500e3,
+                    "rinit": 200e3,
+                    "roff": 200e3,
+                    "ron": 2e3,
+                    "vt": 0.6,
+                },
+                "name": "memristor",
+                "nodes": ["pl", "mn", "x"],
+            },
+            "input_parameters": {
+                "source_number": 1,
+                "n_plus": "vin",
+                "n_minus": "gnd",
+                "wave_form": {
+                    "type": "sin",
+                    "parameters": {"vo": 0.0, "amplitude": 1.0, "frequency": 1.0},
+                },
+            },
+            "simulation_parameters": {
+                "analysis_type": ".tran",
+                "tstep": tstop / self.amount_points,
+                "tstop": tstop,
+                "tstart": 0,
+                "tmax": tstop / self.amount_points,
+                "uic": True,
+            },
+            "export_parameters": {
+                "folder_name": f"{self.FOLDER_NAME}_{size}",
+                "file_name": self.FILE_NAME,
+                "magnitudes": ["vin", "i(v1)"] + [f"l{i}" for i in range(amount_edges)],
+            },
+            "network_type": NetworkType.GRID_2D_GRAPH.value,
+            "network_parameters": {"n": size, "m": size},
+            "plot_types": [plot_type.value for plot_type in PlotType],
+        }
+
+    def create_simulation_service(self, size: int) -> SimulationService:
+        simulation_service = SimulationService(self.get_request_parameters(size))
+        self.simulation_folder_paths.append(
+            simulation_service.directories_management_service.get_simulation_folder_path()
+        )
+
+        return simulation_service
+
+    def write_results_file(self, simulation_service: SimulationService) -> None:
+        """
+        Writes a results file shaped like the ngspice wrdata output, followed by the time measures TimeMeasureService
+        appends
+        """
+        magnitudes = simulation_service.simulation_inputs.export_parameters.magnitudes
+        time_values = np.linspace(
+            0,
+            simulation_service.simulation_inputs.simulation_parameters.tstop,
+            self.amount_points,
+        )
+        vin = np.sin(2 * np.pi * time_values)
+        columns = [time_values, vin, vin / 2e3] + [
+            np.linspace(2e3, 200e3, self.amount_points) for _ in magnitudes[2:]
+        ]
+
+        results_file_path = (
+            simulation_service.directories_management_service.get_export_simulation_file_path()
+        )
+        with open(results_file_path, "w") as f:
+            f.write(" ".join(["time"] + magnitudes) + "\n")
+            np.savetxt(f, np.column_stack(columns), fmt="%.12e")
+            for time_measure in list(TimeMeasures)[:4]:
+                f.write(f"# {time_measure.value} = 0.0 ms\n")
+
+    def measure(
+        self,
+        stage: str,
+        size: int,
+        function: Callable[[], Any],
+        teardown: Callable[[], Any] = None,
+    ) -> BenchmarkResult:
+        times = []
+        for _ in range(self.repeats):
+            start_time = time.perf_counter()
+            function()
+            times.append((time.perf_counter() - start_time) * 1000)
+            if teardown:
+                teardown()
+
+        return BenchmarkResult(stage=stage, size=size, times=times)
+
+    def benchmark_networks(self, size: int) -> List[BenchmarkResult]:
+        results = []
+        for network_type in NetworkType:
+            stage = f"network:{network_type.value}"
+            if network_type == NetworkType.SINGLE_DEVICE or not self.should_run(stage):
+                continue
+
+            network_parameters = self.get_network_parameters(network_type, size)
+            results.append(
+                self.measure(
+                    stage,
+                    size,
+                    lambda: NetworkService(
+                        network_type, network_parameters
+                    ).generate_device_parameters("xmem", "memristor"),
+                )
+            )
+
+        return results
+
+    def get_plot_functions(
+        self, plotter_service: PlotterService, data_loader: DataLoader
+    ) -> Dict[PlotType, Callable[[], None]]:
+        dataframe = data_loader.dataframe
+        csv_file_name = data_loader.csv_file_name_no_extension
+
+        return {
+            PlotType.IV: lambda: plotter_service.plot_iv(dataframe, csv_file_name),
+            PlotType.IV_OVERLAPPED: lambda: plotter_service.plot_iv_overlapped(
+                dataframe
+            ),
+            PlotType.IV_LOG: lambda: plotter_service.plot_iv_log(
+                dataframe, csv_file_name
+            ),
+            PlotType.IV_LOG_OVERLAPPED: lambda: plotter_service.plot_iv_log_overlapped(
+                dataframe
+            ),
+            PlotType.IV_ANIMATED: lambda: plotter_service.plot_iv_animated(
+                dataframe, csv_file_name
+            ),
+            PlotType.CURRENT_AND_VIN_VS_TIME: lambda: plotter_service.plot_current_and_vin_vs_time(
+                dataframe, csv_file_name
+            ),
+            PlotType.STATE_AND_VIN_VS_TIME: lambda: plotter_service.plot_state_and_vin_vs_time(
+                dataframe, csv_file_name
+            ),
+            PlotType.MEMRISTIVE_STATES_OVERLAPPED: lambda: plotter_service.plot_states_overlapped(
+                dataframe
+            ),
+            PlotType.GRAPH: plotter_service.plot_networkx_graph,
+            PlotType.GRID_STATES_ANIMATED: lambda: plotter_service.plot_grid_states_animated(
+                dataframe, csv_file_name
+            ),
+        }
+
+    def benchmark_pipeline(self, size: int) -> List[BenchmarkResult]:
+        results = []
+        simulation_service = self.create_simulation_service(size)
+        directories_management_service = (
+            simulation_service.directories_management_service
+        )
+        directories_management_service.create_workspace()
+        subcircuit_file_service = (
+            simulation_service.create_subcircuit_file_service_from_request()
+        )
+        circuit_file_service = (
+            simulation_service.create_circuit_file_service_from_request(
+                subcircuit_file_service
+            )
+        )
+        subcircuit_file_service.write_subcircuit_file()
+
+        if self.should_run("circuit_file"):
+            results.append(
+                self.measure(
+                    "circuit_file", size, circuit_file_service.write_circuit_file
+                )
+            )
+        else:
+            circuit_file_service.write_circuit_file()
+
+        self.write_results_file(simulation_service)
+        plotter_service = PlotterService(
+            simulation_results_directory_path=SIMULATIONS_DIR,
+            export_parameters=simulation_service.simulation_inputs.export_parameters,
+            model_parameters=subcircuit_file_service.subcircuit.model_parameters,
+            input_parameters=circuit_file_service.input_parameters,
+            graph=simulation_service.graph,
+        )
+
+        if self.should_run("csv_load"):
+            results.append(
+                self.measure("csv_load", size, plotter_service.load_data_from_csv)
+            )
+        data_loader = plotter_service.load_data_from_csv()[0]
+
+        for plot_type, plot_function in self.get_plot_functions(
+            plotter_service, data_loader
+        ).items():
+            stage = f"plot:{plot_type.value}"
+            if self.should_run(stage):
+                # Overlapped plots draw on the current figure and never close it
+                results.append(
+                    self.measure(
+                        stage, size, plot_function, teardown=lambda: plt.close("all")
+                    )
+                )
+
+        if self.should_run("zip"):
+            results.append(
+                self.measure("zip", size, simulation_service.create_results_zip)
+            )
+
+        return results
+
+    def benchmark_simulation(self, size: int) -> List[BenchmarkResult]:
+        if not self.should_run("simulate"):
+            return []
+        if shutil.which(settings.NGSPICE_EXECUTABLE) is None:
+            self.skipped_stages.append(
+                f"simulate (size {size}): {settings.NGSPICE_EXECUTABLE} not found"
+            )
+            return []
+
+        return [
+            self.measure(
+                "simulate",
+                size,
+                lambda: self.create_simulation_service(size).simulate(),
+            )
+        ]
+
+    def run(self) -> List[BenchmarkResult]:
+        results = []
+        try:
+            for size in self.sizes:
+                results += self.benchmark_networks(size)
+                results += self.benchmark_pipeline(size)
+                results += self.benchmark_simulation(size)
+        finally:
+            plt.close("all")
+            for simulation_folder_path in self.simulation_folder_paths:
+                shutil.rmtree(simulation_folder_path, ignore_errors=True)
+
+        return results
+
+    def to_dict(self, results: List[BenchmarkResult]) -> Dict[str, Any]:
+        return {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "amount_points": self.amount_points,
+            "repeats": self.repeats,
+            "results": [result.to_dict() for result in results],
+        }
+
+    def save_results(self, results: List[BenchmarkResult], file_path: str) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(file_path)), exist_ok=True)
+        with open(file_path, "w") as f:
+            json.dump(self.to_dict(results), f, indent=2)
+
+    @staticmethod
+    def load_baseline(file_path: str) -> Dict[str, Any]:
+        try:
+            with open(file_path, "r") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            raise InvalidBenchmarkBaseline(
+                f"Could not read benchmark baseline {file_path}: {str(e)}"
+            )
+
+    @classmethod
+    def compare(
+        cls,
+        results: List[BenchmarkResult],
+        baseline: Dict[str, Any],
+        threshold: float = None,
+    ) -> List[BenchmarkRegression]:
+        """
+        :param threshold: Relative slowdown of the median time over the baseline one reported as a regression
+        :return: Stages whose median time regressed, stages missing in the baseline are not compared
+        """
+        threshold = (
+            threshold if threshold is not None else cls.DEFAULT_REGRESSION_THRESHOLD
+        )
+        baseline_times = {
+            (result["stage"], result["size"]): result["median_ms"]
+            for result in baseline.get("results", [])
+        }
+
+        regressions = []
+        for result in results:
+            baseline_time = baseline_times.get((result.stage, result.size))
+            if baseline_time is None:
+                continue
+
+            median_time = result.get_median_time()
+            if (
+                median_time > baseline_time * (1 + threshold)
+                and median_time - baseline_time > cls.MIN_REGRESSION_MS
+            ):
+                regressions.append(
+                    BenchmarkRegression(
+                        stage=result.stage,
+                        size=result.size,
+                        baseline_time=baseline_time,
+                        time=median_time,
+                    )
+                )
+
+        return regressions
+
+
+class InvalidBenchmarkBaseline(Exception):
+    pass
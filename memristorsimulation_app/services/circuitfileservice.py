@@ -1,4 +1,9 @@
+import os
+import re
+
 from typing import TextIO, List
+from django.conf import settings
+from memristorsimulation_app.constants import ArtifactStage, OutputDecimation
 from memristorsimulation_app.representations import (
     InputParameters,
     SimulationParameters,
@@ -11,6 +16,13 @@ from memristorsimulation_app.services.subcircuitfileservice import SubcircuitFil
 
 
 class CircuitFileService:
+    # Plot of the transient analysis, every circuit file runs a single analysis in its own ngspice process
+    TRANSIENT_PLOT_NAME = "tran1"
+    MAGNITUDE_PATTERN = re.compile(
+        r"^(?:(?P<function>[iv])\((?P<name>\w+)\)|(?P<vector>\w+))$"
+    )
+    IGNORE_STATES_MAGNITUDES = ["vin", "i(v1)"]
+
     def __init__(
         self,
         subcircuit_file_service: SubcircuitFileService,
@@ -22,17 +34,28 @@ class CircuitFileService:
     ):
         self.input_parameters = input_parameters
         self.device_parameters = device_parameters
-        self.simulation_parameters = simulation_parameters
+        # Templates build their parameters without SimulationService, their automatic step is resolved here
+        self.simulation_parameters = simulation_parameters.resolve_auto_step(
+            input_parameters.wave_form
+        )
         self.ignore_states = ignore_states if ignore_states is not None else None
 
         self.subcircuit_file_service = subcircuit_file_service
         self.directories_management_service = directories_management_service
 
     def _write_dependencies(self, f: TextIO) -> None:
-        f.write("\n\n* DEPENDENCIES:\n")
-        f.write(
-            f".include {self.directories_management_service.get_subcircuit_file_path()}"
+        """
+        The subcircuit is included relative to the circuit file, which ngspice resolves from the circuit folder. An
+        absolute path would point into the scratch root once promote_workspace moves the run
+        """
+        subcircuit_file_path = os.path.relpath(
+            self.directories_management_service.get_subcircuit_file_path(),
+            os.path.dirname(
+                self.directories_management_service.get_circuit_file_path()
+            ),
         )
+        f.write("\n\n* DEPENDENCIES:\n")
+        f.write(f".include {subcircuit_file_path}")
 
     def _write_components(self, file: TextIO) -> None:
         file.write("\n\n* COMPONENTS:\n")
@@ -51,26 +74,135 @@ class CircuitFileService:
         file.write("set wr_vecnames\n")
         file.write("set wr_singlescale\n")
 
-        if self.ignore_states:
-            file.write(
-                f"wrdata {self.directories_management_service.get_export_simulation_file_path()} vin i(v1)\n"
+        magnitudes = (
+            self.IGNORE_STATES_MAGNITUDES
+            if self.ignore_states
+            else self.directories_management_service.export_parameters.magnitudes
+        )
+        self._write_output_decimation(file, magnitudes)
+        file.write(
+            f"wrdata {self.directories_management_service.get_export_simulation_file_path()} "
+            f"{' '.join(magnitudes)}\n"
+        )
+
+        if settings.SIMULATION_NGSPICE_RUSAGE:
+            # Printed last, so the elapsed time includes writing the results file
+            file.write("rusage all\n")
+
+    @classmethod
+    def get_vector_name(cls, magnitude: str) -> str:
+        """
+        :return: Name of the ngspice vector read by a wrdata magnitude, i(v1) reads v1#branch and v(x) reads x
+        """
+        match = cls.MAGNITUDE_PATTERN.match(magnitude.strip())
+        if match is None:
+            raise UnsupportedDecimationMagnitude(
+                f"Magnitude {magnitude} is not a vector, i() or v() and cannot be decimated"
             )
+        if match.group("vector"):
+            return match.group("vector")
+        if match.group("function") == "i":
+            return f"{match.group('name')}#branch"
+
+        return match.group("name")
+
+    def _write_output_decimation(self, file: TextIO, magnitudes: List[str]) -> None:
+        """
+        Reduces the timepoints written by wrdata inside the ngspice control block, so only the kept rows reach the disk.
+        EVERY_NTH and TOLERANCE pick the kept times with a control language loop over the timepoints, then a new plot
+        holds every magnitude interpolated (exactly, at degree 1) onto those times under its original vector name, so
+        wrdata writes the same columns.
+        """
+        export_parameters = self.directories_management_service.export_parameters
+        output_decimation = export_parameters.output_decimation
+        if output_decimation in (None, OutputDecimation.NONE):
+            return
+
+        if output_decimation == OutputDecimation.LINEARIZE:
+            # Interpolates every vector onto the tstep grid of the transient analysis
+            file.write("linearize\n")
+            return
+
+        vector_names = [self.get_vector_name(magnitude) for magnitude in magnitudes]
+        for index, magnitude in enumerate(magnitudes):
+            file.write(f"let dvec{index} = {magnitude}\n")
+        file.write("let n = length(time)\n")
+
+        if output_decimation == OutputDecimation.EVERY_NTH:
+            self._write_every_nth_times(file, export_parameters.decimation_factor)
         else:
+            self.validate_tolerance_magnitudes(magnitudes)
+            self._write_tolerance_times(
+                file, len(magnitudes), export_parameters.decimation_tolerance
+            )
+
+        file.write("set polydegree = 1\n")
+        file.write("setplot new\n")
+        file.write(f"let time = {self.TRANSIENT_PLOT_NAME}.dtime\n")
+        file.write("settype time time\n")
+        file.write("setscale time\n")
+        for index, vector_name in enumerate(vector_names):
             file.write(
-                f"wrdata {self.directories_management_service.get_export_simulation_file_path()} "
-                f"{self.directories_management_service.export_parameters.get_export_magnitudes()}\n"
+                f"let {vector_name} = interpolate({self.TRANSIENT_PLOT_NAME}.dvec{index})\n"
+            )
+
+    @staticmethod
+    def _write_every_nth_times(file: TextIO, decimation_factor: int) -> None:
+        file.write(f"let m = floor((n - 1) / {decimation_factor}) + 1\n")
+        file.write("let dtime = vector(m)\n")
+        file.write("let i = 0\n")
+        file.write("while i lt m\n")
+        file.write(f"let dtime[i] = time[i * {decimation_factor}]\n")
+        file.write("let i = i + 1\n")
+        file.write("end\n")
+
+    @staticmethod
+    def validate_tolerance_magnitudes(magnitudes: List[str]) -> None:
+        max_magnitudes = settings.SIMULATION_DECIMATION_TOLERANCE_MAX_MAGNITUDES
+        if len(magnitudes) > max_magnitudes:
+            raise TooManyDecimationMagnitudes(
+                f"TOLERANCE decimation accepts up to {max_magnitudes} magnitudes, {len(magnitudes)} were given"
             )
 
+    @staticmethod
+    def _write_tolerance_times(
+        file: TextIO, amount_magnitudes: int, decimation_tolerance: float
+    ) -> None:
+        """
+        The loop is interpreted by ngspice, running one statement per magnitude plus a few more on every timepoint. Its
+        cost grows with timepoints x magnitudes and can exceed the simulation time of long runs, so the amount of
+        magnitudes is bounded by SIMULATION_DECIMATION_TOLERANCE_MAX_MAGNITUDES
+        """
+        # Tolerances are relative to the range of every magnitude, the first and last timepoints are always kept
+        for index in range(amount_magnitudes):
+            file.write(
+                f"let dtol{index} = {decimation_tolerance} * (vecmax(dvec{index}) - vecmin(dvec{index}))\n"
+            )
+        file.write("let dtime = vector(n)\n")
+        file.write("let dtime[0] = time[0]\n")
+        file.write("let m = 1\n")
+        file.write("let last = 0\n")
+        file.write("let i = 1\n")
+        file.write("while i lt n\n")
+        file.write("let keep = i eq (n - 1)\n")
+        for index in range(amount_magnitudes):
+            file.write(
+                f"let keep = keep + (abs(dvec{index}[i] - dvec{index}[last]) gt dtol{index})\n"
+            )
+        file.write("if keep gt 0\n")
+        file.write("let dtime[m] = time[i]\n")
+        file.write("let last = i\n")
+        file.write("let m = m + 1\n")
+        file.write("end\n")
+        file.write("let i = i + 1\n")
+        file.write("end\n")
+        file.write("let dtime = dtime[0, m - 1]\n")
+
     def write_circuit_file(self) -> None:
         """
         Writes the .cir circuit file to execute in Spice. The file is saved in simulation_results/model-name_simulations
         :return: None
         """
-        self.directories_management_service.get_export_simulation_file_path()
-        self.directories_management_service.create_simulation_results_for_model_folder_if_not_exists(
-            self.subcircuit_file_service.model
-        )
-
         with open(
             self.directories_management_service.get_circuit_file_path(), "w+"
         ) as f:
@@ -84,3 +216,21 @@ class CircuitFileService:
             f.write("\nquit\n")
             f.write("\n.endc\n")
             f.write(".end\n")
+
+        self.directories_management_service.register_artifact(
+            self.directories_management_service.get_circuit_file_path(),
+            ArtifactStage.CIRCUIT,
+        )
+        # ngspice writes the results file named in wrdata when the circuit runs
+        self.directories_management_service.register_artifact(
+            self.directories_management_service.get_export_simulation_file_path(),
+            ArtifactStage.RESULTS,
+        )
+
+
+class UnsupportedDecimationMagnitude(Exception):
+    pass
+
+
+class TooManyDecimationMagnitudes(Exception):
+    pass
@@ -0,0 +1,259 @@
+import json
+import logging
+import os
+import re
+import numpy as np
+
+from typing import List, Optional, Tuple
+from memristorsimulation_app.constants import (
+    SIMULATIONS_DIR,
+    MemristorModels,
+    ModelsSimulationFolders,
+    NetworkType,
+)
+from memristorsimulation_app.representations import (
+    CostModel,
+    SimulationCostFeatures,
+    SimulationInputs,
+)
+from memristorsimulation_app.services.networkservice import NetworkService
+
+
+logger = logging.getLogger(__name__)
+
+
+class CostEstimatorService:
+    """
+    Estimates the ngspice time of a simulation from its network size, amount of timepoints, exported magnitudes and
+    model. The power law is fitted on the python_execution_time measures that TimeMeasureService leaves in the logs of
+    previous runs, using their circuit files to recover the features.
+    """
+
+    COST_MODEL_FILE_PATH = f"{SIMULATIONS_DIR}/.cost_model.json"
+    DEFAULT_COST_MODEL = CostModel(
+        intercept=float(np.log(5e-3)),
+        edges_exponent=1.0,
+        timepoints_exponent=1.0,
+        magnitudes_exponent=0.1,
+    )
+    MIN_FIT_SAMPLES = 10
+    # Weight of the default coefficients in the fit, keeps exponents sensible when history barely varies a feature
+    PRIOR_WEIGHT = 1.0
+
+    EXECUTION_TIME_PATTERN = re.compile(
+        r"^# python_execution_time = ([-+]?\d*\.?\d+(?:[eE][-+]?\d+)?) ms", re.MULTILINE
+    )
+    MODEL_PATTERN = re.compile(r"MODEL (\S+)")
+
+    def __init__(self, cost_model: CostModel = None):
+        self.cost_model = cost_model or self.load_cost_model()
+
+    @classmethod
+    def load_cost_model(cls) -> CostModel:
+        try:
+            with open(cls.COST_MODEL_FILE_PATH, "r") as f:
+                return CostModel.from_dict(json.load(f))
+        except (FileNotFoundError, json.JSONDecodeError, TypeError):
+            return cls.DEFAULT_COST_MODEL
+
+    def save_cost_model(self) -> None:
+        os.makedirs(SIMULATIONS_DIR, exist_ok=True)
+        temporary_file_path = f"{self.COST_MODEL_FILE_PATH}.{os.getpid()}.tmp"
+        with open(temporary_file_path, "w") as f:
+            json.dump(self.cost_model.to_dict(), f, indent=2)
+        os.replace(temporary_file_path, self.COST_MODEL_FILE_PATH)
+
+    @staticmethod
+    def get_features(simulation_inputs: SimulationInputs) -> SimulationCostFeatures:
+        if simulation_inputs.network_type == NetworkType.SINGLE_DEVICE:
+            amount_edges = 1
+        else:
+            # Generating the network of a huge request would already exhaust the worker the admission protects
+            amount_edges = NetworkService.get_amount_edges(
+                simulation_inputs.network_type, simulation_inputs.network_parameters
+            )
+
+        simulation_parameters = simulation_inputs.simulation_parameters
+
+        return SimulationCostFeatures(
+            model=simulation_inputs.model,
+            amount_edges=amount_edges,
+            amount_timepoints=(
+                simulation_parameters.tstop - (simulation_parameters.tstart or 0)
+            )
+            / simulation_parameters.tstep,
+            amount_magnitudes=len(simulation_inputs.export_parameters.magnitudes),
+            amount_iterations=simulation_inputs.amount_iterations or 1,
+        )
+
+    def _get_feature_row(self, features: SimulationCostFeatures) -> np.ndarray:
+        return np.array(
+            [
+                1.0,
+                np.log(max(features.amount_edges, 1)),
+                np.log(max(features.amount_timepoints, 1)),
+                np.log1p(features.amount_magnitudes),
+            ]
+            + [float(features.model == model) for model in self._get_offset_models()]
+        )
+
+    @staticmethod
+    def _get_offset_models() -> List[MemristorModels]:
+        # Pershin is the reference model, the others get an offset relative to it
+        return [model for model in MemristorModels if model != MemristorModels.PERSHIN]
+
+    def _get_coefficients(self, cost_model: CostModel) -> np.ndarray:
+        return np.array(
+            [
+                cost_model.intercept,
+                cost_model.edges_exponent,
+                cost_model.timepoints_exponent,
+                cost_model.magnitudes_exponent,
+            ]
+            + [
+                cost_model.model_offsets.get(model.value, 0.0)
+                for model in self._get_offset_models()
+            ]
+        )
+
+    def estimate_time_ms(self, features: SimulationCostFeatures) -> float:
+        """
+        :return: Estimated ngspice time in ms of every iteration of the simulation together
+        """
+        log_time_ms = self._get_feature_row(features) @ self._get_coefficients(
+            self.cost_model
+        )
+
+        return float(np.exp(log_time_ms)) * features.amount_iterations
+
+    @classmethod
+    def parse_simulation_folder(
+        cls, simulation_folder_path: str
+    ) -> Optional[Tuple[SimulationCostFeatures, float]]:
+        """
+        Recovers the features of a previous run from its circuit file and its median execution time from its log
+        :return: Features and time in ms of a single iteration, None if the folder has no usable measures
+        """
+        folder_name = os.path.basename(simulation_folder_path)
+        log_file_path = f"{simulation_folder_path}/{folder_name}.log"
+        circuit_file_names = [
+            file_name
+            for file_name in os.listdir(simulation_folder_path)
+            if file_name.endswith("_circuit_file.cir")
+        ]
+        if not os.path.isfile(log_file_path) or not circuit_file_names:
+            return None
+
+        with open(log_file_path, "r") as f:
+            execution_times = [
+                float(value) for value in cls.EXECUTION_TIME_PATTERN.findall(f.read())
+            ]
+        with open(f"{simulation_folder_path}/{circuit_file_names[0]}", "r") as f:
+            circuit_lines = f.read().splitlines()
+
+        model, amount_edges, analysis, amount_magnitudes = None, 0, None, None
+        for line in circuit_lines:
+            tokens = line.split()
+            if not tokens:
+                continue
+
+            model_match = cls.MODEL_PATTERN.search(line)
+            if line.startswith("*") and model_match:
+                model = model_match.group(1)
+            elif tokens[0].lower().startswith("x"):
+                amount_edges += 1
+            elif tokens[0] == ".tran" and len(tokens) >= 3:
+                analysis = tokens
+            elif tokens[0] == "wrdata":
+                amount_magnitudes = len(tokens) - 2
+
+        try:
+            model = MemristorModels(model)
+            tstep, tstop = float(analysis[1]), float(analysis[2])
+            tstart = (
+                float(analysis[3])
+                if len(analysis) > 3 and analysis[3] != "uic"
+                else 0.0
+            )
+        except (ValueError, TypeError, IndexError):
+            return None
+
+        if not execution_times or not amount_edges or not amount_magnitudes:
+            return None
+
+        features = SimulationCostFeatures(
+            model=model,
+            amount_edges=amount_edges,
+            amount_timepoints=(tstop - tstart) / tstep,
+            amount_magnitudes=amount_magnitudes,
+        )
+
+        return features, float(np.median(execution_times))
+
+    @classmethod
+    def collect_samples(cls) -> List[Tuple[SimulationCostFeatures, float]]:
+        samples = []
+
+        for model_simulation_folder in ModelsSimulationFolders:
+            model_folder_path = f"{SIMULATIONS_DIR}/{model_simulation_folder.value}"
+            if not os.path.isdir(model_folder_path):
+                continue
+
+            with os.scandir(model_folder_path) as entries:
+                for entry in entries:
+                    if entry.name.startswith(".") or not entry.is_dir():
+                        continue
+
+                    try:
+                        sample = cls.parse_simulation_folder(entry.path)
+                    except OSError as e:
+                        logger.warning(f"Could not read run {entry.path}: {str(e)}")
+                        continue
+
+                    if sample is not None and sample[1] > 0:
+                        samples.append(sample)
+
+        return samples
+
+    def fit(
+        self, samples: List[Tuple[SimulationCostFeatures, float]] = None
+    ) -> CostModel:
+        """
+        Least squares fit of the power law on the given samples (or the stored runs), regularized towards the default
+        coefficients. The current cost model is kept when there are less than MIN_FIT_SAMPLES samples.
+        """
+        samples = samples if samples is not None else self.collect_samples()
+        if len(samples) < self.MIN_FIT_SAMPLES:
+            logger.warning(
+                f"Only {len(samples)} timed runs found, at least {self.MIN_FIT_SAMPLES} are needed to fit the cost model"
+            )
+            return self.cost_model
+
+        features_matrix = np.array(
+            [self._get_feature_row(features) for features, _ in samples]
+        )
+        log_times = np.log([time_ms for _, time_ms in samples])
+        prior_coefficients = self._get_coefficients(self.DEFAULT_COST_MODEL)
+        prior_weight = np.sqrt(self.PRIOR_WEIGHT)
+
+        coefficients, *_ = np.linalg.lstsq(
+            np.vstack(
+                [features_matrix, prior_weight * np.eye(len(prior_coefficients))]
+            ),
+            np.concatenate([log_times, prior_weight * prior_coefficients]),
+            rcond=None,
+        )
+
+        self.cost_model = CostModel(
+            intercept=float(coefficients[0]),
+            edges_exponent=float(coefficients[1]),
+            timepoints_exponent=float(coefficients[2]),
+            magnitudes_exponent=float(coefficients[3]),
+            model_offsets={
+                model.value: float(offset)
+                for model, offset in zip(self._get_offset_models(), coefficients[4:])
+            },
+            amount_samples=len(samples),
+        )
+
+        return self.cost_model
@@ -1,7 +1,11 @@
+import json
 import os
+import shutil
 
+from typing import List, Optional, Tuple
 from memristorsimulation_app.constants import (
     SIMULATIONS_DIR,
+    ArtifactStage,
     ModelsSimulationFolders,
     MemristorModels,
 )
@@ -9,6 +13,16 @@ from memristorsimulation_app.representations import ExportParameters
 
 
 class DirectoriesManagementService:
+    MANIFEST_FILE_NAME = ".manifest.jsonl"
+    PROFILE_FILE_SUFFIX = ".prof"
+    FIGURES_DIR_NAME = "figures"
+    PROFILE_SUMMARY_FILE_SUFFIX = "_profile.json"
+    CIRCUIT_FILE_NAMES = {
+        MemristorModels.PERSHIN: "pershin_circuit_file.cir",
+        MemristorModels.VOURKAS: "vourkas_circuit_file.cir",
+        MemristorModels.BIOLEK: "biolek_circuit_file.cir",
+    }
+
     def __init__(
         self,
         model: MemristorModels = None,
@@ -16,6 +30,8 @@ class DirectoriesManagementService:
     ):
         self.model = model
         self.export_parameters = export_parameters
+        # Root of the run folder, a scratch root while the run writes its intermediate files
+        self.root_dir = SIMULATIONS_DIR
 
     @staticmethod
     def create_simulation_results_for_model_folder_if_not_exists(
@@ -30,126 +46,199 @@ class DirectoriesManagementService:
     def create_simulation_parameter_folder_if_not_exist(
         self, model_simulation_folder: ModelsSimulationFolders
     ) -> None:
-        folder_directory = f"{SIMULATIONS_DIR}/{model_simulation_folder.value}/{self.export_parameters.folder_name}"
+        folder_directory = f"{self.root_dir}/{model_simulation_folder.value}/{self.export_parameters.folder_name}"
         if not os.path.exists(folder_directory):
             os.makedirs(folder_directory)
 
-    def get_or_create_figures_directory(self) -> str:
-        figures_dir_path = self.get_simulation_folder_path() + "/figures"
-        if not os.path.exists(figures_dir_path):
-            os.makedirs(figures_dir_path)
-        return figures_dir_path
+    def get_figures_directory_path(self) -> str:
+        return f"{self.get_simulation_folder_path()}/{self.FIGURES_DIR_NAME}"
 
     def get_circuit_file_path(self) -> str:
-        return f"{SIMULATIONS_DIR}/{self.get_circuit_dir_and_file_name()}"
+        return f"{self.root_dir}/{self.get_circuit_dir_and_file_name()}"
 
     def get_subcircuit_file_path(self) -> str:
-        return f"{SIMULATIONS_DIR}/{self.get_subcircuit_dir_and_file_name()}"
+        return f"{self.root_dir}/{self.get_subcircuit_dir_and_file_name()}"
 
     def get_export_simulation_file_path(self) -> str:
-        self.create_simulation_parameter_folder_if_not_exist(
-            self.export_parameters.model_simulation_folder
-        )
-        export_simulation_file_path = (
-            f"{SIMULATIONS_DIR}/{self.export_parameters.model_simulation_folder.value}/"
-            f"{self.export_parameters.folder_name}/{self.export_parameters.file_name}_results.csv"
-        )
-
-        return export_simulation_file_path
+        return f"{self.get_simulation_folder_path()}/{self.export_parameters.file_name}_results.csv"
 
     def get_simulation_log_file_path(self) -> str:
-        return (
-            f"{SIMULATIONS_DIR}/{self.export_parameters.model_simulation_folder.value}/"
-            f"{self.export_parameters.folder_name}/{self.export_parameters.folder_name}.log"
-        )
+        return f"{self.get_simulation_folder_path()}/{self.export_parameters.folder_name}.log"
+
+    def get_timing_report_file_path(self) -> str:
+        return f"{self.get_simulation_folder_path()}/{self.export_parameters.folder_name}_timing_report.json"
+
+    def get_profile_file_path(self) -> str:
+        return f"{self.get_simulation_folder_path()}/{self.export_parameters.folder_name}{self.PROFILE_FILE_SUFFIX}"
+
+    def get_profile_summary_file_path(self) -> str:
+        return f"{self.get_simulation_folder_path()}/{self.export_parameters.folder_name}{self.PROFILE_SUMMARY_FILE_SUFFIX}"
 
     def get_circuit_dir_and_file_name(self) -> str:
-        if self.model == MemristorModels.PERSHIN:
-            return (
-                f"{ModelsSimulationFolders.PERSHIN_SIMULATIONS.value}/{self.export_parameters.folder_name}/"
-                f"pershin_circuit_file.cir"
-            )
-        elif self.model == MemristorModels.VOURKAS:
-            return (
-                f"{ModelsSimulationFolders.VOURKAS_SIMULATIONS.value}/{self.export_parameters.folder_name}/"
-                f"vourkas_circuit_file.cir"
-            )
-        elif self.model == MemristorModels.BIOLEK:
-            return (
-                f"{ModelsSimulationFolders.BIOLEK_SIMULATIONS.value}/{self.export_parameters.folder_name}/"
-                f"biolek_circuit_file.cir"
-            )
-        else:
+        if self.model not in self.CIRCUIT_FILE_NAMES:
             raise InvalidMemristorModel(f"The model {self.model} is not valid")
 
+        return f"{self.get_simulation_dir_name()}/{self.CIRCUIT_FILE_NAMES[self.model]}"
+
     def get_subcircuit_dir_and_file_name(self) -> str:
-        if self.model == MemristorModels.PERSHIN:
-            return (
-                f"{ModelsSimulationFolders.PERSHIN_SIMULATIONS.value}/{self.export_parameters.folder_name}/"
-                f"{self.model.value}"
-            )
-        elif self.model == MemristorModels.VOURKAS:
-            return (
-                f"{ModelsSimulationFolders.VOURKAS_SIMULATIONS.value}/{self.export_parameters.folder_name}/"
-                f"{self.model.value}"
-            )
-        elif self.model == MemristorModels.BIOLEK:
-            return (
-                f"{ModelsSimulationFolders.BIOLEK_SIMULATIONS.value}/{self.export_parameters.folder_name}/"
-                f"{self.model.value}"
-            )
-        else:
+        if self.model not in self.CIRCUIT_FILE_NAMES:
             raise InvalidMemristorModel(f"The model {self.model} is not valid")
 
-    # TODO: Refactor dms, this method should have self.export_parameters or receive them as argument
-    def get_simulation_folder_path(self) -> str:
+        return f"{self.get_simulation_dir_name()}/{self.model.value}"
+
+    def get_simulation_dir_name(self) -> str:
+        """
+        Run folder relative to the root, every path of the run is derived from it
+        """
         if not self.export_parameters:
             raise ValueError("Export parameters are not set")
-        return f"{SIMULATIONS_DIR}/{self.export_parameters.model_simulation_folder.value}/{self.export_parameters.folder_name}"
-
-    def get_all_simulation_files(self) -> list:
-        files_to_include = []
-
-        subcircuit_path = self.get_subcircuit_file_path()
-        if os.path.exists(subcircuit_path):
-            files_to_include.append(
-                (subcircuit_path, os.path.basename(subcircuit_path))
-            )
+        return f"{self.export_parameters.model_simulation_folder.value}/{self.export_parameters.folder_name}"
 
-        circuit_path = self.get_circuit_file_path()
-        if os.path.exists(circuit_path):
-            files_to_include.append((circuit_path, os.path.basename(circuit_path)))
-
-        export_path = self.get_export_simulation_file_path()
-        if os.path.exists(export_path):
-            files_to_include.append((export_path, os.path.basename(export_path)))
-
-        log_path = self.get_simulation_log_file_path()
-        if os.path.exists(log_path):
-            files_to_include.append((log_path, os.path.basename(log_path)))
+    def get_simulation_folder_path(self) -> str:
+        return f"{self.root_dir}/{self.get_simulation_dir_name()}"
+
+    def is_scratch_workspace(self) -> bool:
+        return self.root_dir != SIMULATIONS_DIR
+
+    def create_workspace(self, scratch_dir: str = None, exist_ok: bool = False) -> str:
+        """
+        Creates the run folder and its figures folder, the path getters never create folders. os.mkdir fails if the
+        folder exists, so two runs never write into the same folder
+        :param scratch_dir: Root where the run is written until promote_workspace moves it to SIMULATIONS_DIR
+        :param exist_ok: Reuses an existing run folder, for templates that overwrite their fixed folder on every run
+        """
+        if scratch_dir:
+            self.root_dir = scratch_dir
+
+        simulation_folder_path = self.get_simulation_folder_path()
+        os.makedirs(os.path.dirname(simulation_folder_path), exist_ok=True)
+        try:
+            os.mkdir(simulation_folder_path)
+        except FileExistsError:
+            if not exist_ok:
+                raise WorkspaceAlreadyExists(
+                    f"Simulation folder {self.export_parameters.folder_name} already exists"
+                )
+        os.makedirs(self.get_figures_directory_path(), exist_ok=True)
+
+        return simulation_folder_path
+
+    def promote_workspace(self) -> str:
+        """
+        Moves the files registered in the manifest of a scratch run folder to SIMULATIONS_DIR and removes the scratch
+        folder. Files left out of the manifest are dropped with it.
+        :return: Run folder in SIMULATIONS_DIR
+        """
+        if not self.is_scratch_workspace():
+            return self.get_simulation_folder_path()
+
+        scratch_folder_path = self.get_simulation_folder_path()
+        relative_paths = self.read_manifest(scratch_folder_path) or []
+        self.root_dir = SIMULATIONS_DIR
+        simulation_folder_path = self.create_workspace()
+
+        for relative_path in relative_paths + [self.MANIFEST_FILE_NAME]:
+            scratch_file_path = os.path.join(scratch_folder_path, relative_path)
+            if not os.path.isfile(scratch_file_path):
+                continue
+
+            file_path = os.path.join(simulation_folder_path, relative_path)
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            shutil.move(scratch_file_path, file_path)
+        shutil.rmtree(scratch_folder_path, ignore_errors=True)
+
+        return simulation_folder_path
+
+    def register_artifact(self, file_path: str, stage: ArtifactStage) -> None:
+        self.register_artifact_in_folder(
+            self.get_simulation_folder_path(), file_path, stage
+        )
 
-        plots_folder = self.get_or_create_figures_directory()
-        if os.path.exists(plots_folder):
-            for root, _, files in os.walk(plots_folder):
+    @classmethod
+    def register_artifact_in_folder(
+        cls, simulation_folder_path: str, file_path: str, stage: ArtifactStage
+    ) -> None:
+        """
+        Appends the file to the run manifest. Every stage appends one short line per file it writes, appends are atomic
+        so stages running in different threads or processes never corrupt the manifest.
+        """
+        relative_path = os.path.relpath(file_path, simulation_folder_path)
+        line = json.dumps({"path": relative_path, "stage": stage.value}) + "\n"
+
+        with open(f"{simulation_folder_path}/{cls.MANIFEST_FILE_NAME}", "a") as f:
+            f.write(line)
+
+    @classmethod
+    def read_manifest(cls, simulation_folder_path: str) -> Optional[List[str]]:
+        """
+        :return: Relative paths registered in the run manifest in registration order without duplicates, None if the
+        run has no manifest
+        """
+        try:
+            with open(f"{simulation_folder_path}/{cls.MANIFEST_FILE_NAME}", "r") as f:
+                lines = f.read().splitlines()
+        except FileNotFoundError:
+            return None
+
+        relative_paths = {}
+        for line in lines:
+            try:
+                relative_paths[json.loads(line)["path"]] = None
+            except (json.JSONDecodeError, KeyError, TypeError):
+                # A process killed while appending may leave a truncated last line
+                continue
+
+        return list(relative_paths)
+
+    @classmethod
+    def get_run_files(
+        cls, simulation_folder_path: str, include_hidden: bool = True
+    ) -> List[str]:
+        """
+        Relative paths of the files of a run, read from its manifest. Runs written before manifests existed are walked
+        once instead.
+        :param include_hidden: Include internal files (the manifest itself and hidden folders like the columnar index)
+        """
+        relative_paths = cls.read_manifest(simulation_folder_path)
+
+        if relative_paths is None:
+            relative_paths = []
+            for root, _, files in os.walk(simulation_folder_path):
                 for file in files:
-                    file_path = os.path.join(root, file)
-                    relative_path = os.path.relpath(
-                        file_path, self.get_simulation_folder_path()
+                    relative_paths.append(
+                        os.path.relpath(
+                            os.path.join(root, file), simulation_folder_path
+                        )
                     )
-                    files_to_include.append((file_path, relative_path))
-
-        simulation_folder = self.get_simulation_folder_path()
-        if os.path.exists(simulation_folder):
-            for root, _, files in os.walk(simulation_folder):
-                for file in files:
-                    file_path = os.path.join(root, file)
-                    relative_path = os.path.relpath(file_path, simulation_folder)
+        else:
+            relative_paths.append(cls.MANIFEST_FILE_NAME)
+
+        if include_hidden:
+            return relative_paths
+
+        return [
+            relative_path
+            for relative_path in relative_paths
+            if not any(part.startswith(".") for part in relative_path.split(os.sep))
+        ]
+
+    def get_all_simulation_files(self) -> List[Tuple[str, str]]:
+        """
+        :return: (file_path, archive_name) of every result of the run, the internal files are left out
+        """
+        simulation_folder_path = self.get_simulation_folder_path()
+
+        return [
+            (f"{simulation_folder_path}/{relative_path}", relative_path)
+            for relative_path in self.get_run_files(
+                simulation_folder_path, include_hidden=False
+            )
+        ]
 
-                    if not any(fp[0] == file_path for fp in files_to_include):
-                        files_to_include.append((file_path, relative_path))
 
-        return files_to_include
+class InvalidMemristorModel(Exception):
+    pass
 
 
-class InvalidMemristorModel(Exception):
+class WorkspaceAlreadyExists(Exception):
     pass
@@ -0,0 +1,374 @@
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from django.conf import settings
+from memristorsimulation_app.constants import SIMULATIONS_DIR, MetricType
+
+
+logger = logging.getLogger(__name__)
+
+
+class MetricsService:
+    """
+    In-process Prometheus counters, gauges and histograms shared by every worker process through files: each process
+    keeps its own values and rewrites them to <pid>.<token>.json in the metrics folder after every update, the /metrics
+    endpoint sums the files of every process. The token is the process start time (a random one without /proc), so a
+    restarted worker reusing a pid does not overwrite the values of the exited one. Counters and histograms of
+    processes that exited are kept, their gauges are dropped.
+    """
+
+    METRICS = {
+        "memristor_simulation_requests_total": (
+            MetricType.COUNTER,
+            "Simulation requests by final status",
+        ),
+        "memristor_simulation_requests_in_progress": (
+            MetricType.GAUGE,
+            "Simulation requests admitted and not answered yet, including the ones queued in the low priority lane",
+        ),
+        "memristor_simulation_request_duration_seconds": (
+            MetricType.HISTOGRAM,
+            "Time from admission to response of simulation requests by final status",
+        ),
+        "memristor_simulation_admissions_total": (
+            MetricType.COUNTER,
+            "Admission control decisions",
+        ),
+        "memristor_simulation_stage_duration_seconds": (
+            MetricType.HISTOGRAM,
+            "Time spent in every stage of the simulations answered by the API",
+        ),
+        "memristor_cache_requests_total": (
+            MetricType.COUNTER,
+            "Lookups of the coalescing and columnar index caches by result (hit or miss)",
+        ),
+        "memristor_ngspice_processes": (
+            MetricType.GAUGE,
+            "ngspice processes running",
+        ),
+        "memristor_ngspice_runs_total": (
+            MetricType.COUNTER,
+            "ngspice runs by result (ok or error)",
+        ),
+        "memristor_ngspice_duration_seconds": (
+            MetricType.HISTOGRAM,
+            "Wall clock time of every ngspice run",
+        ),
+        "memristor_plot_duration_seconds": (
+            MetricType.HISTOGRAM,
+            "Time spent drawing and saving every figure type",
+        ),
+        "memristor_results_load_duration_seconds": (
+            MetricType.HISTOGRAM,
+            "Time spent parsing the results files of a run for plotting",
+        ),
+    }
+    HISTOGRAM_BUCKETS = [
+        0.005,
+        0.01,
+        0.025,
+        0.05,
+        0.1,
+        0.25,
+        0.5,
+        1,
+        2.5,
+        5,
+        10,
+        30,
+        60,
+        120,
+        300,
+        600,
+    ]
+
+    _lock = threading.Lock()
+    _pid: Optional[int] = None
+    _process_token: Optional[str] = None
+    _values: Dict[str, Dict[str, dict]] = {}
+
+    @staticmethod
+    def get_metrics_dir() -> str:
+        return settings.SIMULATION_METRICS_DIR or f"{SIMULATIONS_DIR}/.metrics"
+
+    @staticmethod
+    def get_labels_key(labels: Dict[str, str]) -> str:
+        return json.dumps(
+            sorted((name, str(value)) for name, value in labels.items()),
+            separators=(",", ":"),
+        )
+
+    @classmethod
+    def _get_process_values(cls) -> Dict[str, Dict[str, dict]]:
+        # Forked workers inherit the values of their parent, which are already in the parent file
+        if cls._pid != os.getpid():
+            cls._pid = os.getpid()
+            cls._process_token = (
+                cls.get_process_start_time(cls._pid) or uuid.uuid4().hex
+            )
+            cls._values = {}
+
+        return cls._values
+
+    @classmethod
+    def get_process_file_path(cls) -> str:
+        cls._get_process_values()
+
+        return f"{cls.get_metrics_dir()}/{cls._pid}.{cls._process_token}.json"
+
+    @classmethod
+    def _update(cls, name: str, labels: Dict[str, str], update: Callable) -> None:
+        if not settings.SIMULATION_METRICS_ENABLED:
+            return
+        if name not in cls.METRICS:
+            raise UnknownMetric(f"Metric {name} is not defined")
+
+        with cls._lock:
+            metric_values = cls._get_process_values().setdefault(name, {})
+            labels_key = cls.get_labels_key(labels)
+            metric_values[labels_key] = update(metric_values.get(labels_key))
+            cls._write_process_file()
+
+    @classmethod
+    def _write_process_file(cls) -> None:
+        """
+        Metrics never make a request fail, write errors are only logged
+        """
+        metrics_dir = cls.get_metrics_dir()
+        file_path = cls.get_process_file_path()
+        tmp_file_path = f"{file_path}.tmp"
+
+        try:
+            os.makedirs(metrics_dir, exist_ok=True)
+            with open(tmp_file_path, "w") as f:
+                json.dump(cls._values, f)
+            os.replace(tmp_file_path, file_path)
+        except OSError as e:
+            logger.warning(f"Could not write metrics to {file_path}: {str(e)}")
+
+    @classmethod
+    def increment_counter(cls, name: str, amount: float = 1, **labels) -> None:
+        cls._update(name, labels, lambda value: (value or 0) + amount)
+
+    @classmethod
+    def increment_gauge(cls, name: str, amount: float = 1, **labels) -> None:
+        cls._update(name, labels, lambda value: (value or 0) + amount)
+
+    @classmethod
+    def decrement_gauge(cls, name: str, amount: float = 1, **labels) -> None:
+        cls.increment_gauge(name, -amount, **labels)
+
+    @classmethod
+    def observe_histogram(cls, name: str, value: float, **labels) -> None:
+        def update(histogram: Optional[dict]) -> dict:
+            histogram = histogram or {
+                "buckets": [0] * len(cls.HISTOGRAM_BUCKETS),
+                "sum": 0,
+                "count": 0,
+            }
+            for index, upper_bound in enumerate(cls.HISTOGRAM_BUCKETS):
+                if value <= upper_bound:
+                    histogram["buckets"][index] += 1
+            histogram["sum"] += value
+            histogram["count"] += 1
+
+            return histogram
+
+        cls._update(name, labels, update)
+
+    @classmethod
+    @contextmanager
+    def track_in_progress(cls, name: str, **labels) -> Iterator[None]:
+        cls.increment_gauge(name, **labels)
+        try:
+            yield
+        finally:
+            cls.decrement_gauge(name, **labels)
+
+    @classmethod
+    @contextmanager
+    def time(cls, name: str, **labels) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            cls.observe_histogram(name, time.perf_counter() - start, **labels)
+
+    @classmethod
+    def timed(cls, name: str, **labels) -> Callable:
+        """
+        Decorator observing the duration of every call in the histogram, labelled with the function name under the
+        label given as function_label
+        """
+        function_label = labels.pop("function_label", None)
+
+        def decorator(function: Callable) -> Callable:
+            function_labels = (
+                {**labels, function_label: function.__name__}
+                if function_label
+                else labels
+            )
+
+            @wraps(function)
+            def wrapper(*args, **kwargs):
+                with cls.time(name, **function_labels):
+                    return function(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    @staticmethod
+    def get_process_start_time(pid: int) -> Optional[str]:
+        """
+        :return: Start time of the process in clock ticks since boot, None if it is not running or /proc is missing
+        """
+        try:
+            with open(f"/proc/{pid}/stat", "r") as f:
+                stat = f.read()
+        except OSError:
+            return None
+
+        # starttime is the 22nd field, the process name before it is parenthesized and may contain spaces
+        return stat.rsplit(")", 1)[1].split()[19]
+
+    @classmethod
+    def is_process_alive(cls, pid: int, process_token: Optional[str] = None) -> bool:
+        """
+        :param process_token: Token of the metrics file, a process with another start time only reuses the pid
+        """
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            pass
+
+        start_time = cls.get_process_start_time(pid)
+        return (
+            process_token is None or start_time is None or process_token == start_time
+        )
+
+    @classmethod
+    def collect(cls) -> Dict[str, Dict[str, dict]]:
+        """
+        :return: Values of every metric summed over the files of every worker process, by metric and labels key
+        """
+        collected = {}
+        metrics_dir = cls.get_metrics_dir()
+        try:
+            file_names = sorted(os.listdir(metrics_dir))
+        except FileNotFoundError:
+            return collected
+
+        for file_name in file_names:
+            if not file_name.endswith(".json"):
+                continue
+            try:
+                with open(f"{metrics_dir}/{file_name}", "r") as f:
+                    process_values = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                continue
+
+            # Files written before the token was added are named <pid>.json
+            pid, _, process_token = file_name[: -len(".json")].partition(".")
+            pid, process_token = int(pid), process_token or None
+            for name, metric_values in process_values.items():
+                if name not in cls.METRICS:
+                    continue
+                metric_type = cls.METRICS[name][0]
+                if metric_type == MetricType.GAUGE and not cls.is_process_alive(
+                    pid, process_token
+                ):
+                    continue
+
+                collected_values = collected.setdefault(name, {})
+                for labels_key, value in metric_values.items():
+                    collected_values[labels_key] = cls._merge(
+                        metric_type, collected_values.get(labels_key), value
+                    )
+
+        return collected
+
+    @staticmethod
+    def _merge(metric_type: MetricType, collected, value):
+        if collected is None:
+            return value
+        if metric_type != MetricType.HISTOGRAM:
+            return collected + value
+
+        return {
+            "buckets": [a + b for a, b in zip(collected["buckets"], value["buckets"])],
+            "sum": collected["sum"] + value["sum"],
+            "count": collected["count"] + value["count"],
+        }
+
+    @staticmethod
+    def _format_labels(labels: List[Tuple[str, str]]) -> str:
+        if not labels:
+            return ""
+
+        escaped_labels = [
+            (
+                name,
+                value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"'),
+            )
+            for name, value in labels
+        ]
+        return (
+            "{" + ",".join(f'{name}="{value}"' for name, value in escaped_labels) + "}"
+        )
+
+    @staticmethod
+    def _format_value(value: float) -> str:
+        return repr(float(value)) if isinstance(value, float) else str(value)
+
+    @classmethod
+    def render(cls) -> str:
+        """
+        :return: Collected metrics in the Prometheus text exposition format
+        """
+        collected = cls.collect()
+        lines = []
+
+        for name, (metric_type, help_text) in cls.METRICS.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type.value}")
+
+            for labels_key, value in sorted(collected.get(name, {}).items()):
+                labels = [tuple(label) for label in json.loads(labels_key)]
+                if metric_type != MetricType.HISTOGRAM:
+                    lines.append(
+                        f"{name}{cls._format_labels(labels)} {cls._format_value(value)}"
+                    )
+                    continue
+
+                for upper_bound, bucket_count in zip(
+                    cls.HISTOGRAM_BUCKETS, value["buckets"]
+                ):
+                    bucket_labels = labels + [("le", str(float(upper_bound)))]
+                    lines.append(
+                        f"{name}_bucket{cls._format_labels(bucket_labels)} {bucket_count}"
+                    )
+                lines.append(
+                    f"{name}_bucket{cls._format_labels(labels + [('le', '+Inf')])} {value['count']}"
+                )
+                lines.append(
+                    f"{name}_sum{cls._format_labels(labels)} {cls._format_value(value['sum'])}"
+                )
+                lines.append(
+                    f"{name}_count{cls._format_labels(labels)} {value['count']}"
+                )
+
+        return "\n".join(lines) + "\n"
+
+
+class UnknownMetric(Exception):
+    pass
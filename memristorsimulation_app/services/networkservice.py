@@ -1,7 +1,7 @@
 import networkx as nx
 import random
 
-from typing import Tuple, List, Union
+from typing import Any, Dict, Tuple, List, Union
 from memristorsimulation_app.constants import NetworkType, NetworkTypeNotImplemented
 from memristorsimulation_app.representations import NetworkParameters, DeviceParameters
 
@@ -86,6 +86,46 @@ class NetworkService:
                     "be None for NetworkType.RANDOM_REGULAR_GRAPH"
                 )
 
+    @staticmethod
+    def get_amount_edges(
+        network_type: NetworkType, network_parameters: NetworkParameters
+    ) -> int:
+        """
+        :return: Amount of edges of the network computed from its parameters, without generating it. Edges removed by
+        removal_probability are not discounted
+        """
+        if network_type == NetworkType.GRID_2D_GRAPH:
+            n, m = network_parameters.n, network_parameters.m
+            if n is None or m is None:
+                raise ValueError(
+                    'NetworkService parameters "N" and "M" cannot be None for NetworkType.GRID_2D_GRAPH'
+                )
+            return n * (m - 1) + m * (n - 1)
+
+        if network_type not in (
+            NetworkType.RANDOM_REGULAR_GRAPH,
+            NetworkType.WATTS_STROGATZ_GRAPH,
+        ):
+            raise NetworkTypeNotImplemented(
+                f"Network type not implemented. Valid networks are {[network_type for network_type in NetworkType]}"
+            )
+
+        amount_nodes = network_parameters.amount_nodes
+        amount_connections = network_parameters.amount_connections
+        if amount_nodes is None or amount_connections is None:
+            raise ValueError(
+                f'NetworkService parameters "amount_connections" and "amount_nodes" cannot be None for {network_type}'
+            )
+
+        if network_type == NetworkType.RANDOM_REGULAR_GRAPH:
+            return amount_nodes * amount_connections // 2
+
+        # networkx joins every node to its amount_connections // 2 neighbours on each side, rewiring keeps the amount
+        # of edges, and returns the complete graph when amount_connections reaches amount_nodes
+        if amount_connections >= amount_nodes:
+            return amount_nodes * (amount_nodes - 1) // 2
+        return amount_nodes * (amount_connections // 2)
+
     def generate_network(self) -> nx.Graph:
         if self.network_type == NetworkType.GRID_2D_GRAPH:
             network = nx.grid_2d_graph(
@@ -162,5 +202,13 @@ class NetworkService:
             for index, connection in enumerate(self.connections)
         ]
 
+    def get_state_edges(self) -> Dict[str, Tuple[Any, Any]]:
+        """
+        Maps every exported state magnitude (lN) to the network edge where its memristor is connected. The index
+        matches the device number assigned by generate_device_parameters
+        :return: Dictionary with state magnitude names as keys and (node1, node2) edges as values
+        """
+        return {f"l{index}": edge for index, edge in enumerate(self.network.edges)}
+
     def should_ignore_states(self) -> bool:
         return self.network.number_of_edges() > self.MAX_AMOUNT_STATES
@@ -1,29 +1,172 @@
+import asyncio
+import time
+
+from contextlib import asynccontextmanager, contextmanager
+from django.conf import settings
+from typing import AsyncIterator, Iterator, List
+from memristorsimulation_app.representations import TimeMeasure
 from memristorsimulation_app.services.directoriesmanagementservice import (
     DirectoriesManagementService,
 )
-from memristorsimulation_app.services.timemeasureservice import TimeMeasureService
+from memristorsimulation_app.services.metricsservice import MetricsService
+from memristorsimulation_app.services.simulationprogressservice import (
+    SimulationProgressService,
+)
+from memristorsimulation_app.services.timemeasureservice import (
+    AsyncTimeMeasureService,
+    TimeMeasureService,
+)
 
 
 class NGSpiceService:
-    def __init__(self, directories_management_service: DirectoriesManagementService):
-        self.time_measure_service = TimeMeasureService(directories_management_service)
+    def __init__(
+        self,
+        directories_management_service: DirectoriesManagementService,
+        progress_service: SimulationProgressService = None,
+    ):
+        self.time_measure_service = TimeMeasureService(
+            directories_management_service, progress_service=progress_service
+        )
+
+    @staticmethod
+    @contextmanager
+    def track_ngspice_process() -> Iterator[None]:
+        result = "error"
+        with MetricsService.track_in_progress("memristor_ngspice_processes"):
+            try:
+                with MetricsService.time("memristor_ngspice_duration_seconds"):
+                    yield
+                result = "ok"
+            finally:
+                MetricsService.increment_counter(
+                    "memristor_ngspice_runs_total", result=result
+                )
+
+    @staticmethod
+    def get_amount_warmup_iterations(amount_iterations: int) -> int:
+        # A single run is a simulation, not a timing measurement, so it is never repeated
+        return (
+            settings.SIMULATION_TIMING_WARMUP_ITERATIONS if amount_iterations > 1 else 0
+        )
+
+    def write_time_statistics(
+        self,
+        time_measures: List[TimeMeasure],
+        amount_iterations: int,
+        amount_warmup_iterations: int,
+    ) -> None:
+        average_time_measure = self.time_measure_service.compute_time_average(
+            time_measures
+        )
+        timing_report = self.time_measure_service.create_timing_report(
+            time_measures, amount_iterations, amount_warmup_iterations
+        )
+        self.time_measure_service.write_simulation_log(
+            average_time_measure=average_time_measure
+        )
+        self.time_measure_service.write_timing_report(timing_report)
+        self.time_measure_service.print_average_time_measure(average_time_measure)
+        self.time_measure_service.print_timing_report(timing_report)
 
-    def run_single_circuit_simulation(self, amount_iterations: int = 1) -> None:
+    def run_single_circuit_simulation(
+        self, amount_iterations: int = 1
+    ) -> List[TimeMeasure]:
+        """
+        Repeated simulations are preceded by warmup runs left out of the measures, and stop before amount_iterations
+        once the median time is precise enough
+        """
         enable_print_time_measure = True if amount_iterations == 1 else False
+        amount_warmup_iterations = self.get_amount_warmup_iterations(amount_iterations)
         time_measures = []
 
+        for _ in range(amount_warmup_iterations):
+            with self.track_ngspice_process():
+                self.time_measure_service.execute_with_time_measure(False, warmup=True)
+
         for _ in range(amount_iterations):
-            time_measures.append(
-                self.time_measure_service.execute_with_time_measure(
-                    enable_print_time_measure
+            with self.track_ngspice_process():
+                time_measures.append(
+                    self.time_measure_service.execute_with_time_measure(
+                        enable_print_time_measure
+                    )
                 )
-            )
+            if self.time_measure_service.is_precise_enough(time_measures):
+                break
 
         if amount_iterations > 1:
-            average_time_measure = self.time_measure_service.compute_time_average(
-                time_measures, amount_iterations
+            self.write_time_statistics(
+                time_measures, amount_iterations, amount_warmup_iterations
+            )
+
+        return time_measures
+
+
+class AsyncNGSpiceService(NGSpiceService):
+    def __init__(
+        self,
+        directories_management_service: DirectoriesManagementService,
+        progress_service: SimulationProgressService = None,
+    ):
+        self.time_measure_service = AsyncTimeMeasureService(
+            directories_management_service, progress_service=progress_service
+        )
+
+    @staticmethod
+    @asynccontextmanager
+    async def track_ngspice_process_async() -> AsyncIterator[None]:
+        """
+        Every metrics update rewrites the metrics file of the process, so they are done in a worker thread
+        """
+        await asyncio.to_thread(
+            MetricsService.increment_gauge, "memristor_ngspice_processes"
+        )
+        start = time.perf_counter()
+        result = "error"
+        try:
+            yield
+            result = "ok"
+        finally:
+            await asyncio.to_thread(
+                AsyncNGSpiceService._finish_tracking,
+                time.perf_counter() - start,
+                result,
             )
-            self.time_measure_service.write_simulation_log(
-                average_time_measure=average_time_measure
+
+    @staticmethod
+    def _finish_tracking(duration: float, result: str) -> None:
+        MetricsService.observe_histogram("memristor_ngspice_duration_seconds", duration)
+        MetricsService.increment_counter("memristor_ngspice_runs_total", result=result)
+        MetricsService.decrement_gauge("memristor_ngspice_processes")
+
+    async def run_single_circuit_simulation(
+        self, amount_iterations: int = 1
+    ) -> List[TimeMeasure]:
+        enable_print_time_measure = True if amount_iterations == 1 else False
+        amount_warmup_iterations = self.get_amount_warmup_iterations(amount_iterations)
+        time_measures = []
+
+        for _ in range(amount_warmup_iterations):
+            async with self.track_ngspice_process_async():
+                await self.time_measure_service.execute_with_time_measure(
+                    False, warmup=True
+                )
+
+        for _ in range(amount_iterations):
+            async with self.track_ngspice_process_async():
+                time_measures.append(
+                    await self.time_measure_service.execute_with_time_measure(
+                        enable_print_time_measure
+                    )
+                )
+            if self.time_measure_service.is_precise_enough(time_measures):
+                break
+
+        if amount_iterations > 1:
+            await asyncio.to_thread(
+                self.write_time_statistics,
+                time_measures,
+                amount_iterations,
+                amount_warmup_iterations,
             )
-            self.time_measure_service.print_average_time_measure(average_time_measure)
+
+        return time_measures
@@ -1,12 +1,14 @@
 import networkx as nx
+import numpy as np
 import pandas as pd
 import os
 
 from matplotlib import pyplot as plt
 from matplotlib import animation as anime
-from typing import List
+from matplotlib.collections import LineCollection
+from typing import Any, Dict, List
 from networkx import NetworkXError
-from memristorsimulation_app.constants import MeasuredMagnitude
+from memristorsimulation_app.constants import ArtifactStage, MeasuredMagnitude
 from memristorsimulation_app.representations import (
     DataLoader,
     ModelParameters,
@@ -17,9 +19,12 @@ from memristorsimulation_app.representations import (
 from memristorsimulation_app.services.directoriesmanagementservice import (
     DirectoriesManagementService,
 )
+from memristorsimulation_app.services.metricsservice import MetricsService
 
 
 class PlotterService:
+    MAX_ANIMATION_FRAMES = 300
+
     def __init__(
         self,
         simulation_results_directory_path: str,
@@ -38,16 +43,27 @@ class PlotterService:
             f"{self.model_simulations_directory_path}/"
             f"{self.export_parameters.folder_name}"
         )
-        self.figures_directory_path = f"{self.simulations_directory_path}/figures"
+        # Created with the run folder by DirectoriesManagementService.create_workspace
+        self.figures_directory_path = f"{self.simulations_directory_path}/{DirectoriesManagementService.FIGURES_DIR_NAME}"
         self.directories_management_service = DirectoriesManagementService(
             export_parameters=self.export_parameters
         )
-        self.directories_management_service.get_or_create_figures_directory()
 
         self.model_parameters = model_parameters
         self.input_parameters = input_parameters
         self.graph = graph
 
+    def _get_figure_path(self, figure_file_name: str) -> str:
+        """
+        Registers the figure in the run manifest before it is written, readers of the manifest skip missing files
+        """
+        figure_path = f"{self.figures_directory_path}/{figure_file_name}"
+        self.directories_management_service.register_artifact(
+            figure_path, ArtifactStage.FIGURE
+        )
+
+        return figure_path
+
     @staticmethod
     def _get_csv_measured_magnitude(csv_file_name_no_extension: str):
         if csv_file_name_no_extension.endswith("_iv"):
@@ -57,6 +73,7 @@ class PlotterService:
         else:
             return MeasuredMagnitude.OTHER
 
+    @MetricsService.timed("memristor_results_load_duration_seconds")
     def load_data_from_csv(self) -> List[DataLoader]:
         data_loaders = []
         files_in_model_simulations_directory = os.listdir(
@@ -85,6 +102,7 @@ class PlotterService:
 
         return data_loaders
 
+    @MetricsService.timed("memristor_plot_duration_seconds", function_label="plot")
     def plot_iv(self, df: pd.DataFrame, csv_file_name: str, title: str = None) -> None:
         plt.figure(figsize=(12, 8))
         plt.plot(
@@ -102,9 +120,10 @@ class PlotterService:
         )
         plt.autoscale()
         plt.legend(loc="lower right", fontsize=12)
-        plt.savefig(f"{self.figures_directory_path}/{csv_file_name}_iv.jpg")
+        plt.savefig(self._get_figure_path(f"{csv_file_name}_iv.jpg"))
         plt.close()
 
+    @MetricsService.timed("memristor_plot_duration_seconds", function_label="plot")
     def plot_iv_overlapped(
         self, df: pd.DataFrame, title: str = None, label: str = None
     ) -> None:
@@ -126,7 +145,7 @@ class PlotterService:
         plt.title(f'I-V {title if title is not None else ""}', fontsize=22)
         plt.autoscale()
         plt.legend(loc="lower right", fontsize=12)
-        plt.savefig(f"{self.figures_directory_path}/iv_overlapped.jpg")
+        plt.savefig(self._get_figure_path(f"iv_overlapped.jpg"))
 
     @staticmethod
     def _filter_zero_values_from_dataframe(
@@ -135,6 +154,7 @@ class PlotterService:
         df_filtered = df.dropna(subset=["i(v1)"])
         return df_filtered[abs(df_filtered["i(v1)"]) > epsilon]
 
+    @MetricsService.timed("memristor_plot_duration_seconds", function_label="plot")
     def plot_iv_log(
         self, df: pd.DataFrame, csv_file_name: str, title: str = None
     ) -> None:
@@ -157,9 +177,10 @@ class PlotterService:
         )
         plt.autoscale()
         plt.legend(loc="lower right", fontsize=12)
-        plt.savefig(f"{self.figures_directory_path}/{csv_file_name}_log(i)v.jpg")
+        plt.savefig(self._get_figure_path(f"{csv_file_name}_log(i)v.jpg"))
         plt.close()
 
+    @MetricsService.timed("memristor_plot_duration_seconds", function_label="plot")
     def plot_iv_log_overlapped(
         self, df: pd.DataFrame, title: str = None, label: str = None
     ):
@@ -183,8 +204,9 @@ class PlotterService:
         plt.title(f'log(I)-V {title if title is not None else ""}', fontsize=22)
         plt.autoscale()
         plt.legend(loc="lower right", fontsize=12)
-        plt.savefig(f"{self.figures_directory_path}/iv_log_overlapped.jpg")
+        plt.savefig(self._get_figure_path(f"iv_log_overlapped.jpg"))
 
+    @MetricsService.timed("memristor_plot_duration_seconds", function_label="plot")
     def plot_current_and_vin_vs_time(
         self, df: pd.DataFrame, csv_file_name: str, title: dict = None
     ) -> None:
@@ -209,9 +231,10 @@ class PlotterService:
             fontsize=22,
         )
         plt.legend(loc="center", bbox_to_anchor=(0.5, 1.1))
-        plt.savefig(f"{self.figures_directory_path}/{csv_file_name}_ivtime.jpg")
+        plt.savefig(self._get_figure_path(f"{csv_file_name}_ivtime.jpg"))
         plt.close()
 
+    @MetricsService.timed("memristor_plot_duration_seconds", function_label="plot")
     def plot_state_and_vin_vs_time(
         self, df: pd.DataFrame, csv_file_name: str, title: dict = None
     ) -> None:
@@ -236,9 +259,10 @@ class PlotterService:
             fontsize=22,
         )
         plt.legend(loc="center", bbox_to_anchor=(0.5, 1.1))
-        plt.savefig(f"{self.figures_directory_path}/{csv_file_name}_statevtime.jpg")
+        plt.savefig(self._get_figure_path(f"{csv_file_name}_statevtime.jpg"))
         plt.close()
 
+    @MetricsService.timed("memristor_plot_duration_seconds", function_label="plot")
     def plot_states_overlapped(
         self, df: pd.DataFrame, title: str = None, label: str = None
     ) -> None:
@@ -263,8 +287,9 @@ class PlotterService:
         )
         plt.autoscale()
         plt.legend(loc="center")
-        plt.savefig(f"{self.figures_directory_path}/states_overlapped.jpg")
+        plt.savefig(self._get_figure_path(f"states_overlapped.jpg"))
 
+    @MetricsService.timed("memristor_plot_duration_seconds", function_label="plot")
     def plot_iv_animated(
         self, df: pd.DataFrame, csv_file_name: str, title: dict = None
     ) -> None:
@@ -285,7 +310,7 @@ class PlotterService:
         ylist = []
 
         with writer.saving(
-            fig, f"{self.figures_directory_path}/{csv_file_name}_ivanimation.gif", 100
+            fig, self._get_figure_path(f"{csv_file_name}_ivanimation.gif"), 100
         ):
             for xval, yval in zip(df["vin"], -df["i(v1)"]):
                 xlist.append(xval)
@@ -297,6 +322,77 @@ class PlotterService:
 
         plt.close()
 
+    def _get_node_positions(self) -> Dict[Any, np.ndarray]:
+        if all(
+            isinstance(node, tuple) and len(node) == 2 for node in self.graph.nx_graph
+        ):
+            return {node: np.array(node, dtype=float) for node in self.graph.nx_graph}
+
+        return nx.spring_layout(self.graph.nx_graph, seed=self.graph.seed)
+
+    @MetricsService.timed("memristor_plot_duration_seconds", function_label="plot")
+    def plot_grid_states_animated(
+        self, df: pd.DataFrame, csv_file_name: str, title: str = None
+    ) -> None:
+        state_edges = self.graph.state_edges or {
+            f"l{index}": edge for index, edge in enumerate(self.graph.nx_graph.edges)
+        }
+        state_columns = [column for column in state_edges if column in df.columns]
+        if not state_columns:
+            return
+
+        positions = self._get_node_positions()
+        segments = np.array(
+            [
+                [positions[state_edges[column][0]], positions[state_edges[column][1]]]
+                for column in state_columns
+            ]
+        )
+        states = df[state_columns].to_numpy(dtype=float)
+        times = df["time"].to_numpy(dtype=float)
+        frame_indexes = np.unique(
+            np.linspace(0, len(df) - 1, min(len(df), self.MAX_ANIMATION_FRAMES)).astype(
+                int
+            )
+        )
+
+        fig, ax = plt.subplots(figsize=(12, 8))
+        # A single collection is drawn and only its color array changes between frames
+        line_collection = LineCollection(segments, cmap="viridis", linewidths=4)
+        line_collection.set_array(states[frame_indexes[0]])
+        line_collection.set_clim(np.nanmin(states), np.nanmax(states))
+        ax.add_collection(line_collection)
+        ax.autoscale()
+        ax.set_aspect("equal")
+        ax.margins(0.05)
+        ax.set_xticks([])
+        ax.set_yticks([])
+        fig.colorbar(line_collection, ax=ax, label="Memristance [ohm]")
+        for node, label in [(self.graph.vin_plus, "V+"), (self.graph.vin_minus, "V-")]:
+            if node in positions:
+                ax.plot(*positions[node], "o", color="#f07b07", markersize=12)
+                ax.annotate(label, positions[node], fontsize=12, fontweight="bold")
+        figure_title = ax.set_title("")
+
+        metadata = dict(title="animation", artist="ignaciopineyro")
+        writer = anime.PillowWriter(fps=15, metadata=metadata)
+
+        with writer.saving(
+            fig,
+            self._get_figure_path(f"{csv_file_name}_gridstatesanimation.gif"),
+            100,
+        ):
+            for frame_index in frame_indexes:
+                line_collection.set_array(states[frame_index])
+                figure_title.set_text(
+                    f"Memristive states {csv_file_name} {title if title is not None else ''}"
+                    f"\nt={times[frame_index]:.4g} seg"
+                )
+                writer.grab_frame()
+
+        plt.close()
+
+    @MetricsService.timed("memristor_plot_duration_seconds", function_label="plot")
     def plot_networkx_graph(self):
         color_map = []
         labels = {}
@@ -344,5 +440,5 @@ class PlotterService:
             font_size=12,
             font_weight="bold",
         )
-        fig.savefig(f"{self.figures_directory_path}/graph.jpg")
+        fig.savefig(self._get_figure_path(f"graph.jpg"))
         plt.close()
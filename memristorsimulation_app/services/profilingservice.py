@@ -0,0 +1,177 @@
+import cProfile
+import json
+import logging
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Iterator, List
+from django.conf import settings
+from memristorsimulation_app.constants import (
+    SIMULATIONS_DIR,
+    ArtifactStage,
+    ModelsSimulationFolders,
+)
+from memristorsimulation_app.services.directoriesmanagementservice import (
+    DirectoriesManagementService,
+)
+from memristorsimulation_app.services.retentionservice import RetentionService
+
+
+logger = logging.getLogger(__name__)
+
+
+class ProfilingService:
+    """
+    cProfile and tracemalloc around one simulation, requested by admins for single slow requests. The pstats dump
+    and a JSON summary of the slowest functions and largest allocations are written to the run folder. tracemalloc is
+    process wide, so profiled runs of a process take turns and allocations of other threads running meanwhile are
+    traced as well.
+    """
+
+    _lock = threading.Lock()
+
+    def __init__(self, directories_management_service: DirectoriesManagementService):
+        self.directories_management_service = directories_management_service
+
+    @contextmanager
+    def profile(self) -> Iterator[None]:
+        """
+        Profiles the block and writes its artifacts, failed runs are profiled too if their folder exists
+        """
+        with self._lock:
+            profiler = cProfile.Profile()
+            # Tracing started elsewhere (e.g. python -X tracemalloc) is left running
+            was_tracing = tracemalloc.is_tracing()
+            if not was_tracing:
+                tracemalloc.start()
+            start = time.perf_counter()
+            profiler.enable()
+            try:
+                yield
+            finally:
+                profiler.disable()
+                total_time_ms = (time.perf_counter() - start) * 1000
+                current_memory, peak_memory = tracemalloc.get_traced_memory()
+                snapshot = tracemalloc.take_snapshot()
+                if not was_tracing:
+                    tracemalloc.stop()
+                self._write_artifacts(
+                    profiler, snapshot, total_time_ms, current_memory, peak_memory
+                )
+
+    @staticmethod
+    def get_top_functions(profiler: cProfile.Profile, top: int) -> List[dict]:
+        """
+        :return: Functions with the highest cumulative time, times in ms
+        """
+        stats = pstats.Stats(profiler).stats
+        functions = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)
+
+        return [
+            {
+                "function": f"{file_name}:{line_number}({function_name})",
+                "calls": calls,
+                "primitive_calls": primitive_calls,
+                "total_time_ms": total_time * 1000,
+                "cumulative_time_ms": cumulative_time * 1000,
+            }
+            for (file_name, line_number, function_name), (
+                primitive_calls,
+                calls,
+                total_time,
+                cumulative_time,
+                _,
+            ) in functions[:top]
+        ]
+
+    @staticmethod
+    def get_top_allocations(snapshot: tracemalloc.Snapshot, top: int) -> List[dict]:
+        """
+        :return: Source lines holding the most memory when the run finished
+        """
+        return [
+            {
+                "location": str(statistic.traceback),
+                "size_bytes": statistic.size,
+                "count": statistic.count,
+            }
+            for statistic in snapshot.statistics("lineno")[:top]
+        ]
+
+    def _write_artifacts(
+        self,
+        profiler: cProfile.Profile,
+        snapshot: tracemalloc.Snapshot,
+        total_time_ms: float,
+        current_memory: int,
+        peak_memory: int,
+    ) -> None:
+        """
+        Profiling never makes a simulation fail, write errors are only logged
+        """
+        if not os.path.isdir(
+            self.directories_management_service.get_simulation_folder_path()
+        ):
+            return
+
+        profile_file_path = self.directories_management_service.get_profile_file_path()
+        summary_file_path = (
+            self.directories_management_service.get_profile_summary_file_path()
+        )
+        top = settings.SIMULATION_PROFILE_TOP
+        summary = {
+            "folder_name": self.directories_management_service.export_parameters.folder_name,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "total_time_ms": total_time_ms,
+            "traced_memory_current_bytes": current_memory,
+            "traced_memory_peak_bytes": peak_memory,
+            "profile_file": os.path.basename(profile_file_path),
+            "top_functions": self.get_top_functions(profiler, top),
+            "top_allocations": self.get_top_allocations(snapshot, top),
+        }
+
+        try:
+            profiler.dump_stats(profile_file_path)
+            with open(summary_file_path, "w") as f:
+                json.dump(summary, f, indent=2)
+        except OSError as e:
+            logger.warning(f"Could not write profile of {summary['folder_name']}: {e}")
+            return
+
+        self.directories_management_service.register_artifact(
+            profile_file_path, ArtifactStage.LOG
+        )
+        self.directories_management_service.register_artifact(
+            summary_file_path, ArtifactStage.LOG
+        )
+
+    @staticmethod
+    def load_summary(
+        model_simulation_folder: ModelsSimulationFolders, folder_name: str
+    ) -> dict:
+        if not folder_name or folder_name.startswith(".") or "/" in folder_name:
+            raise ProfileNotFound(f"Invalid folder name {folder_name}")
+
+        simulation_folder_path = (
+            f"{SIMULATIONS_DIR}/{model_simulation_folder.value}/{folder_name}"
+        )
+        RetentionService.restore_folder(simulation_folder_path)
+        summary_file_path = (
+            f"{simulation_folder_path}/{folder_name}"
+            f"{DirectoriesManagementService.PROFILE_SUMMARY_FILE_SUFFIX}"
+        )
+
+        try:
+            with open(summary_file_path, "r") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            raise ProfileNotFound(f"Simulation {folder_name} was not profiled")
+
+
+class ProfileNotFound(Exception):
+    pass
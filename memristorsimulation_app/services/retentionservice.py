@@ -0,0 +1,403 @@
+import errno
+import fcntl
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+import zipfile
+
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import List, Optional
+from django.conf import settings
+from django.db import DatabaseError, transaction
+from django.db.models import QuerySet
+from memristorsimulation_app.constants import SIMULATIONS_DIR, ModelsSimulationFolders
+from memristorsimulation_app.models import SimulationRun, SimulationRunFile
+from memristorsimulation_app.representations import (
+    RetentionReport,
+    SimulationFolderUsage,
+)
+from memristorsimulation_app.services.archiveservice import ArchiveService
+from memristorsimulation_app.services.directoriesmanagementservice import (
+    DirectoriesManagementService,
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+class RetentionService:
+    """
+    Keeps simulation_results under a disk quota. The last access of a run folder is its directory mtime, which is
+    refreshed with touch() every time the run is simulated, downloaded or read, and kept as the archive mtime once the
+    folder is compressed. Runs accessed within the protected window are never evicted nor compressed.
+    """
+
+    COMPRESSED_EXTENSION = ".zip"
+    LOCK_FILE_NAME = ".retention.lock"
+    LAST_RUN_FILE_NAME = ".retention_last_run"
+    RESTORING_EXTENSION = ".restoring"
+
+    def __init__(
+        self,
+        quota_bytes: int = None,
+        max_age_days: float = None,
+        compress_after_hours: float = None,
+        protected_minutes: float = None,
+        dry_run: bool = False,
+    ):
+        self.quota_bytes = (
+            quota_bytes
+            if quota_bytes is not None
+            else settings.SIMULATION_RESULTS_QUOTA_BYTES
+        )
+        self.max_age_seconds = 86400 * (
+            max_age_days
+            if max_age_days is not None
+            else settings.SIMULATION_RESULTS_MAX_AGE_DAYS
+        )
+        self.compress_after_seconds = 3600 * (
+            compress_after_hours
+            if compress_after_hours is not None
+            else settings.SIMULATION_RESULTS_COMPRESS_AFTER_HOURS
+        )
+        self.protected_seconds = 60 * (
+            protected_minutes
+            if protected_minutes is not None
+            else settings.SIMULATION_RESULTS_PROTECTED_MINUTES
+        )
+        self.dry_run = dry_run
+
+    @staticmethod
+    def touch(simulation_folder_path: str) -> None:
+        if os.path.isdir(simulation_folder_path):
+            os.utime(simulation_folder_path)
+
+    @classmethod
+    def restore_folder(cls, simulation_folder_path: str) -> bool:
+        """
+        Extracts a compressed run back into its folder so it can be served again. Restores hold the retention lock,
+        so they never race with a retention pass nor with another restore of the same run.
+        :return: True if the folder was restored, False if it was not compressed or was already restored
+        """
+        archive_path = simulation_folder_path + cls.COMPRESSED_EXTENSION
+        if os.path.isdir(simulation_folder_path) or not os.path.isfile(archive_path):
+            return False
+
+        with cls._retention_lock(blocking=True):
+            # Restored or evicted while waiting for the lock
+            if os.path.isdir(simulation_folder_path) or not os.path.isfile(
+                archive_path
+            ):
+                return False
+
+            temporary_folder_path = tempfile.mkdtemp(
+                prefix=f"{os.path.basename(simulation_folder_path)}.",
+                suffix=cls.RESTORING_EXTENSION,
+                dir=os.path.dirname(simulation_folder_path),
+            )
+            try:
+                with zipfile.ZipFile(archive_path) as zip_file:
+                    zip_file.extractall(temporary_folder_path)
+                os.replace(temporary_folder_path, simulation_folder_path)
+            except OSError as e:
+                shutil.rmtree(temporary_folder_path, ignore_errors=True)
+                # Another process without the lock (e.g. a manual restore) got there first
+                if isinstance(e, FileNotFoundError) or e.errno in (
+                    errno.ENOTEMPTY,
+                    errno.EEXIST,
+                ):
+                    return False
+                raise
+
+            try:
+                os.remove(archive_path)
+            except FileNotFoundError:
+                pass
+            cls.touch(simulation_folder_path)
+            cls.mark_runs_restored(simulation_folder_path)
+
+        return True
+
+    @staticmethod
+    def get_folder_size(path: str) -> int:
+        if os.path.isfile(path):
+            return os.path.getsize(path)
+
+        size = 0
+        for relative_path in DirectoriesManagementService.get_run_files(path):
+            try:
+                size += os.stat(os.path.join(path, relative_path)).st_size
+            except FileNotFoundError:
+                continue
+
+        return size
+
+    def get_folder_usages(self) -> List[SimulationFolderUsage]:
+        usages = []
+
+        for model_simulation_folder in ModelsSimulationFolders:
+            model_folder_path = f"{SIMULATIONS_DIR}/{model_simulation_folder.value}"
+            if not os.path.isdir(model_folder_path):
+                continue
+
+            with os.scandir(model_folder_path) as entries:
+                for entry in entries:
+                    if entry.name.startswith(".") or entry.name.endswith(
+                        self.RESTORING_EXTENSION
+                    ):
+                        continue
+
+                    compressed = entry.is_file() and entry.name.endswith(
+                        self.COMPRESSED_EXTENSION
+                    )
+                    if not (entry.is_dir() or compressed):
+                        continue
+
+                    usages.append(
+                        SimulationFolderUsage(
+                            model_simulation_folder=model_simulation_folder,
+                            folder_name=(
+                                entry.name[: -len(self.COMPRESSED_EXTENSION)]
+                                if compressed
+                                else entry.name
+                            ),
+                            path=entry.path,
+                            size_bytes=self.get_folder_size(entry.path),
+                            last_access=entry.stat().st_mtime,
+                            compressed=compressed,
+                        )
+                    )
+
+        return sorted(usages, key=lambda usage: usage.last_access)
+
+    def compress_folder(self, usage: SimulationFolderUsage) -> SimulationFolderUsage:
+        archive_path = usage.path + self.COMPRESSED_EXTENSION
+        temporary_archive_path = f"{archive_path}.tmp"
+
+        with zipfile.ZipFile(temporary_archive_path, "w") as zip_file:
+            ArchiveService().write_files(
+                zip_file,
+                [
+                    (os.path.join(usage.path, relative_path), relative_path)
+                    for relative_path in DirectoriesManagementService.get_run_files(
+                        usage.path
+                    )
+                ],
+            )
+
+        os.replace(temporary_archive_path, archive_path)
+        # The archive keeps the last access of the folder so LRU ordering is not reset by the compression
+        os.utime(archive_path, (usage.last_access, usage.last_access))
+        shutil.rmtree(usage.path)
+
+        return SimulationFolderUsage(
+            model_simulation_folder=usage.model_simulation_folder,
+            folder_name=usage.folder_name,
+            path=archive_path,
+            size_bytes=os.path.getsize(archive_path),
+            last_access=usage.last_access,
+            compressed=True,
+        )
+
+    @staticmethod
+    def delete(usage: SimulationFolderUsage) -> None:
+        if usage.compressed:
+            os.remove(usage.path)
+        else:
+            shutil.rmtree(usage.path)
+
+    def is_protected(self, usage: SimulationFolderUsage, now: float) -> bool:
+        return now - usage.last_access < self.protected_seconds
+
+    def enforce_retention(self, now: float = None) -> RetentionReport:
+        with self._retention_lock(blocking=True):
+            return self._enforce_retention(now or time.time())
+
+    def _enforce_retention(self, now: float) -> RetentionReport:
+        report = RetentionReport()
+        remaining_usages = []
+
+        for usage in self.get_folder_usages():
+            age = now - usage.last_access
+
+            if self.is_protected(usage, now):
+                remaining_usages.append(usage)
+            elif self.max_age_seconds and age > self.max_age_seconds:
+                self._evict(usage, report)
+            elif (
+                self.compress_after_seconds
+                and not usage.compressed
+                and age > self.compress_after_seconds
+            ):
+                remaining_usages.append(self._compress(usage, report))
+            else:
+                remaining_usages.append(usage)
+
+        total_bytes = sum(usage.size_bytes for usage in remaining_usages)
+
+        if self.quota_bytes:
+            # Usages are sorted by last access, so the least recently used runs are evicted first
+            for usage in remaining_usages:
+                if total_bytes <= self.quota_bytes:
+                    break
+                if self.is_protected(usage, now):
+                    continue
+
+                self._evict(usage, report)
+                total_bytes -= usage.size_bytes
+
+        report.total_bytes = total_bytes
+        if total_bytes > self.quota_bytes > 0:
+            logger.warning(
+                f"Simulation results use {total_bytes} bytes after retention, quota is {self.quota_bytes} bytes"
+            )
+
+        return report
+
+    @staticmethod
+    def get_catalogued_runs(model_simulation_folder: str, folder_name: str) -> QuerySet:
+        return SimulationRun.objects.filter(
+            model_simulation_folder=model_simulation_folder,
+            folder_name=folder_name,
+            evicted_at__isnull=True,
+        )
+
+    @classmethod
+    def mark_runs_evicted(cls, usage: SimulationFolderUsage) -> None:
+        """
+        Catalogued runs of an evicted folder keep their row with evicted_at set, their files are dropped. The catalogue
+        never makes the retention fail, database errors are only logged
+        """
+        try:
+            with transaction.atomic():
+                runs = cls.get_catalogued_runs(
+                    usage.model_simulation_folder.value, usage.folder_name
+                )
+                SimulationRunFile.objects.filter(run__in=runs).delete()
+                runs.update(evicted_at=datetime.now(timezone.utc), compressed_at=None)
+        except DatabaseError as e:
+            logger.warning(
+                f"Could not mark runs of {usage.folder_name} as evicted in the catalogue: {str(e)}"
+            )
+
+    @classmethod
+    def mark_runs_compressed(cls, usage: SimulationFolderUsage) -> None:
+        """
+        Catalogued runs of a compressed folder keep their files, whose paths point inside the folder, with compressed_at
+        set until the folder is restored
+        """
+        try:
+            cls.get_catalogued_runs(
+                usage.model_simulation_folder.value, usage.folder_name
+            ).update(compressed_at=datetime.now(timezone.utc))
+        except DatabaseError as e:
+            logger.warning(
+                f"Could not mark runs of {usage.folder_name} as compressed in the catalogue: {str(e)}"
+            )
+
+    @classmethod
+    def mark_runs_restored(cls, simulation_folder_path: str) -> None:
+        folder_name = os.path.basename(simulation_folder_path)
+        try:
+            cls.get_catalogued_runs(
+                os.path.basename(os.path.dirname(simulation_folder_path)), folder_name
+            ).update(compressed_at=None)
+        except DatabaseError as e:
+            logger.warning(
+                f"Could not mark runs of {folder_name} as restored in the catalogue: {str(e)}"
+            )
+
+    def _evict(self, usage: SimulationFolderUsage, report: RetentionReport) -> None:
+        if not self.dry_run:
+            self.delete(usage)
+            self.mark_runs_evicted(usage)
+
+        report.deleted.append(
+            f"{usage.model_simulation_folder.value}/{usage.folder_name}"
+        )
+        report.freed_bytes += usage.size_bytes
+
+    def _compress(
+        self, usage: SimulationFolderUsage, report: RetentionReport
+    ) -> SimulationFolderUsage:
+        report.compressed.append(
+            f"{usage.model_simulation_folder.value}/{usage.folder_name}"
+        )
+        if self.dry_run:
+            return usage
+
+        compressed_usage = self.compress_folder(usage)
+        self.mark_runs_compressed(usage)
+        report.freed_bytes += usage.size_bytes - compressed_usage.size_bytes
+
+        return compressed_usage
+
+    @classmethod
+    @contextmanager
+    def _retention_lock(cls, blocking: bool):
+        # Only one retention pass runs at a time across every worker process
+        os.makedirs(SIMULATIONS_DIR, exist_ok=True)
+        with open(f"{SIMULATIONS_DIR}/{cls.LOCK_FILE_NAME}", "w") as lock_file:
+            try:
+                fcntl.flock(
+                    lock_file,
+                    fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB,
+                )
+            except BlockingIOError:
+                raise RetentionAlreadyRunning()
+
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    @classmethod
+    def enforce_retention_in_background(cls) -> Optional[threading.Thread]:
+        """
+        Starts a retention pass in a daemon thread when SIMULATION_RETENTION_INTERVAL_SECONDS have passed since the
+        previous one. Meant to be called after a simulation finishes, so no scheduler is needed.
+        """
+        interval = settings.SIMULATION_RETENTION_INTERVAL_SECONDS
+        if not interval:
+            return None
+
+        last_run_file_path = f"{SIMULATIONS_DIR}/{cls.LAST_RUN_FILE_NAME}"
+        if (
+            os.path.exists(last_run_file_path)
+            and time.time() - os.path.getmtime(last_run_file_path) < interval
+        ):
+            return None
+
+        os.makedirs(SIMULATIONS_DIR, exist_ok=True)
+        with open(last_run_file_path, "w") as f:
+            f.write(str(time.time()))
+
+        thread = threading.Thread(target=cls._run_in_background, daemon=True)
+        thread.start()
+
+        return thread
+
+    @classmethod
+    def _run_in_background(cls) -> None:
+        retention_service = cls()
+        try:
+            with retention_service._retention_lock(blocking=False):
+                report = retention_service._enforce_retention(time.time())
+        except RetentionAlreadyRunning:
+            return
+        except Exception as e:
+            logger.error(f"Error during simulation results retention: {str(e)}")
+            return
+
+        logger.info(
+            f"Simulation results retention freed {report.freed_bytes} bytes, deleted {len(report.deleted)} and "
+            f"compressed {len(report.compressed)} runs"
+        )
+
+
+class RetentionAlreadyRunning(Exception):
+    pass
@@ -0,0 +1,514 @@
+import json
+import logging
+import multiprocessing
+import os
+import resource
+import shutil
+import time
+import django
+import matplotlib.pyplot as plt
+import numpy as np
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Tuple
+from django.conf import settings
+from memristorsimulation_app.constants import MemristorModels, NetworkType
+from memristorsimulation_app.representations import (
+    NetworkParameters,
+    ScalingFit,
+    ScalingMeasurement,
+)
+from memristorsimulation_app.services.simulationcatalogueservice import (
+    SimulationCatalogueService,
+)
+from memristorsimulation_app.services.simulationservice import SimulationService
+from memristorsimulation_app.services.timemeasureservice import TimeMeasureService
+
+
+logger = logging.getLogger(__name__)
+
+
+def run_scaling_point(
+    measurement: ScalingMeasurement, request_parameters: dict, ngspice_executable: str
+) -> Tuple[ScalingMeasurement, str]:
+    """
+    Runs one configuration in a fresh worker, so the peak RSS of the worker belongs to that run only
+    :param ngspice_executable: Executable chosen by the parent process, spawned workers read the settings again
+    :return: Measurement and folder of the run
+    """
+    simulation_folder_path = None
+    settings.NGSPICE_EXECUTABLE = ngspice_executable
+
+    try:
+        simulation_service = SimulationService(request_parameters=request_parameters)
+        directories_management_service = (
+            simulation_service.directories_management_service
+        )
+        start_time = time.perf_counter()
+        simulation_service.simulate()
+        measurement.wall_time = (time.perf_counter() - start_time) * 1000
+        simulation_folder_path = (
+            directories_management_service.get_simulation_folder_path()
+        )
+
+        measurement.amount_nodes, measurement.amount_edges = (
+            SimulationCatalogueService.get_network_size(simulation_service)
+        )
+        average_time_measure = TimeMeasureService.compute_time_average(
+            simulation_service.time_measures
+        )
+        measurement.ngspice_real_time = (
+            average_time_measure.average_linux_real_execution_time
+        )
+        measurement.ngspice_user_time = (
+            average_time_measure.average_linux_user_execution_time
+        )
+        measurement.ngspice_sys_time = (
+            average_time_measure.average_linux_sys_execution_time
+        )
+        measurement.ngspice_peak_rss = SimulationCatalogueService.get_max_rss_bytes(
+            simulation_service
+        )
+        # ru_maxrss is in KiB on Linux
+        measurement.python_peak_rss = (
+            resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+        )
+        measurement.output_size = sum(
+            os.path.getsize(file_path)
+            for file_path, _ in directories_management_service.get_all_simulation_files()
+            if os.path.isfile(file_path)
+        )
+    except Exception as e:
+        logger.error(
+            f"Scaling point {measurement.network_type} size={measurement.size} failed: {str(e)}"
+        )
+        measurement.error = f"{type(e).__name__}: {str(e)}"
+
+    return measurement, simulation_folder_path
+
+
+class ScalingStudyService:
+    """
+    Measures how a whole simulation grows with the network: every network type runs on networks of growing size (and,
+    for random regular and Watts-Strogatz networks, growing amount of connections) recording wall time, ngspice
+    real/user/sys time, peak RSS and output size. A power law is fitted to every metric against the amount of nodes and
+    edges and the report is written as JSON together with a log-log plot per metric.
+    Sizes are the side of a square grid, random regular and Watts-Strogatz networks get the same amount of nodes.
+    """
+
+    DEFAULT_NETWORK_TYPES = [
+        NetworkType.GRID_2D_GRAPH,
+        NetworkType.RANDOM_REGULAR_GRAPH,
+        NetworkType.WATTS_STROGATZ_GRAPH,
+    ]
+    DEFAULT_SIZES = [3, 5, 8, 12]
+    DEFAULT_CONNECTIONS = [4]
+    DEFAULT_AMOUNT_POINTS = 1000
+    DEFAULT_REPEATS = 3
+    SHORTCUT_PROBABILITY = 0.1
+    METRICS = [
+        "wall_time",
+        "ngspice_real_time",
+        "ngspice_user_time",
+        "ngspice_sys_time",
+        "ngspice_peak_rss",
+        "python_peak_rss",
+        "output_size",
+    ]
+    FIT_VARIABLES = ["amount_nodes", "amount_edges"]
+    REPORT_FILE_NAME = "scaling_study.json"
+    FOLDER_NAME = "scaling_study"
+    FILE_NAME = "scaling_study"
+
+    def __init__(
+        self,
+        network_types: List[NetworkType] = None,
+        sizes: List[int] = None,
+        connections: List[int] = None,
+        amount_points: int = None,
+        repeats: int = None,
+        keep_results: bool = False,
+    ):
+        self.network_types = network_types or self.DEFAULT_NETWORK_TYPES
+        self.sizes = sizes or self.DEFAULT_SIZES
+        self.connections = connections or self.DEFAULT_CONNECTIONS
+        self.amount_points = amount_points or self.DEFAULT_AMOUNT_POINTS
+        self.repeats = repeats or self.DEFAULT_REPEATS
+        self.keep_results = keep_results
+        self.skipped_configurations: List[str] = []
+
+    @staticmethod
+    def is_valid_configuration(
+        network_type: NetworkType, size: int, amount_connections: int
+    ) -> bool:
+        if network_type == NetworkType.GRID_2D_GRAPH:
+            return size > 1
+
+        amount_nodes = size * size
+        # Random regular graphs need less connections than nodes and an even amount of connection ends
+        return 0 < amount_connections < amount_nodes and (
+            network_type != NetworkType.RANDOM_REGULAR_GRAPH
+            or (amount_nodes * amount_connections) % 2 == 0
+        )
+
+    def get_configurations(self) -> List[Tuple[NetworkType, int, int]]:
+        """
+        :return: (network type, size, amount of connections) to run, the amount of connections is None for grids
+        """
+        configurations = []
+        for network_type in self.network_types:
+            connections = (
+                [None]
+                if network_type == NetworkType.GRID_2D_GRAPH
+                else self.connections
+            )
+            for size in self.sizes:
+                for amount_connections in connections:
+                    if self.is_valid_configuration(
+                        network_type, size, amount_connections
+                    ):
+                        configurations.append((network_type, size, amount_connections))
+                    else:
+                        self.skipped_configurations.append(
+                            f"{network_type.value} size={size} connections={amount_connections}"
+                        )
+
+        return configurations
+
+    def get_network_parameters(
+        self, network_type: NetworkType, size: int, amount_connections: int
+    ) -> NetworkParameters:
+        if network_type == NetworkType.GRID_2D_GRAPH:
+            return NetworkParameters(n=size, m=size)
+
+        return NetworkParameters(
+            amount_nodes=size * size,
+            amount_connections=amount_connections,
+            shortcut_probability=self.SHORTCUT_PROBABILITY,
+            seed=0,
+        )
+
+    @staticmethod
+    def get_amount_edges(
+        network_type: NetworkType, size: int, amount_connections: int
+    ) -> int:
+        if network_type == NetworkType.GRID_2D_GRAPH:
+            return 2 * size * (size - 1)
+
+        if network_type == NetworkType.RANDOM_REGULAR_GRAPH:
+            return size * size * amount_connections // 2
+
+        # Watts-Strogatz rings join every node to amount_connections // 2 neighbours on each side, rewiring moves
+        # edges without changing their amount
+        return size * size * (amount_connections // 2)
+
+    def get_request_parameters(
+        self, network_type: NetworkType, size: int, amount_connections: int
+    ) -> dict:
+        """
+        Simulation request exporting every state, with one timepoint per study point and no plots
+        """
+        tstop = 1.0
+        network_parameters = self.get_network_parameters(
+            network_type, size, amount_connections
+        )
+        amount_edges = self.get_amount_edges(network_type, size, amount_connections)
+
+        return {
+            "model": MemristorModels.PERSHIN.value,
+            "subcircuit": {
+                "model_parameters": {
+                    "alpha": 0.0,
+                    "beta": 500e3,
+                    "rinit": 200e3,
+                    "roff": 200e3,
+                    "ron": 2e3,
+                    "vt": 0.6,
+                },
+                "name": "memristor",
+                "nodes": ["pl", "mn", "x"],
+            },
+            "input_parameters": {
+                "source_number": 1,
+                "n_plus": "vin",
+                "n_minus": "gnd",
+                "wave_form": {
+                    "type": "sin",
+                    "parameters": {"vo": 0.0, "amplitude": 1.0, "frequency": 1.0},
+                },
+            },
+            "simulation_parameters": {
+                "analysis_type": ".tran",
+                "tstep": tstop / self.amount_points,
+                "tstop": tstop,
+                "tstart": 0,
+                "tmax": tstop / self.amount_points,
+                "uic": True,
+            },
+            "export_parameters": {
+                "folder_name": f"{self.FOLDER_NAME}_{network_type.value.lower()}_{size}",
+                "file_name": self.FILE_NAME,
+                "magnitudes": ["vin", "i(v1)"] + [f"l{i}" for i in range(amount_edges)],
+            },
+            "network_type": network_type.value,
+            "network_parameters": {
+                k: v for k, v in asdict(network_parameters).items() if v is not None
+            },
+            "plot_types": [],
+        }
+
+    def run(self) -> List[ScalingMeasurement]:
+        if shutil.which(settings.NGSPICE_EXECUTABLE) is None:
+            raise NGSpiceNotFound(
+                f"{settings.NGSPICE_EXECUTABLE} not found, set NGSPICE_EXECUTABLE to run the scaling study"
+            )
+
+        measurements, request_parameters = [], []
+        for network_type, size, amount_connections in self.get_configurations():
+            for repeat in range(self.repeats):
+                measurements.append(
+                    ScalingMeasurement(
+                        network_type=network_type.value,
+                        size=size,
+                        amount_connections=amount_connections,
+                        repeat=repeat,
+                    )
+                )
+                request_parameters.append(
+                    self.get_request_parameters(network_type, size, amount_connections)
+                )
+
+        results = []
+        simulation_folder_paths = []
+        try:
+            # One run at a time, each one in a new worker, so runs never compete for the CPU and peak RSS is per run.
+            # Workers set up Django before unpickling the first point, run_scaling_point imports the catalogue models
+            with ProcessPoolExecutor(
+                max_workers=1,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=django.setup,
+                max_tasks_per_child=1,
+            ) as executor:
+                for measurement, simulation_folder_path in executor.map(
+                    run_scaling_point,
+                    measurements,
+                    request_parameters,
+                    [settings.NGSPICE_EXECUTABLE] * len(measurements),
+                ):
+                    results.append(measurement)
+                    if simulation_folder_path:
+                        simulation_folder_paths.append(simulation_folder_path)
+        finally:
+            if not self.keep_results:
+                for simulation_folder_path in simulation_folder_paths:
+                    shutil.rmtree(simulation_folder_path, ignore_errors=True)
+
+        return results
+
+    @classmethod
+    def aggregate(cls, measurements: List[ScalingMeasurement]) -> List[Dict[str, Any]]:
+        """
+        :return: Median of every metric over the repeats of every configuration, failed repeats are left out
+        """
+        configurations: Dict[Tuple[str, int, int], List[ScalingMeasurement]] = {}
+        for measurement in measurements:
+            if not measurement.is_failed():
+                configurations.setdefault(
+                    (
+                        measurement.network_type,
+                        measurement.size,
+                        measurement.amount_connections,
+                    ),
+                    [],
+                ).append(measurement)
+
+        aggregated = []
+        for (
+            network_type,
+            size,
+            amount_connections,
+        ), configuration_measurements in configurations.items():
+            row = {
+                "network_type": network_type,
+                "size": size,
+                "amount_connections": amount_connections,
+                "amount_nodes": configuration_measurements[0].amount_nodes,
+                "amount_edges": configuration_measurements[0].amount_edges,
+                "amount_repeats": len(configuration_measurements),
+            }
+            for metric in cls.METRICS:
+                values = [
+                    getattr(measurement, metric)
+                    for measurement in configuration_measurements
+                    if getattr(measurement, metric) is not None
+                ]
+                row[metric] = float(np.median(values)) if values else None
+            aggregated.append(row)
+
+        return aggregated
+
+    @staticmethod
+    def fit_power_law(
+        variable_values: List[float], metric_values: List[float]
+    ) -> Tuple[float, float, float]:
+        """
+        :return: Exponent, coefficient and r squared of metric = coefficient * variable ^ exponent
+        """
+        log_variable_values = np.log(variable_values)
+        log_metric_values = np.log(metric_values)
+        exponent, log_coefficient = np.polyfit(
+            log_variable_values, log_metric_values, 1
+        )
+
+        residuals = log_metric_values - (
+            exponent * log_variable_values + log_coefficient
+        )
+        total = np.sum((log_metric_values - np.mean(log_metric_values)) ** 2)
+        # Constant metrics are fitted exactly by a zero exponent
+        r_squared = 1 - np.sum(residuals**2) / total if total > 1e-12 else 1.0
+
+        return float(exponent), float(np.exp(log_coefficient)), float(r_squared)
+
+    @classmethod
+    def fit(cls, aggregated: List[Dict[str, Any]]) -> List[ScalingFit]:
+        """
+        Fits every metric of every network type against every variable, it needs at least two distinct positive values
+        """
+        fits = []
+        for network_type in dict.fromkeys(row["network_type"] for row in aggregated):
+            rows = [row for row in aggregated if row["network_type"] == network_type]
+            for metric in cls.METRICS:
+                for variable in cls.FIT_VARIABLES:
+                    points = [
+                        (row[variable], row[metric])
+                        for row in rows
+                        if row[variable] and row[metric] and row[metric] > 0
+                    ]
+                    if len({variable_value for variable_value, _ in points}) < 2:
+                        continue
+
+                    exponent, coefficient, r_squared = cls.fit_power_law(*zip(*points))
+                    fits.append(
+                        ScalingFit(
+                            network_type=network_type,
+                            metric=metric,
+                            variable=variable,
+                            exponent=exponent,
+                            coefficient=coefficient,
+                            r_squared=r_squared,
+                            amount_points=len(points),
+                        )
+                    )
+
+        return fits
+
+    def to_dict(self, measurements: List[ScalingMeasurement]) -> Dict[str, Any]:
+        aggregated = self.aggregate(measurements)
+
+        return {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "ngspice_executable": settings.NGSPICE_EXECUTABLE,
+            "amount_points": self.amount_points,
+            "repeats": self.repeats,
+            "skipped_configurations": self.skipped_configurations,
+            "fits": [fit.to_dict() for fit in self.fit(aggregated)],
+            "aggregated": aggregated,
+            "measurements": [measurement.to_dict() for measurement in measurements],
+        }
+
+    @classmethod
+    def plot(
+        cls,
+        aggregated: List[Dict[str, Any]],
+        fits: List[ScalingFit],
+        output_dir: str,
+        variable: str = "amount_edges",
+    ) -> List[str]:
+        """
+        Draws a log-log figure per metric with the median of every configuration and the fitted power law of every
+        network type
+        :return: Paths of the figures
+        """
+        figure_paths = []
+        for metric in cls.METRICS:
+            figure, axes = plt.subplots()
+            has_points = False
+
+            for network_type in dict.fromkeys(
+                row["network_type"] for row in aggregated
+            ):
+                points = sorted(
+                    (row[variable], row[metric])
+                    for row in aggregated
+                    if row["network_type"] == network_type
+                    and row[variable]
+                    and row[metric]
+                )
+                if not points:
+                    continue
+
+                has_points = True
+                variable_values, metric_values = zip(*points)
+                label = network_type
+                fit = next(
+                    (
+                        fit
+                        for fit in fits
+                        if fit.network_type == network_type
+                        and fit.metric == metric
+                        and fit.variable == variable
+                    ),
+                    None,
+                )
+                if fit:
+                    label = f"{network_type} (exponent {fit.exponent:.2f})"
+                (line,) = axes.plot(
+                    variable_values, metric_values, marker="o", label=label
+                )
+                if fit:
+                    axes.plot(
+                        variable_values,
+                        [fit.predict(value) for value in variable_values],
+                        linestyle="--",
+                        color=line.get_color(),
+                    )
+
+            if has_points:
+                axes.set_xscale("log")
+                axes.set_yscale("log")
+                axes.set_xlabel(variable)
+                axes.set_ylabel(metric)
+                axes.set_title(f"{metric} vs {variable}")
+                axes.legend()
+                figure_path = f"{output_dir}/{metric}.png"
+                figure.savefig(figure_path)
+                figure_paths.append(figure_path)
+            plt.close(figure)
+
+        return figure_paths
+
+    def save_report(
+        self, measurements: List[ScalingMeasurement], output_dir: str
+    ) -> Dict[str, Any]:
+        """
+        Writes the JSON report and the figures into output_dir
+        :return: Report
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        report = self.to_dict(measurements)
+        with open(f"{output_dir}/{self.REPORT_FILE_NAME}", "w") as f:
+            json.dump(report, f, indent=2)
+
+        self.plot(
+            report["aggregated"],
+            [ScalingFit(**fit) for fit in report["fits"]],
+            output_dir,
+        )
+
+        return report
+
+
+class NGSpiceNotFound(Exception):
+    pass
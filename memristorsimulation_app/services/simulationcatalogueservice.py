@@ -0,0 +1,200 @@
+import json
+import logging
+import os
+import time
+
+from dataclasses import asdict
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
+from django.db import DatabaseError, transaction
+from django.db.models import QuerySet
+from memristorsimulation_app.constants import (
+    MemristorModels,
+    NetworkType,
+    SimulationStatus,
+)
+from memristorsimulation_app.models import SimulationRun, SimulationRunFile
+from memristorsimulation_app.services.simulationservice import SimulationService
+from memristorsimulation_app.services.timemeasureservice import TimeMeasureService
+
+
+logger = logging.getLogger(__name__)
+
+
+class SimulationCatalogueService:
+    """
+    Records every simulation run in the database so past runs are found by inputs, model or network without walking
+    simulation_results. Run fields are built apart from saving them, so sweep workers build them in their own process
+    and the request process saves them.
+    """
+
+    @staticmethod
+    def get_network_size(
+        simulation_service: SimulationService,
+    ) -> Tuple[Optional[int], Optional[int]]:
+        """
+        :return: Amount of nodes and edges of the simulated circuit, the graph is only known once it was built
+        """
+        if (
+            simulation_service.simulation_inputs.network_type
+            == NetworkType.SINGLE_DEVICE
+        ):
+            return 2, 1
+
+        if simulation_service.graph is None:
+            return None, None
+
+        return (
+            simulation_service.graph.nx_graph.number_of_nodes(),
+            simulation_service.graph.nx_graph.number_of_edges(),
+        )
+
+    @staticmethod
+    def get_files(simulation_service: SimulationService) -> List[dict]:
+        files = []
+        for (
+            file_path,
+            archive_name,
+        ) in (
+            simulation_service.directories_management_service.get_all_simulation_files()
+        ):
+            if os.path.isfile(file_path):
+                files.append(
+                    {
+                        "archive_name": archive_name,
+                        "path": file_path,
+                        "size_bytes": os.path.getsize(file_path),
+                    }
+                )
+
+        return files
+
+    @staticmethod
+    def get_ngspice_statistics(simulation_service: SimulationService) -> dict:
+        """
+        :return: ngspice statistics of the last iteration that succeeded and reported them
+        """
+        for time_measure in reversed(simulation_service.time_measures):
+            if not time_measure.is_failed() and time_measure.ngspice_statistics:
+                return asdict(time_measure.ngspice_statistics)
+
+        return {}
+
+    @staticmethod
+    def get_max_rss_bytes(simulation_service: SimulationService) -> Optional[int]:
+        max_rss_bytes = [
+            time_measure.max_rss_bytes
+            for time_measure in simulation_service.time_measures
+            if time_measure.max_rss_bytes is not None
+        ]
+
+        return max(max_rss_bytes) if max_rss_bytes else None
+
+    @classmethod
+    def get_run_fields(
+        cls,
+        simulation_service: SimulationService,
+        status: SimulationStatus,
+        started_at: float,
+        error: str = None,
+    ) -> dict:
+        simulation_inputs = simulation_service.simulation_inputs
+        amount_nodes, amount_edges = cls.get_network_size(simulation_service)
+        time_measures = [
+            {k: v for k, v in asdict(time_measure).items() if k != "start_time"}
+            for time_measure in simulation_service.time_measures
+        ]
+        # Failed iterations are left out of the averages
+        average_time_measure = asdict(
+            TimeMeasureService.compute_time_average(simulation_service.time_measures)
+        )
+
+        return {
+            "input_hash": simulation_service.get_input_hash(),
+            "model": simulation_inputs.model.value,
+            "network_type": simulation_inputs.network_type.value,
+            "model_simulation_folder": simulation_inputs.export_parameters.model_simulation_folder.value,
+            "folder_name": simulation_inputs.export_parameters.folder_name,
+            "inputs": json.loads(simulation_service.get_canonical_request_parameters()),
+            "amount_nodes": amount_nodes,
+            "amount_edges": amount_edges,
+            "amount_iterations": simulation_inputs.amount_iterations or 1,
+            "status": status.value,
+            "error": error or "",
+            "python_execution_time": average_time_measure.get(
+                "average_python_execution_time"
+            ),
+            "linux_real_execution_time": average_time_measure.get(
+                "average_linux_real_execution_time"
+            ),
+            "linux_user_execution_time": average_time_measure.get(
+                "average_linux_user_execution_time"
+            ),
+            "linux_sys_execution_time": average_time_measure.get(
+                "average_linux_sys_execution_time"
+            ),
+            "time_measures": time_measures,
+            "max_rss_bytes": cls.get_max_rss_bytes(simulation_service),
+            "ngspice_statistics": cls.get_ngspice_statistics(simulation_service),
+            "started_at": datetime.fromtimestamp(started_at, tz=timezone.utc),
+            "finished_at": datetime.fromtimestamp(time.time(), tz=timezone.utc),
+            # Failed and cancelled runs may have no folder, listing their files would create it
+            "files": (
+                cls.get_files(simulation_service)
+                if status == SimulationStatus.FINISHED
+                else []
+            ),
+        }
+
+    @staticmethod
+    def save_run(run_fields: dict) -> Optional[SimulationRun]:
+        """
+        The catalogue never makes a simulation fail, database errors are only logged
+        """
+        run_fields = dict(run_fields)
+        files = run_fields.pop("files", [])
+
+        try:
+            with transaction.atomic():
+                run = SimulationRun.objects.create(**run_fields)
+                SimulationRunFile.objects.bulk_create(
+                    [SimulationRunFile(run=run, **file) for file in files]
+                )
+        except DatabaseError as e:
+            logger.warning(
+                f"Could not record run {run_fields.get('folder_name')} in the catalogue: {str(e)}"
+            )
+            return None
+
+        return run
+
+    @classmethod
+    def record_run(
+        cls,
+        simulation_service: SimulationService,
+        status: SimulationStatus,
+        started_at: float,
+        error: str = None,
+    ) -> Optional[SimulationRun]:
+        return cls.save_run(
+            cls.get_run_fields(simulation_service, status, started_at, error=error)
+        )
+
+    @staticmethod
+    def find_runs(
+        input_hash: str = None,
+        model: MemristorModels = None,
+        network_type: NetworkType = None,
+        status: SimulationStatus = None,
+    ) -> QuerySet:
+        runs = SimulationRun.objects.all()
+        if input_hash is not None:
+            runs = runs.filter(input_hash=input_hash)
+        if model is not None:
+            runs = runs.filter(model=model.value)
+        if network_type is not None:
+            runs = runs.filter(network_type=network_type.value)
+        if status is not None:
+            runs = runs.filter(status=status.value)
+
+        return runs
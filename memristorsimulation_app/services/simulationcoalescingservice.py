@@ -0,0 +1,225 @@
+import asyncio
+import fcntl
+import json
+import logging
+import os
+import time
+
+from io import BytesIO
+from typing import Optional
+from django.conf import settings
+from memristorsimulation_app.constants import SIMULATIONS_DIR, SimulationStatus
+from memristorsimulation_app.representations import SimulationArtifact
+from memristorsimulation_app.services.simulationprogressservice import (
+    SimulationCancelled,
+)
+from memristorsimulation_app.services.simulationservice import SimulationService
+
+
+logger = logging.getLogger(__name__)
+
+
+class SimulationCoalescingService:
+    """
+    Single-flight layer in front of SimulationService. The lock table is a folder with one lock file per canonical input
+    hash: the request that takes the exclusive flock runs the simulation, identical requests arriving meanwhile wait for
+    the lock and share the ZIP left by that run instead of starting another ngspice process. flock locks are released
+    by the kernel when a process dies, so a crashed worker never blocks its followers.
+    """
+
+    INFLIGHT_DIR = f"{SIMULATIONS_DIR}/.inflight"
+    LOCK_POLL_INTERVAL = 0.2
+
+    def __init__(self, simulation_service: SimulationService):
+        self.simulation_service = simulation_service
+        self.input_hash = simulation_service.get_input_hash()
+        self.lock_file_path = f"{self.INFLIGHT_DIR}/{self.input_hash}.lock"
+        self.result_file_path = f"{self.INFLIGHT_DIR}/{self.input_hash}.json"
+        self.artifact_file_path = f"{self.INFLIGHT_DIR}/{self.input_hash}.zip"
+
+    def simulate_and_create_results_zip(self) -> SimulationArtifact:
+        # Profiled runs are not shared, their profile belongs to the request that asked for it
+        if (
+            not settings.SIMULATION_COALESCING_ENABLED
+            or self.simulation_service.profiling_service
+        ):
+            return self._create_artifact(
+                self.simulation_service.simulate_and_create_results_zip()
+            )
+
+        arrival_time = time.time()
+        with self._open_lock_file() as lock_file:
+            if self._try_lock(lock_file):
+                return self._run_as_leader()
+
+            logger.info(f"Waiting for in-flight simulation {self.input_hash}")
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                artifact = self._get_shared_artifact(arrival_time)
+                if artifact is not None:
+                    return artifact
+
+                return self._run_as_leader()
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    async def simulate_and_create_results_zip_async(self) -> SimulationArtifact:
+        # cProfile only sees the thread it was enabled in, so profiled runs are simulated synchronously in one worker
+        # thread instead of spread over the event loop
+        if self.simulation_service.profiling_service:
+            return self._create_artifact(
+                await asyncio.to_thread(
+                    self.simulation_service.simulate_and_create_results_zip
+                )
+            )
+
+        if not settings.SIMULATION_COALESCING_ENABLED:
+            return self._create_artifact(
+                await self.simulation_service.simulate_and_create_results_zip_async()
+            )
+
+        arrival_time = time.time()
+        lock_file = await asyncio.to_thread(self._open_lock_file)
+        try:
+            # The lock is polled instead of awaited in a thread, so waiting followers do not exhaust the thread pool
+            # that the leader needs for its file I/O
+            leader = self._try_lock(lock_file)
+            if not leader:
+                logger.info(f"Waiting for in-flight simulation {self.input_hash}")
+                while not self._try_lock(lock_file):
+                    await asyncio.sleep(self.LOCK_POLL_INTERVAL)
+
+                artifact = await asyncio.to_thread(
+                    self._get_shared_artifact, arrival_time
+                )
+                if artifact is not None:
+                    return artifact
+
+            try:
+                zip_buffer = (
+                    await self.simulation_service.simulate_and_create_results_zip_async()
+                )
+            except Exception as e:
+                await asyncio.to_thread(self._write_failed_result, e)
+                raise
+
+            await asyncio.to_thread(self._write_shared_artifact, zip_buffer)
+
+            return self._create_artifact(zip_buffer)
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+            lock_file.close()
+
+    def _run_as_leader(self) -> SimulationArtifact:
+        try:
+            zip_buffer = self.simulation_service.simulate_and_create_results_zip()
+        except Exception as e:
+            self._write_failed_result(e)
+            raise
+
+        self._write_shared_artifact(zip_buffer)
+
+        return self._create_artifact(zip_buffer)
+
+    def _create_artifact(self, zip_buffer: BytesIO) -> SimulationArtifact:
+        return SimulationArtifact(
+            zip_buffer=zip_buffer,
+            folder_name=self.simulation_service.simulation_inputs.export_parameters.folder_name,
+        )
+
+    def _open_lock_file(self):
+        os.makedirs(self.INFLIGHT_DIR, exist_ok=True)
+
+        return open(self.lock_file_path, "a+")
+
+    @staticmethod
+    def _try_lock(lock_file) -> bool:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except BlockingIOError:
+            return False
+
+    def _get_shared_artifact(self, arrival_time: float) -> Optional[SimulationArtifact]:
+        """
+        Result left by the run the follower waited for. Results older than the follower arrival belong to a previous
+        run and are ignored, as well as cancelled runs, so the follower simulates on its own.
+        """
+        try:
+            with open(self.result_file_path, "r") as f:
+                result = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+        if result["finished_at"] < arrival_time:
+            return None
+
+        if result["status"] == SimulationStatus.FAILED.value:
+            raise CoalescedSimulationFailed(result["error"])
+
+        if result["status"] != SimulationStatus.FINISHED.value:
+            return None
+
+        with open(self.artifact_file_path, "rb") as f:
+            zip_buffer = BytesIO(f.read())
+
+        progress_service = self.simulation_service.progress_service
+        if progress_service:
+            progress_service.start(
+                self.simulation_service.simulation_inputs.simulation_parameters.tstop
+            )
+            progress_service.finish(SimulationStatus.FINISHED)
+
+        return SimulationArtifact(
+            zip_buffer=zip_buffer, folder_name=result["folder_name"], coalesced=True
+        )
+
+    def _write_shared_artifact(self, zip_buffer: BytesIO) -> None:
+        self._delete_expired_results()
+
+        temporary_artifact_file_path = f"{self.artifact_file_path}.{os.getpid()}.tmp"
+        with open(temporary_artifact_file_path, "wb") as f:
+            f.write(zip_buffer.getvalue())
+        os.replace(temporary_artifact_file_path, self.artifact_file_path)
+
+        self._write_result(SimulationStatus.FINISHED)
+
+    def _write_failed_result(self, exception: Exception) -> None:
+        status = (
+            SimulationStatus.CANCELLED
+            if isinstance(exception, SimulationCancelled)
+            else SimulationStatus.FAILED
+        )
+        self._write_result(status, error=str(exception))
+
+    def _write_result(self, status: SimulationStatus, error: str = None) -> None:
+        temporary_result_file_path = f"{self.result_file_path}.{os.getpid()}.tmp"
+        with open(temporary_result_file_path, "w") as f:
+            json.dump(
+                {
+                    "status": status.value,
+                    "folder_name": self.simulation_service.simulation_inputs.export_parameters.folder_name,
+                    "finished_at": time.time(),
+                    "error": error,
+                },
+                f,
+            )
+        os.replace(temporary_result_file_path, self.result_file_path)
+
+    def _delete_expired_results(self) -> None:
+        # Lock files are never deleted, a process could be waiting on them
+        expiration_time = (
+            time.time() - settings.SIMULATION_COALESCING_RESULT_TTL_SECONDS
+        )
+        with os.scandir(self.INFLIGHT_DIR) as entries:
+            for entry in entries:
+                if entry.name.endswith((".json", ".zip")):
+                    try:
+                        if entry.stat().st_mtime < expiration_time:
+                            os.remove(entry.path)
+                    except FileNotFoundError:
+                        pass
+
+
+class CoalescedSimulationFailed(Exception):
+    pass
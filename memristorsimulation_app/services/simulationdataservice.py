@@ -0,0 +1,351 @@
+import fcntl
+import json
+import os
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+
+from io import StringIO
+from typing import List, Optional
+from memristorsimulation_app.constants import (
+    SIMULATIONS_DIR,
+    ArtifactStage,
+    ModelsSimulationFolders,
+)
+from memristorsimulation_app.representations import SimulationSeries
+from memristorsimulation_app.services.directoriesmanagementservice import (
+    DirectoriesManagementService,
+)
+from memristorsimulation_app.services.metricsservice import MetricsService
+from memristorsimulation_app.services.retentionservice import RetentionService
+
+
+class SimulationDataService:
+    """
+    Reads stored simulation results. The first read of a results file converts it into a columnar index, one .npy
+    file per column under .columns/<results file>/, so later reads memory map the time column, find the requested
+    window with a binary search and only read the requested columns inside it.
+    """
+
+    TIME_COLUMN = "time"
+    DEFAULT_COLUMNS = ["vin", "i(v1)"]
+    RESULTS_FILE_SUFFIX = "_results.csv"
+    COLUMNS_DIR = ".columns"
+    INDEX_FILE_NAME = "index.json"
+
+    def __init__(
+        self,
+        model_simulation_folder: ModelsSimulationFolders,
+        folder_name: str,
+        file_name: str = None,
+    ):
+        if not folder_name or folder_name.startswith(".") or "/" in folder_name:
+            raise SimulationResultsNotFound(f"Invalid folder name {folder_name}")
+
+        self.model_simulation_folder = model_simulation_folder
+        self.folder_name = folder_name
+        self.file_name = file_name
+        self.simulation_folder_path = (
+            f"{SIMULATIONS_DIR}/{self.model_simulation_folder.value}/{self.folder_name}"
+        )
+
+        # Cold runs are compressed by the retention, they are extracted back on access
+        RetentionService.restore_folder(self.simulation_folder_path)
+        if not os.path.isdir(self.simulation_folder_path):
+            raise SimulationResultsNotFound(
+                f"Simulation folder {self.folder_name} does not exist in "
+                f"{self.model_simulation_folder.value}"
+            )
+        RetentionService.touch(self.simulation_folder_path)
+
+    def get_results_file_names(self) -> List[str]:
+        return sorted(
+            file_name
+            for file_name in os.listdir(self.simulation_folder_path)
+            if file_name.endswith(self.RESULTS_FILE_SUFFIX)
+        )
+
+    def get_results_file_path(self) -> str:
+        results_file_names = self.get_results_file_names()
+
+        if self.file_name is not None:
+            results_file_name = f"{self.file_name}{self.RESULTS_FILE_SUFFIX}"
+            if results_file_name not in results_file_names:
+                raise SimulationResultsNotFound(
+                    f"Results file {results_file_name} does not exist in {self.folder_name}"
+                )
+        elif len(results_file_names) == 1:
+            results_file_name = results_file_names[0]
+        elif not results_file_names:
+            raise SimulationResultsNotFound(
+                f"No results file found in {self.folder_name}"
+            )
+        else:
+            raise AmbiguousResultsFile(
+                f"More than one results file found in {self.folder_name}, a file name must be "
+                f"provided. Available files: {results_file_names}"
+            )
+
+        return f"{self.simulation_folder_path}/{results_file_name}"
+
+    @staticmethod
+    def load_dataframe(results_file_path: str) -> pd.DataFrame:
+        # Time measures are appended to the results file as '#' comment lines
+        return pd.read_csv(results_file_path, sep=r"\s+", comment="#")
+
+    def get_columnar_index_path(self, results_file_path: str) -> str:
+        results_file_name = os.path.basename(results_file_path).replace(".csv", "")
+
+        return f"{self.simulation_folder_path}/{self.COLUMNS_DIR}/{results_file_name}"
+
+    @staticmethod
+    def _get_source_signature(results_file_path: str) -> dict:
+        stat = os.stat(results_file_path)
+
+        return {"source_size": stat.st_size, "source_mtime_ns": stat.st_mtime_ns}
+
+    @staticmethod
+    def _is_index_of(index: dict, source_signature: dict) -> bool:
+        return all(index.get(k) == v for k, v in source_signature.items())
+
+    def _read_index_file(self, index_path: str) -> Optional[dict]:
+        try:
+            with open(f"{index_path}/{self.INDEX_FILE_NAME}", "r") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def build_columnar_index(self, results_file_path: str) -> dict:
+        index_path = self.get_columnar_index_path(results_file_path)
+        source_signature = self._get_source_signature(results_file_path)
+        dataframe = self.load_dataframe(results_file_path)
+        if self.TIME_COLUMN not in dataframe.columns:
+            raise InvalidSeriesColumn(
+                f"Results file {os.path.basename(results_file_path)} has no {self.TIME_COLUMN} column"
+            )
+        if not dataframe[self.TIME_COLUMN].is_monotonic_increasing:
+            dataframe = dataframe.sort_values(self.TIME_COLUMN, kind="stable")
+
+        # Column names like i(v1) are not valid file names, files are named after the column position
+        index = {
+            "columns": list(dataframe.columns),
+            "amount_points": len(dataframe),
+            **source_signature,
+        }
+        os.makedirs(os.path.dirname(index_path), exist_ok=True)
+        temporary_index_path = tempfile.mkdtemp(
+            prefix=f"{os.path.basename(index_path)}.",
+            suffix=".tmp",
+            dir=os.path.dirname(index_path),
+        )
+        for column_index, column in enumerate(dataframe.columns):
+            np.save(
+                f"{temporary_index_path}/{column_index}.npy",
+                dataframe[column].to_numpy(dtype=np.float64),
+            )
+        with open(f"{temporary_index_path}/{self.INDEX_FILE_NAME}", "w") as f:
+            json.dump(index, f)
+
+        # Reads of other workers may be memory mapping the current index, it is only replaced when it is stale and
+        # under a lock, so a concurrent build that finished first is kept and this one discarded
+        with open(f"{index_path}.lock", "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            current_index = self._read_index_file(index_path)
+            if current_index is not None and self._is_index_of(
+                current_index, source_signature
+            ):
+                shutil.rmtree(temporary_index_path, ignore_errors=True)
+                return current_index
+
+            shutil.rmtree(index_path, ignore_errors=True)
+            os.replace(temporary_index_path, index_path)
+
+        for file_name in [f"{i}.npy" for i in range(len(index["columns"]))] + [
+            self.INDEX_FILE_NAME
+        ]:
+            DirectoriesManagementService.register_artifact_in_folder(
+                self.simulation_folder_path,
+                f"{index_path}/{file_name}",
+                ArtifactStage.INDEX,
+            )
+
+        return index
+
+    def load_columnar_index(self, results_file_path: str) -> dict:
+        index = self._read_index_file(self.get_columnar_index_path(results_file_path))
+        if index is None or not self._is_index_of(
+            index, self._get_source_signature(results_file_path)
+        ):
+            return self._build_columnar_index_on_miss(results_file_path)
+
+        MetricsService.increment_counter(
+            "memristor_cache_requests_total", cache="columnar_index", result="hit"
+        )
+
+        return index
+
+    def _build_columnar_index_on_miss(self, results_file_path: str) -> dict:
+        MetricsService.increment_counter(
+            "memristor_cache_requests_total", cache="columnar_index", result="miss"
+        )
+
+        return self.build_columnar_index(results_file_path)
+
+    def load_column(self, results_file_path: str, index: dict, column: str):
+        """
+        :return: Memory mapped column, only the slices that are used are read from disk
+        """
+        return np.load(
+            f"{self.get_columnar_index_path(results_file_path)}/{index['columns'].index(column)}.npy",
+            mmap_mode="r",
+        )
+
+    @staticmethod
+    def compute_decimation_indexes(values: np.ndarray, max_points: int) -> np.ndarray:
+        """
+        Min-max decimation over equally sized buckets. For every bucket the first and last samples are kept together
+        with the minimum and maximum of every column, so peaks and switching events survive the decimation. Wide frames
+        keep more extrema than the budget allows, they are thinned evenly keeping the first and last samples.
+        :param values: 2D array with one column per series (time excluded) and one row per sample
+        :param max_points: Maximum amount of samples to keep
+        :return: Sorted array of sample indexes to keep
+        """
+        amount_points = values.shape[0]
+        if amount_points <= max_points:
+            return np.arange(amount_points)
+
+        points_per_bucket = 2 + 2 * values.shape[1]
+        amount_buckets = max(1, max_points // points_per_bucket)
+        bucket_size = int(np.ceil(amount_points / amount_buckets))
+        padding = amount_buckets * bucket_size - amount_points
+
+        buckets = np.pad(
+            np.nan_to_num(values), ((0, padding), (0, 0)), mode="edge"
+        ).reshape(amount_buckets, bucket_size, values.shape[1])
+        offsets = (np.arange(amount_buckets) * bucket_size)[:, None]
+        first_indexes = offsets[:, 0]
+        last_indexes = np.minimum(first_indexes + bucket_size - 1, amount_points - 1)
+
+        indexes = np.concatenate(
+            [
+                first_indexes,
+                last_indexes,
+                (np.argmin(buckets, axis=1) + offsets).ravel(),
+                (np.argmax(buckets, axis=1) + offsets).ravel(),
+            ]
+        )
+
+        indexes = np.unique(np.minimum(indexes, amount_points - 1))
+        if len(indexes) > max_points:
+            indexes = np.unique(
+                np.concatenate(
+                    [
+                        [0, amount_points - 1],
+                        indexes[
+                            np.linspace(0, len(indexes) - 1, max(max_points - 2, 0))
+                            .round()
+                            .astype(int)
+                        ],
+                    ]
+                )
+            )
+
+        return indexes
+
+    def get_series(
+        self,
+        columns: List[str] = None,
+        max_points: int = None,
+        t0: float = None,
+        t1: float = None,
+    ) -> SimulationSeries:
+        """
+        :param t0: Start of the time window (inclusive), the beginning of the simulation if None
+        :param t1: End of the time window (inclusive), the end of the simulation if None
+        :return: Series of the requested columns inside the window, total_points is the amount of points in the window
+        """
+        results_file_path = self.get_results_file_path()
+        index = self.load_columnar_index(results_file_path)
+
+        columns = [
+            column
+            for column in (columns or self.DEFAULT_COLUMNS)
+            if column != self.TIME_COLUMN
+        ]
+        missing_columns = [c for c in columns if c not in index["columns"]]
+        if missing_columns:
+            raise InvalidSeriesColumn(
+                f"Columns {missing_columns} not found. Available columns: {index['columns']}"
+            )
+
+        time = self.load_column(results_file_path, index, self.TIME_COLUMN)
+        start = 0 if t0 is None else int(np.searchsorted(time, t0, side="left"))
+        stop = len(time) if t1 is None else int(np.searchsorted(time, t1, side="right"))
+        stop = max(start, stop)
+
+        window_time = np.array(time[start:stop])
+        values = (
+            np.column_stack(
+                [
+                    self.load_column(results_file_path, index, column)[start:stop]
+                    for column in columns
+                ]
+            )
+            if columns
+            else np.empty((len(window_time), 0))
+        )
+        indexes = (
+            self.compute_decimation_indexes(values, max_points)
+            if max_points is not None
+            else np.arange(len(window_time))
+        )
+
+        series_values = {self.TIME_COLUMN: window_time[indexes]}
+        for column_index, column in enumerate(columns):
+            series_values[column] = values[indexes, column_index]
+
+        return SimulationSeries(
+            csv_file_name_no_extension=os.path.basename(results_file_path).replace(
+                ".csv", ""
+            ),
+            columns=[self.TIME_COLUMN] + columns,
+            values=series_values,
+            total_points=len(window_time),
+        )
+
+    @staticmethod
+    def series_to_binary(series: SimulationSeries) -> bytes:
+        """
+        Serializes the series as little-endian float32 values, one column after the other in series.columns order
+        :return: Raw bytes ready to be loaded into a Float32Array
+        """
+        return np.concatenate(
+            [series.values[column].astype("<f4") for column in series.columns]
+        ).tobytes()
+
+    @staticmethod
+    def series_to_csv(series: SimulationSeries) -> str:
+        csv_buffer = StringIO()
+        np.savetxt(
+            csv_buffer,
+            np.column_stack([series.values[column] for column in series.columns]),
+            delimiter=",",
+            header=",".join(series.columns),
+            comments="",
+            fmt="%.9e",
+        )
+
+        return csv_buffer.getvalue()
+
+
+class SimulationResultsNotFound(Exception):
+    pass
+
+
+class AmbiguousResultsFile(Exception):
+    pass
+
+
+class InvalidSeriesColumn(Exception):
+    pass
@@ -0,0 +1,184 @@
+import asyncio
+import json
+import os
+import re
+import time
+
+from typing import AsyncIterator, Iterator, Optional
+from memristorsimulation_app.constants import SIMULATIONS_DIR, SimulationStatus
+from memristorsimulation_app.representations import SimulationProgress
+
+
+class SimulationProgressService:
+    """
+    Keeps the progress of a running simulation in a small JSON file so it can be read from any worker process. The
+    cancellation flag lives in a separate file to avoid racing with the writer of the progress file.
+    """
+
+    PROGRESS_DIR = f"{SIMULATIONS_DIR}/.progress"
+    PROGRESS_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+    # ngspice prints the transient analysis time as "Reference value : 1.23450e-03" (carriage return terminated)
+    REFERENCE_VALUE_PATTERN = re.compile(
+        r"Reference value\s*:\s*([-+]?\d*\.?\d+(?:[eE][-+]?\d+)?)"
+    )
+    PERCENTAGE_PATTERN = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*%\s*$")
+    MIN_WRITE_INTERVAL = 0.25
+    POLL_INTERVAL = 0.5
+    WAIT_FOR_START_TIMEOUT = 30
+
+    def __init__(self, progress_id: str):
+        if not progress_id or not self.PROGRESS_ID_PATTERN.match(progress_id):
+            raise InvalidProgressId(f"Invalid progress id {progress_id}")
+
+        self.progress_id = progress_id
+        self.progress_file_path = f"{self.PROGRESS_DIR}/{progress_id}.json"
+        self.cancel_file_path = f"{self.PROGRESS_DIR}/{progress_id}.cancel"
+        self.progress = None
+        self._last_write_time = 0.0
+
+    def start(self, tstop: float) -> SimulationProgress:
+        # A cancellation requested while no run used the id (idle or already finished) must not kill this run
+        self._remove_cancel_file()
+        self.progress = SimulationProgress(
+            progress_id=self.progress_id, tstop=tstop, start_time=time.time()
+        )
+        self._write_progress()
+
+        return self.progress
+
+    def update(self, simulated_time: float = None, percentage: float = None) -> None:
+        if self.progress is None:
+            return
+
+        if simulated_time is not None and self.progress.tstop:
+            percentage = 100 * simulated_time / self.progress.tstop
+        elif percentage is not None and self.progress.tstop:
+            simulated_time = self.progress.tstop * percentage / 100
+        else:
+            return
+
+        self.progress.simulated_time = simulated_time
+        self.progress.percentage = min(max(percentage, 0.0), 100.0)
+        self._update_times()
+
+        if time.time() - self._last_write_time >= self.MIN_WRITE_INTERVAL:
+            self._write_progress()
+
+    def parse_output_line(self, line: str) -> None:
+        reference_value = self.REFERENCE_VALUE_PATTERN.search(line)
+        if reference_value:
+            self.update(simulated_time=float(reference_value.group(1)))
+            return
+
+        percentage = self.PERCENTAGE_PATTERN.match(line)
+        if percentage:
+            self.update(percentage=float(percentage.group(1)))
+
+    def finish(self, status: SimulationStatus, error: str = None) -> None:
+        if self.progress is None:
+            return
+
+        self.progress.status = status
+        self.progress.error = error
+        if status == SimulationStatus.FINISHED:
+            self.progress.simulated_time = self.progress.tstop
+            self.progress.percentage = 100.0
+        self._update_times()
+        self.progress.estimated_time_remaining = (
+            0.0 if status == SimulationStatus.FINISHED else None
+        )
+        self._write_progress()
+        self._remove_cancel_file()
+
+    def get_progress(self) -> Optional[SimulationProgress]:
+        try:
+            with open(self.progress_file_path, "r") as f:
+                return SimulationProgress.from_dict(json.load(f))
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def follow_progress(self) -> Iterator[SimulationProgress]:
+        """
+        Yields the stored progress every time it changes until the simulation reaches a final status. Gives up when no
+        progress is stored after WAIT_FOR_START_TIMEOUT seconds, clients may subscribe right before sending the run.
+        """
+        last_progress = None
+        wait_start_time = time.time()
+
+        while True:
+            progress = self.get_progress()
+
+            if progress is None:
+                if time.time() - wait_start_time > self.WAIT_FOR_START_TIMEOUT:
+                    return
+            elif progress != last_progress:
+                last_progress = progress
+                yield progress
+
+                if progress.status in SimulationStatus.get_final_statuses():
+                    return
+
+            time.sleep(self.POLL_INTERVAL)
+
+    async def follow_progress_async(self) -> AsyncIterator[SimulationProgress]:
+        """
+        follow_progress for the event loop, the progress file is read in a worker thread and the polling sleeps do not
+        hold a thread while the client stays subscribed
+        """
+        last_progress = None
+        wait_start_time = time.time()
+
+        while True:
+            progress = await asyncio.to_thread(self.get_progress)
+
+            if progress is None:
+                if time.time() - wait_start_time > self.WAIT_FOR_START_TIMEOUT:
+                    return
+            elif progress != last_progress:
+                last_progress = progress
+                yield progress
+
+                if progress.status in SimulationStatus.get_final_statuses():
+                    return
+
+            await asyncio.sleep(self.POLL_INTERVAL)
+
+    def request_cancel(self) -> None:
+        os.makedirs(self.PROGRESS_DIR, exist_ok=True)
+        with open(self.cancel_file_path, "w") as f:
+            f.write(str(time.time()))
+
+    def is_cancel_requested(self) -> bool:
+        return os.path.exists(self.cancel_file_path)
+
+    def _remove_cancel_file(self) -> None:
+        try:
+            os.remove(self.cancel_file_path)
+        except FileNotFoundError:
+            pass
+
+    def _update_times(self) -> None:
+        self.progress.elapsed_time = time.time() - self.progress.start_time
+        if 0 < self.progress.percentage < 100:
+            self.progress.estimated_time_remaining = (
+                self.progress.elapsed_time
+                * (100 - self.progress.percentage)
+                / self.progress.percentage
+            )
+
+    def _write_progress(self) -> None:
+        os.makedirs(self.PROGRESS_DIR, exist_ok=True)
+        # Written to a temporary file and renamed so readers never see a partially written progress
+        temporary_file_path = f"{self.progress_file_path}.{os.getpid()}.tmp"
+        with open(temporary_file_path, "w") as f:
+            json.dump(self.progress.to_dict(), f)
+        os.replace(temporary_file_path, self.progress_file_path)
+        self._last_write_time = time.time()
+
+
+class InvalidProgressId(Exception):
+    pass
+
+
+class SimulationCancelled(Exception):
+    pass
@@ -1,41 +1,80 @@
-import os
+import asyncio
+import hashlib
+import json
+import threading
 import zipfile
 
+from contextlib import nullcontext
+from enum import Enum
 from io import BytesIO
+from typing import List
+from django.conf import settings
 from memristorsimulation_app.constants import (
     MemristorModels,
     NetworkType,
+    PlotType,
+    SimulationStatus,
 )
 from memristorsimulation_app.representations import (
     ExportParameters,
+    Graph,
     InputParameters,
     NetworkParameters,
     SimulationInputs,
+    TimeMeasure,
     SimulationParameters,
     Subcircuit,
 )
+from memristorsimulation_app.services.archiveservice import ArchiveService
 from memristorsimulation_app.services.circuitfileservice import CircuitFileService
 from memristorsimulation_app.services.directoriesmanagementservice import (
     DirectoriesManagementService,
 )
 from memristorsimulation_app.services.networkservice import NetworkService
-from memristorsimulation_app.services.ngspiceservice import NGSpiceService
+from memristorsimulation_app.services.ngspiceservice import (
+    AsyncNGSpiceService,
+    NGSpiceService,
+)
+from memristorsimulation_app.services.profilingservice import ProfilingService
+from memristorsimulation_app.services.retentionservice import RetentionService
+from memristorsimulation_app.services.simulationprogressservice import (
+    SimulationCancelled,
+    SimulationProgressService,
+)
+from memristorsimulation_app.services.stagetimingservice import StageTimingService
 from memristorsimulation_app.services.subcircuitfileservice import SubcircuitFileService
 from memristorsimulation_app.simulation_templates.basetemplate import BaseTemplate
 
 
+# pyplot keeps global state, so plots of simulations running in different threads must not interleave
+PLOT_LOCK = threading.Lock()
+
+
 class SimulationService(BaseTemplate):
-    def __init__(self, request_parameters: dict):
+    def __init__(
+        self, request_parameters: dict, progress_id: str = None, profile: bool = False
+    ):
         self.request_parameters = request_parameters
-        self.simulation_inputs: SimulationInputs = self.parse_request_parameters(
-            request_parameters
-        )
+        self.stage_timing_service = StageTimingService()
+        with self.time_stage("parse"):
+            self.simulation_inputs: SimulationInputs = self.parse_request_parameters(
+                request_parameters
+            )
 
         self.directories_management_service = DirectoriesManagementService(
             self.simulation_inputs.model, self.simulation_inputs.export_parameters
         )
+        self.graph = None
+        self.time_measures: List[TimeMeasure] = []
+        self.progress_service = (
+            SimulationProgressService(progress_id) if progress_id else None
+        )
+        self.profiling_service = (
+            ProfilingService(self.directories_management_service) if profile else None
+        )
 
-    def parse_request_parameters(self, request_parameters: dict) -> SimulationInputs:
+    @staticmethod
+    def parse_request_parameters(request_parameters: dict) -> SimulationInputs:
         model = MemristorModels(request_parameters["model"])
         export_params = ExportParameters.from_dict(
             request_parameters["export_parameters"], model
@@ -43,7 +82,7 @@ class SimulationService(BaseTemplate):
         input_params = InputParameters.from_dict(request_parameters["input_parameters"])
         simulation_params = SimulationParameters.from_dict(
             request_parameters["simulation_parameters"]
-        )
+        ).resolve_auto_step(input_params.wave_form)
         subcircuit = Subcircuit.from_dict(request_parameters["subcircuit"])
         network_type = NetworkType(request_parameters["network_type"])
         network_params = NetworkParameters(**request_parameters["network_parameters"])
@@ -60,6 +99,25 @@ class SimulationService(BaseTemplate):
             plot_types=plot_types,
         )
 
+    def get_canonical_request_parameters(self) -> str:
+        """
+        Request parameters as JSON with sorted keys and enums as their values, so key order and enum representation
+        do not change it
+        """
+        return json.dumps(
+            self.request_parameters,
+            sort_keys=True,
+            separators=(",", ":"),
+            default=lambda value: (
+                value.value if isinstance(value, Enum) else str(value)
+            ),
+        )
+
+    def get_input_hash(self) -> str:
+        return hashlib.sha256(
+            self.get_canonical_request_parameters().encode()
+        ).hexdigest()
+
     def create_subcircuit_file_service_from_request(self) -> SubcircuitFileService:
         # Sources, components, dependencies and control_cmd are created by default due to its complexity and impact in the subcircuit
         default_sources = self.create_default_behavioural_source()
@@ -90,7 +148,19 @@ class SimulationService(BaseTemplate):
                 self.simulation_inputs.network_type,
                 self.simulation_inputs.network_parameters,
             )
-            ignore_states = network_service.should_ignore_states()
+            # States are always exported when the grid animation needs them, regardless of the network size
+            ignore_states = (
+                network_service.should_ignore_states()
+                and PlotType.GRID_STATES_ANIMATED
+                not in (self.simulation_inputs.plot_types or [])
+            )
+            self.graph = Graph(
+                network_service.network,
+                network_service.vin_minus,
+                network_service.vin_plus,
+                seed=self.simulation_inputs.network_parameters.seed,
+                state_edges=network_service.get_state_edges(),
+            )
         device_params = self.create_device_parameters(
             self.simulation_inputs.network_type, network_service=network_service
         )
@@ -105,43 +175,143 @@ class SimulationService(BaseTemplate):
         )
 
     def _build_from_request_and_write(self) -> CircuitFileService:
-        subcircuit_file_service = self.create_subcircuit_file_service_from_request()
-        circuit_file_service = self.create_circuit_file_service_from_request(
-            subcircuit_file_service
+        self.directories_management_service.create_workspace(
+            scratch_dir=settings.SIMULATION_SCRATCH_DIR
         )
-        subcircuit_file_service.write_subcircuit_file()
-        circuit_file_service.write_circuit_file()
+        with self.time_stage("build"):
+            subcircuit_file_service = self.create_subcircuit_file_service_from_request()
+            circuit_file_service = self.create_circuit_file_service_from_request(
+                subcircuit_file_service
+            )
+        with self.time_stage("subcircuit_write"):
+            subcircuit_file_service.write_subcircuit_file()
+        with self.time_stage("circuit_write"):
+            circuit_file_service.write_circuit_file()
 
         return circuit_file_service
 
     def simulate(self) -> None:
         circuit_file_service = self._build_from_request_and_write()
-        ngspice_service = NGSpiceService(self.directories_management_service)
-        ngspice_service.run_single_circuit_simulation(
-            self.simulation_inputs.amount_iterations
-        )
-        self.plot(
-            export_parameters=self.simulation_inputs.export_parameters,
-            model_parameters=circuit_file_service.subcircuit_file_service.subcircuit.model_parameters,
-            input_parameters=circuit_file_service.input_parameters,
-            plot_types=self.simulation_inputs.plot_types,
+        if self.progress_service:
+            self.progress_service.start(
+                self.simulation_inputs.simulation_parameters.tstop
+            )
+
+        try:
+            ngspice_service = NGSpiceService(
+                self.directories_management_service,
+                progress_service=self.progress_service,
+            )
+            try:
+                with self.time_stage("spice"):
+                    self.time_measures = ngspice_service.run_single_circuit_simulation(
+                        self.simulation_inputs.amount_iterations
+                    )
+            finally:
+                # Failed runs are promoted too, so their logs are kept and the scratch root does not fill up
+                self.directories_management_service.promote_workspace()
+            self._plot_results(circuit_file_service)
+        except SimulationCancelled:
+            self._finish_progress(SimulationStatus.CANCELLED)
+            raise
+        except Exception as e:
+            self._finish_progress(SimulationStatus.FAILED, error=str(e))
+            raise
+
+        self._finish_progress(SimulationStatus.FINISHED)
+
+    async def simulate_async(self) -> None:
+        """
+        Same as simulate, awaiting ngspice through asyncio subprocesses while file writing and plotting run in
+        worker threads
+        """
+        circuit_file_service = await asyncio.to_thread(
+            self._build_from_request_and_write
         )
+        if self.progress_service:
+            await asyncio.to_thread(
+                self.progress_service.start,
+                self.simulation_inputs.simulation_parameters.tstop,
+            )
+
+        try:
+            ngspice_service = await asyncio.to_thread(
+                AsyncNGSpiceService,
+                self.directories_management_service,
+                progress_service=self.progress_service,
+            )
+            try:
+                with self.time_stage("spice"):
+                    self.time_measures = (
+                        await ngspice_service.run_single_circuit_simulation(
+                            self.simulation_inputs.amount_iterations
+                        )
+                    )
+            finally:
+                await asyncio.to_thread(
+                    self.directories_management_service.promote_workspace
+                )
+            await asyncio.to_thread(self._plot_results, circuit_file_service)
+        except SimulationCancelled:
+            await asyncio.to_thread(self._finish_progress, SimulationStatus.CANCELLED)
+            raise
+        except Exception as e:
+            await asyncio.to_thread(
+                self._finish_progress, SimulationStatus.FAILED, error=str(e)
+            )
+            raise
+
+        await asyncio.to_thread(self._finish_progress, SimulationStatus.FINISHED)
+
+    def _plot_results(self, circuit_file_service: CircuitFileService) -> None:
+        with PLOT_LOCK:
+            self.plot(
+                export_parameters=self.simulation_inputs.export_parameters,
+                model_parameters=circuit_file_service.subcircuit_file_service.subcircuit.model_parameters,
+                input_parameters=circuit_file_service.input_parameters,
+                plot_types=self.simulation_inputs.plot_types,
+                graph=self.graph,
+                stage_timing_service=self.stage_timing_service,
+            )
+
+    def _finish_progress(self, status: SimulationStatus, error: str = None) -> None:
+        if self.progress_service:
+            self.progress_service.finish(status, error=error)
 
     def create_results_zip(self) -> BytesIO:
         zip_buffer = BytesIO()
 
-        file_paths = self.directories_management_service.get_all_simulation_files()
+        with self.time_stage("zip"):
+            file_paths = self.directories_management_service.get_all_simulation_files()
 
-        with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as zip_file:
-            for file_path, archive_name in file_paths:
-                if os.path.exists(file_path):
-                    zip_file.write(file_path, archive_name)
+            with zipfile.ZipFile(zip_buffer, "w") as zip_file:
+                ArchiveService().write_files(zip_file, file_paths)
 
         zip_buffer.seek(0)
+        RetentionService.touch(
+            self.directories_management_service.get_simulation_folder_path()
+        )
 
         return zip_buffer
 
     def simulate_and_create_results_zip(self) -> BytesIO:
-        self.simulate()
+        # The profile is written before zipping, so it is returned with the results
+        with (
+            self.profiling_service.profile()
+            if self.profiling_service
+            else nullcontext()
+        ):
+            self.simulate()
+        zip_buffer = self.create_results_zip()
+        self.write_stage_timings(self.directories_management_service)
+
+        return zip_buffer
+
+    async def simulate_and_create_results_zip_async(self) -> BytesIO:
+        await self.simulate_async()
+        zip_buffer = await asyncio.to_thread(self.create_results_zip)
+        await asyncio.to_thread(
+            self.write_stage_timings, self.directories_management_service
+        )
 
-        return self.create_results_zip()
+        return zip_buffer
@@ -0,0 +1,100 @@
+import json
+import os
+import threading
+import time
+
+from contextlib import contextmanager
+from dataclasses import asdict
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List
+from memristorsimulation_app.representations import TimingSpan
+
+
+class StageTimingService:
+    """
+    Wall clock spans of the named stages of a simulation: parsing, file writing, ngspice, CSV loading, every plot type
+    and zipping. Spans of one run are returned in a Server-Timing header and written to a JSON log in the run folder,
+    TimeMeasureService only times the ngspice process itself.
+    """
+
+    LOG_FILE_NAME = ".timings.json"
+
+    def __init__(self):
+        self.started_at = time.time()
+        self.origin = time.perf_counter()
+        self.spans: List[TimingSpan] = []
+        # Stages of the async simulation run in worker threads
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        """
+        Times the block as a span of the given stage, failed stages are recorded too
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            with self._lock:
+                self.spans.append(
+                    TimingSpan(
+                        name=name,
+                        start_ms=(start - self.origin) * 1000,
+                        duration_ms=(end - start) * 1000,
+                    )
+                )
+
+    def get_stage_durations(self) -> Dict[str, float]:
+        """
+        :return: Total ms of every stage in the order they first ran, stages repeated per results file are summed
+        """
+        stage_durations = {}
+        with self._lock:
+            for timing_span in self.spans:
+                stage_durations[timing_span.name] = (
+                    stage_durations.get(timing_span.name, 0) + timing_span.duration_ms
+                )
+
+        return stage_durations
+
+    def get_total_time(self) -> float:
+        with self._lock:
+            return max(
+                (timing_span.get_end_ms() for timing_span in self.spans), default=0.0
+            )
+
+    def get_server_timing_header(self) -> str:
+        return ", ".join(
+            f"{name};dur={duration:.1f}"
+            for name, duration in self.get_stage_durations().items()
+        )
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            spans = [asdict(timing_span) for timing_span in self.spans]
+
+        return {
+            "started_at": datetime.fromtimestamp(
+                self.started_at, tz=timezone.utc
+            ).isoformat(),
+            "total_ms": self.get_total_time(),
+            "stages_ms": self.get_stage_durations(),
+            "spans": spans,
+        }
+
+    def write_log(self, simulation_folder_path: str) -> str:
+        """
+        Writes the spans of the run to LOG_FILE_NAME in its folder. The file is hidden, so it is kept with the run but
+        not added to the results ZIP.
+
+        :return: Path of the log
+        """
+        log_file_path = f"{simulation_folder_path}/{self.LOG_FILE_NAME}"
+        tmp_file_path = f"{log_file_path}.{os.getpid()}.tmp"
+
+        with open(tmp_file_path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        os.replace(tmp_file_path, log_file_path)
+
+        return log_file_path
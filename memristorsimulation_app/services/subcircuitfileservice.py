@@ -1,5 +1,5 @@
 from typing import TextIO, List
-from memristorsimulation_app.constants import MemristorModels
+from memristorsimulation_app.constants import ArtifactStage, MemristorModels
 from memristorsimulation_app.representations import (
     Subcircuit,
     ModelDependence,
@@ -70,8 +70,6 @@ class SubcircuitFileService:
         Writes the .sub subcircuit file to include on circuit's file. The file is saved in models/
         :return: None
         """
-        self.directories_management_service.get_export_simulation_file_path()
-
         with open(self.model_file_path, "w+") as f:
             f.write(f"* MEMRISTOR SUBCIRCUIT - MODEL {self.model.value}")
             self._write_subcircuit_parameters(f)
@@ -81,3 +79,7 @@ class SubcircuitFileService:
             self._write_components(f)
             self._write_control_commands(f)
             f.write("\n.ends")
+
+        self.directories_management_service.register_artifact(
+            self.model_file_path, ArtifactStage.SUBCIRCUIT
+        )
@@ -0,0 +1,235 @@
+import copy
+import csv
+import itertools
+import logging
+import multiprocessing
+import time
+import zipfile
+import django
+import numpy as np
+
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO, StringIO
+from typing import Any, Dict, List
+from django.conf import settings
+from memristorsimulation_app.constants import (
+    InvalidSweep,
+    SimulationStatus,
+    SweepMode,
+)
+from memristorsimulation_app.representations import (
+    SimulationInputs,
+    SweepPointResult,
+)
+from memristorsimulation_app.serializers.simulation import SimulationInputsSerializer
+from memristorsimulation_app.services.archiveservice import ArchiveService
+from memristorsimulation_app.services.simulationcatalogueservice import (
+    SimulationCatalogueService,
+)
+from memristorsimulation_app.services.simulationservice import SimulationService
+
+
+logger = logging.getLogger(__name__)
+
+
+def run_sweep_point(
+    index: int, parameter_values: Dict[str, Any], request_parameters: dict
+) -> SweepPointResult:
+    result = SweepPointResult(index=index, parameter_values=parameter_values)
+    started_at = time.time()
+    simulation_service = None
+
+    try:
+        simulation_service = SimulationService(request_parameters=request_parameters)
+        result.folder_name = (
+            simulation_service.simulation_inputs.export_parameters.folder_name
+        )
+        simulation_service.simulate()
+        simulation_service.write_stage_timings(
+            simulation_service.directories_management_service
+        )
+        result.file_paths = (
+            simulation_service.directories_management_service.get_all_simulation_files()
+        )
+    except Exception as e:
+        logger.error(f"Sweep point {index} failed: {str(e)}")
+        result.error = f"{type(e).__name__}: {str(e)}"
+
+    # Workers have no database connection, the catalogue entry is saved by the process that started the sweep
+    if simulation_service is not None:
+        result.run_fields = SimulationCatalogueService.get_run_fields(
+            simulation_service,
+            SimulationStatus.FAILED if result.error else SimulationStatus.FINISHED,
+            started_at,
+            error=result.error,
+        )
+
+    return result
+
+
+class SweepSimulationService:
+    MAX_AMOUNT_POINTS = 256
+    INDEX_FILE_NAME = "sweep_index.csv"
+
+    def __init__(
+        self,
+        base_request_parameters: dict,
+        parameters: List[dict],
+        mode: SweepMode = SweepMode.CARTESIAN,
+        max_workers: int = None,
+    ):
+        self.base_request_parameters = base_request_parameters
+        self.parameters = parameters
+        self.mode = mode
+        self.max_workers = min(
+            max_workers or settings.SIMULATION_SWEEP_MAX_WORKERS,
+            settings.SIMULATION_SWEEP_MAX_WORKERS,
+        )
+        self.sweep_points = self.generate_sweep_points()
+        self.request_parameters = self.build_request_parameters()
+
+    @staticmethod
+    def get_parameter_values(parameter: dict) -> List[Any]:
+        if parameter.get("values") is not None:
+            return list(parameter["values"])
+
+        return np.linspace(
+            parameter["start"], parameter["stop"], parameter["num"]
+        ).tolist()
+
+    def generate_sweep_points(self) -> List[Dict[str, Any]]:
+        paths = [parameter["path"] for parameter in self.parameters]
+        if len(set(paths)) != len(paths):
+            raise InvalidSweep(f"Sweep parameter paths must be unique: {paths}")
+
+        values = [self.get_parameter_values(parameter) for parameter in self.parameters]
+
+        if self.mode == SweepMode.CARTESIAN:
+            combinations = itertools.product(*values)
+        elif self.mode == SweepMode.ZIP:
+            if len({len(parameter_values) for parameter_values in values}) != 1:
+                raise InvalidSweep(
+                    f"All sweep parameters must have the same amount of values in {SweepMode.ZIP.value} mode"
+                )
+            combinations = zip(*values)
+        else:
+            raise InvalidSweep(f"Sweep mode {self.mode} not implemented")
+
+        sweep_points = [
+            dict(zip(paths, combination))
+            for combination in itertools.islice(
+                combinations, self.MAX_AMOUNT_POINTS + 1
+            )
+        ]
+        if len(sweep_points) > self.MAX_AMOUNT_POINTS:
+            raise InvalidSweep(
+                f"Sweep exceeds the maximum amount of points ({self.MAX_AMOUNT_POINTS})"
+            )
+
+        return sweep_points
+
+    @staticmethod
+    def set_parameter(request_parameters: dict, path: str, value: Any) -> None:
+        *parents, key = path.split(".")
+        node = request_parameters
+        for parent in parents:
+            if not isinstance(node.get(parent), dict):
+                raise InvalidSweep(f"Invalid sweep parameter path {path}")
+            node = node[parent]
+
+        node[key] = value
+
+    def build_request_parameters(self) -> List[dict]:
+        request_parameters, errors = [], {}
+
+        for index, sweep_point in enumerate(self.sweep_points):
+            point_request_parameters = copy.deepcopy(self.base_request_parameters)
+            for path, value in sweep_point.items():
+                self.set_parameter(point_request_parameters, path, value)
+
+            serializer = SimulationInputsSerializer(data=point_request_parameters)
+            if not serializer.is_valid():
+                errors[f"point_{index}"] = serializer.errors
+                continue
+
+            validated_data = serializer.validated_data
+            # Points are simulated concurrently, so each one writes into its own folder
+            validated_data["export_parameters"][
+                "folder_name"
+            ] = f"{validated_data['export_parameters']['folder_name']}_point_{index}"
+            request_parameters.append(validated_data)
+
+        if errors:
+            raise InvalidSweep(errors)
+
+        return request_parameters
+
+    def get_simulations_inputs(self) -> List[SimulationInputs]:
+        """
+        :return: Inputs of every point, parsed without creating their folders, to price the sweep before running it
+        """
+        return [
+            SimulationService.parse_request_parameters(point_request_parameters)
+            for point_request_parameters in self.request_parameters
+        ]
+
+    def simulate(self) -> List[SweepPointResult]:
+        max_workers = max(1, min(self.max_workers, len(self.request_parameters)))
+        # Spawned workers keep matplotlib global state isolated and are safe to start from threaded servers. They set
+        # up Django before unpickling the first point, run_sweep_point imports the catalogue models
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=django.setup,
+        ) as executor:
+            return list(
+                executor.map(
+                    run_sweep_point,
+                    range(len(self.request_parameters)),
+                    self.sweep_points,
+                    self.request_parameters,
+                )
+            )
+
+    def create_index(self, results: List[SweepPointResult]) -> str:
+        paths = [parameter["path"] for parameter in self.parameters]
+        index = StringIO()
+        writer = csv.writer(index)
+        writer.writerow(["point"] + paths + ["folder_name", "status", "error"])
+
+        for result in results:
+            writer.writerow(
+                [result.index]
+                + [result.parameter_values[path] for path in paths]
+                + [
+                    result.folder_name,
+                    "FAILED" if result.error else "OK",
+                    result.error or "",
+                ]
+            )
+
+        return index.getvalue()
+
+    def create_results_zip(self, results: List[SweepPointResult]) -> BytesIO:
+        zip_buffer = BytesIO()
+
+        archive_service = ArchiveService()
+        with zipfile.ZipFile(zip_buffer, "w") as zip_file:
+            archive_service.writestr(
+                zip_file, self.INDEX_FILE_NAME, self.create_index(results)
+            )
+            archive_service.write_files(
+                zip_file,
+                [
+                    (file_path, f"{result.folder_name}/{archive_name}")
+                    for result in results
+                    for file_path, archive_name in result.file_paths
+                ],
+            )
+
+        zip_buffer.seek(0)
+
+        return zip_buffer
+
+    def simulate_and_create_results_zip(self) -> BytesIO:
+        return self.create_results_zip(self.simulate())
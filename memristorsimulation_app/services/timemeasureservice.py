@@ -1,16 +1,35 @@
+import asyncio
+import json
 import logging
+import numpy as np
 import os
+import re
+import resource
+import select
+import shlex
+import signal
 import subprocess
 import sys
 import time
 
-from dataclasses import asdict
-from typing import List
-from memristorsimulation_app.constants import TimeMeasures
-from memristorsimulation_app.representations import TimeMeasure, AverageTimeMeasure
+from dataclasses import asdict, fields
+from typing import List, Optional, Sequence, Tuple
+from django.conf import settings
+from memristorsimulation_app.constants import ArtifactStage, TimeMeasures
+from memristorsimulation_app.representations import (
+    AverageTimeMeasure,
+    NGSpiceStatistics,
+    TimeMeasure,
+    TimingReport,
+    TimingStatistics,
+)
 from memristorsimulation_app.services.directoriesmanagementservice import (
     DirectoriesManagementService,
 )
+from memristorsimulation_app.services.simulationprogressservice import (
+    SimulationCancelled,
+    SimulationProgressService,
+)
 
 
 logging.basicConfig(level=logging.INFO)
@@ -18,8 +37,71 @@ logger = logging.getLogger(__name__)
 
 
 class TimeMeasureService:
-    def __init__(self, directories_management_service: DirectoriesManagementService):
+    OUTPUT_READ_TIMEOUT = 0.5
+    OUTPUT_CHUNK_SIZE = 4096
+    OUTPUT_LINE_SEPARATOR = re.compile(rb"[\r\n]")
+
+    TIME_MEASURE_FIELDS = [
+        "python_execution_time",
+        "linux_real_execution_time",
+        "linux_user_execution_time",
+        "linux_sys_execution_time",
+    ]
+    RESOURCE_USAGE_FIELDS = [
+        "max_rss_bytes",
+        "minor_page_faults",
+        "major_page_faults",
+        "voluntary_context_switches",
+        "involuntary_context_switches",
+        "block_input_operations",
+        "block_output_operations",
+    ]
+    # Time measure whose confidence interval decides when repeated simulations stop
+    ADAPTIVE_STOP_TIME_MEASURE = "linux_real_execution_time"
+    BOOTSTRAP_RESAMPLES = 1000
+    BOOTSTRAP_SEED = 0
+    # Modified z-score (Iglewicz and Hoaglin) above which an iteration is flagged as outlier
+    OUTLIER_THRESHOLD = 3.5
+    MAD_NORMAL_CONSISTENCY = 0.6745
+
+    # "<name> [(seconds)] = <value> [unit]" lines printed by ngspice "rusage all"
+    NGSPICE_STATISTICS_LINE = re.compile(
+        r"^\s*(?P<name>[A-Za-z][\w \-/]*?)\s*(?:\([a-z]+\))?\s*=\s*"
+        r"(?P<value>[-+]?\d+(?:\.\d*)?(?:[eE][-+]?\d+)?)\s*(?P<unit>[A-Za-z]*)"
+    )
+    NGSPICE_STATISTICS_FIELDS = {
+        "total iterations": "total_iterations",
+        "transient iterations": "transient_iterations",
+        "circuit equations": "circuit_equations",
+        "transient timepoints": "transient_timepoints",
+        "accepted timepoints": "accepted_timepoints",
+        "rejected timepoints": "rejected_timepoints",
+        "total analysis time": "total_analysis_time",
+        "total elapsed time": "total_elapsed_time",
+        "transient time": "transient_time",
+        "load time": "load_time",
+        "matrix reordering time": "reordering_time",
+        "l-u decomposition time": "decomposition_time",
+        "matrix solve time": "solve_time",
+        "maximum ngspice program size": "max_program_size",
+    }
+    SIZE_UNITS = {
+        "bytes": 1,
+        "kb": 1024,
+        "kib": 1024,
+        "mb": 1024**2,
+        "mib": 1024**2,
+        "gb": 1024**3,
+        "gib": 1024**3,
+    }
+
+    def __init__(
+        self,
+        directories_management_service: DirectoriesManagementService,
+        progress_service: SimulationProgressService = None,
+    ):
         self.directories_management_service = directories_management_service
+        self.progress_service = progress_service
 
         self.command_line = None
         self.circuit_file_path = (
@@ -31,65 +113,152 @@ class TimeMeasureService:
         self.simulation_log_path = (
             self.directories_management_service.get_simulation_log_file_path()
         )
-        self.execute_command = ""
+        self.execute_command: List[str] = []
 
     def execute_with_time_measure(
-        self, enable_print_time_measure: bool = True
+        self, enable_print_time_measure: bool = True, warmup: bool = False
     ) -> TimeMeasure:
+        """
+        :param warmup: Warmup runs are not written to the simulation log, so they never reach the statistics
+        """
         time_measure = TimeMeasure(start_time=self.init_python_execution_time_measure())
 
         try:
-            if self._is_os_linux():
-                self.execute_command = f"time ngspice {self.circuit_file_path} 2>&1"
+            self._prepare_execute_command()
+
+            process_start_time = time.perf_counter()
+            process = self._start_process()
+            simulation_log = self.read_process_output(process)
+            rusage = self.wait_process(process)
+            real_time = (time.perf_counter() - process_start_time) * 1000
+            self._log_process_return_code(process.returncode)
+            time_measure.return_code = process.returncode
+            time_measure.ngspice_statistics = self.parse_ngspice_statistics(
+                simulation_log.decode(errors="replace")
+            )
 
-                if (
-                    not self.circuit_file_path
-                    or not self.simulation_result_file_path
-                    or not self.simulation_log_path
-                ):
-                    raise FilePathNotFoundError(
-                        f"File paths not provided for TimeMeasureService. \nCircuit file path: {self.circuit_file_path}\n"
-                        f"Simulation result file path: {self.simulation_result_file_path}\n"
-                        f"Simulation log path: {self.simulation_log_path}"
-                    )
+            time_measure = self.write_python_time_measure_into_csv(time_measure)
+            self.set_resource_usage(time_measure, real_time, rusage)
+            self.write_linux_time_measure_into_csv(time_measure)
 
-                logger.info(f"Executing command: {self.execute_command}")
+        except Exception as e:
+            logger.error(f"Error during time measurement execution: {str(e)}")
+            raise e
 
-                process = subprocess.Popen(
-                    ["bash", "-c", self.execute_command, "_"],
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    cwd=os.path.dirname(self.circuit_file_path),
-                    env=os.environ.copy(),
-                )
+        if not warmup:
+            self.write_simulation_log(
+                simulation_log=simulation_log.decode(), time_measure=time_measure
+            )
 
-                simulation_log, linux_time_output = process.communicate()
+        if enable_print_time_measure:
+            self.print_time_measure(time_measure)
 
-                if process.returncode != 0:
-                    logger.error(
-                        f"Simulation process failed with return code: {process.returncode}"
-                    )
-                else:
-                    logger.info(f"Simulation process ended succesfully")
+        return time_measure
 
-                time_measure = self.write_python_time_measure_into_csv(time_measure)
-                self.write_linux_time_measure_into_csv(linux_time_output, time_measure)
+    def _prepare_execute_command(self) -> None:
+        if not self._is_os_linux():
+            raise OperatingSystemError()
+
+        self.execute_command = [settings.NGSPICE_EXECUTABLE, self.circuit_file_path]
+
+        if (
+            not self.circuit_file_path
+            or not self.simulation_result_file_path
+            or not self.simulation_log_path
+        ):
+            raise FilePathNotFoundError(
+                f"File paths not provided for TimeMeasureService. \nCircuit file path: {self.circuit_file_path}\n"
+                f"Simulation result file path: {self.simulation_result_file_path}\n"
+                f"Simulation log path: {self.simulation_log_path}"
+            )
 
-            else:
-                raise OperatingSystemError()
+        logger.info(f"Executing command: {shlex.join(self.execute_command)}")
+
+    def _start_process(self) -> subprocess.Popen:
+        """
+        ngspice is started directly, with no shell in between, so os.wait4 returns its own resource usage. Its stderr is
+        merged into stdout, which is the simulation log
+        """
+        return subprocess.Popen(
+            self.execute_command,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            cwd=os.path.dirname(self.circuit_file_path),
+            env=os.environ.copy(),
+            start_new_session=True,
+        )
 
-        except Exception as e:
-            logger.error(f"Error during time measurement execution: {str(e)}")
-            raise e
+    @staticmethod
+    def wait_process(process: subprocess.Popen) -> resource.struct_rusage:
+        """
+        Reaps the process with os.wait4 instead of Popen.wait, which discards the resource usage of the child
+        :return: Resource usage of the process
+        """
+        _, status, rusage = os.wait4(process.pid, 0)
+        process.returncode = os.waitstatus_to_exitcode(status)
 
-        self.write_simulation_log(
-            simulation_log=simulation_log.decode(), time_measure=time_measure
+        return rusage
+
+    @staticmethod
+    def _log_process_return_code(returncode: int) -> None:
+        if returncode != 0:
+            logger.error(f"Simulation process failed with return code: {returncode}")
+        else:
+            logger.info(f"Simulation process ended succesfully")
+
+    def _parse_output_chunk(self, pending_line: bytes, chunk: bytes) -> bytes:
+        """
+        Feeds the complete lines of the chunk to the progress service
+        :return: Trailing incomplete line, to be prepended to the next chunk
+        """
+        *lines, pending_line = self.OUTPUT_LINE_SEPARATOR.split(pending_line + chunk)
+        if self.progress_service:
+            for line in lines:
+                self.progress_service.parse_output_line(line.decode(errors="replace"))
+
+        return pending_line
+
+    def _raise_simulation_cancelled(self) -> None:
+        raise SimulationCancelled(
+            f"Simulation {self.progress_service.progress_id} cancelled"
         )
 
-        if enable_print_time_measure:
-            self.print_time_measure(time_measure)
+    def read_process_output(self, process: subprocess.Popen) -> bytes:
+        """
+        Reads the process stdout while it runs instead of waiting for it to exit, so the ngspice progress lines can be
+        parsed and a cancellation requested through the progress service can stop the process.
+        :return: Whole stdout of the process
+        """
+        output = bytearray()
+        pending_line = b""
+        stdout_fd = process.stdout.fileno()
 
-        return time_measure
+        while True:
+            if self.progress_service and self.progress_service.is_cancel_requested():
+                self._kill_process(process)
+                self._raise_simulation_cancelled()
+
+            ready, _, _ = select.select([stdout_fd], [], [], self.OUTPUT_READ_TIMEOUT)
+            if not ready:
+                continue
+
+            chunk = os.read(stdout_fd, self.OUTPUT_CHUNK_SIZE)
+            if not chunk:
+                break
+
+            output.extend(chunk)
+            pending_line = self._parse_output_chunk(pending_line, chunk)
+
+        return bytes(output)
+
+    @staticmethod
+    def _kill_process(process: subprocess.Popen) -> None:
+        # ngspice leads its own session, killing the whole process group also stops anything it started
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        process.wait()
 
     @staticmethod
     def init_python_execution_time_measure() -> float:
@@ -100,69 +269,228 @@ class TimeMeasureService:
         return time.time() - start_time
 
     @staticmethod
-    def _format_linux_time_output(
-        decoded_linux_time_output: str, time_measure: TimeMeasure
+    def set_resource_usage(
+        time_measure: TimeMeasure, real_time: float, rusage: resource.struct_rusage
     ) -> TimeMeasure:
-        decoded_real_time = decoded_linux_time_output.split("\n")[1].replace(",", ".")
-        decoded_user_time = decoded_linux_time_output.split("\n")[2].replace(",", ".")
-        decoded_sys_time = decoded_linux_time_output.split("\n")[3].replace(",", ".")
+        """
+        :param real_time: Wall clock time of the process in ms
+        :param rusage: Resource usage of the process, as returned by os.wait4
+        """
+        time_measure.linux_real_execution_time = real_time
+        time_measure.linux_user_execution_time = rusage.ru_utime * 1000
+        time_measure.linux_sys_execution_time = rusage.ru_stime * 1000
+        # ru_maxrss is in KiB on Linux
+        time_measure.max_rss_bytes = rusage.ru_maxrss * 1024
+        time_measure.minor_page_faults = rusage.ru_minflt
+        time_measure.major_page_faults = rusage.ru_majflt
+        time_measure.voluntary_context_switches = rusage.ru_nvcsw
+        time_measure.involuntary_context_switches = rusage.ru_nivcsw
+        time_measure.block_input_operations = rusage.ru_inblock
+        time_measure.block_output_operations = rusage.ru_oublock
 
-        real_time_minutes = float(decoded_real_time.split("\t")[1].split("m")[0])
-        real_time_seconds = float(
-            decoded_real_time.split("\t")[1].split("m")[1].split("s")[0]
-        )
-        real_time_ms = (real_time_minutes * 60 + real_time_seconds) * 1000
+        return time_measure
+
+    @classmethod
+    def parse_ngspice_statistics(
+        cls, simulation_log: str
+    ) -> Optional[NGSpiceStatistics]:
+        """
+        Parses the statistics ngspice prints with "rusage all", times are converted to ms and sizes to bytes
+        :return: None when the output has no statistics, ngspice ran without "rusage all" or failed before it
+        """
+        integer_fields = {
+            f.name for f in fields(NGSpiceStatistics) if f.type in (int, "int")
+        }
+        values = {}
+
+        for line in simulation_log.splitlines():
+            match = cls.NGSPICE_STATISTICS_LINE.match(line)
+            if not match:
+                continue
+
+            field_name = cls.NGSPICE_STATISTICS_FIELDS.get(
+                " ".join(match["name"].lower().split())
+            )
+            if field_name is None:
+                continue
+
+            value = float(match["value"])
+            if field_name.endswith("_time"):
+                value *= 1000
+            elif field_name.endswith("_size"):
+                value *= cls.SIZE_UNITS.get(match["unit"].lower(), 1)
+            values[field_name] = (
+                int(round(value)) if field_name in integer_fields else value
+            )
+
+        return NGSpiceStatistics(**values) if values else None
+
+    @classmethod
+    def get_time_measure_values(
+        cls, time_measures: List[TimeMeasure], time_measure_field: str
+    ) -> Tuple[List[int], List[float]]:
+        """
+        :return: Indexes and values of the field in the iterations that succeeded and measured it
+        """
+        indexes, values = [], []
+        for index, time_measure in enumerate(time_measures):
+            value = getattr(time_measure, time_measure_field)
+            if not time_measure.is_failed() and value is not None:
+                indexes.append(index)
+                values.append(value)
+
+        return indexes, values
+
+    @classmethod
+    def compute_time_average(
+        cls, time_measures: List[TimeMeasure]
+    ) -> AverageTimeMeasure:
+        """
+        Averages every field over the iterations that succeeded and measured it, failed iterations are left out
+        """
+        averages = []
+        for time_measure_field in cls.TIME_MEASURE_FIELDS:
+            _, values = cls.get_time_measure_values(time_measures, time_measure_field)
+            averages.append(sum(values) / len(values) if values else None)
 
-        user_time_minutes = float(decoded_user_time.split("\t")[1].split("m")[0])
-        user_time_seconds = float(
-            decoded_user_time.split("\t")[1].split("m")[1].split("s")[0]
+        return AverageTimeMeasure(
+            len(
+                [
+                    time_measure
+                    for time_measure in time_measures
+                    if not time_measure.is_failed()
+                ]
+            ),
+            *averages,
         )
-        user_time_ms = (user_time_minutes * 60 + user_time_seconds) * 1000
 
-        sys_time_minutes = float(decoded_sys_time.split("\t")[1].split("m")[0])
-        sys_time_seconds = float(
-            decoded_sys_time.split("\t")[1].split("m")[1].split("s")[0]
+    @classmethod
+    def bootstrap_median_confidence_interval(
+        cls, values: np.ndarray, confidence_level: float
+    ) -> Tuple[float, float]:
+        if len(values) < 2:
+            return float(values[0]), float(values[0])
+
+        # Seeded, so the same measures always give the same interval
+        rng = np.random.default_rng(cls.BOOTSTRAP_SEED)
+        resampled_medians = np.median(
+            rng.choice(values, size=(cls.BOOTSTRAP_RESAMPLES, len(values))), axis=1
+        )
+        tail = (1 - confidence_level) / 2
+        ci_low, ci_high = np.quantile(resampled_medians, [tail, 1 - tail])
+
+        return float(ci_low), float(ci_high)
+
+    @classmethod
+    def compute_timing_statistics(
+        cls, values: Sequence[float], confidence_level: float
+    ) -> TimingStatistics:
+        """
+        :return: Statistics of the values, outliers are indexes of values
+        """
+        values = np.asarray(values, dtype=float)
+        median = float(np.median(values))
+        mad = float(np.median(np.abs(values - median)))
+        outliers = (
+            np.flatnonzero(
+                np.abs(cls.MAD_NORMAL_CONSISTENCY * (values - median) / mad)
+                > cls.OUTLIER_THRESHOLD
+            ).tolist()
+            if mad > 0
+            else []
+        )
+        p5, p95 = np.percentile(values, [5, 95])
+        ci_low, ci_high = cls.bootstrap_median_confidence_interval(
+            values, confidence_level
         )
-        sys_time_ms = (sys_time_minutes * 60 + sys_time_seconds) * 1000
 
-        time_measure.linux_real_execution_time = real_time_ms
-        time_measure.linux_user_execution_time = user_time_ms
-        time_measure.linux_sys_execution_time = sys_time_ms
+        return TimingStatistics(
+            amount_samples=len(values),
+            mean=float(np.mean(values)),
+            median=median,
+            p5=float(p5),
+            p95=float(p95),
+            std=float(np.std(values, ddof=1)) if len(values) > 1 else 0.0,
+            mad=mad,
+            ci_low=ci_low,
+            ci_high=ci_high,
+            outliers=outliers,
+        )
 
-        return time_measure
+    @classmethod
+    def is_precise_enough(cls, time_measures: List[TimeMeasure]) -> bool:
+        """
+        True once the confidence interval of the median is within SIMULATION_TIMING_TARGET_PRECISION of the median, so
+        repeated simulations can stop before running every iteration
+        """
+        if settings.SIMULATION_TIMING_TARGET_PRECISION <= 0:
+            return False
+
+        _, values = cls.get_time_measure_values(
+            time_measures, cls.ADAPTIVE_STOP_TIME_MEASURE
+        )
+        if len(values) < max(settings.SIMULATION_TIMING_MIN_ITERATIONS, 2):
+            return False
 
-    @staticmethod
-    def compute_time_average(
-        time_measures: List[TimeMeasure], amount_iterations: int
-    ) -> AverageTimeMeasure:
-        average_python_execution_time = (
-            sum(time_measure.python_execution_time for time_measure in time_measures)
-            / amount_iterations
+        timing_statistics = cls.compute_timing_statistics(
+            values, settings.SIMULATION_TIMING_CONFIDENCE_LEVEL
         )
-        average_linux_real_execution_time = (
-            sum(
-                time_measure.linux_real_execution_time for time_measure in time_measures
-            )
-            / amount_iterations
+
+        return (
+            timing_statistics.get_relative_ci_half_width()
+            <= settings.SIMULATION_TIMING_TARGET_PRECISION
         )
-        average_linux_user_execution_time = (
-            sum(
-                time_measure.linux_user_execution_time for time_measure in time_measures
+
+    @classmethod
+    def create_timing_report(
+        cls,
+        time_measures: List[TimeMeasure],
+        max_iterations: int,
+        amount_warmup_iterations: int = 0,
+    ) -> TimingReport:
+        confidence_level = settings.SIMULATION_TIMING_CONFIDENCE_LEVEL
+        statistics = {}
+        for time_measure_field in cls.TIME_MEASURE_FIELDS:
+            indexes, values = cls.get_time_measure_values(
+                time_measures, time_measure_field
             )
-            / amount_iterations
-        )
-        average_linux_sys_execution_time = (
-            sum(time_measure.linux_sys_execution_time for time_measure in time_measures)
-            / amount_iterations
+            if not values:
+                continue
+
+            timing_statistics = cls.compute_timing_statistics(values, confidence_level)
+            # Outliers are reported as iteration indexes
+            timing_statistics.outliers = [
+                indexes[index] for index in timing_statistics.outliers
+            ]
+            statistics[time_measure_field] = timing_statistics
+
+        return TimingReport(
+            max_iterations=max_iterations,
+            amount_warmup_iterations=amount_warmup_iterations,
+            amount_iterations=len(time_measures),
+            amount_failed_iterations=len(
+                [
+                    time_measure
+                    for time_measure in time_measures
+                    if time_measure.is_failed()
+                ]
+            ),
+            stopped_early=len(time_measures) < max_iterations,
+            confidence_level=confidence_level,
+            statistics=statistics,
         )
 
-        return AverageTimeMeasure(
-            amount_iterations,
-            average_python_execution_time,
-            average_linux_real_execution_time,
-            average_linux_user_execution_time,
-            average_linux_sys_execution_time,
+    def write_timing_report(self, timing_report: TimingReport) -> None:
+        timing_report_file_path = (
+            self.directories_management_service.get_timing_report_file_path()
         )
+        if not os.path.exists(timing_report_file_path):
+            self.directories_management_service.register_artifact(
+                timing_report_file_path, ArtifactStage.LOG
+            )
+
+        with open(timing_report_file_path, "w") as f:
+            json.dump(timing_report.to_dict(), f, indent=2)
 
     def write_python_time_measure_into_csv(
         self, time_measure: TimeMeasure
@@ -179,33 +507,29 @@ class TimeMeasureService:
 
         return time_measure
 
-    def write_linux_time_measure_into_csv(
-        self, linux_time_output: bytes, time_measure: TimeMeasure
-    ) -> None:
-        formatted_time_measure = self._format_linux_time_output(
-            linux_time_output.decode(), time_measure
-        )
-
+    def write_linux_time_measure_into_csv(self, time_measure: TimeMeasure) -> None:
         with open(self.simulation_result_file_path, "a") as f:
             f.write(
                 f"\n# {TimeMeasures.LINUX_REAL_EXECUTION_TIME.value} = "
-                f"{formatted_time_measure.linux_real_execution_time} ms"
+                f"{time_measure.linux_real_execution_time} ms"
             )
             f.write(
                 f"\n# {TimeMeasures.LINUX_USER_EXECUTION_TIME.value} = "
-                f"{formatted_time_measure.linux_user_execution_time} ms"
+                f"{time_measure.linux_user_execution_time} ms"
             )
             f.write(
                 f"\n# {TimeMeasures.LINUX_SYS_EXECUTION_TIME.value} = "
-                f"{formatted_time_measure.linux_sys_execution_time} ms"
+                f"{time_measure.linux_sys_execution_time} ms"
             )
 
-    @staticmethod
-    def print_time_measure(time_measure: TimeMeasure):
+    @classmethod
+    def print_time_measure(cls, time_measure: TimeMeasure):
         print(f'\n{"#" * 30}')
         for k, v in asdict(time_measure).items():
-            if k != "start_time" and v is not None:
+            if k in cls.TIME_MEASURE_FIELDS and v is not None:
                 print(f"# {k} = {str(v)} ms")
+            elif k in cls.RESOURCE_USAGE_FIELDS and v is not None:
+                print(f"# {k} = {str(v)}")
         print(f"\n")
 
     @staticmethod
@@ -218,20 +542,43 @@ class TimeMeasureService:
                 print(f"# {k} = {str(v)} ms")
         print(f"\n")
 
+    @staticmethod
+    def print_timing_report(timing_report: TimingReport):
+        print(f'\n{"#" * 30}')
+        print(
+            f"# iterations = {timing_report.amount_iterations} of {timing_report.max_iterations} "
+            f"(warmup = {timing_report.amount_warmup_iterations}, failed = {timing_report.amount_failed_iterations})"
+        )
+        for k, timing_statistics in timing_report.statistics.items():
+            print(
+                f"# {k}: median = {timing_statistics.median} ms "
+                f"[{timing_statistics.ci_low}, {timing_statistics.ci_high}], "
+                f"p5 = {timing_statistics.p5} ms, p95 = {timing_statistics.p95} ms, "
+                f"mad = {timing_statistics.mad} ms, outliers = {len(timing_statistics.outliers)}"
+            )
+        print(f"\n")
+
     def write_simulation_log(
         self,
         simulation_log: str = None,
         time_measure: TimeMeasure = None,
         average_time_measure: AverageTimeMeasure = None,
     ) -> None:
+        if not os.path.exists(self.simulation_log_path):
+            self.directories_management_service.register_artifact(
+                self.simulation_log_path, ArtifactStage.LOG
+            )
+
         with open(f"{self.simulation_log_path}", "a+") as f:
             if simulation_log:
                 f.write(f'{"#" * 60}\n{simulation_log}\n\n')
 
             if time_measure:
                 for k, v in asdict(time_measure).items():
-                    if k != "start_time" and v is not None:
+                    if k in self.TIME_MEASURE_FIELDS and v is not None:
                         f.write(f"# {k} = {str(v)} ms\n")
+                    elif k in self.RESOURCE_USAGE_FIELDS and v is not None:
+                        f.write(f"# {k} = {str(v)}\n")
                 f.write("\n")
 
             if average_time_measure:
@@ -248,6 +595,111 @@ class TimeMeasureService:
         return sys.platform == "linux" or sys.platform == "linux2"
 
 
+class AsyncTimeMeasureService(TimeMeasureService):
+    """
+    Supervises ngspice from an event loop so many simulations run at once. Its output is read through an asyncio pipe,
+    while reaping it with os.wait4 and the file writes are delegated to worker threads to keep the event loop free.
+    ngspice is started with subprocess.Popen, processes started by asyncio are reaped by its child watcher, which
+    discards their resource usage.
+    """
+
+    async def execute_with_time_measure(
+        self, enable_print_time_measure: bool = True, warmup: bool = False
+    ) -> TimeMeasure:
+        time_measure = TimeMeasure(start_time=self.init_python_execution_time_measure())
+
+        try:
+            self._prepare_execute_command()
+
+            process_start_time = time.perf_counter()
+            process = self._start_process()
+            try:
+                simulation_log = await self.read_process_output(process)
+                rusage = await asyncio.to_thread(self.wait_process, process)
+            except BaseException:
+                # A cancelled task (e.g. the client disconnected) must not leave ngspice running nor unreaped, the
+                # kill is shielded so a second cancellation does not interrupt it
+                await asyncio.shield(self._kill_process(process))
+                raise
+            real_time = (time.perf_counter() - process_start_time) * 1000
+            self._log_process_return_code(process.returncode)
+            time_measure.return_code = process.returncode
+            time_measure.ngspice_statistics = self.parse_ngspice_statistics(
+                simulation_log.decode(errors="replace")
+            )
+
+            time_measure = await asyncio.to_thread(
+                self.write_python_time_measure_into_csv, time_measure
+            )
+            self.set_resource_usage(time_measure, real_time, rusage)
+            await asyncio.to_thread(
+                self.write_linux_time_measure_into_csv, time_measure
+            )
+
+        except Exception as e:
+            logger.error(f"Error during time measurement execution: {str(e)}")
+            raise e
+
+        if not warmup:
+            await asyncio.to_thread(
+                self.write_simulation_log,
+                simulation_log=simulation_log.decode(),
+                time_measure=time_measure,
+            )
+
+        if enable_print_time_measure:
+            self.print_time_measure(time_measure)
+
+        return time_measure
+
+    async def read_process_output(self, process: subprocess.Popen) -> bytes:
+        output = bytearray()
+        pending_line = b""
+        stdout = asyncio.StreamReader()
+        transport, _ = await asyncio.get_running_loop().connect_read_pipe(
+            lambda: asyncio.StreamReaderProtocol(stdout), process.stdout
+        )
+
+        try:
+            while True:
+                if (
+                    self.progress_service
+                    and self.progress_service.is_cancel_requested()
+                ):
+                    await self._kill_process(process)
+                    self._raise_simulation_cancelled()
+
+                try:
+                    chunk = await asyncio.wait_for(
+                        stdout.read(self.OUTPUT_CHUNK_SIZE),
+                        timeout=self.OUTPUT_READ_TIMEOUT,
+                    )
+                except asyncio.TimeoutError:
+                    continue
+
+                if not chunk:
+                    break
+
+                output.extend(chunk)
+                pending_line = self._parse_output_chunk(pending_line, chunk)
+        finally:
+            transport.close()
+
+        return bytes(output)
+
+    @staticmethod
+    async def _kill_process(process: subprocess.Popen) -> None:
+        # A reaped pid may have been reused by another process
+        if process.returncode is not None:
+            return
+
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        await asyncio.to_thread(process.wait)
+
+
 class FilePathNotFoundError(Exception):
     pass
 
@@ -1,6 +1,7 @@
 from abc import ABC
-from typing import List, Union, Tuple, Optional
+from typing import ContextManager, List, Union, Tuple, Optional
 from memristorsimulation_app.constants import (
+    ArtifactStage,
     InvalidNetworkType,
     MemristorModels,
     NetworkType,
@@ -21,14 +22,37 @@ from memristorsimulation_app.representations import (
 )
 from memristorsimulation_app.services.circuitfileservice import CircuitFileService
 from memristorsimulation_app.services.directoriesmanagementservice import (
+    DirectoriesManagementService,
     InvalidMemristorModel,
 )
 from memristorsimulation_app.services.networkservice import NetworkService
 from memristorsimulation_app.services.plotterservice import PlotterService
+from memristorsimulation_app.services.stagetimingservice import StageTimingService
 from memristorsimulation_app.services.subcircuitfileservice import SubcircuitFileService
 
 
 class BaseTemplate(ABC):
+    stage_timing_service: Optional[StageTimingService] = None
+
+    def time_stage(self, name: str) -> ContextManager[None]:
+        if self.stage_timing_service is None:
+            self.stage_timing_service = StageTimingService()
+
+        return self.stage_timing_service.span(name)
+
+    def write_stage_timings(
+        self, directories_management_service: DirectoriesManagementService
+    ) -> None:
+        if self.stage_timing_service is None:
+            return
+
+        log_file_path = self.stage_timing_service.write_log(
+            directories_management_service.get_simulation_folder_path()
+        )
+        directories_management_service.register_artifact(
+            log_file_path, ArtifactStage.LOG
+        )
+
     def create_default_behavioural_source(self) -> List[BehaviouralSource]:
         return [
             BehaviouralSource(
@@ -113,8 +137,13 @@ class BaseTemplate(ABC):
         input_parameters: InputParameters = None,
         plot_types: List[PlotType] = None,
         graph: Graph = None,
+        stage_timing_service: StageTimingService = None,
     ):
+        """
+        :param stage_timing_service: Receives a load span and one span per plot type, named plot_<PlotType>
+        """
         if plot_types is not None:
+            stage_timing_service = stage_timing_service or StageTimingService()
             plotter_service = PlotterService(
                 simulation_results_directory_path=SIMULATIONS_DIR,
                 export_parameters=export_parameters,
@@ -122,34 +151,65 @@ class BaseTemplate(ABC):
                 input_parameters=input_parameters,
                 graph=graph,
             )
-            data_loaders = plotter_service.load_data_from_csv()
+            with stage_timing_service.span("load"):
+                data_loaders = plotter_service.load_data_from_csv()
 
             for data_loader in data_loaders:
                 if PlotType.IV in plot_types:
-                    plotter_service.plot_iv(
-                        data_loader.dataframe, data_loader.csv_file_name_no_extension
-                    )
+                    with stage_timing_service.span(f"plot_{PlotType.IV.value}"):
+                        plotter_service.plot_iv(
+                            data_loader.dataframe,
+                            data_loader.csv_file_name_no_extension,
+                        )
                 if PlotType.IV_OVERLAPPED in plot_types:
-                    plotter_service.plot_iv_overlapped(data_loader.dataframe)
+                    with stage_timing_service.span(
+                        f"plot_{PlotType.IV_OVERLAPPED.value}"
+                    ):
+                        plotter_service.plot_iv_overlapped(data_loader.dataframe)
                 if PlotType.IV_LOG in plot_types:
-                    plotter_service.plot_iv_log(
-                        data_loader.dataframe, data_loader.csv_file_name_no_extension
-                    )
+                    with stage_timing_service.span(f"plot_{PlotType.IV_LOG.value}"):
+                        plotter_service.plot_iv_log(
+                            data_loader.dataframe,
+                            data_loader.csv_file_name_no_extension,
+                        )
                 if PlotType.IV_LOG_OVERLAPPED in plot_types:
-                    plotter_service.plot_iv_log_overlapped(data_loader.dataframe)
+                    with stage_timing_service.span(
+                        f"plot_{PlotType.IV_LOG_OVERLAPPED.value}"
+                    ):
+                        plotter_service.plot_iv_log_overlapped(data_loader.dataframe)
                 if PlotType.CURRENT_AND_VIN_VS_TIME in plot_types:
-                    plotter_service.plot_current_and_vin_vs_time(
-                        data_loader.dataframe, data_loader.csv_file_name_no_extension
-                    )
+                    with stage_timing_service.span(
+                        f"plot_{PlotType.CURRENT_AND_VIN_VS_TIME.value}"
+                    ):
+                        plotter_service.plot_current_and_vin_vs_time(
+                            data_loader.dataframe,
+                            data_loader.csv_file_name_no_extension,
+                        )
                 if PlotType.STATE_AND_VIN_VS_TIME in plot_types:
-                    plotter_service.plot_state_and_vin_vs_time(
-                        data_loader.dataframe, data_loader.csv_file_name_no_extension
-                    )
+                    with stage_timing_service.span(
+                        f"plot_{PlotType.STATE_AND_VIN_VS_TIME.value}"
+                    ):
+                        plotter_service.plot_state_and_vin_vs_time(
+                            data_loader.dataframe,
+                            data_loader.csv_file_name_no_extension,
+                        )
                 if PlotType.MEMRISTIVE_STATES_OVERLAPPED in plot_types:
-                    plotter_service.plot_states_overlapped(data_loader.dataframe)
+                    with stage_timing_service.span(
+                        f"plot_{PlotType.MEMRISTIVE_STATES_OVERLAPPED.value}"
+                    ):
+                        plotter_service.plot_states_overlapped(data_loader.dataframe)
+                if PlotType.GRID_STATES_ANIMATED in plot_types and graph is not None:
+                    with stage_timing_service.span(
+                        f"plot_{PlotType.GRID_STATES_ANIMATED.value}"
+                    ):
+                        plotter_service.plot_grid_states_animated(
+                            data_loader.dataframe,
+                            data_loader.csv_file_name_no_extension,
+                        )
 
             if PlotType.GRAPH in plot_types and graph is not None:
-                plotter_service.plot_networkx_graph()
+                with stage_timing_service.span(f"plot_{PlotType.GRAPH.value}"):
+                    plotter_service.plot_networkx_graph()
 
     def create_subcircuit_file_service(
         self,
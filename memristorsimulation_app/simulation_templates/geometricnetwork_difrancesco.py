@@ -59,6 +59,7 @@ class GeometricNetworkDiFrancesco(BaseTemplate):
         PlotType.IV_LOG,
         PlotType.CURRENT_AND_VIN_VS_TIME,
         PlotType.GRAPH,
+        PlotType.GRID_STATES_ANIMATED,
     ]
 
     def __init__(self, model: MemristorModels):
@@ -72,6 +73,7 @@ class GeometricNetworkDiFrancesco(BaseTemplate):
             self.network_service.network,
             self.network_service.vin_minus,
             self.network_service.vin_plus,
+            state_edges=self.network_service.get_state_edges(),
         )
         self.device_params = self.network_service.generate_device_parameters(
             "xmem", "memristor"
@@ -149,19 +151,30 @@ class GeometricNetworkDiFrancesco(BaseTemplate):
         )
 
     def simulate(self):
-        subcircuit_file_service = self.create_subcircuit_file_service()
-        circuit_file_service = self.create_circuit_file_service(subcircuit_file_service)
-        circuit_file_service.subcircuit_file_service.write_subcircuit_file()
-        circuit_file_service.write_circuit_file()
-        ngspice_service = NGSpiceService(self.directories_management_service)
-        ngspice_service.run_single_circuit_simulation(self.AMOUNT_ITERATIONS)
+        with self.time_stage("build"):
+            subcircuit_file_service = self.create_subcircuit_file_service()
+            circuit_file_service = self.create_circuit_file_service(
+                subcircuit_file_service
+            )
+        circuit_file_service.directories_management_service.create_workspace(
+            exist_ok=True
+        )
+        with self.time_stage("subcircuit_write"):
+            circuit_file_service.subcircuit_file_service.write_subcircuit_file()
+        with self.time_stage("circuit_write"):
+            circuit_file_service.write_circuit_file()
+        with self.time_stage("spice"):
+            ngspice_service = NGSpiceService(self.directories_management_service)
+            ngspice_service.run_single_circuit_simulation(self.AMOUNT_ITERATIONS)
         self.plot(
             export_parameters=self.export_params,
             model_parameters=circuit_file_service.subcircuit_file_service.subcircuit.model_parameters,
             input_parameters=circuit_file_service.input_parameters,
             plot_types=self.PLOT_TYPES,
             graph=self.graph,
+            stage_timing_service=self.stage_timing_service,
         )
+        self.write_stage_timings(self.directories_management_service)
 
 
 if __name__ == "__main__":
@@ -85,6 +85,7 @@ class RandomRegularNetwork(BaseTemplate):
             self.network_service.vin_minus,
             self.network_service.vin_plus,
             seed=self.SEED,
+            state_edges=self.network_service.get_state_edges(),
         )
         self.ignore_states = True if len(self.graph.nx_graph.edges) > 100 else False
         self.device_params = self.network_service.generate_device_parameters(
@@ -164,19 +165,30 @@ class RandomRegularNetwork(BaseTemplate):
         )
 
     def simulate(self):
-        subcircuit_file_service = self.create_subcircuit_file_service()
-        circuit_file_service = self.create_circuit_file_service(subcircuit_file_service)
-        circuit_file_service.subcircuit_file_service.write_subcircuit_file()
-        circuit_file_service.write_circuit_file()
-        ngspice_service = NGSpiceService(self.directories_management_service)
-        ngspice_service.run_single_circuit_simulation(self.AMOUNT_ITERATIONS)
+        with self.time_stage("build"):
+            subcircuit_file_service = self.create_subcircuit_file_service()
+            circuit_file_service = self.create_circuit_file_service(
+                subcircuit_file_service
+            )
+        circuit_file_service.directories_management_service.create_workspace(
+            exist_ok=True
+        )
+        with self.time_stage("subcircuit_write"):
+            circuit_file_service.subcircuit_file_service.write_subcircuit_file()
+        with self.time_stage("circuit_write"):
+            circuit_file_service.write_circuit_file()
+        with self.time_stage("spice"):
+            ngspice_service = NGSpiceService(self.directories_management_service)
+            ngspice_service.run_single_circuit_simulation(self.AMOUNT_ITERATIONS)
         self.plot(
             export_parameters=self.directories_management_service.export_parameters,
             model_parameters=circuit_file_service.subcircuit_file_service.subcircuit.model_parameters,
             input_parameters=circuit_file_service.input_parameters,
             plot_types=self.PLOT_TYPES,
             graph=self.graph,
+            stage_timing_service=self.stage_timing_service,
         )
+        self.write_stage_timings(self.directories_management_service)
 
 
 if __name__ == "__main__":
@@ -59,6 +59,8 @@ class SingleDeviceVariableBeta(BaseTemplate):
 
     def __init__(self, model: MemristorModels):
         self.model = model
+        # Every export of the template is written into the same run folder
+        self.run_id = ExportParameters.create_run_id()
 
     def create_subcircuit_file_service(
         self,
@@ -98,6 +100,7 @@ class SingleDeviceVariableBeta(BaseTemplate):
             self.EXPORT_FOLDER_NAME,
             export_file_name,
             ["vin", "i(v1)", "l0"],
+            run_id=self.run_id,
         )
         subcircuit_directories_management_service = DirectoriesManagementService(
             self.model, export_params
@@ -141,6 +144,7 @@ class SingleDeviceVariableBeta(BaseTemplate):
                 self.EXPORT_FOLDER_NAME,
                 export_file_name,
                 ["vin", "i(v1)", "l0"],
+                run_id=self.run_id,
             )
             circuit_directories_management_service = DirectoriesManagementService(
                 self.model, export_params
@@ -162,17 +166,22 @@ class SingleDeviceVariableBeta(BaseTemplate):
         return circuit_file_services, circuit_directories_management_services
 
     def simulate(self):
-        subcircuit_file_service = self.create_subcircuit_file_service()
-        circuit_file_services, directories_management_services = (
-            self.create_circuit_file_service(subcircuit_file_service)
-        )
+        with self.time_stage("build"):
+            subcircuit_file_service = self.create_subcircuit_file_service()
+            circuit_file_services, directories_management_services = (
+                self.create_circuit_file_service(subcircuit_file_service)
+            )
 
         for cfs, dms in zip(circuit_file_services, directories_management_services):
-            cfs.subcircuit_file_service.write_subcircuit_file()
-            cfs.write_circuit_file()
+            dms.create_workspace(exist_ok=True)
+            with self.time_stage("subcircuit_write"):
+                cfs.subcircuit_file_service.write_subcircuit_file()
+            with self.time_stage("circuit_write"):
+                cfs.write_circuit_file()
 
-            ngspice_service = NGSpiceService(dms)
-            ngspice_service.run_single_circuit_simulation(self.AMOUNT_ITERATIONS)
+            with self.time_stage("spice"):
+                ngspice_service = NGSpiceService(dms)
+                ngspice_service.run_single_circuit_simulation(self.AMOUNT_ITERATIONS)
 
         for cfs, dms in zip(circuit_file_services, directories_management_services):
             self.plot(
@@ -180,8 +189,13 @@ class SingleDeviceVariableBeta(BaseTemplate):
                 model_parameters=cfs.subcircuit_file_service.subcircuit.model_parameters,
                 input_parameters=cfs.input_parameters,
                 plot_types=self.PLOT_TYPES,
+                stage_timing_service=self.stage_timing_service,
             )
 
+        # Every variation folder keeps the spans of the whole template run
+        for dms in directories_management_services:
+            self.write_stage_timings(dms)
+
 
 if __name__ == "__main__":
     SingleDeviceVariableBeta(MemristorModels.PERSHIN).simulate()
@@ -164,6 +164,28 @@ class BaseTestCase(TestCase):
 
         return content
 
+    @staticmethod
+    def write_simulation_results_csv(
+        model_simulation_folder: ModelsSimulationFolders,
+        folder_name: str,
+        file_name: str,
+        dataframe: pd.DataFrame,
+    ) -> str:
+        simulation_folder = (
+            f"{SIMULATIONS_DIR}/{model_simulation_folder.value}/{folder_name}"
+        )
+        os.makedirs(simulation_folder, exist_ok=True)
+        csv_file_path = f"{simulation_folder}/{file_name}_results.csv"
+
+        with open(csv_file_path, "w") as f:
+            f.write(dataframe.to_string(index=False))
+            f.write("\n# PYTHON_EXECUTION_TIME = 1.0 ms")
+            f.write("\n# LINUX_REAL_EXECUTION_TIME = 1.0 ms")
+            f.write("\n# LINUX_USER_EXECUTION_TIME = 1.0 ms")
+            f.write("\n# LINUX_SYS_EXECUTION_TIME = 1.0 ms")
+
+        return csv_file_path
+
     def create_directories_management_service(
         self, memristor_model: MemristorModels
     ) -> DirectoriesManagementService:
@@ -227,6 +249,7 @@ class BaseTestCase(TestCase):
         directories_management_service = self.create_directories_management_service(
             memristor_model
         )
+        directories_management_service.create_workspace()
         return SubcircuitFileService(
             model=memristor_model,
             subcircuit=subcircuit,
@@ -274,6 +297,7 @@ class BaseTestCase(TestCase):
         directories_management_service = self.create_directories_management_service(
             MemristorModels.PERSHIN
         )
+        directories_management_service.create_workspace()
 
         return CircuitFileService(
             subcircuit_file_service,
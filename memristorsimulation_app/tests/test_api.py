@@ -1,17 +1,36 @@
+import asyncio
+import json
 import zipfile
+import numpy as np
+import pandas as pd
 
-from rest_framework.test import APITestCase
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient, APITestCase
 from rest_framework import status
 from unittest.mock import patch
 from io import BytesIO
+from memristorsimulation_app.constants import ModelsSimulationFolders, SimulationStatus
+from memristorsimulation_app.models import SimulationRun
+from memristorsimulation_app.services.simulationprogressservice import (
+    SimulationCancelled,
+    SimulationProgressService,
+)
 from memristorsimulation_app.tests.basetestcase import BaseTestCase
 
 
 class UserAPITestCase(APITestCase, BaseTestCase):
-    def test_simulation_view(self):
-        url = ""
+    def setUp(self) -> None:
+        super().setUp()
 
-        data = {
+        retention_patcher = patch(
+            "memristorsimulation_app.views.RetentionService.enforce_retention_in_background"
+        )
+        self.mock_enforce_retention = retention_patcher.start()
+        self.addCleanup(retention_patcher.stop)
+
+    @staticmethod
+    def _get_simulation_request_data() -> dict:
+        return {
             "model": "pershin.sub",
             "subcircuit": {
                 "model_parameters": {
@@ -68,8 +87,12 @@ class UserAPITestCase(APITestCase, BaseTestCase):
             "plot_types": ["IV", "IV_LOG"],
         }
 
+    def test_simulation_view(self):
+        url = ""
+        data = self._get_simulation_request_data()
+
         with patch(
-            "memristorsimulation_app.services.simulationservice.SimulationService.simulate_and_create_results_zip"
+            "memristorsimulation_app.services.simulationservice.SimulationService.simulate_and_create_results_zip_async"
         ) as mock_simulate:
             mock_zip_buffer = BytesIO()
             with zipfile.ZipFile(
@@ -88,6 +111,9 @@ class UserAPITestCase(APITestCase, BaseTestCase):
             self.assertIn("attachment", response["Content-Disposition"])
             self.assertIn("simulation_test_simulation", response["Content-Disposition"])
             self.assertIn(".zip", response["Content-Disposition"])
+            self.assertTrue(
+                response["X-Simulation-Folder"].startswith("test_simulation")
+            )
 
             zip_content = BytesIO(response.content)
             with zipfile.ZipFile(zip_content, "r") as zip_file:
@@ -95,6 +121,258 @@ class UserAPITestCase(APITestCase, BaseTestCase):
                 self.assertIn("test_file.txt", file_list)
 
             mock_simulate.assert_called_once()
+            self.mock_enforce_retention.assert_called_once()
+            self.assertEqual(response["X-Simulation-Admission"], "ACCEPT")
+            self.assertGreater(float(response["X-Simulation-Estimated-Time"]), 0)
+            self.assertTrue(response["Server-Timing"].startswith("parse;dur="))
+
+            run = SimulationRun.objects.get()
+            self.assertEqual(run.status, SimulationStatus.FINISHED.value)
+            self.assertEqual(run.folder_name, response["X-Simulation-Folder"])
+            self.assertEqual(run.network_type, "GRID_2D_GRAPH")
+
+    def test_metrics_view(self):
+        with patch(
+            "memristorsimulation_app.services.simulationservice.SimulationService.simulate_and_create_results_zip_async",
+            return_value=BytesIO(b"results"),
+        ):
+            self.client.post("", self._get_simulation_request_data(), format="json")
+
+        response = self.client.get("/metrics")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+        metrics = response.content.decode()
+        self.assertIn("# TYPE memristor_simulation_requests_total counter", metrics)
+        self.assertIn(
+            'memristor_simulation_admissions_total{decision="ACCEPT"}', metrics
+        )
+        self.assertIn("memristor_simulation_requests_in_progress 0", metrics)
+        self.assertIn(
+            'memristor_simulation_stage_duration_seconds_count{stage="parse"}', metrics
+        )
+        self.assertIn(
+            'memristor_cache_requests_total{cache="coalescing",result="miss"}', metrics
+        )
+
+    def test_simulation_view_with_progress_id(self):
+        data = self._get_simulation_request_data()
+
+        response = self.client.post(
+            "", data, format="json", HTTP_X_SIMULATION_PROGRESS_ID="invalid/id"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        with patch(
+            "memristorsimulation_app.services.simulationservice.SimulationService.simulate_and_create_results_zip_async"
+        ) as mock_simulate:
+            mock_simulate.return_value = BytesIO(b"zip")
+
+            response = self.client.post(
+                "", data, format="json", HTTP_X_SIMULATION_PROGRESS_ID="run-1"
+            )
+
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response["X-Simulation-Progress-Id"], "run-1")
+
+            mock_simulate.side_effect = SimulationCancelled(
+                "Simulation run-1 cancelled"
+            )
+            response = self.client.post(
+                "", data, format="json", HTTP_X_SIMULATION_PROGRESS_ID="run-1"
+            )
+
+            self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+
+    def test_simulation_view_with_profile(self):
+        data = self._get_simulation_request_data()
+
+        response = self.client.post("/?profile=true", data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.force_login(
+            User.objects.create_user("admin", password="admin", is_staff=True)
+        )
+        # The profile is written to the run folder, which the mocked simulation still creates
+        with patch(
+            "memristorsimulation_app.services.simulationservice.SimulationService.simulate",
+            autospec=True,
+            side_effect=lambda simulation_service: simulation_service.directories_management_service.create_workspace(),
+        ) as mock_simulate, patch(
+            "memristorsimulation_app.services.simulationservice.SimulationService.create_results_zip",
+            return_value=BytesIO(b"zip"),
+        ):
+            response = self.client.post(
+                "", data, format="json", HTTP_X_SIMULATION_PROFILE="true"
+            )
+
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            mock_simulate.assert_called_once()
+
+        folder_name = response["X-Simulation-Folder"]
+        profile_url = f"/simulations/pershin_simulations/{folder_name}/profile/"
+        self.assertEqual(response["X-Simulation-Profile"], profile_url)
+        self.assertEqual(response["X-Simulation-Coalesced"], "false")
+
+        response = self.client.get(profile_url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["folder_name"], folder_name)
+        self.assertIn("top_functions", response.data)
+        self.assertIn("top_allocations", response.data)
+
+    def test_simulation_view_with_profile_enforces_csrf(self):
+        data = self._get_simulation_request_data()
+        client = APIClient(enforce_csrf_checks=True)
+        client.force_login(
+            User.objects.create_user("admin", password="admin", is_staff=True)
+        )
+
+        with patch(
+            "memristorsimulation_app.services.simulationservice.SimulationService.simulate",
+            autospec=True,
+            side_effect=lambda simulation_service: simulation_service.directories_management_service.create_workspace(),
+        ) as mock_simulate, patch(
+            "memristorsimulation_app.services.simulationservice.SimulationService.create_results_zip",
+            return_value=BytesIO(b"zip"),
+        ):
+            response = client.post(
+                "", data, format="json", HTTP_X_SIMULATION_PROFILE="true"
+            )
+
+            self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+            mock_simulate.assert_not_called()
+
+            csrf_token = "a" * 32
+            client.cookies["csrftoken"] = csrf_token
+            response = client.post(
+                "",
+                data,
+                format="json",
+                HTTP_X_SIMULATION_PROFILE="true",
+                HTTP_X_CSRFTOKEN=csrf_token,
+            )
+
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertIn("X-Simulation-Profile", response)
+
+    def test_simulation_profile_view(self):
+        response = self.client.get("/simulations/pershin_simulations/missing/profile/")
+        self.assertIn(
+            response.status_code,
+            [status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN],
+        )
+
+        self.client.force_login(
+            User.objects.create_user("admin", password="admin", is_staff=True)
+        )
+        response = self.client.get("/simulations/pershin_simulations/missing/profile/")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        response = self.client.get("/simulations/invalid/missing/profile/")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_simulation_progress_view(self):
+        progress_service = SimulationProgressService("run-1")
+        progress_service.start(tstop=1.0)
+        progress_service.finish(SimulationStatus.FINISHED)
+
+        response = self.client.get("/simulations/progress/run-1/")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        events = asyncio.run(self._read_streaming_content(response)).split("\n\n")
+        self.assertTrue(events[0].startswith("event: progress\ndata: "))
+        progress = json.loads(events[0].split("data: ", 1)[1])
+        self.assertEqual(progress["progressId"], "run-1")
+        self.assertEqual(progress["status"], "FINISHED")
+        self.assertEqual(progress["percentage"], 100.0)
+        self.assertEqual(events[1], "event: end\ndata: {}")
+
+        response = self.client.delete("/simulations/progress/run-1/")
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertTrue(progress_service.is_cancel_requested())
+
+        response = self.client.get("/simulations/progress/invalid.id/")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @patch.object(SimulationProgressService, "POLL_INTERVAL", 0.05)
+    @patch.object(SimulationProgressService, "MIN_WRITE_INTERVAL", 0)
+    def test_simulation_progress_view_while_running(self):
+        progress_service = SimulationProgressService("run-2")
+        progress_service.start(tstop=1.0)
+
+        async def run_simulation():
+            for reference_value in ["2.50000e-01", "7.50000e-01"]:
+                await asyncio.sleep(0.2)
+                await asyncio.to_thread(
+                    progress_service.parse_output_line,
+                    f"Reference value :  {reference_value}",
+                )
+            await asyncio.sleep(0.2)
+            await asyncio.to_thread(progress_service.finish, SimulationStatus.FINISHED)
+
+        async def follow_simulation(response):
+            simulation = asyncio.create_task(run_simulation())
+            content = await self._read_streaming_content(response)
+            await simulation
+
+            return content
+
+        response = self.client.get("/simulations/progress/run-2/")
+        events = asyncio.run(follow_simulation(response)).split("\n\n")
+
+        progresses = [
+            json.loads(event.split("data: ", 1)[1])
+            for event in events
+            if event.startswith("event: progress")
+        ]
+        self.assertEqual(
+            [progress["percentage"] for progress in progresses],
+            [0.0, 25.0, 75.0, 100.0],
+        )
+        self.assertEqual(progresses[-1]["status"], "FINISHED")
+        self.assertEqual(events[-2], "event: end\ndata: {}")
+
+    @staticmethod
+    async def _read_streaming_content(response) -> str:
+        return b"".join([chunk async for chunk in response.streaming_content]).decode()
+
+    def test_simulation_view_rejected_by_admission_control(self):
+        data = self._get_simulation_request_data()
+        data["network_parameters"]["n"] = 100
+        data["network_parameters"]["m"] = 100
+        data["simulation_parameters"]["tstop"] = 100
+
+        with patch(
+            "memristorsimulation_app.services.simulationservice.SimulationService.simulate_and_create_results_zip_async"
+        ) as mock_simulate:
+            response = self.client.post("", data, format="json")
+
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn("exceeds the budget", response.json()["ERROR"])
+            self.assertGreater(response.json()["estimatedTimeMs"], 3600 * 1000)
+            mock_simulate.assert_not_called()
+
+    def test_simulation_view_low_priority(self):
+        data = self._get_simulation_request_data()
+
+        with patch(
+            "memristorsimulation_app.services.simulationservice.SimulationService.simulate_and_create_results_zip_async"
+        ) as mock_simulate, patch.multiple(
+            "memristorsimulation_app.services.admissioncontrolservice.settings",
+            SIMULATION_COST_WARN_SECONDS=1e-6,
+            SIMULATION_COST_LOW_PRIORITY_SECONDS=1e-5,
+        ):
+            mock_simulate.return_value = BytesIO(b"zip")
+
+            response = self.client.post("", data, format="json")
+
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response["X-Simulation-Admission"], "LOW_PRIORITY")
+            mock_simulate.assert_called_once()
 
     def test_simulation_view_invalid_json(self):
         url = ""
@@ -116,7 +394,50 @@ class UserAPITestCase(APITestCase, BaseTestCase):
         response = self.client.post(url, invalid_data, format="json")
 
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
-        self.assertIn("subcircuit", response.data.keys() or response.content.decode())
+        self.assertIn("subcircuit", response.json().keys())
+
+        data = self._get_simulation_request_data()
+        del data["simulation_parameters"]["tstep"]
+
+        response = self.client.post(url, data, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("tstep", response.json()["simulationParameters"])
+
+        data = self._get_simulation_request_data()
+        data["export_parameters"]["output_decimation"] = "EVERY_NTH"
+
+        response = self.client.post(url, data, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("decimationFactor", response.json()["exportParameters"])
+
+        for tstep in [0, -1e-3]:
+            data = self._get_simulation_request_data()
+            data["simulation_parameters"]["tstep"] = tstep
+
+            response = self.client.post(url, data, format="json")
+
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn("tstep", response.json()["simulationParameters"])
+
+        data = self._get_simulation_request_data()
+        data["network_parameters"]["n"] = 10**6
+
+        response = self.client.post(url, data, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("n", response.json()["networkParameters"])
+
+        data = self._get_simulation_request_data()
+        data["export_parameters"]["output_decimation"] = "TOLERANCE"
+        data["export_parameters"]["decimation_tolerance"] = 0.001
+        data["export_parameters"]["magnitudes"] = [f"l{i}" for i in range(9)]
+
+        response = self.client.post(url, data, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("magnitudes", response.json()["exportParameters"])
 
     def test_simulation_view_with_simulation_error(self):
         url = ""
@@ -179,7 +500,7 @@ class UserAPITestCase(APITestCase, BaseTestCase):
         }
 
         with patch(
-            "memristorsimulation_app.services.simulationservice.SimulationService.simulate_and_create_results_zip"
+            "memristorsimulation_app.services.simulationservice.SimulationService.simulate_and_create_results_zip_async"
         ) as mock_simulate:
             mock_simulate.side_effect = Exception("Error de simulación")
 
@@ -188,6 +509,9 @@ class UserAPITestCase(APITestCase, BaseTestCase):
             self.assertEqual(
                 response.status_code, status.HTTP_500_INTERNAL_SERVER_ERROR
             )
+            run = SimulationRun.objects.get()
+            self.assertEqual(run.status, SimulationStatus.FAILED.value)
+            self.assertEqual(run.error, "Error de simulación")
 
     def test_simulation_view_get_method(self):
         url = ""
@@ -258,7 +582,7 @@ class UserAPITestCase(APITestCase, BaseTestCase):
         }
 
         with patch(
-            "memristorsimulation_app.services.simulationservice.SimulationService.simulate_and_create_results_zip"
+            "memristorsimulation_app.services.simulationservice.SimulationService.simulate_and_create_results_zip_async"
         ) as mock_simulate:
             mock_zip_buffer = BytesIO()
             test_content = "Test content"
@@ -275,3 +599,192 @@ class UserAPITestCase(APITestCase, BaseTestCase):
             self.assertEqual(response.status_code, status.HTTP_200_OK)
             self.assertEqual(int(response["Content-Length"]), len(response.content))
             self.assertGreater(len(response.content), 0)
+
+    def test_simulation_series_view(self):
+        folder_name = self.get_random_string()
+        dataframe = pd.DataFrame(
+            {
+                "time": np.linspace(0, 1, 1000),
+                "vin": np.linspace(-1, 1, 1000),
+                "i(v1)": np.linspace(-1e-3, 1e-3, 1000),
+                "l0": np.linspace(2e3, 200e3, 1000),
+            }
+        )
+        self.write_simulation_results_csv(
+            ModelsSimulationFolders.PERSHIN_SIMULATIONS,
+            folder_name,
+            self.get_random_string(),
+            dataframe,
+        )
+        url = f"/simulations/pershin_simulations/{folder_name}/series/"
+
+        response = self.client.get(url, {"columns": "vin,l0", "maxPoints": 100})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["columns"], ["time", "vin", "l0"])
+        self.assertEqual(response.data["totalPoints"], 1000)
+        self.assertLessEqual(response.data["returnedPoints"], 100)
+        self.assertEqual(len(response.data["series"]), 3)
+        self.assertEqual(
+            len(response.data["series"][0]), response.data["returnedPoints"]
+        )
+
+        response = self.client.get(
+            url, {"columns": "i(v1)", "maxPoints": 50, "responseFormat": "binary"}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "application/octet-stream")
+        self.assertEqual(response["X-Series-Columns"], "time,i(v1)")
+        self.assertEqual(
+            len(response.content), 2 * 4 * int(response["X-Series-Points"])
+        )
+
+    def test_simulation_series_view_errors(self):
+        folder_name = self.get_random_string()
+        self.write_simulation_results_csv(
+            ModelsSimulationFolders.PERSHIN_SIMULATIONS,
+            folder_name,
+            self.get_random_string(),
+            pd.DataFrame({"time": [0.0, 1.0], "vin": [0.0, 1.0]}),
+        )
+
+        response = self.client.get(
+            f"/simulations/pershin_simulations/{self.get_random_string()}/series/"
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        response = self.client.get(f"/simulations/invalid/{folder_name}/series/")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        response = self.client.get(
+            f"/simulations/pershin_simulations/{folder_name}/series/",
+            {"columns": "l0"},
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.get(
+            f"/simulations/pershin_simulations/{folder_name}/series/",
+            {"maxPoints": 1},
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_simulation_window_view(self):
+        folder_name = self.get_random_string()
+        dataframe = pd.DataFrame(
+            {
+                "time": np.linspace(0, 1, 1001),
+                "vin": np.linspace(-1, 1, 1001),
+                "l0": np.linspace(2e3, 200e3, 1001),
+                "l1": np.linspace(200e3, 2e3, 1001),
+            }
+        )
+        self.write_simulation_results_csv(
+            ModelsSimulationFolders.PERSHIN_SIMULATIONS,
+            folder_name,
+            self.get_random_string(),
+            dataframe,
+        )
+        url = f"/simulations/pershin_simulations/{folder_name}/window/"
+
+        response = self.client.get(url, {"columns": "l1", "t0": 0.1, "t1": 0.2})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "text/csv")
+        self.assertEqual(response["X-Series-Points"], "101")
+        window = pd.read_csv(BytesIO(response.content))
+        self.assertEqual(list(window.columns), ["time", "l1"])
+        self.assertAlmostEqual(window["time"].iloc[0], 0.1)
+        self.assertAlmostEqual(window["time"].iloc[-1], 0.2)
+
+        response = self.client.get(
+            url, {"columns": "l0", "t0": 0.5, "responseFormat": "binary"}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["X-Series-Points"], "501")
+        self.assertEqual(len(response.content), 2 * 4 * 501)
+
+        response = self.client.get(url, {"t0": 0.5, "t1": 0.1})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_sweep_simulation_view(self):
+        data = {
+            "base": {
+                "model": "pershin.sub",
+                "subcircuit": {
+                    "modelParameters": {
+                        "alpha": 0.0,
+                        "beta": 500000.0,
+                        "rinit": 200000.0,
+                        "roff": 200000.0,
+                        "ron": 2000.0,
+                        "vt": 0.6,
+                    },
+                },
+                "inputParameters": {
+                    "sourceNumber": 1,
+                    "nPlus": "vin",
+                    "nMinus": "gnd",
+                    "waveForm": {
+                        "type": "sin",
+                        "parameters": {"vo": 0.0, "amplitude": 1.0, "frequency": 1.0},
+                    },
+                },
+                "simulationParameters": {"tstep": 1e-3, "tstop": 1.0},
+                "exportParameters": {
+                    "modelSimulationFolder": "pershin_simulations",
+                    "folderName": "test_sweep",
+                    "fileName": "test_results",
+                    "magnitudes": ["vin", "i(v1)", "l0"],
+                },
+                "networkType": "SINGLE_DEVICE",
+                "networkParameters": {},
+                "plotTypes": ["IV"],
+            },
+            "parameters": [
+                {"path": "subcircuit.modelParameters.alpha", "values": [0, 1000]},
+                {
+                    "path": "subcircuit.modelParameters.vt",
+                    "start": 0.5,
+                    "stop": 0.7,
+                    "num": 3,
+                },
+            ],
+            "mode": "CARTESIAN",
+        }
+
+        with patch(
+            "memristorsimulation_app.services.sweepsimulationservice.SweepSimulationService.simulate"
+        ) as mock_simulate:
+            mock_simulate.return_value = []
+
+            response = self.client.post("/sweep/", data, format="json")
+
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response["Content-Type"], "application/zip")
+            self.assertIn("sweep_test_sweep", response["Content-Disposition"])
+            self.assertEqual(response["X-Simulation-Admission"], "ACCEPT")
+            mock_simulate.assert_called_once()
+
+            with zipfile.ZipFile(BytesIO(response.content), "r") as zip_file:
+                self.assertIn("sweep_index.csv", zip_file.namelist())
+
+        data["base"]["simulationParameters"]["tstop"] = 100
+        data["base"]["simulationParameters"]["tstep"] = 1e-9
+        with patch(
+            "memristorsimulation_app.services.sweepsimulationservice.SweepSimulationService.simulate"
+        ) as mock_simulate:
+            response = self.client.post("/sweep/", data, format="json")
+
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn("exceeds the budget", response.json()["ERROR"])
+            mock_simulate.assert_not_called()
+
+        data["parameters"][0]["path"] = "subcircuit.invalid.alpha"
+        response = self.client.post("/sweep/", data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        data["parameters"] = []
+        response = self.client.post("/sweep/", data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,116 @@
+import os
+import zipfile
+
+from io import BytesIO
+from unittest.mock import patch
+from memristorsimulation_app.constants import SIMULATIONS_DIR
+from memristorsimulation_app.services.archiveservice import ArchiveService
+from memristorsimulation_app.tests.basetestcase import BaseTestCase
+
+
+class ArchiveServiceTestCase(BaseTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+
+        self.folder_path = f"{SIMULATIONS_DIR}/{self.get_random_string()}"
+        os.makedirs(self.folder_path)
+
+    def _create_file(self, file_name: str, content: bytes) -> str:
+        file_path = f"{self.folder_path}/{file_name}"
+        with open(file_path, "wb") as f:
+            f.write(content)
+
+        return file_path
+
+    @staticmethod
+    def _create_zip(archive_service: ArchiveService, file_paths: list) -> BytesIO:
+        zip_buffer = BytesIO()
+        with zipfile.ZipFile(zip_buffer, "w") as zip_file:
+            archive_service.write_files(zip_file, file_paths)
+        zip_buffer.seek(0)
+
+        return zip_buffer
+
+    def test_get_compress_type(self):
+        archive_service = ArchiveService()
+
+        self.assertEqual(
+            archive_service.get_compress_type("figures/iv.jpg"), zipfile.ZIP_STORED
+        )
+        self.assertEqual(
+            archive_service.get_compress_type("figures/states.GIF"),
+            zipfile.ZIP_STORED,
+        )
+        self.assertEqual(
+            archive_service.get_compress_type("results.csv"), zipfile.ZIP_DEFLATED
+        )
+        self.assertEqual(
+            archive_service.get_compress_type("run.log"), zipfile.ZIP_DEFLATED
+        )
+
+    def test_write_files(self):
+        csv_content = b"time vin i(v1)\n" + b"0.0 1.0 2.0\n" * 1000
+        file_paths = [
+            (self._create_file("results.csv", csv_content), "results.csv"),
+            (self._create_file("iv.jpg", b"\xff\xd8jpeg"), "figures/iv.jpg"),
+            (f"{self.folder_path}/missing.log", "missing.log"),
+        ]
+
+        zip_buffer = self._create_zip(ArchiveService(deflate_level=5), file_paths)
+
+        with zipfile.ZipFile(zip_buffer) as zip_file:
+            self.assertEqual(zip_file.namelist(), ["results.csv", "figures/iv.jpg"])
+            self.assertEqual(
+                zip_file.getinfo("results.csv").compress_type, zipfile.ZIP_DEFLATED
+            )
+            self.assertEqual(
+                zip_file.getinfo("figures/iv.jpg").compress_type, zipfile.ZIP_STORED
+            )
+            self.assertEqual(zip_file.read("results.csv"), csv_content)
+
+    def test_write_files_in_parallel(self):
+        file_contents = {
+            f"results_{i}.csv": (f"{i} 0.5 1e-6\n" * (2000 + i)).encode()
+            for i in range(4)
+        }
+        file_paths = [
+            (self._create_file("figure.png", b"png"), "figures/figure.png")
+        ] + [
+            (self._create_file(file_name, content), file_name)
+            for file_name, content in file_contents.items()
+        ]
+        archive_service = ArchiveService(parallel_min_bytes=1024, max_workers=4)
+
+        with patch.object(
+            archive_service, "read_file", wraps=archive_service.read_file
+        ) as mock_read_file:
+            zip_buffer = self._create_zip(archive_service, file_paths)
+
+            self.assertEqual(mock_read_file.call_count, 4)
+
+        with zipfile.ZipFile(zip_buffer) as zip_file:
+            self.assertIsNone(zip_file.testzip())
+            self.assertEqual(
+                zip_file.namelist(), ["figures/figure.png"] + list(file_contents)
+            )
+            for file_name, content in file_contents.items():
+                self.assertEqual(zip_file.read(file_name), content)
+                self.assertLess(zip_file.getinfo(file_name).compress_size, len(content))
+
+    def test_write_files_in_parallel_with_repeated_archive_names(self):
+        first_content = b"0 0.5 1e-6\n" * 2000
+        second_content = b"1 0.7 2e-6\n" * 2000
+        file_paths = [
+            (self._create_file("first.csv", first_content), "results.csv"),
+            (self._create_file("second.csv", second_content), "results.csv"),
+        ]
+        archive_service = ArchiveService(parallel_min_bytes=1024, max_workers=2)
+
+        with self.assertWarns(UserWarning):
+            zip_buffer = self._create_zip(archive_service, file_paths)
+
+        with zipfile.ZipFile(zip_buffer) as zip_file:
+            self.assertEqual(
+                [zip_file.open(zip_info).read() for zip_info in zip_file.infolist()],
+                [first_content, second_content],
+            )
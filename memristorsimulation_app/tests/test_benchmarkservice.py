@@ -0,0 +1,117 @@
+import json
+import os
+import shutil
+import tempfile
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from memristorsimulation_app.representations import BenchmarkResult
+from memristorsimulation_app.services.benchmarkservice import BenchmarkService
+from memristorsimulation_app.tests.basetestcase import BaseTestCase
+
+
+class BenchmarkServiceTestCase(BaseTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+
+        output_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, output_dir, ignore_errors=True)
+        self.output_path = f"{output_dir}/benchmark.json"
+
+    def test_run(self):
+        benchmark_service = BenchmarkService(
+            sizes=[2, 3],
+            amount_points=20,
+            repeats=2,
+            stages=["network", "circuit_file", "csv_load", "plot:IV", "zip"],
+        )
+
+        results = benchmark_service.run()
+
+        self.assertEqual(
+            [(result.stage, result.size) for result in results if result.size == 2],
+            [
+                ("network:GRID_2D_GRAPH", 2),
+                ("network:RANDOM_REGULAR_GRAPH", 2),
+                ("network:WATTS_STROGATZ_GRAPH", 2),
+                ("circuit_file", 2),
+                ("csv_load", 2),
+                ("plot:IV", 2),
+                ("zip", 2),
+            ],
+        )
+        self.assertTrue(all(len(result.times) == 2 for result in results))
+        # Benchmark runs are removed once measured
+        self.assertFalse(
+            any(
+                os.path.exists(simulation_folder_path)
+                for simulation_folder_path in benchmark_service.simulation_folder_paths
+            )
+        )
+
+    def test_should_run(self):
+        benchmark_service = BenchmarkService(stages=["network", "plot:IV"])
+
+        self.assertTrue(benchmark_service.should_run("network:GRID_2D_GRAPH"))
+        self.assertTrue(benchmark_service.should_run("plot:IV"))
+        self.assertFalse(benchmark_service.should_run("plot:IV_ANIMATED"))
+        self.assertFalse(benchmark_service.should_run("zip"))
+        self.assertTrue(BenchmarkService().should_run("zip"))
+
+    def test_compare(self):
+        baseline = {
+            "results": [
+                {"stage": "zip", "size": 3, "median_ms": 10.0},
+                {"stage": "csv_load", "size": 3, "median_ms": 10.0},
+                {"stage": "circuit_file", "size": 3, "median_ms": 0.1},
+            ]
+        }
+        results = [
+            BenchmarkResult(stage="zip", size=3, times=[14.0, 15.0, 16.0]),
+            BenchmarkResult(stage="csv_load", size=3, times=[10.5]),
+            # Over the threshold but under MIN_REGRESSION_MS
+            BenchmarkResult(stage="circuit_file", size=3, times=[0.5]),
+            BenchmarkResult(stage="plot:IV", size=3, times=[100.0]),
+        ]
+
+        regressions = BenchmarkService.compare(results, baseline, threshold=0.2)
+
+        self.assertEqual(len(regressions), 1)
+        self.assertEqual(regressions[0].stage, "zip")
+        self.assertEqual(regressions[0].get_ratio(), 1.5)
+
+    def test_benchmark_command(self):
+        call_command(
+            "benchmark",
+            sizes=[2],
+            points=20,
+            repeats=1,
+            stages=["circuit_file"],
+            output=self.output_path,
+            stdout=open(os.devnull, "w"),
+        )
+
+        with open(self.output_path, "r") as f:
+            benchmark = json.load(f)
+        self.assertEqual(benchmark["amount_points"], 20)
+        self.assertEqual(
+            [(result["stage"], result["size"]) for result in benchmark["results"]],
+            [("circuit_file", 2)],
+        )
+
+        benchmark["results"][0]["median_ms"] = -10.0
+        baseline_path = f"{os.path.dirname(self.output_path)}/baseline.json"
+        with open(baseline_path, "w") as f:
+            json.dump(benchmark, f)
+
+        with self.assertRaises(CommandError):
+            call_command(
+                "benchmark",
+                sizes=[2],
+                points=20,
+                repeats=1,
+                stages=["circuit_file"],
+                output=self.output_path,
+                baseline=baseline_path,
+                stdout=open(os.devnull, "w"),
+            )
@@ -1,4 +1,23 @@
-from memristorsimulation_app.constants import MemristorModels
+import os
+import shutil
+import tempfile
+
+from django.test import override_settings
+from memristorsimulation_app.constants import (
+    AnalysisType,
+    MemristorModels,
+    OutputDecimation,
+)
+from memristorsimulation_app.representations import (
+    AlternatingPulseWaveForm,
+    InputParameters,
+    SimulationParameters,
+)
+from memristorsimulation_app.services.circuitfileservice import (
+    CircuitFileService,
+    TooManyDecimationMagnitudes,
+    UnsupportedDecimationMagnitude,
+)
 from memristorsimulation_app.tests.basetestcase import BaseTestCase
 
 
@@ -28,7 +47,7 @@ class CircuitFileServiceTestCase(BaseTestCase):
 
         # Dependencies
         self.assertIn(
-            f".include {circuit_file_service.directories_management_service.get_subcircuit_file_path()}",
+            f".include {MemristorModels.PERSHIN.value}",
             content,
         )
 
@@ -59,7 +78,174 @@ class CircuitFileServiceTestCase(BaseTestCase):
             f"{circuit_file_service.directories_management_service.export_parameters.get_export_magnitudes()}",
             content,
         )
+        self.assertIn("rusage all", content)
 
         self.assertIn("quit", content)
         self.assertIn(".endc", content)
         self.assertIn(".end", content)
+
+    def test_write_circuit_file_with_auto_step(self):
+        subcircuit_file_service = self.create_subcircuit_file_service(
+            MemristorModels.PERSHIN
+        )
+        subcircuit_file_service.write_subcircuit_file()
+        template_circuit_file_service = self.create_circuit_file_service(
+            subcircuit_file_service=subcircuit_file_service
+        )
+        input_parameters = InputParameters(
+            source_number=1,
+            n_plus="vin",
+            n_minus="0",
+            wave_form=AlternatingPulseWaveForm(
+                v1=0, v2=[1, -1], tr=1e-4, tf=1e-4, pw=2e-3, per=1e-2
+            ),
+        )
+
+        circuit_file_service = CircuitFileService(
+            subcircuit_file_service,
+            input_parameters,
+            template_circuit_file_service.device_parameters,
+            SimulationParameters(AnalysisType.TRAN, None, 2e-2, auto_step=True),
+            template_circuit_file_service.directories_management_service,
+        )
+        circuit_file_service.write_circuit_file()
+
+        content = self.open_file(
+            circuit_file_service.directories_management_service.get_circuit_file_path()
+        )
+
+        # Shortest plateau is the 2 ms pulse width, 20 points per plateau
+        self.assertAlmostEqual(circuit_file_service.simulation_parameters.tstep, 1e-4)
+        self.assertAlmostEqual(circuit_file_service.simulation_parameters.tmax, 1e-4)
+        self.assertIn(
+            circuit_file_service.simulation_parameters.get_analysis(), content
+        )
+
+    @override_settings(SIMULATION_NGSPICE_RUSAGE=False)
+    def test_write_circuit_file_without_rusage(self):
+        subcircuit_file_service = self.create_subcircuit_file_service(
+            MemristorModels.PERSHIN
+        )
+        subcircuit_file_service.write_subcircuit_file()
+
+        circuit_file_service = self.create_circuit_file_service(
+            subcircuit_file_service=subcircuit_file_service
+        )
+        circuit_file_service.write_circuit_file()
+
+        content = self.open_file(
+            circuit_file_service.directories_management_service.get_circuit_file_path()
+        )
+        self.assertNotIn("rusage", content)
+
+    def test_write_circuit_file_include_survives_promotion(self):
+        scratch_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, scratch_dir, ignore_errors=True)
+        subcircuit_file_service = self.create_subcircuit_file_service(
+            MemristorModels.PERSHIN
+        )
+        circuit_file_service = self.create_circuit_file_service(
+            subcircuit_file_service=subcircuit_file_service
+        )
+        # The run writes both files into one scratch run folder
+        directories_management_service = self.create_directories_management_service(
+            MemristorModels.PERSHIN
+        )
+        directories_management_service.create_workspace(scratch_dir=scratch_dir)
+        subcircuit_file_service.directories_management_service = (
+            directories_management_service
+        )
+        subcircuit_file_service.model_file_path = (
+            directories_management_service.get_subcircuit_file_path()
+        )
+        circuit_file_service.directories_management_service = (
+            directories_management_service
+        )
+        subcircuit_file_service.write_subcircuit_file()
+        circuit_file_service.write_circuit_file()
+
+        simulation_folder_path = directories_management_service.promote_workspace()
+
+        content = self.open_file(directories_management_service.get_circuit_file_path())
+        include_line = next(
+            line for line in content.splitlines() if line.startswith(".include ")
+        )
+        included_file_path = os.path.join(
+            simulation_folder_path, include_line.removeprefix(".include ")
+        )
+        self.assertTrue(os.path.isfile(included_file_path))
+        self.assertNotIn(scratch_dir, include_line)
+
+    def _write_circuit_file_with_decimation(
+        self, output_decimation: OutputDecimation, **decimation_parameters
+    ) -> str:
+        subcircuit_file_service = self.create_subcircuit_file_service(
+            MemristorModels.PERSHIN
+        )
+        subcircuit_file_service.write_subcircuit_file()
+        circuit_file_service = self.create_circuit_file_service(
+            subcircuit_file_service=subcircuit_file_service
+        )
+        export_parameters = (
+            circuit_file_service.directories_management_service.export_parameters
+        )
+        export_parameters.magnitudes = ["vin", "i(v1)", "v(x)"]
+        export_parameters.output_decimation = output_decimation
+        for name, value in decimation_parameters.items():
+            setattr(export_parameters, name, value)
+
+        circuit_file_service.write_circuit_file()
+
+        return self.open_file(
+            circuit_file_service.directories_management_service.get_circuit_file_path()
+        )
+
+    def test_write_circuit_file_with_linearize(self):
+        content = self._write_circuit_file_with_decimation(OutputDecimation.LINEARIZE)
+
+        self.assertIn("linearize\nwrdata", content)
+        self.assertNotIn("setplot new", content)
+
+    def test_write_circuit_file_with_every_nth_decimation(self):
+        content = self._write_circuit_file_with_decimation(
+            OutputDecimation.EVERY_NTH, decimation_factor=10
+        )
+
+        self.assertIn("let dvec1 = i(v1)\n", content)
+        self.assertIn("let m = floor((n - 1) / 10) + 1\n", content)
+        self.assertIn("let dtime[i] = time[i * 10]\n", content)
+        self.assertIn("setplot new\nlet time = tran1.dtime\n", content)
+        self.assertIn("let vin = interpolate(tran1.dvec0)\n", content)
+        self.assertIn("let v1#branch = interpolate(tran1.dvec1)\n", content)
+        self.assertIn("let x = interpolate(tran1.dvec2)\n", content)
+        # The decimated plot is written under the requested magnitudes
+        self.assertLess(content.index("let x = interpolate"), content.index("wrdata"))
+        self.assertIn(" vin i(v1) v(x)\n", content)
+
+    def test_write_circuit_file_with_tolerance_decimation(self):
+        content = self._write_circuit_file_with_decimation(
+            OutputDecimation.TOLERANCE, decimation_tolerance=0.001
+        )
+
+        self.assertIn("let dtol2 = 0.001 * (vecmax(dvec2) - vecmin(dvec2))\n", content)
+        self.assertIn(
+            "let keep = keep + (abs(dvec1[i] - dvec1[last]) gt dtol1)\n", content
+        )
+        self.assertIn("let dtime = dtime[0, m - 1]\n", content)
+        self.assertIn("let v1#branch = interpolate(tran1.dvec1)\n", content)
+
+    @override_settings(SIMULATION_DECIMATION_TOLERANCE_MAX_MAGNITUDES=2)
+    def test_write_circuit_file_with_too_many_tolerance_magnitudes(self):
+        with self.assertRaises(TooManyDecimationMagnitudes):
+            self._write_circuit_file_with_decimation(
+                OutputDecimation.TOLERANCE, decimation_tolerance=0.001
+            )
+
+    def test_get_vector_name(self):
+        self.assertEqual(CircuitFileService.get_vector_name("vin"), "vin")
+        self.assertEqual(CircuitFileService.get_vector_name("l12"), "l12")
+        self.assertEqual(CircuitFileService.get_vector_name("i(v1)"), "v1#branch")
+        self.assertEqual(CircuitFileService.get_vector_name("v(x)"), "x")
+
+        with self.assertRaises(UnsupportedDecimationMagnitude):
+            CircuitFileService.get_vector_name("v(a,b)")
@@ -0,0 +1,345 @@
+import asyncio
+import os
+import threading
+import time
+
+from io import StringIO
+from unittest.mock import patch
+from django.core.management import call_command
+from memristorsimulation_app.constants import (
+    SIMULATIONS_DIR,
+    AdmissionDecision,
+    AnalysisType,
+    MemristorModels,
+    ModelsSimulationFolders,
+    NetworkType,
+)
+from memristorsimulation_app.representations import (
+    ExportParameters,
+    NetworkParameters,
+    SimulationCostFeatures,
+    SimulationInputs,
+    SimulationParameters,
+)
+from memristorsimulation_app.services.admissioncontrolservice import (
+    AdmissionControlService,
+)
+from memristorsimulation_app.services.costestimatorservice import CostEstimatorService
+from memristorsimulation_app.tests.basetestcase import BaseTestCase
+
+
+class CostEstimatorServiceTestCase(BaseTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+
+        self.model_folder_path = (
+            f"{SIMULATIONS_DIR}/{ModelsSimulationFolders.PERSHIN_SIMULATIONS.value}"
+        )
+
+    @staticmethod
+    def _get_simulation_inputs(
+        network_type: NetworkType = NetworkType.GRID_2D_GRAPH,
+        n: int = 4,
+        m: int = 4,
+        tstep: float = 1e-9,
+        tstop: float = 1e-6,
+        amount_iterations: int = 1,
+    ) -> SimulationInputs:
+        return SimulationInputs(
+            model=MemristorModels.PERSHIN,
+            subcircuit=None,
+            input_parameters=None,
+            simulation_parameters=SimulationParameters(
+                analysis_type=AnalysisType.TRAN, tstep=tstep, tstop=tstop
+            ),
+            export_parameters=ExportParameters(
+                ModelsSimulationFolders.PERSHIN_SIMULATIONS,
+                "folder",
+                "file",
+                ["v(vin)", "i(v1)", "v(x)"],
+            ),
+            network_type=network_type,
+            network_parameters=NetworkParameters(n=n, m=m),
+            amount_iterations=amount_iterations,
+        )
+
+    def _create_timed_run(
+        self,
+        folder_name: str,
+        amount_edges: int,
+        tstop: float,
+        execution_times_ms: list,
+        model: str = "pershin.sub",
+    ) -> str:
+        folder_path = f"{self.model_folder_path}/{folder_name}"
+        os.makedirs(folder_path)
+        with open(f"{folder_path}/{folder_name}_circuit_file.cir", "w") as f:
+            f.write(f"* MEMRISTOR CIRCUIT - MODEL {model}\n\n")
+            f.write(".include ../../models/pershin.sub\n\n")
+            f.write("v1 vin 0 sin(0 1 1000 0 0 0)\n\n")
+            for edge in range(amount_edges):
+                f.write(f"xmem{edge} n{edge} n{edge + 1} 0 memristor\n")
+            f.write(f"\n.tran 1e-09 {tstop} 0 1e-06 uic\n\n")
+            f.write(".control\nrun\nwrdata results.csv vin i(v1) l0\n.endc\n.end\n")
+        with open(f"{folder_path}/{folder_name}.log", "w") as f:
+            for execution_time in execution_times_ms:
+                f.write(f"# python_execution_time = {execution_time} ms\n")
+
+        return folder_path
+
+    def test_get_features(self):
+        single_device_features = CostEstimatorService.get_features(
+            self._get_simulation_inputs(network_type=NetworkType.SINGLE_DEVICE)
+        )
+        grid_features = CostEstimatorService.get_features(
+            self._get_simulation_inputs(amount_iterations=3)
+        )
+
+        self.assertEqual(single_device_features.amount_edges, 1)
+        self.assertEqual(grid_features.amount_edges, 24)
+        self.assertAlmostEqual(grid_features.amount_timepoints, 1000)
+        self.assertEqual(grid_features.amount_magnitudes, 3)
+        self.assertEqual(grid_features.amount_iterations, 3)
+
+    def test_estimate_time_ms(self):
+        cost_estimator_service = CostEstimatorService(
+            CostEstimatorService.DEFAULT_COST_MODEL
+        )
+        small_features = SimulationCostFeatures(
+            model=MemristorModels.PERSHIN,
+            amount_edges=24,
+            amount_timepoints=1000,
+            amount_magnitudes=3,
+        )
+        large_features = SimulationCostFeatures(
+            model=MemristorModels.PERSHIN,
+            amount_edges=240,
+            amount_timepoints=1000,
+            amount_magnitudes=3,
+            amount_iterations=2,
+        )
+
+        small_estimate = cost_estimator_service.estimate_time_ms(small_features)
+        large_estimate = cost_estimator_service.estimate_time_ms(large_features)
+
+        self.assertGreater(small_estimate, 0)
+        self.assertAlmostEqual(large_estimate, 20 * small_estimate)
+
+    def test_parse_simulation_folder(self):
+        folder_path = self._create_timed_run("run", 12, 1e-6, [30, 10, 20])
+
+        features, execution_time = CostEstimatorService.parse_simulation_folder(
+            folder_path
+        )
+
+        self.assertEqual(features.model, MemristorModels.PERSHIN)
+        self.assertEqual(features.amount_edges, 12)
+        self.assertAlmostEqual(features.amount_timepoints, 1000)
+        self.assertEqual(features.amount_magnitudes, 3)
+        self.assertEqual(execution_time, 20)
+
+        os.makedirs(f"{self.model_folder_path}/untimed")
+        self.assertIsNone(
+            CostEstimatorService.parse_simulation_folder(
+                f"{self.model_folder_path}/untimed"
+            )
+        )
+
+    def test_fit(self):
+        # Synthetic runs following time = 0.01 * edges^1.5 * timepoints
+        for run, (amount_edges, tstop) in enumerate(
+            (amount_edges, tstop)
+            for amount_edges in [4, 16, 64, 256]
+            for tstop in [1e-6, 1e-5, 1e-4]
+        ):
+            execution_time = 0.01 * amount_edges**1.5 * tstop / 1e-9
+            self._create_timed_run(f"run_{run}", amount_edges, tstop, [execution_time])
+
+        cost_estimator_service = CostEstimatorService(
+            CostEstimatorService.DEFAULT_COST_MODEL
+        )
+        cost_model = cost_estimator_service.fit()
+
+        self.assertEqual(cost_model.amount_samples, 12)
+        self.assertAlmostEqual(cost_model.edges_exponent, 1.5, delta=0.05)
+        self.assertAlmostEqual(cost_model.timepoints_exponent, 1.0, delta=0.05)
+
+    def test_fit_not_enough_samples(self):
+        self._create_timed_run("run", 12, 1e-6, [20])
+        cost_estimator_service = CostEstimatorService(
+            CostEstimatorService.DEFAULT_COST_MODEL
+        )
+
+        cost_model = cost_estimator_service.fit()
+
+        self.assertEqual(cost_model, CostEstimatorService.DEFAULT_COST_MODEL)
+
+    def test_save_and_load_cost_model(self):
+        self.assertEqual(
+            CostEstimatorService.load_cost_model(),
+            CostEstimatorService.DEFAULT_COST_MODEL,
+        )
+        samples = [
+            (
+                SimulationCostFeatures(
+                    model=MemristorModels.PERSHIN,
+                    amount_edges=amount_edges,
+                    amount_timepoints=1000,
+                    amount_magnitudes=3,
+                ),
+                float(amount_edges),
+            )
+            for amount_edges in range(1, 20)
+        ]
+        cost_estimator_service = CostEstimatorService(
+            CostEstimatorService.DEFAULT_COST_MODEL
+        )
+        cost_model = cost_estimator_service.fit(samples)
+
+        cost_estimator_service.save_cost_model()
+
+        self.assertEqual(CostEstimatorService.load_cost_model(), cost_model)
+
+    def test_fit_cost_model_command(self):
+        for run in range(CostEstimatorService.MIN_FIT_SAMPLES):
+            self._create_timed_run(f"run_{run}", run + 1, 1e-6, [run + 1])
+        stdout = StringIO()
+
+        call_command("fit_cost_model", "--dry-run", stdout=stdout)
+
+        self.assertIn("# amount_samples = 10", stdout.getvalue())
+        self.assertFalse(os.path.exists(CostEstimatorService.COST_MODEL_FILE_PATH))
+
+        call_command("fit_cost_model", stdout=StringIO())
+
+        self.assertEqual(CostEstimatorService.load_cost_model().amount_samples, 10)
+
+
+class AdmissionControlServiceTestCase(BaseTestCase):
+    @patch.multiple(
+        "memristorsimulation_app.services.admissioncontrolservice.settings",
+        SIMULATION_COST_WARN_SECONDS=1,
+        SIMULATION_COST_LOW_PRIORITY_SECONDS=10,
+        SIMULATION_COST_REJECT_SECONDS=100,
+    )
+    def test_get_decision(self):
+        self.assertEqual(
+            AdmissionControlService.get_decision(500), AdmissionDecision.ACCEPT
+        )
+        self.assertEqual(
+            AdmissionControlService.get_decision(5000), AdmissionDecision.WARN
+        )
+        self.assertEqual(
+            AdmissionControlService.get_decision(50000),
+            AdmissionDecision.LOW_PRIORITY,
+        )
+        self.assertEqual(
+            AdmissionControlService.get_decision(500000), AdmissionDecision.REJECT
+        )
+
+    @patch.multiple(
+        "memristorsimulation_app.services.admissioncontrolservice.settings",
+        SIMULATION_COST_WARN_SECONDS=0,
+        SIMULATION_COST_LOW_PRIORITY_SECONDS=0,
+        SIMULATION_COST_REJECT_SECONDS=0,
+    )
+    def test_get_decision_disabled_budgets(self):
+        self.assertEqual(
+            AdmissionControlService.get_decision(1e12), AdmissionDecision.ACCEPT
+        )
+
+    def test_evaluate(self):
+        simulation_inputs = CostEstimatorServiceTestCase._get_simulation_inputs()
+
+        cost_estimate = AdmissionControlService(
+            simulation_inputs,
+            CostEstimatorService(CostEstimatorService.DEFAULT_COST_MODEL),
+        ).evaluate()
+
+        self.assertEqual(cost_estimate.features.amount_edges, 24)
+        self.assertGreater(cost_estimate.estimated_time_ms, 0)
+        self.assertEqual(cost_estimate.decision, AdmissionDecision.ACCEPT)
+
+    def test_evaluate_batch(self):
+        cost_estimator_service = CostEstimatorService(
+            CostEstimatorService.DEFAULT_COST_MODEL
+        )
+        small_inputs = CostEstimatorServiceTestCase._get_simulation_inputs(
+            network_type=NetworkType.SINGLE_DEVICE
+        )
+        grid_inputs = CostEstimatorServiceTestCase._get_simulation_inputs()
+
+        cost_estimate = AdmissionControlService.evaluate_batch(
+            [small_inputs, grid_inputs, grid_inputs], cost_estimator_service
+        )
+
+        grid_estimate = AdmissionControlService(
+            grid_inputs, cost_estimator_service
+        ).evaluate()
+        small_estimate = AdmissionControlService(
+            small_inputs, cost_estimator_service
+        ).evaluate()
+        self.assertAlmostEqual(
+            cost_estimate.estimated_time_ms,
+            small_estimate.estimated_time_ms + 2 * grid_estimate.estimated_time_ms,
+        )
+        self.assertEqual(cost_estimate.features.amount_edges, 24)
+
+        with patch(
+            "memristorsimulation_app.services.admissioncontrolservice.settings.SIMULATION_COST_REJECT_SECONDS",
+            grid_estimate.estimated_time_ms * 1.5 / 1000,
+        ):
+            self.assertEqual(
+                AdmissionControlService.evaluate_batch(
+                    [grid_inputs, grid_inputs], cost_estimator_service
+                ).decision,
+                AdmissionDecision.REJECT,
+            )
+
+        with self.assertRaises(ValueError):
+            AdmissionControlService.evaluate_batch([], cost_estimator_service)
+
+    @patch(
+        "memristorsimulation_app.services.admissioncontrolservice.settings.SIMULATION_LOW_PRIORITY_SLOTS",
+        1,
+    )
+    @patch.object(AdmissionControlService, "SLOT_POLL_INTERVAL", 0.05)
+    def test_low_priority_slot_blocking(self):
+        running_times = []
+
+        def run_low_priority():
+            with AdmissionControlService.low_priority_slot_blocking():
+                start_time = time.time()
+                time.sleep(0.2)
+                running_times.append((start_time, time.time()))
+
+        threads = [threading.Thread(target=run_low_priority) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        (first_start, first_end), (second_start, second_end) = sorted(running_times)
+        self.assertGreaterEqual(second_start, first_end)
+
+    @patch(
+        "memristorsimulation_app.services.admissioncontrolservice.settings.SIMULATION_LOW_PRIORITY_SLOTS",
+        1,
+    )
+    @patch.object(AdmissionControlService, "SLOT_POLL_INTERVAL", 0.05)
+    def test_low_priority_slot(self):
+        running_times = []
+
+        async def run_low_priority():
+            async with AdmissionControlService.low_priority_slot():
+                start_time = time.time()
+                await asyncio.sleep(0.2)
+                running_times.append((start_time, time.time()))
+
+        async def run_concurrently():
+            await asyncio.gather(run_low_priority(), run_low_priority())
+
+        asyncio.run(run_concurrently())
+
+        (first_start, first_end), (second_start, second_end) = sorted(running_times)
+        self.assertGreaterEqual(second_start, first_end)
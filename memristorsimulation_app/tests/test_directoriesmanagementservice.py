@@ -1,14 +1,18 @@
 import os
+import shutil
+import tempfile
 
 from pyparsing import Optional
 from memristorsimulation_app.constants import (
     SIMULATIONS_DIR,
+    ArtifactStage,
     MemristorModels,
     ModelsSimulationFolders,
 )
 from memristorsimulation_app.representations import ExportParameters
 from memristorsimulation_app.services.directoriesmanagementservice import (
     DirectoriesManagementService,
+    WorkspaceAlreadyExists,
 )
 from memristorsimulation_app.tests.basetestcase import BaseTestCase
 
@@ -82,12 +86,14 @@ class DirectoriesManagementServiceTestCase(BaseTestCase):
         )
 
         expected_dir = f"{SIMULATIONS_DIR}/{export_params.model_simulation_folder.value}/{export_params.folder_name}/figures"
-        self.assertFalse(os.path.exists(expected_dir))
 
-        figs_dir = dms.get_or_create_figures_directory()
+        figs_dir = dms.get_figures_directory_path()
 
         self.assertEqual(figs_dir, expected_dir)
-        self.assertTrue(os.path.exists(expected_dir))
+        self.assertFalse(os.path.exists(expected_dir))
+
+        dms.create_workspace()
+
         self.assertTrue(os.path.isdir(expected_dir))
 
     def test_get_circuit_file_path(self):
@@ -138,7 +144,7 @@ class DirectoriesManagementServiceTestCase(BaseTestCase):
             export_file_path = dsm.get_export_simulation_file_path()
 
             self.assertEqual(export_file_path, expected_path)
-            self.assertTrue(os.path.exists(os.path.dirname(export_file_path)))
+            self.assertFalse(os.path.exists(os.path.dirname(export_file_path)))
 
     def test_get_simulation_log_file_path(self):
         for model, model_sim_folder in zip(MemristorModels, ModelsSimulationFolders):
@@ -188,3 +194,195 @@ class DirectoriesManagementServiceTestCase(BaseTestCase):
             dir_and_file = dsm.get_subcircuit_dir_and_file_name()
 
             self.assertEqual(dir_and_file, expected_path)
+
+    def _create_simulation_folder(self) -> DirectoriesManagementService:
+        directories_management_service = DirectoriesManagementService(
+            model=MemristorModels.PERSHIN,
+            export_parameters=self._create_export_parameters(
+                ModelsSimulationFolders.PERSHIN_SIMULATIONS
+            ),
+        )
+        directories_management_service.create_simulation_parameter_folder_if_not_exist(
+            ModelsSimulationFolders.PERSHIN_SIMULATIONS
+        )
+
+        return directories_management_service
+
+    def test_register_artifact(self):
+        directories_management_service = self._create_simulation_folder()
+        simulation_folder_path = (
+            directories_management_service.get_simulation_folder_path()
+        )
+        circuit_file_path = directories_management_service.get_circuit_file_path()
+        figure_path = f"{simulation_folder_path}/figures/iv.jpg"
+
+        directories_management_service.register_artifact(
+            circuit_file_path, ArtifactStage.CIRCUIT
+        )
+        directories_management_service.register_artifact(
+            figure_path, ArtifactStage.FIGURE
+        )
+        directories_management_service.register_artifact(
+            circuit_file_path, ArtifactStage.CIRCUIT
+        )
+
+        self.assertEqual(
+            DirectoriesManagementService.read_manifest(simulation_folder_path),
+            ["pershin_circuit_file.cir", "figures/iv.jpg"],
+        )
+
+    def test_read_manifest_truncated_line(self):
+        directories_management_service = self._create_simulation_folder()
+        simulation_folder_path = (
+            directories_management_service.get_simulation_folder_path()
+        )
+        directories_management_service.register_artifact(
+            directories_management_service.get_circuit_file_path(),
+            ArtifactStage.CIRCUIT,
+        )
+        with open(
+            f"{simulation_folder_path}/{DirectoriesManagementService.MANIFEST_FILE_NAME}",
+            "a",
+        ) as f:
+            f.write('{"path": "figu')
+
+        self.assertEqual(
+            DirectoriesManagementService.read_manifest(simulation_folder_path),
+            ["pershin_circuit_file.cir"],
+        )
+
+    def test_get_run_files(self):
+        directories_management_service = self._create_simulation_folder()
+        simulation_folder_path = (
+            directories_management_service.get_simulation_folder_path()
+        )
+        directories_management_service.register_artifact(
+            f"{simulation_folder_path}/results.csv", ArtifactStage.RESULTS
+        )
+        directories_management_service.register_artifact(
+            f"{simulation_folder_path}/.columns/results/0.npy", ArtifactStage.INDEX
+        )
+        # Files left out of the manifest are not part of the run
+        with open(f"{simulation_folder_path}/unregistered.txt", "w") as f:
+            f.write("unregistered")
+
+        self.assertEqual(
+            DirectoriesManagementService.get_run_files(simulation_folder_path),
+            [
+                "results.csv",
+                ".columns/results/0.npy",
+                DirectoriesManagementService.MANIFEST_FILE_NAME,
+            ],
+        )
+        self.assertEqual(
+            directories_management_service.get_all_simulation_files(),
+            [(f"{simulation_folder_path}/results.csv", "results.csv")],
+        )
+
+    def test_get_run_files_without_manifest(self):
+        directories_management_service = self._create_simulation_folder()
+        simulation_folder_path = (
+            directories_management_service.get_simulation_folder_path()
+        )
+        os.makedirs(f"{simulation_folder_path}/figures")
+        os.makedirs(f"{simulation_folder_path}/.columns")
+        for relative_path in ["results.csv", "figures/iv.jpg", ".columns/index.json"]:
+            with open(f"{simulation_folder_path}/{relative_path}", "w") as f:
+                f.write(relative_path)
+
+        self.assertEqual(
+            sorted(DirectoriesManagementService.get_run_files(simulation_folder_path)),
+            [".columns/index.json", "figures/iv.jpg", "results.csv"],
+        )
+        self.assertEqual(
+            sorted(
+                archive_name
+                for _, archive_name in directories_management_service.get_all_simulation_files()
+            ),
+            ["figures/iv.jpg", "results.csv"],
+        )
+
+    def test_export_parameters_run_folder(self):
+        first_export_params = ExportParameters(
+            ModelsSimulationFolders.PERSHIN_SIMULATIONS, "run", "results", []
+        )
+        second_export_params = ExportParameters(
+            ModelsSimulationFolders.PERSHIN_SIMULATIONS, "run", "results", []
+        )
+        shared_export_params = ExportParameters(
+            ModelsSimulationFolders.PERSHIN_SIMULATIONS,
+            "run",
+            "vin_2",
+            [],
+            run_id=first_export_params.run_id,
+        )
+
+        self.assertNotEqual(
+            first_export_params.folder_name, second_export_params.folder_name
+        )
+        self.assertEqual(
+            first_export_params.folder_name, shared_export_params.folder_name
+        )
+        self.assertEqual(
+            first_export_params.folder_name, f"run_{first_export_params.run_id}"
+        )
+
+    def test_create_workspace(self):
+        directories_management_service = DirectoriesManagementService(
+            model=MemristorModels.PERSHIN,
+            export_parameters=self._create_export_parameters(
+                ModelsSimulationFolders.PERSHIN_SIMULATIONS
+            ),
+        )
+
+        simulation_folder_path = directories_management_service.create_workspace()
+
+        self.assertTrue(os.path.isdir(simulation_folder_path))
+        self.assertEqual(
+            os.path.dirname(directories_management_service.get_circuit_file_path()),
+            simulation_folder_path,
+        )
+        with self.assertRaises(WorkspaceAlreadyExists):
+            directories_management_service.create_workspace()
+        self.assertEqual(
+            directories_management_service.create_workspace(exist_ok=True),
+            simulation_folder_path,
+        )
+
+    def test_promote_workspace(self):
+        scratch_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, scratch_dir, ignore_errors=True)
+        directories_management_service = DirectoriesManagementService(
+            model=MemristorModels.PERSHIN,
+            export_parameters=self._create_export_parameters(
+                ModelsSimulationFolders.PERSHIN_SIMULATIONS
+            ),
+        )
+        scratch_folder_path = directories_management_service.create_workspace(
+            scratch_dir=scratch_dir
+        )
+        circuit_file_path = directories_management_service.get_circuit_file_path()
+        with open(circuit_file_path, "w") as f:
+            f.write(".end\n")
+        directories_management_service.register_artifact(
+            circuit_file_path, ArtifactStage.CIRCUIT
+        )
+        with open(f"{scratch_folder_path}/unregistered.raw", "w") as f:
+            f.write("unregistered")
+
+        simulation_folder_path = directories_management_service.promote_workspace()
+
+        self.assertFalse(directories_management_service.is_scratch_workspace())
+        self.assertFalse(os.path.exists(scratch_folder_path))
+        self.assertEqual(
+            sorted(os.listdir(simulation_folder_path)),
+            [
+                DirectoriesManagementService.MANIFEST_FILE_NAME,
+                DirectoriesManagementService.FIGURES_DIR_NAME,
+                "pershin_circuit_file.cir",
+            ],
+        )
+        self.assertEqual(
+            directories_management_service.get_circuit_file_path(),
+            f"{simulation_folder_path}/pershin_circuit_file.cir",
+        )
@@ -0,0 +1,278 @@
+import asyncio
+import copy
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import pandas as pd
+
+from django.conf import settings
+from django.test import override_settings
+from unittest import skipIf
+from unittest.mock import patch
+from memristorsimulation_app.constants import (
+    FAKE_NGSPICE_EXECUTABLE,
+    OutputDecimation,
+    PlotType,
+)
+from memristorsimulation_app.services.metricsservice import MetricsService
+from memristorsimulation_app.services.ngspiceservice import (
+    AsyncNGSpiceService,
+    NGSpiceService,
+)
+from memristorsimulation_app.services.simulationservice import SimulationService
+from memristorsimulation_app.tests.basetestcase import BaseTestCase
+
+
+class FakeNGSpiceTestCase(BaseTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+
+        self.request_parameters = {
+            "model": "pershin.sub",
+            "subcircuit": {
+                "model_parameters": {
+                    "alpha": 0.0,
+                    "beta": 500000.0,
+                    "rinit": 200000.0,
+                    "roff": 200000.0,
+                    "ron": 2000.0,
+                    "vt": 0.6,
+                },
+                "name": "memristor",
+                "nodes": ["pl", "mn", "x"],
+            },
+            "input_parameters": {
+                "source_number": 1,
+                "n_plus": "vin",
+                "n_minus": "gnd",
+                "wave_form": {
+                    "type": "sin",
+                    "parameters": {"vo": 0.0, "amplitude": 1.0, "frequency": 1.0},
+                },
+            },
+            "simulation_parameters": {
+                "analysis_type": ".tran",
+                "tstep": 1e-2,
+                "tstop": 1.0,
+                "uic": True,
+            },
+            "export_parameters": {
+                "folder_name": self.get_random_string(),
+                "file_name": "results",
+                "magnitudes": ["vin", "i(v1)", "l0", "l1", "l2", "l3"],
+            },
+            "network_type": "GRID_2D_GRAPH",
+            "network_parameters": {"n": 2, "m": 2},
+            "plot_types": [PlotType.IV],
+        }
+
+    def _run_fake_ngspice(self, circuit_file_path: str, **env) -> int:
+        return subprocess.run(
+            [sys.executable, FAKE_NGSPICE_EXECUTABLE, circuit_file_path],
+            capture_output=True,
+            env={**os.environ, **env},
+        ).returncode
+
+    def test_fake_ngspice(self):
+        simulation_service = SimulationService(self.request_parameters)
+        simulation_service._build_from_request_and_write()
+        directories_management_service = (
+            simulation_service.directories_management_service
+        )
+
+        return_code = self._run_fake_ngspice(
+            directories_management_service.get_circuit_file_path(),
+            FAKE_NGSPICE_POINTS="250",
+        )
+
+        self.assertEqual(return_code, 0)
+        dataframe = pd.read_csv(
+            directories_management_service.get_export_simulation_file_path(),
+            sep=r"\s+",
+        )
+        self.assertEqual(
+            list(dataframe.columns), ["time", "vin", "i(v1)", "l0", "l1", "l2", "l3"]
+        )
+        self.assertEqual(len(dataframe), 250)
+        self.assertEqual(dataframe["time"].iloc[-1], 1.0)
+
+    def _run_fake_ngspice_with_decimation(
+        self, output_decimation: OutputDecimation, **decimation_parameters
+    ) -> pd.DataFrame:
+        request_parameters = copy.deepcopy(self.request_parameters)
+        request_parameters["export_parameters"].update(
+            output_decimation=output_decimation.value, **decimation_parameters
+        )
+        simulation_service = SimulationService(request_parameters)
+        simulation_service._build_from_request_and_write()
+        directories_management_service = (
+            simulation_service.directories_management_service
+        )
+
+        return_code = self._run_fake_ngspice(
+            directories_management_service.get_circuit_file_path(),
+            FAKE_NGSPICE_POINTS="250",
+        )
+
+        self.assertEqual(return_code, 0)
+        return pd.read_csv(
+            directories_management_service.get_export_simulation_file_path(),
+            sep=r"\s+",
+        )
+
+    def test_fake_ngspice_with_linearize(self):
+        dataframe = self._run_fake_ngspice_with_decimation(OutputDecimation.LINEARIZE)
+
+        # tstop / tstep + 1 rows whatever the timepoints of the transient analysis
+        self.assertEqual(len(dataframe), 101)
+        self.assertAlmostEqual(dataframe["time"].iloc[1], 1e-2)
+        self.assertEqual(dataframe["time"].iloc[-1], 1.0)
+
+    def test_fake_ngspice_with_every_nth_decimation(self):
+        dataframe = self._run_fake_ngspice_with_decimation(
+            OutputDecimation.EVERY_NTH, decimation_factor=10
+        )
+
+        self.assertEqual(
+            list(dataframe.columns), ["time", "vin", "i(v1)", "l0", "l1", "l2", "l3"]
+        )
+        # floor((250 - 1) / 10) + 1 rows, the ones the ngspice loop keeps
+        self.assertEqual(len(dataframe), 25)
+        self.assertAlmostEqual(dataframe["time"].iloc[1], 10 / 249)
+
+    def _simulate_with_decimation(
+        self, output_decimation: OutputDecimation = None, **decimation_parameters
+    ) -> pd.DataFrame:
+        request_parameters = copy.deepcopy(self.request_parameters)
+        request_parameters["plot_types"] = []
+        if output_decimation:
+            request_parameters["export_parameters"].update(
+                output_decimation=output_decimation.value, **decimation_parameters
+            )
+        simulation_service = SimulationService(request_parameters)
+
+        simulation_service.simulate()
+
+        self.assertEqual(simulation_service.time_measures[0].return_code, 0)
+        # The time measures are appended to the results file as comments
+        return pd.read_csv(
+            simulation_service.directories_management_service.get_export_simulation_file_path(),
+            sep=r"\s+",
+            comment="#",
+        )
+
+    @skipIf(
+        shutil.which(settings.NGSPICE_EXECUTABLE) is None, "ngspice is not installed"
+    )
+    def test_simulate_with_every_nth_decimation_in_ngspice(self):
+        dataframe = self._simulate_with_decimation()
+        decimated_dataframe = self._simulate_with_decimation(
+            OutputDecimation.EVERY_NTH, decimation_factor=10
+        )
+
+        self.assertEqual(list(decimated_dataframe.columns), list(dataframe.columns))
+        self.assertEqual(len(decimated_dataframe), (len(dataframe) - 1) // 10 + 1)
+        pd.testing.assert_frame_equal(
+            decimated_dataframe,
+            dataframe.iloc[::10].reset_index(drop=True),
+            rtol=1e-6,
+        )
+
+    @skipIf(
+        shutil.which(settings.NGSPICE_EXECUTABLE) is None, "ngspice is not installed"
+    )
+    def test_simulate_with_tolerance_decimation_in_ngspice(self):
+        dataframe = self._simulate_with_decimation()
+        decimated_dataframe = self._simulate_with_decimation(
+            OutputDecimation.TOLERANCE, decimation_tolerance=0.05
+        )
+
+        self.assertEqual(list(decimated_dataframe.columns), list(dataframe.columns))
+        self.assertLess(len(decimated_dataframe), len(dataframe))
+        self.assertGreater(len(decimated_dataframe), 2)
+        # Kept rows are timepoints of the full results, the first and last ones always
+        self.assertTrue(decimated_dataframe["time"].isin(dataframe["time"]).all())
+        self.assertEqual(decimated_dataframe["time"].iloc[0], dataframe["time"].iloc[0])
+        self.assertEqual(
+            decimated_dataframe["time"].iloc[-1], dataframe["time"].iloc[-1]
+        )
+
+    def test_fake_ngspice_without_analysis(self):
+        circuit_file_path = f"{tempfile.mkdtemp()}/{self.get_random_string()}.cir"
+        with open(circuit_file_path, "w") as f:
+            f.write("* EMPTY CIRCUIT\n.end\n")
+        self.addCleanup(shutil.rmtree, os.path.dirname(circuit_file_path))
+
+        self.assertEqual(self._run_fake_ngspice(circuit_file_path), 1)
+
+    def test_simulate_with_fake_ngspice(self):
+        simulation_service = SimulationService(self.request_parameters)
+
+        with override_settings(NGSPICE_EXECUTABLE=FAKE_NGSPICE_EXECUTABLE):
+            simulation_service.simulate()
+
+        self.assertEqual(len(simulation_service.time_measures), 1)
+        self.assertIsNotNone(
+            simulation_service.time_measures[0].linux_real_execution_time
+        )
+        self.assertGreater(simulation_service.time_measures[0].max_rss_bytes, 0)
+        ngspice_statistics = simulation_service.time_measures[0].ngspice_statistics
+        self.assertEqual(ngspice_statistics.transient_timepoints, 101)
+        self.assertEqual(ngspice_statistics.circuit_equations, 7)
+        self.assertGreater(ngspice_statistics.max_program_size, 0)
+        self.assertIn(
+            "figures/results_results_iv.jpg",
+            [
+                archive_name
+                for _, archive_name in simulation_service.directories_management_service.get_all_simulation_files()
+            ],
+        )
+
+    def test_simulate_async_with_fake_ngspice(self):
+        simulation_service = SimulationService(self.request_parameters)
+
+        with override_settings(NGSPICE_EXECUTABLE=FAKE_NGSPICE_EXECUTABLE):
+            asyncio.run(simulation_service.simulate_async())
+
+        time_measure = simulation_service.time_measures[0]
+        self.assertEqual(time_measure.return_code, 0)
+        self.assertGreater(time_measure.linux_user_execution_time, 0)
+        self.assertGreater(time_measure.max_rss_bytes, 0)
+        self.assertEqual(time_measure.ngspice_statistics.transient_timepoints, 101)
+
+    def test_simulate_async_updates_metrics_outside_event_loop(self):
+        simulation_service = SimulationService(self.request_parameters)
+        update = MetricsService._update
+        update_threads = []
+
+        def record_update_thread(*args):
+            update_threads.append(threading.current_thread())
+            update(*args)
+
+        with override_settings(NGSPICE_EXECUTABLE=FAKE_NGSPICE_EXECUTABLE):
+            with patch.object(
+                MetricsService, "_update", side_effect=record_update_thread
+            ):
+                asyncio.run(simulation_service.simulate_async())
+
+        self.assertGreaterEqual(len(update_threads), 4)
+        self.assertNotIn(threading.main_thread(), update_threads)
+
+    def test_async_ngspice_service_keeps_sync_process_tracking(self):
+        self.assertIs(
+            AsyncNGSpiceService.track_ngspice_process,
+            NGSpiceService.track_ngspice_process,
+        )
+
+        with patch.object(MetricsService, "_update"):
+            with AsyncNGSpiceService.track_ngspice_process():
+                pass
+
+            async def track():
+                async with AsyncNGSpiceService.track_ngspice_process_async():
+                    pass
+
+            asyncio.run(track())
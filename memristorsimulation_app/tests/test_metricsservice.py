@@ -0,0 +1,171 @@
+import json
+import os
+
+from django.test import override_settings
+from unittest.mock import patch
+from memristorsimulation_app.services.metricsservice import (
+    MetricsService,
+    UnknownMetric,
+)
+from memristorsimulation_app.tests.basetestcase import BaseTestCase
+
+
+class MetricsServiceTestCase(BaseTestCase):
+    DEAD_PID = 2**22 + 1
+
+    def setUp(self) -> None:
+        super().setUp()
+
+        # Values of previous tests are dropped as if they belonged to another process
+        MetricsService._pid = None
+
+    def _write_process_file(
+        self, pid: int, values: dict, process_token: str = "1"
+    ) -> None:
+        os.makedirs(MetricsService.get_metrics_dir(), exist_ok=True)
+        with open(
+            f"{MetricsService.get_metrics_dir()}/{pid}.{process_token}.json", "w"
+        ) as f:
+            json.dump(values, f)
+
+    def test_increment_counter(self):
+        MetricsService.increment_counter(
+            "memristor_simulation_requests_total", status="FINISHED"
+        )
+        MetricsService.increment_counter(
+            "memristor_simulation_requests_total", status="FINISHED"
+        )
+        MetricsService.increment_counter(
+            "memristor_simulation_requests_total", status="FAILED"
+        )
+
+        with open(MetricsService.get_process_file_path(), "r") as f:
+            process_values = json.load(f)
+        self.assertEqual(
+            process_values["memristor_simulation_requests_total"],
+            {'[["status","FAILED"]]': 1, '[["status","FINISHED"]]': 2},
+        )
+
+        metrics = MetricsService.render()
+        self.assertIn("# TYPE memristor_simulation_requests_total counter", metrics)
+        self.assertIn(
+            'memristor_simulation_requests_total{status="FINISHED"} 2', metrics
+        )
+        self.assertIn('memristor_simulation_requests_total{status="FAILED"} 1', metrics)
+
+    def test_track_in_progress(self):
+        with MetricsService.track_in_progress("memristor_ngspice_processes"):
+            self.assertIn("memristor_ngspice_processes 1\n", MetricsService.render())
+
+        self.assertIn("memristor_ngspice_processes 0\n", MetricsService.render())
+
+    def test_observe_histogram(self):
+        MetricsService.observe_histogram("memristor_ngspice_duration_seconds", 0.2)
+        MetricsService.observe_histogram("memristor_ngspice_duration_seconds", 3)
+        MetricsService.observe_histogram("memristor_ngspice_duration_seconds", 1000)
+
+        metrics = MetricsService.render()
+        self.assertIn('memristor_ngspice_duration_seconds_bucket{le="0.1"} 0', metrics)
+        self.assertIn('memristor_ngspice_duration_seconds_bucket{le="0.25"} 1', metrics)
+        self.assertIn('memristor_ngspice_duration_seconds_bucket{le="5.0"} 2', metrics)
+        self.assertIn(
+            'memristor_ngspice_duration_seconds_bucket{le="600.0"} 2', metrics
+        )
+        self.assertIn('memristor_ngspice_duration_seconds_bucket{le="+Inf"} 3', metrics)
+        self.assertIn("memristor_ngspice_duration_seconds_sum 1003.2", metrics)
+        self.assertIn("memristor_ngspice_duration_seconds_count 3", metrics)
+
+    def test_timed(self):
+        @MetricsService.timed("memristor_plot_duration_seconds", function_label="plot")
+        def plot_iv():
+            return "figure"
+
+        self.assertEqual(plot_iv(), "figure")
+        self.assertIn(
+            'memristor_plot_duration_seconds_count{plot="plot_iv"} 1',
+            MetricsService.render(),
+        )
+
+    def test_collect_sums_processes(self):
+        MetricsService.increment_counter("memristor_ngspice_runs_total", result="ok")
+        MetricsService.increment_gauge("memristor_ngspice_processes")
+        self._write_process_file(
+            self.DEAD_PID,
+            {
+                "memristor_ngspice_runs_total": {'[["result","ok"]]': 4},
+                "memristor_ngspice_processes": {"[]": 2},
+            },
+        )
+        self._write_process_file(
+            os.getppid(),
+            {"memristor_ngspice_processes": {"[]": 3}},
+            MetricsService.get_process_start_time(os.getppid()),
+        )
+
+        collected = MetricsService.collect()
+
+        # Gauges of processes that exited are dropped, their counters are kept
+        self.assertEqual(
+            collected["memristor_ngspice_runs_total"], {'[["result","ok"]]': 5}
+        )
+        self.assertEqual(collected["memristor_ngspice_processes"], {"[]": 4})
+
+    def test_forked_process_starts_empty(self):
+        MetricsService.increment_counter("memristor_ngspice_runs_total", result="ok")
+
+        with patch(
+            "memristorsimulation_app.services.metricsservice.os.getpid",
+            return_value=self.DEAD_PID,
+        ):
+            MetricsService.increment_counter(
+                "memristor_ngspice_runs_total", result="ok"
+            )
+            process_file_path = MetricsService.get_process_file_path()
+
+        self.assertTrue(
+            os.path.basename(process_file_path).startswith(f"{self.DEAD_PID}.")
+        )
+        with open(process_file_path, "r") as f:
+            self.assertEqual(
+                json.load(f)["memristor_ngspice_runs_total"], {'[["result","ok"]]': 1}
+            )
+
+    def test_restarted_process_with_reused_pid(self):
+        # Values of an exited worker whose pid was given to this process
+        self._write_process_file(
+            os.getpid(),
+            {
+                "memristor_ngspice_runs_total": {'[["result","ok"]]': 4},
+                "memristor_ngspice_processes": {"[]": 2},
+            },
+        )
+        MetricsService.increment_counter("memristor_ngspice_runs_total", result="ok")
+        MetricsService.increment_gauge("memristor_ngspice_processes")
+
+        collected = MetricsService.collect()
+
+        self.assertEqual(
+            collected["memristor_ngspice_runs_total"], {'[["result","ok"]]': 5}
+        )
+        self.assertEqual(collected["memristor_ngspice_processes"], {"[]": 1})
+
+    def test_render_escapes_label_values(self):
+        MetricsService.increment_counter(
+            "memristor_simulation_requests_total", status='A "quoted"\nvalue'
+        )
+
+        self.assertIn(
+            'memristor_simulation_requests_total{status="A \\"quoted\\"\\nvalue"} 1',
+            MetricsService.render(),
+        )
+
+    def test_unknown_metric(self):
+        with self.assertRaises(UnknownMetric):
+            MetricsService.increment_counter("memristor_unknown_total")
+
+    @override_settings(SIMULATION_METRICS_ENABLED=False)
+    def test_metrics_disabled(self):
+        MetricsService.increment_counter("memristor_ngspice_runs_total", result="ok")
+
+        self.assertFalse(os.path.exists(MetricsService.get_metrics_dir()))
+        self.assertEqual(MetricsService.collect(), {})
@@ -148,6 +148,42 @@ class NetworkServiceTestCase(BaseTestCase):
                 ),
             )
 
+    def test_get_amount_edges(self):
+        for network_type, network_parameters in [
+            (NetworkType.GRID_2D_GRAPH, NetworkParameters(n=4, m=7)),
+            (NetworkType.GRID_2D_GRAPH, NetworkParameters(n=1, m=5)),
+            (
+                NetworkType.RANDOM_REGULAR_GRAPH,
+                NetworkParameters(amount_nodes=12, amount_connections=3, seed=1),
+            ),
+            (
+                NetworkType.WATTS_STROGATZ_GRAPH,
+                NetworkParameters(
+                    amount_nodes=15,
+                    amount_connections=5,
+                    shortcut_probability=0.3,
+                    seed=1,
+                ),
+            ),
+            (
+                NetworkType.WATTS_STROGATZ_GRAPH,
+                NetworkParameters(
+                    amount_nodes=5, amount_connections=5, shortcut_probability=0.3
+                ),
+            ),
+        ]:
+            self.assertEqual(
+                NetworkService.get_amount_edges(network_type, network_parameters),
+                NetworkService(
+                    network_type, network_parameters
+                ).network.number_of_edges(),
+            )
+
+        with self.assertRaises(ValueError):
+            NetworkService.get_amount_edges(
+                NetworkType.GRID_2D_GRAPH, NetworkParameters(n=None, m=3)
+            )
+
     def test_generate_network_not_implemented(self):
         with patch.object(
             NetworkType, "__iter__", return_value=iter([NetworkType.GRID_2D_GRAPH])
@@ -301,3 +337,15 @@ class NetworkServiceTestCase(BaseTestCase):
         )
         self.assertFalse(small_ws_network_service.should_ignore_states())
         self.assertTrue(large_ws_network_service.should_ignore_states())
+
+    def test_get_state_edges(self):
+        service = self.create_grid_network_service(n=3, m=3, removal_probability=0.3)
+
+        device_params = service.generate_device_parameters("xmem", "memristor")
+        state_edges = service.get_state_edges()
+
+        self.assertEqual(len(state_edges), len(device_params))
+        for device_param in device_params:
+            node1, node2 = state_edges[device_param.nodes[2]]
+            self.assertTrue(service.network.has_edge(node1, node2))
+            self.assertIsInstance(node1, tuple)
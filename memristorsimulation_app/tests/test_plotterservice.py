@@ -0,0 +1,66 @@
+import os
+import networkx as nx
+import numpy as np
+import pandas as pd
+
+from memristorsimulation_app.constants import SIMULATIONS_DIR, ModelsSimulationFolders
+from memristorsimulation_app.representations import ExportParameters, Graph
+from memristorsimulation_app.services.directoriesmanagementservice import (
+    DirectoriesManagementService,
+)
+from memristorsimulation_app.services.plotterservice import PlotterService
+from memristorsimulation_app.tests.basetestcase import BaseTestCase
+
+
+class PlotterServiceTestCase(BaseTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.export_parameters = ExportParameters(
+            ModelsSimulationFolders.PERSHIN_SIMULATIONS,
+            self.get_random_string(),
+            self.get_random_string(),
+            [],
+        )
+        DirectoriesManagementService(
+            export_parameters=self.export_parameters
+        ).create_workspace()
+
+    def test_plot_grid_states_animated(self):
+        network_service = self.create_grid_network_service(n=3, m=3)
+        state_edges = network_service.get_state_edges()
+        graph = Graph(
+            network_service.network,
+            network_service.vin_minus,
+            network_service.vin_plus,
+            state_edges=state_edges,
+        )
+        time = np.linspace(0, 1, 20)
+        dataframe = pd.DataFrame(
+            {"time": time, "vin": np.sin(time), "i(v1)": np.sin(time)}
+            | {
+                state: np.linspace(2e3, 200e3, len(time)) * (index + 1)
+                for index, state in enumerate(state_edges)
+            }
+        )
+        plotter_service = PlotterService(
+            SIMULATIONS_DIR, self.export_parameters, graph=graph
+        )
+
+        plotter_service.plot_grid_states_animated(dataframe, "grid")
+
+        gif_path = (
+            f"{plotter_service.figures_directory_path}/grid_gridstatesanimation.gif"
+        )
+        self.assertTrue(os.path.exists(gif_path))
+        self.assertGreater(os.path.getsize(gif_path), 0)
+
+    def test_plot_grid_states_animated_without_states(self):
+        graph = Graph(nx.grid_2d_graph(2, 2), (1, 0), (0, 0))
+        dataframe = pd.DataFrame({"time": [0.0, 1.0], "vin": [0.0, 1.0]})
+        plotter_service = PlotterService(
+            SIMULATIONS_DIR, self.export_parameters, graph=graph
+        )
+
+        plotter_service.plot_grid_states_animated(dataframe, "grid")
+
+        self.assertEqual(os.listdir(plotter_service.figures_directory_path), [])
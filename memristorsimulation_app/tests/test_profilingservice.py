@@ -0,0 +1,122 @@
+import json
+import os
+import pstats
+import tracemalloc
+
+from django.test import override_settings
+from memristorsimulation_app.constants import MemristorModels
+from memristorsimulation_app.services.profilingservice import (
+    ProfileNotFound,
+    ProfilingService,
+)
+from memristorsimulation_app.tests.basetestcase import BaseTestCase
+
+
+def allocate_lists(amount: int) -> list:
+    return [list(range(100)) for _ in range(amount)]
+
+
+class ProfilingServiceTestCase(BaseTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+
+        self.directories_management_service = (
+            self.create_directories_management_service(MemristorModels.PERSHIN)
+        )
+        self.directories_management_service.create_workspace()
+        self.profiling_service = ProfilingService(self.directories_management_service)
+
+    @override_settings(SIMULATION_PROFILE_TOP=5)
+    def test_profile(self):
+        with self.profiling_service.profile():
+            allocated = allocate_lists(1000)
+
+        self.assertEqual(len(allocated), 1000)
+        self.assertFalse(tracemalloc.is_tracing())
+
+        profile_file_path = self.directories_management_service.get_profile_file_path()
+        summary_file_path = (
+            self.directories_management_service.get_profile_summary_file_path()
+        )
+        self.assertTrue(os.path.isfile(profile_file_path))
+        self.assertIn(
+            "allocate_lists",
+            [
+                function_name
+                for _, _, function_name in pstats.Stats(profile_file_path).stats
+            ],
+        )
+
+        with open(summary_file_path, "r") as f:
+            summary = json.load(f)
+
+        folder_name = self.directories_management_service.export_parameters.folder_name
+        self.assertEqual(summary["folder_name"], folder_name)
+        self.assertEqual(summary["profile_file"], f"{folder_name}.prof")
+        self.assertGreater(summary["total_time_ms"], 0)
+        self.assertGreater(summary["traced_memory_peak_bytes"], 0)
+        self.assertLessEqual(len(summary["top_functions"]), 5)
+        self.assertEqual(len(summary["top_allocations"]), 5)
+        self.assertTrue(
+            any(
+                "allocate_lists" in function["function"]
+                for function in summary["top_functions"]
+            )
+        )
+        self.assertGreaterEqual(
+            summary["top_functions"][0]["cumulative_time_ms"],
+            summary["top_functions"][-1]["cumulative_time_ms"],
+        )
+        self.assertIn(
+            "test_profilingservice.py", summary["top_allocations"][0]["location"]
+        )
+
+        manifest_paths = self.directories_management_service.read_manifest(
+            self.directories_management_service.get_simulation_folder_path()
+        )
+        self.assertIn(f"{folder_name}.prof", manifest_paths)
+        self.assertIn(f"{folder_name}_profile.json", manifest_paths)
+
+    def test_profile_of_failed_run(self):
+        with self.assertRaises(ValueError):
+            with self.profiling_service.profile():
+                raise ValueError("ngspice failed")
+
+        self.assertFalse(tracemalloc.is_tracing())
+        self.assertTrue(
+            os.path.isfile(
+                self.directories_management_service.get_profile_summary_file_path()
+            )
+        )
+
+    def test_profile_without_simulation_folder(self):
+        directories_management_service = self.create_directories_management_service(
+            MemristorModels.PERSHIN
+        )
+
+        with ProfilingService(directories_management_service).profile():
+            pass
+
+        self.assertFalse(
+            os.path.exists(directories_management_service.get_simulation_folder_path())
+        )
+
+    def test_load_summary(self):
+        export_parameters = self.directories_management_service.export_parameters
+        with self.profiling_service.profile():
+            pass
+
+        summary = ProfilingService.load_summary(
+            export_parameters.model_simulation_folder, export_parameters.folder_name
+        )
+
+        self.assertEqual(summary["folder_name"], export_parameters.folder_name)
+
+        with self.assertRaises(ProfileNotFound):
+            ProfilingService.load_summary(
+                export_parameters.model_simulation_folder, self.get_random_string()
+            )
+        with self.assertRaises(ProfileNotFound):
+            ProfilingService.load_summary(
+                export_parameters.model_simulation_folder, "../.inflight"
+            )
@@ -0,0 +1,287 @@
+import errno
+import os
+import threading
+import time
+
+from datetime import datetime, timezone
+from io import StringIO
+from unittest.mock import patch
+from django.core.management import call_command
+from django.test import TestCase
+from memristorsimulation_app.constants import (
+    SIMULATIONS_DIR,
+    MemristorModels,
+    ModelsSimulationFolders,
+    NetworkType,
+    SimulationStatus,
+)
+from memristorsimulation_app.models import SimulationRun, SimulationRunFile
+from memristorsimulation_app.services.retentionservice import RetentionService
+from memristorsimulation_app.services.simulationdataservice import (
+    SimulationDataService,
+)
+from memristorsimulation_app.tests.basetestcase import BaseTestCase
+
+
+class RetentionServiceTestCase(TestCase, BaseTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+
+        self.now = time.time()
+        self.model_folder_path = (
+            f"{SIMULATIONS_DIR}/{ModelsSimulationFolders.PERSHIN_SIMULATIONS.value}"
+        )
+
+    def _create_simulation_folder(
+        self, folder_name: str, size_bytes: int, age_seconds: float
+    ) -> str:
+        folder_path = f"{self.model_folder_path}/{folder_name}"
+        os.makedirs(f"{folder_path}/figures")
+        with open(f"{folder_path}/{folder_name}_results.csv", "w") as f:
+            f.write("time vin\n" + "0" * size_bytes)
+        last_access = self.now - age_seconds
+        os.utime(folder_path, (last_access, last_access))
+
+        return folder_path
+
+    @staticmethod
+    def _create_simulation_run(folder_name: str) -> SimulationRun:
+        run = SimulationRun.objects.create(
+            input_hash=folder_name,
+            model=MemristorModels.PERSHIN.value,
+            network_type=NetworkType.SINGLE_DEVICE.value,
+            model_simulation_folder=ModelsSimulationFolders.PERSHIN_SIMULATIONS.value,
+            folder_name=folder_name,
+            inputs={},
+            status=SimulationStatus.FINISHED.value,
+            started_at=datetime.now(timezone.utc),
+            finished_at=datetime.now(timezone.utc),
+        )
+        SimulationRunFile.objects.create(
+            run=run,
+            archive_name=f"{folder_name}_results.csv",
+            path=f"{folder_name}/{folder_name}_results.csv",
+            size_bytes=100,
+        )
+
+        return run
+
+    def test_get_folder_usages(self):
+        self._create_simulation_folder("old", 1000, 7200)
+        self._create_simulation_folder("new", 2000, 60)
+        os.makedirs(f"{self.model_folder_path}/.hidden")
+
+        usages = RetentionService().get_folder_usages()
+
+        self.assertEqual([usage.folder_name for usage in usages], ["old", "new"])
+        self.assertEqual(usages[0].size_bytes, 1009)
+        self.assertAlmostEqual(usages[0].last_access, self.now - 7200, places=3)
+        self.assertFalse(usages[0].compressed)
+
+    def test_enforce_retention_max_age(self):
+        self._create_simulation_folder("expired", 100, 3 * 86400)
+        kept_folder_path = self._create_simulation_folder("kept", 100, 86400)
+
+        report = RetentionService(
+            quota_bytes=0,
+            max_age_days=2,
+            compress_after_hours=0,
+            protected_minutes=60,
+        ).enforce_retention(now=self.now)
+
+        self.assertEqual(report.deleted, ["pershin_simulations/expired"])
+        self.assertEqual(report.freed_bytes, 109)
+        self.assertFalse(os.path.exists(f"{self.model_folder_path}/expired"))
+        self.assertTrue(os.path.isdir(kept_folder_path))
+
+    def test_enforce_retention_quota_evicts_least_recently_used(self):
+        self._create_simulation_folder("oldest", 1000, 3 * 3600)
+        self._create_simulation_folder("older", 1000, 2 * 3600)
+        recent_folder_path = self._create_simulation_folder("recent", 5000, 60)
+
+        report = RetentionService(
+            quota_bytes=3000,
+            max_age_days=0,
+            compress_after_hours=0,
+            protected_minutes=60,
+        ).enforce_retention(now=self.now)
+
+        # The recent run is protected even if the quota is still exceeded after evicting the others
+        self.assertEqual(
+            report.deleted,
+            ["pershin_simulations/oldest", "pershin_simulations/older"],
+        )
+        self.assertEqual(report.total_bytes, 5009)
+        self.assertTrue(os.path.isdir(recent_folder_path))
+
+    def test_enforce_retention_compresses_cold_folders(self):
+        folder_path = self._create_simulation_folder("cold", 10000, 2 * 86400)
+
+        report = RetentionService(
+            quota_bytes=0,
+            max_age_days=0,
+            compress_after_hours=24,
+            protected_minutes=60,
+        ).enforce_retention(now=self.now)
+
+        self.assertEqual(report.compressed, ["pershin_simulations/cold"])
+        self.assertGreater(report.freed_bytes, 0)
+        self.assertFalse(os.path.exists(folder_path))
+        self.assertTrue(os.path.isfile(f"{folder_path}.zip"))
+        self.assertAlmostEqual(
+            os.path.getmtime(f"{folder_path}.zip"), self.now - 2 * 86400, places=3
+        )
+
+        usages = RetentionService().get_folder_usages()
+        self.assertEqual(usages[0].folder_name, "cold")
+        self.assertTrue(usages[0].compressed)
+
+    def test_enforce_retention_dry_run(self):
+        folder_path = self._create_simulation_folder("expired", 100, 3 * 86400)
+
+        report = RetentionService(
+            quota_bytes=0, max_age_days=1, dry_run=True
+        ).enforce_retention(now=self.now)
+
+        self.assertEqual(report.deleted, ["pershin_simulations/expired"])
+        self.assertTrue(os.path.isdir(folder_path))
+
+    def test_enforce_retention_marks_catalogued_runs_evicted(self):
+        self._create_simulation_folder("expired", 100, 3 * 86400)
+        self._create_simulation_folder("kept", 100, 86400)
+        expired_run = self._create_simulation_run("expired")
+        kept_run = self._create_simulation_run("kept")
+
+        RetentionService(quota_bytes=0, max_age_days=1, dry_run=True).enforce_retention(
+            now=self.now
+        )
+        expired_run.refresh_from_db()
+
+        self.assertIsNone(expired_run.evicted_at)
+
+        RetentionService(
+            quota_bytes=0, max_age_days=2, compress_after_hours=0, protected_minutes=60
+        ).enforce_retention(now=self.now)
+        expired_run.refresh_from_db()
+        kept_run.refresh_from_db()
+
+        self.assertIsNotNone(expired_run.evicted_at)
+        self.assertEqual(expired_run.status, SimulationStatus.FINISHED.value)
+        self.assertFalse(expired_run.files.exists())
+        self.assertIsNone(kept_run.evicted_at)
+        self.assertEqual(kept_run.files.count(), 1)
+
+    def test_enforce_retention_marks_catalogued_runs_compressed(self):
+        folder_path = self._create_simulation_folder("cold", 10, 2 * 86400)
+        run = self._create_simulation_run("cold")
+
+        RetentionService(
+            quota_bytes=0, max_age_days=0, compress_after_hours=1
+        ).enforce_retention(now=self.now)
+        run.refresh_from_db()
+
+        self.assertIsNotNone(run.compressed_at)
+        self.assertIsNone(run.evicted_at)
+        self.assertEqual(run.files.count(), 1)
+
+        self.assertTrue(RetentionService.restore_folder(folder_path))
+        run.refresh_from_db()
+
+        self.assertIsNone(run.compressed_at)
+        self.assertEqual(run.files.count(), 1)
+
+    def test_compressed_folder_restored_on_access(self):
+        folder_path = self._create_simulation_folder("cold", 10, 2 * 86400)
+        RetentionService(
+            quota_bytes=0, max_age_days=0, compress_after_hours=1
+        ).enforce_retention(now=self.now)
+        self.assertFalse(os.path.exists(folder_path))
+
+        simulation_data_service = SimulationDataService(
+            ModelsSimulationFolders.PERSHIN_SIMULATIONS, "cold"
+        )
+
+        self.assertTrue(os.path.isdir(folder_path))
+        self.assertFalse(os.path.exists(f"{folder_path}.zip"))
+        self.assertEqual(
+            simulation_data_service.get_results_file_names(), ["cold_results.csv"]
+        )
+        self.assertGreater(os.path.getmtime(folder_path), self.now - 60)
+
+    def test_concurrent_restores(self):
+        folder_path = self._create_simulation_folder("cold", 10, 2 * 86400)
+        RetentionService(
+            quota_bytes=0, max_age_days=0, compress_after_hours=1
+        ).enforce_retention(now=self.now)
+        results, errors = [], []
+
+        def restore():
+            try:
+                results.append(RetentionService.restore_folder(folder_path))
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=restore) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(sorted(results), [False] * 7 + [True])
+        self.assertTrue(os.path.isfile(f"{folder_path}/cold_results.csv"))
+        self.assertFalse(os.path.exists(f"{folder_path}.zip"))
+        self.assertEqual(
+            [
+                name
+                for name in os.listdir(self.model_folder_path)
+                if name.endswith(RetentionService.RESTORING_EXTENSION)
+            ],
+            [],
+        )
+
+    def test_restore_of_already_restored_folder(self):
+        folder_path = self._create_simulation_folder("cold", 10, 2 * 86400)
+        RetentionService(
+            quota_bytes=0, max_age_days=0, compress_after_hours=1
+        ).enforce_retention(now=self.now)
+
+        # The folder shows up after the checks, as if another process restored it meanwhile
+        with patch(
+            "memristorsimulation_app.services.retentionservice.os.replace",
+            side_effect=OSError(errno.ENOTEMPTY, "Directory not empty"),
+        ):
+            self.assertFalse(RetentionService.restore_folder(folder_path))
+
+        self.assertTrue(os.path.isfile(f"{folder_path}.zip"))
+        self.assertEqual(os.listdir(self.model_folder_path), ["cold.zip"])
+
+    def test_enforce_retention_in_background_interval(self):
+        self._create_simulation_folder("expired", 100, 365 * 86400)
+
+        with patch(
+            "memristorsimulation_app.services.retentionservice.settings.SIMULATION_RETENTION_INTERVAL_SECONDS",
+            600,
+        ):
+            thread = RetentionService.enforce_retention_in_background()
+            thread.join()
+            self.assertIsNone(RetentionService.enforce_retention_in_background())
+
+        self.assertFalse(os.path.exists(f"{self.model_folder_path}/expired"))
+
+    def test_enforce_retention_command(self):
+        self._create_simulation_folder("expired", 100, 3 * 86400)
+        out = StringIO()
+
+        call_command(
+            "enforce_retention",
+            "--max-age-days",
+            "1",
+            "--quota-bytes",
+            "0",
+            "--dry-run",
+            stdout=out,
+        )
+
+        self.assertIn("[DRY RUN] Deleted pershin_simulations/expired", out.getvalue())
+        self.assertTrue(os.path.isdir(f"{self.model_folder_path}/expired"))
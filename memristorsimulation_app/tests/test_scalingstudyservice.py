@@ -0,0 +1,177 @@
+import glob
+import json
+import os
+import shutil
+import tempfile
+
+from django.test import override_settings
+from memristorsimulation_app.constants import (
+    FAKE_NGSPICE_EXECUTABLE,
+    SIMULATIONS_DIR,
+    NetworkType,
+)
+from memristorsimulation_app.representations import ScalingMeasurement
+from memristorsimulation_app.services.networkservice import NetworkService
+from memristorsimulation_app.services.scalingstudyservice import (
+    NGSpiceNotFound,
+    ScalingStudyService,
+)
+from memristorsimulation_app.tests.basetestcase import BaseTestCase
+
+
+class ScalingStudyServiceTestCase(BaseTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+
+        self.output_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.output_dir, ignore_errors=True)
+
+    @staticmethod
+    def _create_measurement(
+        network_type: NetworkType, size: int, wall_time: float, **kwargs
+    ) -> ScalingMeasurement:
+        return ScalingMeasurement(
+            network_type=network_type.value,
+            size=size,
+            amount_connections=None,
+            repeat=0,
+            amount_nodes=size * size,
+            amount_edges=2 * size * (size - 1),
+            wall_time=wall_time,
+            **kwargs,
+        )
+
+    def test_get_configurations(self):
+        scaling_study_service = ScalingStudyService(sizes=[2, 3], connections=[3, 4])
+
+        configurations = scaling_study_service.get_configurations()
+
+        self.assertEqual(
+            configurations,
+            [
+                (NetworkType.GRID_2D_GRAPH, 2, None),
+                (NetworkType.GRID_2D_GRAPH, 3, None),
+                (NetworkType.RANDOM_REGULAR_GRAPH, 2, 3),
+                (NetworkType.RANDOM_REGULAR_GRAPH, 3, 4),
+                (NetworkType.WATTS_STROGATZ_GRAPH, 2, 3),
+                (NetworkType.WATTS_STROGATZ_GRAPH, 3, 3),
+                (NetworkType.WATTS_STROGATZ_GRAPH, 3, 4),
+            ],
+        )
+        # 9 nodes with 3 connections have an odd amount of connection ends, 4 nodes cannot have 4 connections
+        self.assertEqual(
+            scaling_study_service.skipped_configurations,
+            [
+                "RANDOM_REGULAR_GRAPH size=2 connections=4",
+                "RANDOM_REGULAR_GRAPH size=3 connections=3",
+                "WATTS_STROGATZ_GRAPH size=2 connections=4",
+            ],
+        )
+
+    def test_get_amount_edges(self):
+        scaling_study_service = ScalingStudyService(sizes=[3, 4], connections=[2, 3, 4])
+
+        for (
+            network_type,
+            size,
+            amount_connections,
+        ) in scaling_study_service.get_configurations():
+            network_service = NetworkService(
+                network_type,
+                scaling_study_service.get_network_parameters(
+                    network_type, size, amount_connections
+                ),
+            )
+
+            self.assertEqual(
+                scaling_study_service.get_amount_edges(
+                    network_type, size, amount_connections
+                ),
+                network_service.generate_network().number_of_edges(),
+            )
+
+    def test_fit_power_law(self):
+        exponent, coefficient, r_squared = ScalingStudyService.fit_power_law(
+            [2, 4, 8, 16], [3 * x**2 for x in [2, 4, 8, 16]]
+        )
+
+        self.assertAlmostEqual(exponent, 2)
+        self.assertAlmostEqual(coefficient, 3)
+        self.assertAlmostEqual(r_squared, 1)
+
+    def test_aggregate_and_fit(self):
+        measurements = [
+            self._create_measurement(NetworkType.GRID_2D_GRAPH, 2, 3.0),
+            self._create_measurement(NetworkType.GRID_2D_GRAPH, 2, 5.0),
+            self._create_measurement(NetworkType.GRID_2D_GRAPH, 3, 9.0),
+            self._create_measurement(NetworkType.GRID_2D_GRAPH, 4, 16.0),
+            self._create_measurement(
+                NetworkType.GRID_2D_GRAPH, 4, 1000.0, error="CalledProcessError"
+            ),
+        ]
+
+        aggregated = ScalingStudyService.aggregate(measurements)
+        fits = ScalingStudyService.fit(aggregated)
+
+        self.assertEqual(
+            [
+                (row["size"], row["amount_repeats"], row["wall_time"])
+                for row in aggregated
+            ],
+            [(2, 2, 4.0), (3, 1, 9.0), (4, 1, 16.0)],
+        )
+        # Metrics without values are not fitted
+        self.assertEqual(
+            [(fit.metric, fit.variable) for fit in fits],
+            [("wall_time", "amount_nodes"), ("wall_time", "amount_edges")],
+        )
+        self.assertAlmostEqual(fits[0].exponent, 1)
+        self.assertAlmostEqual(fits[0].coefficient, 1)
+
+    @override_settings(NGSPICE_EXECUTABLE=FAKE_NGSPICE_EXECUTABLE)
+    def test_run_and_save_report(self):
+        scaling_study_service = ScalingStudyService(
+            network_types=[NetworkType.GRID_2D_GRAPH],
+            sizes=[2, 3],
+            amount_points=20,
+            repeats=1,
+        )
+
+        measurements = scaling_study_service.run()
+        report = scaling_study_service.save_report(measurements, self.output_dir)
+
+        self.assertEqual(
+            [
+                (measurement.size, measurement.amount_nodes, measurement.amount_edges)
+                for measurement in measurements
+            ],
+            [(2, 4, 4), (3, 9, 12)],
+        )
+        for measurement in measurements:
+            self.assertIsNone(measurement.error)
+            self.assertGreater(measurement.wall_time, 0)
+            self.assertIsNotNone(measurement.ngspice_user_time)
+            self.assertGreater(measurement.ngspice_peak_rss, 0)
+            self.assertGreater(measurement.output_size, 0)
+        self.assertGreater(measurements[1].output_size, measurements[0].output_size)
+        # Runs are removed once measured
+        self.assertEqual(
+            glob.glob(
+                f"{SIMULATIONS_DIR}/**/{ScalingStudyService.FOLDER_NAME}_*",
+                recursive=True,
+            ),
+            [],
+        )
+
+        with open(f"{self.output_dir}/{ScalingStudyService.REPORT_FILE_NAME}") as f:
+            self.assertEqual(json.load(f), report)
+        self.assertIn(
+            ("output_size", "amount_edges"),
+            [(fit["metric"], fit["variable"]) for fit in report["fits"]],
+        )
+        self.assertTrue(os.path.isfile(f"{self.output_dir}/output_size.png"))
+
+    @override_settings(NGSPICE_EXECUTABLE="not-an-ngspice-executable")
+    def test_run_without_ngspice(self):
+        with self.assertRaises(NGSpiceNotFound):
+            ScalingStudyService(sizes=[2], repeats=1).run()
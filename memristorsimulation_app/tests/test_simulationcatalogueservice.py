@@ -0,0 +1,213 @@
+import os
+import time
+
+from django.db import DatabaseError
+from django.test import TestCase
+from unittest.mock import patch
+from memristorsimulation_app.constants import (
+    MemristorModels,
+    NetworkType,
+    SimulationStatus,
+)
+from memristorsimulation_app.models import SimulationRun
+from memristorsimulation_app.representations import NGSpiceStatistics, TimeMeasure
+from memristorsimulation_app.services.simulationcatalogueservice import (
+    SimulationCatalogueService,
+)
+from memristorsimulation_app.services.simulationservice import SimulationService
+from memristorsimulation_app.tests.basetestcase import BaseTestCase
+
+
+class SimulationCatalogueServiceTestCase(TestCase, BaseTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+
+        self.request_parameters = {
+            "model": "pershin.sub",
+            "subcircuit": {
+                "model_parameters": {
+                    "alpha": 0.0,
+                    "beta": 500000.0,
+                    "rinit": 200000.0,
+                    "roff": 200000.0,
+                    "ron": 2000.0,
+                    "vt": 0.6,
+                },
+                "name": "memristor",
+                "nodes": ["vin", "0", "x"],
+            },
+            "input_parameters": {
+                "source_number": 1,
+                "n_plus": "vin",
+                "n_minus": "0",
+                "wave_form": {
+                    "type": "sin",
+                    "parameters": {"vo": 0.0, "amplitude": 1.0, "frequency": 1.0},
+                },
+            },
+            "simulation_parameters": {
+                "analysis_type": ".tran",
+                "tstep": 1e-3,
+                "tstop": 1.0,
+            },
+            "export_parameters": {
+                "model_simulation_folder": "pershin_simulations",
+                "folder_name": self.get_random_string(),
+                "file_name": "results",
+                "magnitudes": ["vin", "i(v1)", "l0"],
+            },
+            "network_type": "GRID_2D_GRAPH",
+            "network_parameters": {"n": 3, "m": 3},
+            "plot_types": ["IV"],
+        }
+        self.started_at = time.time()
+
+    def _create_simulated_service(self) -> SimulationService:
+        simulation_service = SimulationService(self.request_parameters)
+        simulation_service.create_circuit_file_service_from_request(
+            simulation_service.create_subcircuit_file_service_from_request()
+        )
+        simulation_service.time_measures = [
+            TimeMeasure(
+                start_time=self.started_at,
+                python_execution_time=10.0,
+                linux_real_execution_time=9.0,
+                linux_user_execution_time=6.0,
+                linux_sys_execution_time=1.0,
+            ),
+            TimeMeasure(
+                start_time=self.started_at,
+                python_execution_time=20.0,
+                linux_real_execution_time=19.0,
+                linux_user_execution_time=16.0,
+                linux_sys_execution_time=3.0,
+            ),
+        ]
+
+        export_file_path = (
+            simulation_service.directories_management_service.get_export_simulation_file_path()
+        )
+        os.makedirs(os.path.dirname(export_file_path), exist_ok=True)
+        with open(export_file_path, "w") as f:
+            f.write("time vin\n0 0\n")
+
+        return simulation_service
+
+    def test_get_run_fields(self):
+        simulation_service = self._create_simulated_service()
+
+        run_fields = SimulationCatalogueService.get_run_fields(
+            simulation_service, SimulationStatus.FINISHED, self.started_at
+        )
+
+        self.assertEqual(run_fields["input_hash"], simulation_service.get_input_hash())
+        self.assertEqual(run_fields["model"], "pershin.sub")
+        self.assertEqual(run_fields["network_type"], "GRID_2D_GRAPH")
+        self.assertEqual(run_fields["amount_edges"], 12)
+        self.assertEqual(run_fields["amount_nodes"], 9)
+        self.assertEqual(run_fields["python_execution_time"], 15.0)
+        self.assertEqual(run_fields["linux_sys_execution_time"], 2.0)
+        self.assertEqual(len(run_fields["time_measures"]), 2)
+        self.assertNotIn("start_time", run_fields["time_measures"][0])
+        self.assertEqual(
+            run_fields["inputs"]["export_parameters"]["file_name"], "results"
+        )
+        self.assertEqual(
+            [file["size_bytes"] for file in run_fields["files"]],
+            [len("time vin\n0 0\n")],
+        )
+
+    def test_record_run(self):
+        simulation_service = self._create_simulated_service()
+
+        run = SimulationCatalogueService.record_run(
+            simulation_service, SimulationStatus.FINISHED, self.started_at
+        )
+
+        run = SimulationRun.objects.get(pk=run.pk)
+        self.assertEqual(run.status, SimulationStatus.FINISHED.value)
+        self.assertEqual(
+            run.folder_name,
+            simulation_service.simulation_inputs.export_parameters.folder_name,
+        )
+        self.assertGreaterEqual(run.finished_at, run.started_at)
+        self.assertEqual(run.files.count(), 1)
+
+    def test_record_failed_run(self):
+        simulation_service = SimulationService(self.request_parameters)
+
+        run = SimulationCatalogueService.record_run(
+            simulation_service,
+            SimulationStatus.FAILED,
+            self.started_at,
+            error="ngspice failed",
+        )
+
+        self.assertEqual(run.error, "ngspice failed")
+        self.assertIsNone(run.amount_edges)
+        self.assertIsNone(run.python_execution_time)
+        self.assertEqual(run.ngspice_statistics, {})
+        self.assertEqual(run.files.count(), 0)
+
+    def test_record_run_ngspice_statistics(self):
+        simulation_service = self._create_simulated_service()
+        simulation_service.time_measures[0].ngspice_statistics = NGSpiceStatistics(
+            accepted_timepoints=100, rejected_timepoints=5
+        )
+        # Statistics of failed iterations are only kept in time_measures
+        simulation_service.time_measures[1].ngspice_statistics = NGSpiceStatistics(
+            accepted_timepoints=200
+        )
+        simulation_service.time_measures[1].return_code = 1
+
+        run = SimulationCatalogueService.record_run(
+            simulation_service, SimulationStatus.FINISHED, self.started_at
+        )
+
+        run = SimulationRun.objects.get(pk=run.pk)
+        self.assertEqual(run.ngspice_statistics["accepted_timepoints"], 100)
+        self.assertEqual(run.ngspice_statistics["rejected_timepoints"], 5)
+        self.assertEqual(
+            run.time_measures[1]["ngspice_statistics"]["accepted_timepoints"], 200
+        )
+
+    def test_find_runs(self):
+        simulation_service = self._create_simulated_service()
+        SimulationCatalogueService.record_run(
+            simulation_service, SimulationStatus.FINISHED, self.started_at
+        )
+        SimulationCatalogueService.record_run(
+            simulation_service, SimulationStatus.FAILED, self.started_at
+        )
+
+        self.assertEqual(
+            SimulationCatalogueService.find_runs(
+                input_hash=simulation_service.get_input_hash()
+            ).count(),
+            2,
+        )
+        self.assertEqual(
+            SimulationCatalogueService.find_runs(
+                model=MemristorModels.PERSHIN,
+                network_type=NetworkType.GRID_2D_GRAPH,
+                status=SimulationStatus.FINISHED,
+            ).count(),
+            1,
+        )
+        self.assertFalse(
+            SimulationCatalogueService.find_runs(
+                network_type=NetworkType.SINGLE_DEVICE
+            ).exists()
+        )
+
+    def test_save_run_database_error(self):
+        run_fields = SimulationCatalogueService.get_run_fields(
+            SimulationService(self.request_parameters),
+            SimulationStatus.FAILED,
+            self.started_at,
+        )
+
+        with patch.object(
+            SimulationRun.objects, "create", side_effect=DatabaseError("locked")
+        ):
+            self.assertIsNone(SimulationCatalogueService.save_run(run_fields))
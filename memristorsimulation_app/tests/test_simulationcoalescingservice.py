@@ -0,0 +1,246 @@
+import asyncio
+import threading
+import time
+
+from io import BytesIO
+from unittest.mock import patch
+from memristorsimulation_app.services.simulationcoalescingservice import (
+    CoalescedSimulationFailed,
+    SimulationCoalescingService,
+)
+from memristorsimulation_app.services.simulationprogressservice import (
+    SimulationCancelled,
+)
+from memristorsimulation_app.services.simulationservice import SimulationService
+from memristorsimulation_app.tests.basetestcase import BaseTestCase
+
+
+class SimulationCoalescingServiceTestCase(BaseTestCase):
+    SIMULATION_DURATION = 0.3
+
+    def setUp(self) -> None:
+        super().setUp()
+
+        self.request_parameters = {
+            "model": "pershin.sub",
+            "subcircuit": {
+                "model_parameters": {
+                    "alpha": 0.0,
+                    "beta": 500000.0,
+                    "rinit": 200000.0,
+                    "roff": 200000.0,
+                    "ron": 2000.0,
+                    "vt": 0.6,
+                },
+            },
+            "input_parameters": {
+                "source_number": 1,
+                "n_plus": "vin",
+                "n_minus": "gnd",
+                "wave_form": {
+                    "type": "sin",
+                    "parameters": {"vo": 0.0, "amplitude": 1.0, "frequency": 1.0},
+                },
+            },
+            "simulation_parameters": {
+                "analysis_type": ".tran",
+                "tstep": 1e-3,
+                "tstop": 1.0,
+            },
+            "export_parameters": {
+                "model_simulation_folder": "pershin_simulations",
+                "folder_name": self.get_random_string(),
+                "file_name": self.get_random_string(),
+                "magnitudes": ["vin", "i(v1)", "l0"],
+            },
+            "network_type": "SINGLE_DEVICE",
+            "network_parameters": {},
+            "plot_types": ["IV"],
+        }
+        self.amount_simulations = 0
+
+    def _simulate_and_create_results_zip(self) -> BytesIO:
+        self.amount_simulations += 1
+        time.sleep(self.SIMULATION_DURATION)
+
+        return BytesIO(f"results {self.amount_simulations}".encode())
+
+    async def _simulate_and_create_results_zip_async(self) -> BytesIO:
+        self.amount_simulations += 1
+        await asyncio.sleep(self.SIMULATION_DURATION)
+
+        return BytesIO(f"results {self.amount_simulations}".encode())
+
+    def _create_coalescing_service(self) -> SimulationCoalescingService:
+        return SimulationCoalescingService(SimulationService(self.request_parameters))
+
+    async def _run_in_arrival_order(self, amount_requests: int) -> list:
+        """
+        Identical async requests, each one arriving shortly after the previous one so the first one is the leader
+        """
+
+        async def arrive(index: int):
+            await asyncio.sleep(index * self.SIMULATION_DURATION / 10)
+
+            return (
+                await self._create_coalescing_service().simulate_and_create_results_zip_async()
+            )
+
+        return await asyncio.gather(
+            *[arrive(index) for index in range(amount_requests)],
+            return_exceptions=True,
+        )
+
+    def test_identical_requests_are_coalesced(self):
+        artifacts = []
+
+        def run():
+            artifacts.append(
+                self._create_coalescing_service().simulate_and_create_results_zip()
+            )
+
+        with patch.object(
+            SimulationService,
+            "simulate_and_create_results_zip",
+            side_effect=self._simulate_and_create_results_zip,
+            autospec=False,
+        ):
+            threads = [threading.Thread(target=run) for _ in range(3)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(self.amount_simulations, 1)
+        self.assertEqual(
+            sorted(artifact.coalesced for artifact in artifacts), [False, True, True]
+        )
+        self.assertEqual(
+            {artifact.zip_buffer.getvalue() for artifact in artifacts}, {b"results 1"}
+        )
+        self.assertEqual(len({artifact.folder_name for artifact in artifacts}), 1)
+
+    def test_identical_requests_are_coalesced_async(self):
+        async def run():
+            return await asyncio.gather(
+                *[
+                    self._create_coalescing_service().simulate_and_create_results_zip_async()
+                    for _ in range(5)
+                ]
+            )
+
+        with patch.object(
+            SimulationService,
+            "simulate_and_create_results_zip_async",
+            side_effect=self._simulate_and_create_results_zip_async,
+        ):
+            artifacts = asyncio.run(run())
+
+        self.assertEqual(self.amount_simulations, 1)
+        self.assertEqual(sum(artifact.coalesced for artifact in artifacts), 4)
+        self.assertEqual(
+            {artifact.zip_buffer.getvalue() for artifact in artifacts}, {b"results 1"}
+        )
+
+    def test_different_requests_are_not_coalesced(self):
+        async def run():
+            coalescing_services = [self._create_coalescing_service()]
+            self.request_parameters["simulation_parameters"]["tstop"] = 2.0
+            coalescing_services.append(self._create_coalescing_service())
+
+            return await asyncio.gather(
+                *[
+                    coalescing_service.simulate_and_create_results_zip_async()
+                    for coalescing_service in coalescing_services
+                ]
+            )
+
+        with patch.object(
+            SimulationService,
+            "simulate_and_create_results_zip_async",
+            side_effect=self._simulate_and_create_results_zip_async,
+        ):
+            artifacts = asyncio.run(run())
+
+        self.assertEqual(self.amount_simulations, 2)
+        self.assertFalse(any(artifact.coalesced for artifact in artifacts))
+
+    def test_finished_results_are_not_reused_by_later_requests(self):
+        with patch.object(
+            SimulationService,
+            "simulate_and_create_results_zip",
+            side_effect=self._simulate_and_create_results_zip,
+        ):
+            self._create_coalescing_service().simulate_and_create_results_zip()
+            artifact = (
+                self._create_coalescing_service().simulate_and_create_results_zip()
+            )
+
+        self.assertEqual(self.amount_simulations, 2)
+        self.assertFalse(artifact.coalesced)
+
+    def test_failed_leader_fails_followers(self):
+        async def failing_simulation(*args):
+            await asyncio.sleep(self.SIMULATION_DURATION)
+            raise RuntimeError("ngspice failed")
+
+        async def run():
+            return await self._run_in_arrival_order(2)
+
+        with patch.object(
+            SimulationService,
+            "simulate_and_create_results_zip_async",
+            side_effect=failing_simulation,
+        ) as mock_simulate:
+            results = asyncio.run(run())
+
+        mock_simulate.assert_called_once()
+        self.assertIsInstance(results[0], RuntimeError)
+        self.assertIsInstance(results[1], CoalescedSimulationFailed)
+        self.assertEqual(str(results[1]), "ngspice failed")
+
+    def test_cancelled_leader_does_not_cancel_followers(self):
+        async def simulation(*args):
+            self.amount_simulations += 1
+            await asyncio.sleep(self.SIMULATION_DURATION)
+            if self.amount_simulations == 1:
+                raise SimulationCancelled("Simulation cancelled")
+
+            return BytesIO(b"results")
+
+        async def run():
+            return await self._run_in_arrival_order(2)
+
+        with patch.object(
+            SimulationService,
+            "simulate_and_create_results_zip_async",
+            side_effect=simulation,
+        ):
+            results = asyncio.run(run())
+
+        self.assertEqual(self.amount_simulations, 2)
+        self.assertIsInstance(results[0], SimulationCancelled)
+        self.assertEqual(results[1].zip_buffer.getvalue(), b"results")
+        self.assertFalse(results[1].coalesced)
+
+    def test_coalescing_disabled(self):
+        async def run():
+            return await asyncio.gather(
+                *[
+                    self._create_coalescing_service().simulate_and_create_results_zip_async()
+                    for _ in range(2)
+                ]
+            )
+
+        with patch(
+            "memristorsimulation_app.services.simulationcoalescingservice.settings.SIMULATION_COALESCING_ENABLED",
+            False,
+        ):
+            with patch.object(
+                SimulationService,
+                "simulate_and_create_results_zip_async",
+                side_effect=self._simulate_and_create_results_zip_async,
+            ):
+                asyncio.run(run())
+
+        self.assertEqual(self.amount_simulations, 2)
@@ -0,0 +1,224 @@
+import os
+import numpy as np
+import pandas as pd
+
+from concurrent.futures import ThreadPoolExecutor
+from io import StringIO
+from memristorsimulation_app.constants import MemristorModels, ModelsSimulationFolders
+from memristorsimulation_app.services.simulationdataservice import (
+    AmbiguousResultsFile,
+    InvalidSeriesColumn,
+    SimulationDataService,
+    SimulationResultsNotFound,
+)
+from memristorsimulation_app.tests.basetestcase import BaseTestCase
+
+
+class SimulationDataServiceTestCase(BaseTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.model_simulation_folder = ModelsSimulationFolders.PERSHIN_SIMULATIONS
+        self.folder_name = self.get_random_string()
+        self.file_name = self.get_random_string()
+
+        time = np.linspace(0, 2, 5001)
+        self.dataframe = pd.DataFrame(
+            {
+                "time": time,
+                "vin": np.sin(2 * np.pi * time),
+                "i(v1)": np.sin(2 * np.pi * time) / 1e3,
+                "l0": np.linspace(2e3, 200e3, len(time)),
+            }
+        )
+        self.dataframe.loc[1234, "i(v1)"] = 5.0
+
+        self.write_simulation_results_csv(
+            self.model_simulation_folder,
+            self.folder_name,
+            self.file_name,
+            self.dataframe,
+        )
+
+    def test_get_series_without_decimation(self):
+        service = SimulationDataService(self.model_simulation_folder, self.folder_name)
+
+        series = service.get_series(columns=["vin", "l0"])
+
+        self.assertEqual(series.columns, ["time", "vin", "l0"])
+        self.assertEqual(series.total_points, len(self.dataframe))
+        self.assertEqual(series.returned_points, len(self.dataframe))
+        np.testing.assert_allclose(series.values["l0"], self.dataframe["l0"])
+        self.assertEqual(series.csv_file_name_no_extension, f"{self.file_name}_results")
+
+    def test_get_series_with_decimation_keeps_extremes(self):
+        service = SimulationDataService(self.model_simulation_folder, self.folder_name)
+
+        series = service.get_series(columns=["vin", "i(v1)"], max_points=300)
+
+        self.assertLessEqual(series.returned_points, 300)
+        self.assertEqual(series.total_points, len(self.dataframe))
+        self.assertEqual(series.values["time"][0], 0)
+        self.assertEqual(series.values["time"][-1], 2)
+        self.assertTrue(np.all(np.diff(series.values["time"]) > 0))
+        self.assertEqual(max(series.values["i(v1)"]), 5.0)
+        self.assertAlmostEqual(max(series.values["vin"]), 1, places=5)
+        self.assertAlmostEqual(min(series.values["vin"]), -1, places=5)
+
+    def test_compute_decimation_indexes_below_budget(self):
+        values = np.random.rand(100, 2)
+
+        indexes = SimulationDataService.compute_decimation_indexes(values, 200)
+
+        np.testing.assert_array_equal(indexes, np.arange(100))
+
+    def test_compute_decimation_indexes_of_wide_frames(self):
+        values = np.random.rand(10000, 40)
+
+        for max_points in (2, 3, 50, 200):
+            indexes = SimulationDataService.compute_decimation_indexes(
+                values, max_points
+            )
+
+            self.assertLessEqual(len(indexes), max_points)
+            self.assertEqual(indexes[0], 0)
+            self.assertEqual(indexes[-1], 9999)
+            self.assertTrue(np.all(np.diff(indexes) > 0))
+
+        indexes = SimulationDataService.compute_decimation_indexes(
+            np.random.rand(1000, 3), 2
+        )
+        np.testing.assert_array_equal(indexes, [0, 999])
+
+    def test_get_series_invalid_column(self):
+        service = SimulationDataService(self.model_simulation_folder, self.folder_name)
+
+        with self.assertRaises(InvalidSeriesColumn):
+            service.get_series(columns=["l99"])
+
+    def test_get_series_ambiguous_results_file(self):
+        other_file_name = self.get_random_string()
+        self.write_simulation_results_csv(
+            self.model_simulation_folder,
+            self.folder_name,
+            other_file_name,
+            self.dataframe,
+        )
+        service = SimulationDataService(self.model_simulation_folder, self.folder_name)
+
+        with self.assertRaises(AmbiguousResultsFile):
+            service.get_series()
+
+        service = SimulationDataService(
+            self.model_simulation_folder, self.folder_name, file_name=other_file_name
+        )
+        self.assertEqual(
+            service.get_series().csv_file_name_no_extension,
+            f"{other_file_name}_results",
+        )
+
+    def test_invalid_folder_name(self):
+        for folder_name in ["..", self.get_random_string(), ".hidden"]:
+            with self.assertRaises(SimulationResultsNotFound):
+                SimulationDataService(self.model_simulation_folder, folder_name)
+
+    def test_series_to_binary(self):
+        service = SimulationDataService(self.model_simulation_folder, self.folder_name)
+        series = service.get_series(columns=["vin"], max_points=100)
+
+        binary = SimulationDataService.series_to_binary(series)
+        values = np.frombuffer(binary, dtype="<f4").reshape(2, -1)
+
+        np.testing.assert_allclose(values[0], series.values["time"], rtol=1e-6)
+        np.testing.assert_allclose(values[1], series.values["vin"], atol=1e-6)
+
+    def test_get_series_time_window(self):
+        service = SimulationDataService(self.model_simulation_folder, self.folder_name)
+
+        # Bounds between samples, so the CSV float round trip cannot move a sample across them
+        series = service.get_series(columns=["l0"], t0=0.5001, t1=0.7001)
+
+        window = self.dataframe[
+            (self.dataframe["time"] >= 0.5001) & (self.dataframe["time"] <= 0.7001)
+        ]
+        self.assertEqual(series.columns, ["time", "l0"])
+        self.assertEqual(series.total_points, len(window))
+        np.testing.assert_allclose(series.values["time"], window["time"])
+        np.testing.assert_allclose(series.values["l0"], window["l0"])
+
+        series = service.get_series(columns=["vin"], t0=0.5, t1=0.7, max_points=20)
+        self.assertLessEqual(series.returned_points, 20)
+        self.assertEqual(series.values["time"][0], series.values["time"].min())
+
+        series = service.get_series(columns=["vin"], t0=5, t1=6)
+        self.assertEqual(series.returned_points, 0)
+
+    def test_columnar_index(self):
+        service = SimulationDataService(self.model_simulation_folder, self.folder_name)
+        results_file_path = service.get_results_file_path()
+        index_path = service.get_columnar_index_path(results_file_path)
+
+        service.get_series(columns=["vin"])
+        index = service.load_columnar_index(results_file_path)
+
+        self.assertEqual(index["columns"], ["time", "vin", "i(v1)", "l0"])
+        self.assertEqual(index["amount_points"], len(self.dataframe))
+        self.assertTrue(os.path.isfile(f"{index_path}/3.npy"))
+        self.assertNotIn(
+            SimulationDataService.COLUMNS_DIR,
+            " ".join(
+                archive_name
+                for _, archive_name in self.create_directories_management_service(
+                    MemristorModels.PERSHIN
+                ).get_all_simulation_files()
+            ),
+        )
+
+        # Results files modified after the index was built are indexed again
+        self.dataframe["l0"] = -self.dataframe["l0"]
+        self.write_simulation_results_csv(
+            self.model_simulation_folder,
+            self.folder_name,
+            self.file_name,
+            self.dataframe,
+        )
+        os.utime(results_file_path, ns=(0, os.stat(results_file_path).st_mtime_ns + 1))
+
+        series = service.get_series(columns=["l0"])
+        np.testing.assert_allclose(series.values["l0"], self.dataframe["l0"])
+
+    def test_build_columnar_index_keeps_valid_index(self):
+        service = SimulationDataService(self.model_simulation_folder, self.folder_name)
+        results_file_path = service.get_results_file_path()
+        index_path = service.get_columnar_index_path(results_file_path)
+        service.build_columnar_index(results_file_path)
+        index_inode = os.stat(index_path).st_ino
+        # Column files memory mapped by a concurrent read stay in place
+        column = service.load_column(
+            results_file_path, service.load_columnar_index(results_file_path), "vin"
+        )
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            indexes = list(
+                executor.map(service.build_columnar_index, [results_file_path] * 4)
+            )
+
+        self.assertEqual(os.stat(index_path).st_ino, index_inode)
+        self.assertTrue(os.path.isfile(column.filename))
+        self.assertEqual(
+            [index["amount_points"] for index in indexes], [len(self.dataframe)] * 4
+        )
+        self.assertFalse(
+            any(
+                file_name.endswith(".tmp")
+                for file_name in os.listdir(os.path.dirname(index_path))
+            )
+        )
+
+    def test_series_to_csv(self):
+        service = SimulationDataService(self.model_simulation_folder, self.folder_name)
+        series = service.get_series(columns=["vin", "i(v1)"], t0=0, t1=0.01)
+
+        dataframe = pd.read_csv(StringIO(SimulationDataService.series_to_csv(series)))
+
+        self.assertEqual(list(dataframe.columns), ["time", "vin", "i(v1)"])
+        np.testing.assert_allclose(dataframe["vin"], series.values["vin"])
@@ -0,0 +1,243 @@
+import asyncio
+import subprocess
+import time
+
+from unittest.mock import Mock, patch
+from memristorsimulation_app.constants import SimulationStatus
+from memristorsimulation_app.services.simulationprogressservice import (
+    InvalidProgressId,
+    SimulationCancelled,
+    SimulationProgressService,
+)
+from memristorsimulation_app.services.timemeasureservice import (
+    AsyncTimeMeasureService,
+    TimeMeasureService,
+)
+from memristorsimulation_app.tests.basetestcase import BaseTestCase
+
+
+class SimulationProgressServiceTestCase(BaseTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+
+        self.progress_service = SimulationProgressService(self.get_random_string())
+
+    def test_invalid_progress_id(self):
+        for progress_id in ["", "../run", "run.1", "a" * 65]:
+            with self.assertRaises(InvalidProgressId):
+                SimulationProgressService(progress_id)
+
+    def test_get_progress_not_started(self):
+        self.assertIsNone(self.progress_service.get_progress())
+
+    def test_parse_output_line_reference_value(self):
+        self.progress_service.start(tstop=2.0)
+
+        with patch.object(SimulationProgressService, "MIN_WRITE_INTERVAL", 0):
+            self.progress_service.parse_output_line("Reference value :  5.00000e-01")
+
+        progress = self.progress_service.get_progress()
+        self.assertEqual(progress.status, SimulationStatus.RUNNING)
+        self.assertEqual(progress.simulated_time, 0.5)
+        self.assertEqual(progress.percentage, 25.0)
+        self.assertIsNotNone(progress.estimated_time_remaining)
+        self.assertAlmostEqual(
+            progress.estimated_time_remaining, 3 * progress.elapsed_time
+        )
+
+    def test_parse_output_line_percentage(self):
+        self.progress_service.start(tstop=2.0)
+
+        with patch.object(SimulationProgressService, "MIN_WRITE_INTERVAL", 0):
+            self.progress_service.parse_output_line("75.0%")
+
+        progress = self.progress_service.get_progress()
+        self.assertEqual(progress.simulated_time, 1.5)
+        self.assertEqual(progress.percentage, 75.0)
+
+    def test_parse_output_line_without_progress(self):
+        self.progress_service.start(tstop=2.0)
+
+        with patch.object(SimulationProgressService, "MIN_WRITE_INTERVAL", 0):
+            self.progress_service.parse_output_line("Circuit: memristor circuit")
+
+        self.assertEqual(self.progress_service.get_progress().percentage, 0.0)
+
+    def test_update_is_throttled(self):
+        self.progress_service.start(tstop=1.0)
+
+        self.progress_service.update(simulated_time=0.5)
+
+        self.assertEqual(self.progress_service.progress.percentage, 50.0)
+        self.assertEqual(self.progress_service.get_progress().percentage, 0.0)
+
+    def test_finish(self):
+        self.progress_service.start(tstop=1.0)
+        self.progress_service.request_cancel()
+
+        self.progress_service.finish(SimulationStatus.FINISHED)
+
+        progress = self.progress_service.get_progress()
+        self.assertEqual(progress.status, SimulationStatus.FINISHED)
+        self.assertEqual(progress.percentage, 100.0)
+        self.assertEqual(progress.estimated_time_remaining, 0.0)
+        self.assertFalse(self.progress_service.is_cancel_requested())
+
+    def test_start_clears_stale_cancellation(self):
+        # Cancelled while no run used the id
+        self.progress_service.request_cancel()
+
+        self.progress_service.start(tstop=1.0)
+
+        self.assertFalse(self.progress_service.is_cancel_requested())
+
+    def test_follow_progress(self):
+        self.progress_service.start(tstop=1.0)
+        self.progress_service.finish(SimulationStatus.FAILED, error="ngspice failed")
+
+        with patch.object(SimulationProgressService, "POLL_INTERVAL", 0):
+            progresses = list(self.progress_service.follow_progress())
+
+        self.assertEqual(len(progresses), 1)
+        self.assertEqual(progresses[0].status, SimulationStatus.FAILED)
+        self.assertEqual(progresses[0].error, "ngspice failed")
+
+    def test_follow_progress_not_started(self):
+        with patch.object(SimulationProgressService, "POLL_INTERVAL", 0):
+            with patch.object(SimulationProgressService, "WAIT_FOR_START_TIMEOUT", 0):
+                self.assertEqual(list(self.progress_service.follow_progress()), [])
+
+    def test_follow_progress_async(self):
+        async def collect_progresses() -> list:
+            return [
+                progress
+                async for progress in self.progress_service.follow_progress_async()
+            ]
+
+        with patch.object(SimulationProgressService, "POLL_INTERVAL", 0):
+            with patch.object(SimulationProgressService, "WAIT_FOR_START_TIMEOUT", 0):
+                self.assertEqual(asyncio.run(collect_progresses()), [])
+
+            self.progress_service.start(tstop=1.0)
+            self.progress_service.finish(SimulationStatus.CANCELLED)
+            progresses = asyncio.run(collect_progresses())
+
+        self.assertEqual(len(progresses), 1)
+        self.assertEqual(progresses[0].status, SimulationStatus.CANCELLED)
+
+
+class TimeMeasureServiceReadProcessOutputTestCase(BaseTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+
+        self.progress_service = SimulationProgressService(self.get_random_string())
+        self.progress_service.start(tstop=1.0)
+        self.time_measure_service = TimeMeasureService(
+            Mock(), progress_service=self.progress_service
+        )
+
+    @staticmethod
+    def _start_process(script: str) -> subprocess.Popen:
+        return subprocess.Popen(
+            ["bash", "-c", script],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            start_new_session=True,
+        )
+
+    def test_read_process_output(self):
+        process = self._start_process(
+            "printf 'Circuit: test\\nReference value :  2.50000e-01\\r"
+            "Reference value :  7.50000e-01\\rNo. of Data Rows : 10\\n'"
+        )
+
+        with patch.object(SimulationProgressService, "MIN_WRITE_INTERVAL", 0):
+            output = self.time_measure_service.read_process_output(process)
+        process.wait()
+
+        self.assertIn(b"No. of Data Rows : 10", output)
+        self.assertEqual(self.progress_service.progress.simulated_time, 0.75)
+        self.assertEqual(self.progress_service.get_progress().percentage, 75.0)
+
+    def test_read_process_output_cancelled(self):
+        process = self._start_process("sleep 30")
+        self.progress_service.request_cancel()
+        start_time = time.time()
+
+        with self.assertRaises(SimulationCancelled):
+            self.time_measure_service.read_process_output(process)
+
+        self.assertLess(time.time() - start_time, 5)
+        self.assertIsNotNone(process.returncode)
+
+
+class AsyncTimeMeasureServiceReadProcessOutputTestCase(BaseTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+
+        self.progress_service = SimulationProgressService(self.get_random_string())
+        self.progress_service.start(tstop=1.0)
+        self.time_measure_service = AsyncTimeMeasureService(
+            Mock(), progress_service=self.progress_service
+        )
+
+    async def _read_process_output(self, script: str) -> bytes:
+        process = subprocess.Popen(
+            ["bash", "-c", script],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            start_new_session=True,
+        )
+        output = await self.time_measure_service.read_process_output(process)
+        await asyncio.to_thread(self.time_measure_service.wait_process, process)
+
+        return output
+
+    def test_read_process_output(self):
+        with patch.object(SimulationProgressService, "MIN_WRITE_INTERVAL", 0):
+            output = asyncio.run(
+                self._read_process_output(
+                    "printf 'Reference value :  5.00000e-01\\r'; sleep 0.1; "
+                    "printf 'Reference value :  9.00000e-01\\rdone\\n'"
+                )
+            )
+
+        self.assertTrue(output.endswith(b"done\n"))
+        self.assertEqual(self.progress_service.get_progress().percentage, 90.0)
+
+    def test_read_process_output_cancelled(self):
+        self.progress_service.request_cancel()
+        start_time = time.time()
+
+        with self.assertRaises(SimulationCancelled):
+            asyncio.run(self._read_process_output("sleep 30"))
+
+        self.assertLess(time.time() - start_time, 5)
+
+    def test_execute_with_time_measure_cancelled_task(self):
+        process = subprocess.Popen(
+            ["bash", "-c", "sleep 30"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            start_new_session=True,
+        )
+
+        async def execute_and_cancel() -> None:
+            task = asyncio.create_task(
+                self.time_measure_service.execute_with_time_measure()
+            )
+            await asyncio.sleep(0.2)
+            task.cancel()
+            await task
+
+        start_time = time.time()
+        with patch.object(
+            AsyncTimeMeasureService, "_prepare_execute_command"
+        ), patch.object(
+            AsyncTimeMeasureService, "_start_process", return_value=process
+        ):
+            with self.assertRaises(asyncio.CancelledError):
+                asyncio.run(execute_and_cancel())
+
+        self.assertLess(time.time() - start_time, 5)
+        self.assertIsNotNone(process.returncode)
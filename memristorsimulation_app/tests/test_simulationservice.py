@@ -1,10 +1,25 @@
+import json
+import os
+import shutil
+import tempfile
+
 from io import BytesIO
-from unittest.mock import Mock, patch
+from unittest.mock import AsyncMock, Mock, patch
+import asyncio
+import copy
 import zipfile
-from memristorsimulation_app.constants import AnalysisType
+from django.conf import settings
+from django.test import override_settings
+from memristorsimulation_app.constants import (
+    SIMULATIONS_DIR,
+    AnalysisType,
+    MemristorModels,
+    SimulationStatus,
+)
 from memristorsimulation_app.representations import SinWaveForm
 from memristorsimulation_app.services.networkservice import NetworkService
 from memristorsimulation_app.services.simulationservice import SimulationService
+from memristorsimulation_app.services.stagetimingservice import StageTimingService
 from memristorsimulation_app.services.ngspiceservice import NGSpiceService
 from memristorsimulation_app.simulation_templates.basetemplate import BaseTemplate
 from memristorsimulation_app.tests.basetestcase import BaseTestCase
@@ -285,6 +300,10 @@ class TestSimulationService(BaseTestCase):
             self.simulation_service.simulation_inputs.simulation_parameters,
         )
         self.assertFalse(cfs.ignore_states)
+        self.assertEqual(
+            self.simulation_service.graph.state_edges,
+            network_service.get_state_edges(),
+        )
         self.assertEqual(cfs.subcircuit_file_service, sfs)
         self.assertEqual(
             cfs.directories_management_service,
@@ -318,7 +337,8 @@ class TestSimulationService(BaseTestCase):
                     self.simulation_service.simulate()
                     mock_build.assert_called_once()
                     mock_ngspice_class.assert_called_once_with(
-                        self.simulation_service.directories_management_service
+                        self.simulation_service.directories_management_service,
+                        progress_service=None,
                     )
 
                     mock_ngspice_service.run_single_circuit_simulation.assert_called_once_with(
@@ -330,8 +350,222 @@ class TestSimulationService(BaseTestCase):
                         model_parameters=mock_model_parameters,
                         input_parameters=mock_input_parameters,
                         plot_types=self.simulation_service.simulation_inputs.plot_types,
+                        graph=self.simulation_service.graph,
+                        stage_timing_service=self.simulation_service.stage_timing_service,
+                    )
+                    self.assertEqual(
+                        list(
+                            self.simulation_service.stage_timing_service.get_stage_durations()
+                        ),
+                        ["parse", "spice"],
+                    )
+
+    def test_parse_request_parameters_with_auto_step(self):
+        request_parameters = copy.deepcopy(self.request_parameters)
+        request_parameters["input_parameters"]["wave_form"]["parameters"][
+            "frequency"
+        ] = 1.0
+        request_parameters["simulation_parameters"].update(
+            {"tstep": None, "tstop": 2.0, "tmax": None, "auto_step": True}
+        )
+
+        simulation_parameters = self.simulation_service.parse_request_parameters(
+            request_parameters
+        ).simulation_parameters
+
+        # 100 points per sine period
+        self.assertAlmostEqual(simulation_parameters.tstep, 1e-2)
+        self.assertAlmostEqual(simulation_parameters.tmax, 1e-2)
+        self.assertIn(".tran 0.01 2.0", simulation_parameters.get_analysis())
+
+        # Short runs keep at least AUTO_STEP_MIN_POINTS points
+        request_parameters["simulation_parameters"]["tstop"] = 0.5
+        simulation_parameters = self.simulation_service.parse_request_parameters(
+            request_parameters
+        ).simulation_parameters
+
+        self.assertAlmostEqual(simulation_parameters.tstep, 5e-3)
+
+        request_parameters["input_parameters"]["wave_form"] = {
+            "type": "pulse",
+            "parameters": {
+                "v1": 0,
+                "v2": 1,
+                "tr": 1e-6,
+                "tf": 1e-6,
+                "pw": 1e-3,
+                "per": 1e-2,
+            },
+        }
+        request_parameters["simulation_parameters"]["tstop"] = 0.1
+        simulation_parameters = self.simulation_service.parse_request_parameters(
+            request_parameters
+        ).simulation_parameters
+
+        # 20 points per pulse width, edges are left to the ngspice breakpoints
+        self.assertAlmostEqual(simulation_parameters.tstep, 5e-5)
+
+        request_parameters["simulation_parameters"]["auto_step"] = False
+        request_parameters["simulation_parameters"]["tstep"] = 1e-3
+        simulation_parameters = self.simulation_service.parse_request_parameters(
+            request_parameters
+        ).simulation_parameters
+
+        self.assertEqual(simulation_parameters.tstep, 1e-3)
+        self.assertIsNone(simulation_parameters.tmax)
+
+    def test_get_input_hash(self):
+        reordered_request_parameters = dict(reversed(self.request_parameters.items()))
+        reordered_request_parameters["model"] = MemristorModels.PERSHIN
+
+        self.assertEqual(
+            SimulationService(reordered_request_parameters).get_input_hash(),
+            self.simulation_service.get_input_hash(),
+        )
+
+        modified_request_parameters = copy.deepcopy(self.request_parameters)
+        modified_request_parameters["simulation_parameters"]["tstop"] = 2e-6
+        self.assertNotEqual(
+            SimulationService(modified_request_parameters).get_input_hash(),
+            self.simulation_service.get_input_hash(),
+        )
+
+    def test_simulate_async(self):
+        mock_circuit_file_service = Mock()
+        mock_ngspice_service = Mock()
+        mock_ngspice_service.run_single_circuit_simulation = AsyncMock()
+
+        with patch.object(
+            self.simulation_service,
+            "_build_from_request_and_write",
+            return_value=mock_circuit_file_service,
+        ):
+            with patch(
+                "memristorsimulation_app.services.simulationservice.AsyncNGSpiceService",
+                return_value=mock_ngspice_service,
+            ) as mock_ngspice_class:
+                with patch.object(self.simulation_service, "plot") as mock_plot:
+                    asyncio.run(self.simulation_service.simulate_async())
+
+                    mock_ngspice_class.assert_called_once_with(
+                        self.simulation_service.directories_management_service,
+                        progress_service=None,
+                    )
+                    mock_ngspice_service.run_single_circuit_simulation.assert_awaited_once_with(
+                        self.simulation_service.simulation_inputs.amount_iterations
+                    )
+                    mock_plot.assert_called_once_with(
+                        export_parameters=self.simulation_service.simulation_inputs.export_parameters,
+                        model_parameters=mock_circuit_file_service.subcircuit_file_service.subcircuit.model_parameters,
+                        input_parameters=mock_circuit_file_service.input_parameters,
+                        plot_types=self.simulation_service.simulation_inputs.plot_types,
+                        graph=self.simulation_service.graph,
+                        stage_timing_service=self.simulation_service.stage_timing_service,
                     )
 
+    def test_simulate_in_scratch_workspace(self):
+        scratch_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, scratch_dir, ignore_errors=True)
+        directories_management_service = (
+            self.simulation_service.directories_management_service
+        )
+
+        def run_single_circuit_simulation(amount_iterations):
+            results_file_path = (
+                directories_management_service.get_export_simulation_file_path()
+            )
+            self.assertTrue(results_file_path.startswith(scratch_dir))
+            with open(results_file_path, "w") as f:
+                f.write("time vin\n0 0\n")
+
+            return []
+
+        mock_ngspice_service = Mock(spec=NGSpiceService)
+        mock_ngspice_service.run_single_circuit_simulation.side_effect = (
+            run_single_circuit_simulation
+        )
+
+        with override_settings(SIMULATION_SCRATCH_DIR=scratch_dir):
+            with patch(
+                "memristorsimulation_app.services.simulationservice.NGSpiceService",
+                return_value=mock_ngspice_service,
+            ):
+                with patch.object(self.simulation_service, "plot"):
+                    self.simulation_service.simulate()
+
+        simulation_folder_path = (
+            directories_management_service.get_simulation_folder_path()
+        )
+        self.assertTrue(simulation_folder_path.startswith(SIMULATIONS_DIR))
+        self.assertEqual(
+            sorted(
+                archive_name
+                for _, archive_name in directories_management_service.get_all_simulation_files()
+            ),
+            sorted(
+                [
+                    "pershin.sub",
+                    "pershin_circuit_file.cir",
+                    f"{self.simulation_service.simulation_inputs.export_parameters.file_name}_results.csv",
+                ]
+            ),
+        )
+        self.assertEqual(os.listdir(f"{scratch_dir}/pershin_simulations"), [])
+
+    def test_simulate_and_create_results_zip_writes_stage_timings(self):
+        mock_ngspice_service = Mock(spec=NGSpiceService)
+        mock_ngspice_service.run_single_circuit_simulation.return_value = []
+
+        with patch(
+            "memristorsimulation_app.services.simulationservice.NGSpiceService",
+            return_value=mock_ngspice_service,
+        ):
+            with patch.object(self.simulation_service, "plot"):
+                zip_buffer = self.simulation_service.simulate_and_create_results_zip()
+
+        log_file_path = (
+            f"{self.simulation_service.directories_management_service.get_simulation_folder_path()}/"
+            f"{StageTimingService.LOG_FILE_NAME}"
+        )
+        with open(log_file_path, "r") as f:
+            log = json.load(f)
+        self.assertEqual(
+            list(log["stages_ms"]),
+            ["parse", "build", "subcircuit_write", "circuit_write", "spice", "zip"],
+        )
+        with zipfile.ZipFile(zip_buffer, "r") as zip_file:
+            self.assertNotIn(StageTimingService.LOG_FILE_NAME, zip_file.namelist())
+
+    def test_simulate_with_progress(self):
+        simulation_service = SimulationService(
+            self.request_parameters, progress_id="progress-test"
+        )
+        mock_ngspice_service = Mock(spec=NGSpiceService)
+        mock_ngspice_service.run_single_circuit_simulation.side_effect = RuntimeError(
+            "ngspice failed"
+        )
+
+        with patch.object(simulation_service, "_build_from_request_and_write"):
+            with patch(
+                "memristorsimulation_app.services.simulationservice.NGSpiceService",
+                return_value=mock_ngspice_service,
+            ) as mock_ngspice_class:
+                with self.assertRaises(RuntimeError):
+                    simulation_service.simulate()
+
+                mock_ngspice_class.assert_called_once_with(
+                    simulation_service.directories_management_service,
+                    progress_service=simulation_service.progress_service,
+                )
+
+        progress = simulation_service.progress_service.get_progress()
+        self.assertEqual(progress.status, SimulationStatus.FAILED)
+        self.assertEqual(progress.error, "ngspice failed")
+        self.assertEqual(
+            progress.tstop,
+            simulation_service.simulation_inputs.simulation_parameters.tstop,
+        )
+
     def test_create_results_zip(self):
         mock_file_paths = [
             ("/path/to/subcircuit.sub", "subcircuit.sub"),
@@ -350,7 +584,9 @@ class TestSimulationService(BaseTestCase):
             "get_all_simulation_files",
             return_value=mock_file_paths,
         ) as mock_get_files:
-            with patch("os.path.exists", side_effect=mock_exists) as mock_exists_patch:
+            with patch(
+                "os.path.exists", side_effect=mock_exists
+            ) as mock_exists_patch, patch("os.path.getsize", return_value=0):
                 with patch("zipfile.ZipFile") as mock_zipfile:
                     mock_zip_context = Mock()
                     mock_zipfile.return_value.__enter__.return_value = mock_zip_context
@@ -369,16 +605,21 @@ class TestSimulationService(BaseTestCase):
                     self.assertEqual(
                         kwargs.get("mode", args[1] if len(args) > 1 else None), "w"
                     )
-                    self.assertEqual(
-                        kwargs.get("compression", args[2] if len(args) > 2 else None),
-                        zipfile.ZIP_DEFLATED,
-                    )
 
                     self.assertEqual(
                         mock_zip_context.write.call_count, len(mock_file_paths)
                     )
                     for file_path, archive_name in mock_file_paths:
-                        mock_zip_context.write.assert_any_call(file_path, archive_name)
+                        mock_zip_context.write.assert_any_call(
+                            file_path,
+                            archive_name,
+                            compress_type=(
+                                zipfile.ZIP_STORED
+                                if archive_name.endswith(".png")
+                                else zipfile.ZIP_DEFLATED
+                            ),
+                            compresslevel=settings.SIMULATION_ZIP_DEFLATE_LEVEL,
+                        )
 
                     self.assertIsInstance(result, BytesIO)
 
@@ -400,7 +641,9 @@ class TestSimulationService(BaseTestCase):
             "get_all_simulation_files",
             return_value=mock_file_paths,
         ):
-            with patch("os.path.exists", side_effect=mock_exists):
+            with patch("os.path.exists", side_effect=mock_exists), patch(
+                "os.path.getsize", return_value=0
+            ):
                 with patch("zipfile.ZipFile") as mock_zipfile:
                     mock_zip_context = Mock()
                     mock_zipfile.return_value.__enter__.return_value = mock_zip_context
@@ -409,18 +652,13 @@ class TestSimulationService(BaseTestCase):
                     result = self.simulation_service.create_results_zip()
 
                     self.assertEqual(mock_zip_context.write.call_count, 2)
-                    mock_zip_context.write.assert_any_call(
-                        "/path/to/existing.sub", "existing.sub"
-                    )
-                    mock_zip_context.write.assert_any_call(
-                        "/path/to/another_existing.csv", "another_existing.csv"
+                    written_archive_names = [
+                        call.args[1] for call in mock_zip_context.write.call_args_list
+                    ]
+                    self.assertEqual(
+                        written_archive_names, ["existing.sub", "another_existing.csv"]
                     )
 
-                    with self.assertRaises(AssertionError):
-                        mock_zip_context.write.assert_any_call(
-                            "/path/to/non_existent.cir", "non_existent.cir"
-                        )
-
                     self.assertIsInstance(result, BytesIO)
 
     def test_create_results_zip_empty_file_list(self):
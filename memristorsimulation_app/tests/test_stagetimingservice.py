@@ -0,0 +1,82 @@
+import json
+import os
+
+from unittest.mock import patch
+from memristorsimulation_app.constants import SIMULATIONS_DIR
+from memristorsimulation_app.services.stagetimingservice import StageTimingService
+from memristorsimulation_app.tests.basetestcase import BaseTestCase
+
+
+class StageTimingServiceTestCase(BaseTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+
+        self.stage_timing_service = StageTimingService()
+
+    def _add_span(self, name: str, start: float, end: float) -> None:
+        with patch(
+            "memristorsimulation_app.services.stagetimingservice.time.perf_counter",
+            side_effect=[
+                self.stage_timing_service.origin + start,
+                self.stage_timing_service.origin + end,
+            ],
+        ):
+            with self.stage_timing_service.span(name):
+                pass
+
+    def test_span(self):
+        with self.stage_timing_service.span("parse"):
+            pass
+
+        self.assertEqual(len(self.stage_timing_service.spans), 1)
+        self.assertEqual(self.stage_timing_service.spans[0].name, "parse")
+        self.assertGreaterEqual(self.stage_timing_service.spans[0].start_ms, 0)
+        self.assertGreaterEqual(self.stage_timing_service.spans[0].duration_ms, 0)
+
+    def test_span_of_failed_stage(self):
+        with self.assertRaises(ValueError):
+            with self.stage_timing_service.span("spice"):
+                raise ValueError("ngspice failed")
+
+        self.assertEqual(self.stage_timing_service.spans[0].name, "spice")
+
+    def test_get_stage_durations(self):
+        self._add_span("load", 0, 0.002)
+        self._add_span("plot_IV", 0.002, 0.005)
+        self._add_span("plot_IV", 0.005, 0.006)
+
+        stage_durations = self.stage_timing_service.get_stage_durations()
+
+        self.assertEqual(list(stage_durations), ["load", "plot_IV"])
+        self.assertAlmostEqual(stage_durations["load"], 2)
+        self.assertAlmostEqual(stage_durations["plot_IV"], 4)
+        self.assertAlmostEqual(self.stage_timing_service.get_total_time(), 6)
+
+    def test_get_server_timing_header(self):
+        self.assertEqual(self.stage_timing_service.get_server_timing_header(), "")
+
+        self._add_span("parse", 0, 0.0012)
+        self._add_span("zip", 0.0012, 0.0112)
+
+        self.assertEqual(
+            self.stage_timing_service.get_server_timing_header(),
+            "parse;dur=1.2, zip;dur=10.0",
+        )
+
+    def test_write_log(self):
+        folder_path = f"{SIMULATIONS_DIR}/{self.get_random_string()}"
+        os.makedirs(folder_path)
+        self._add_span("spice", 0, 0.5)
+
+        log_file_path = self.stage_timing_service.write_log(folder_path)
+
+        self.assertEqual(
+            log_file_path, f"{folder_path}/{StageTimingService.LOG_FILE_NAME}"
+        )
+        self.assertEqual(os.listdir(folder_path), [StageTimingService.LOG_FILE_NAME])
+        with open(log_file_path, "r") as f:
+            log = json.load(f)
+        self.assertAlmostEqual(log["total_ms"], 500)
+        self.assertEqual(list(log["stages_ms"]), ["spice"])
+        self.assertEqual(log["spans"][0]["name"], "spice")
+        self.assertIn("started_at", log)
@@ -0,0 +1,220 @@
+import os
+import zipfile
+
+from unittest.mock import patch
+from memristorsimulation_app.constants import (
+    SIMULATIONS_DIR,
+    InvalidSweep,
+    SimulationStatus,
+    SweepMode,
+)
+from memristorsimulation_app.representations import SweepPointResult
+from memristorsimulation_app.services.sweepsimulationservice import (
+    SweepSimulationService,
+    run_sweep_point,
+)
+from memristorsimulation_app.tests.basetestcase import BaseTestCase
+
+
+class SweepSimulationServiceTestCase(BaseTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+
+        self.folder_name = self.get_random_string()
+        self.base_request_parameters = {
+            "model": "pershin.sub",
+            "subcircuit": {
+                "model_parameters": {
+                    "alpha": 0.0,
+                    "beta": 500000.0,
+                    "rinit": 200000.0,
+                    "roff": 200000.0,
+                    "ron": 2000.0,
+                    "vt": 0.6,
+                },
+            },
+            "input_parameters": {
+                "source_number": 1,
+                "n_plus": "vin",
+                "n_minus": "gnd",
+                "wave_form": {
+                    "type": "sin",
+                    "parameters": {"vo": 0.0, "amplitude": 1.0, "frequency": 1.0},
+                },
+            },
+            "simulation_parameters": {"tstep": 1e-3, "tstop": 1.0},
+            "export_parameters": {
+                "model_simulation_folder": "pershin_simulations",
+                "folder_name": self.folder_name,
+                "file_name": self.get_random_string(),
+                "magnitudes": ["vin", "i(v1)", "l0"],
+            },
+            "network_type": "SINGLE_DEVICE",
+            "network_parameters": {},
+            "plot_types": ["IV"],
+        }
+
+    def _create_sweep_simulation_service(
+        self, parameters, mode=SweepMode.CARTESIAN
+    ) -> SweepSimulationService:
+        return SweepSimulationService(
+            self.base_request_parameters, parameters, mode, max_workers=2
+        )
+
+    def test_generate_sweep_points_cartesian(self):
+        service = self._create_sweep_simulation_service(
+            [
+                {"path": "subcircuit.model_parameters.alpha", "values": [0, 1e3, 1e4]},
+                {
+                    "path": "input_parameters.wave_form.parameters.amplitude",
+                    "start": 1,
+                    "stop": 2,
+                    "num": 2,
+                },
+            ]
+        )
+
+        self.assertEqual(len(service.sweep_points), 6)
+        self.assertEqual(
+            service.sweep_points[-1],
+            {
+                "subcircuit.model_parameters.alpha": 1e4,
+                "input_parameters.wave_form.parameters.amplitude": 2.0,
+            },
+        )
+        self.assertEqual(len(service.request_parameters), 6)
+        self.assertEqual(
+            service.request_parameters[-1]["subcircuit"]["model_parameters"]["alpha"],
+            1e4,
+        )
+        self.assertEqual(
+            service.request_parameters[-1]["input_parameters"]["wave_form"][
+                "parameters"
+            ]["amplitude"],
+            2.0,
+        )
+        folder_names = {
+            request_parameters["export_parameters"]["folder_name"]
+            for request_parameters in service.request_parameters
+        }
+        self.assertEqual(len(folder_names), 6)
+        self.assertEqual(
+            self.base_request_parameters["subcircuit"]["model_parameters"]["alpha"],
+            0.0,
+        )
+
+    def test_generate_sweep_points_zip(self):
+        service = self._create_sweep_simulation_service(
+            [
+                {"path": "subcircuit.model_parameters.alpha", "values": [0, 1e3]},
+                {"path": "subcircuit.model_parameters.vt", "values": [0.5, 0.7]},
+            ],
+            mode=SweepMode.ZIP,
+        )
+
+        self.assertEqual(
+            service.sweep_points,
+            [
+                {
+                    "subcircuit.model_parameters.alpha": 0,
+                    "subcircuit.model_parameters.vt": 0.5,
+                },
+                {
+                    "subcircuit.model_parameters.alpha": 1e3,
+                    "subcircuit.model_parameters.vt": 0.7,
+                },
+            ],
+        )
+
+    def test_generate_sweep_points_zip_different_lengths(self):
+        with self.assertRaises(InvalidSweep):
+            self._create_sweep_simulation_service(
+                [
+                    {"path": "subcircuit.model_parameters.alpha", "values": [0, 1]},
+                    {"path": "subcircuit.model_parameters.vt", "values": [0.5]},
+                ],
+                mode=SweepMode.ZIP,
+            )
+
+    def test_generate_sweep_points_exceeds_max_amount_points(self):
+        with self.assertRaises(InvalidSweep):
+            self._create_sweep_simulation_service(
+                [
+                    {
+                        "path": "subcircuit.model_parameters.alpha",
+                        "start": 0,
+                        "stop": 1,
+                        "num": SweepSimulationService.MAX_AMOUNT_POINTS + 1,
+                    }
+                ]
+            )
+
+    def test_invalid_parameter_path(self):
+        with self.assertRaises(InvalidSweep):
+            self._create_sweep_simulation_service(
+                [{"path": "subcircuit.invalid.alpha", "values": [0]}]
+            )
+
+    def test_invalid_point_parameters(self):
+        with self.assertRaises(InvalidSweep) as context:
+            self._create_sweep_simulation_service(
+                [{"path": "simulation_parameters.tstep", "values": [1e-3, "abc"]}]
+            )
+
+        self.assertIn("point_1", context.exception.args[0])
+        self.assertNotIn("point_0", context.exception.args[0])
+
+    def test_run_sweep_point_failure(self):
+        service = self._create_sweep_simulation_service(
+            [{"path": "subcircuit.model_parameters.alpha", "values": [0]}]
+        )
+
+        with patch(
+            "memristorsimulation_app.services.sweepsimulationservice.SimulationService.simulate",
+            side_effect=RuntimeError("ngspice failed"),
+        ):
+            result = run_sweep_point(
+                0, service.sweep_points[0], service.request_parameters[0]
+            )
+
+        self.assertEqual(result.error, "RuntimeError: ngspice failed")
+        self.assertTrue(result.folder_name.startswith(f"{self.folder_name}_point_0"))
+        self.assertEqual(result.file_paths, [])
+        self.assertEqual(result.run_fields["status"], SimulationStatus.FAILED.value)
+        self.assertEqual(result.run_fields["error"], "RuntimeError: ngspice failed")
+
+    def test_create_results_zip(self):
+        service = self._create_sweep_simulation_service(
+            [{"path": "subcircuit.model_parameters.alpha", "values": [0, 1e3]}]
+        )
+        os.makedirs(SIMULATIONS_DIR, exist_ok=True)
+        file_path = f"{SIMULATIONS_DIR}/results.csv"
+        with open(file_path, "w") as f:
+            f.write("time vin\n0 0\n")
+        results = [
+            SweepPointResult(
+                0,
+                service.sweep_points[0],
+                "folder_point_0",
+                [(file_path, "results.csv")],
+            ),
+            SweepPointResult(
+                1, service.sweep_points[1], "folder_point_1", error="Failed"
+            ),
+        ]
+
+        zip_buffer = service.create_results_zip(results)
+
+        with zipfile.ZipFile(zip_buffer) as zip_file:
+            self.assertEqual(
+                sorted(zip_file.namelist()),
+                ["folder_point_0/results.csv", "sweep_index.csv"],
+            )
+            index = zip_file.read("sweep_index.csv").decode().splitlines()
+
+        self.assertEqual(
+            index[0],
+            "point,subcircuit.model_parameters.alpha,folder_name,status,error",
+        )
+        self.assertEqual(index[1], "0,0,folder_point_0,OK,")
+        self.assertEqual(index[2], "1,1000.0,folder_point_1,FAILED,Failed")
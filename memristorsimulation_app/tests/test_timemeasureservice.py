@@ -0,0 +1,262 @@
+import json
+import subprocess
+import sys
+
+from django.test import override_settings
+from unittest.mock import call, patch
+from memristorsimulation_app.constants import MemristorModels
+from memristorsimulation_app.representations import NGSpiceStatistics, TimeMeasure
+from memristorsimulation_app.services.ngspiceservice import NGSpiceService
+from memristorsimulation_app.services.timemeasureservice import TimeMeasureService
+from memristorsimulation_app.tests.basetestcase import BaseTestCase
+
+
+class TimeMeasureServiceTestCase(BaseTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+
+        self.directories_management_service = (
+            self.create_directories_management_service(MemristorModels.PERSHIN)
+        )
+        self.directories_management_service.create_workspace()
+
+    @staticmethod
+    def _create_time_measure(time_ms: float, return_code: int = 0) -> TimeMeasure:
+        return TimeMeasure(
+            start_time=0,
+            python_execution_time=time_ms + 1,
+            linux_real_execution_time=time_ms,
+            linux_user_execution_time=time_ms / 2,
+            linux_sys_execution_time=time_ms / 10,
+            return_code=return_code,
+        )
+
+    def test_wait_process(self):
+        process = subprocess.Popen(
+            [
+                sys.executable,
+                "-c",
+                "import sys; memory = bytearray(64 * 1024 * 1024); sys.exit(3)",
+            ],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+        )
+        process.stdout.read()
+
+        rusage = TimeMeasureService.wait_process(process)
+        time_measure = TimeMeasureService.set_resource_usage(
+            TimeMeasure(), 100.0, rusage
+        )
+
+        self.assertEqual(process.returncode, 3)
+        self.assertEqual(time_measure.linux_real_execution_time, 100.0)
+        self.assertGreater(time_measure.linux_user_execution_time, 0)
+        self.assertGreaterEqual(time_measure.max_rss_bytes, 64 * 1024 * 1024)
+        self.assertGreater(time_measure.minor_page_faults, 0)
+        self.assertIsNotNone(time_measure.voluntary_context_switches)
+        self.assertIsNotNone(time_measure.block_output_operations)
+
+    def test_parse_ngspice_statistics(self):
+        simulation_log = (
+            "Circuit: * MEMRISTOR CIRCUIT - MODEL pershin.sub\n"
+            "Reference value :  5.00000e-01\r"
+            "No. of Data Rows : 1011\n"
+            "Total analysis time (seconds) = 0.024\n\n"
+            "Total elapsed time (seconds) = 0.051 \n\n"
+            "Total DRAM available = 16051.703125 MB.\n"
+            "Maximum ngspice program size =   27.000 MB.\n"
+            "Stack = 0 bytes.\n\n"
+            "Total iterations = 1437\n"
+            "Transient iterations = 1411\n"
+            "Circuit Equations = 13\n"
+            "Transient timepoints = 652\n"
+            "Accepted timepoints = 580\n"
+            "Rejected timepoints = 35\n"
+            "Total analysis time = 0.024\n"
+            "Transient time = 0.024\n"
+            "matrix reordering time = 0\n"
+            "L-U decomposition time = 0.001\n"
+            "Matrix solve time = 0.002\n"
+            "Load time = 0.018\n"
+            "Transient load time = 0.018\n"
+        )
+
+        ngspice_statistics = TimeMeasureService.parse_ngspice_statistics(simulation_log)
+
+        self.assertEqual(
+            ngspice_statistics,
+            NGSpiceStatistics(
+                total_iterations=1437,
+                transient_iterations=1411,
+                circuit_equations=13,
+                transient_timepoints=652,
+                accepted_timepoints=580,
+                rejected_timepoints=35,
+                total_analysis_time=24.0,
+                total_elapsed_time=51.0,
+                transient_time=24.0,
+                load_time=18.0,
+                reordering_time=0.0,
+                decomposition_time=1.0,
+                solve_time=2.0,
+                max_program_size=27 * 1024**2,
+            ),
+        )
+        self.assertAlmostEqual(
+            ngspice_statistics.get_rejected_timepoints_ratio(), 35 / 615
+        )
+        self.assertAlmostEqual(
+            ngspice_statistics.get_iterations_per_timepoint(), 1411 / 652
+        )
+
+    def test_parse_ngspice_statistics_without_rusage(self):
+        self.assertIsNone(
+            TimeMeasureService.parse_ngspice_statistics(
+                "Circuit: * MEMRISTOR CIRCUIT\nNo. of Data Rows : 1011\n"
+            )
+        )
+
+    def test_compute_time_average(self):
+        time_measures = [
+            self._create_time_measure(10),
+            self._create_time_measure(20),
+            self._create_time_measure(1000, return_code=1),
+            TimeMeasure(python_execution_time=30.0),
+        ]
+
+        average_time_measure = TimeMeasureService.compute_time_average(time_measures)
+
+        self.assertEqual(average_time_measure.amount_iterations, 3)
+        self.assertAlmostEqual(
+            average_time_measure.average_python_execution_time, 62 / 3
+        )
+        self.assertEqual(average_time_measure.average_linux_real_execution_time, 15)
+        self.assertEqual(average_time_measure.average_linux_sys_execution_time, 1.5)
+
+    def test_compute_time_average_without_measures(self):
+        average_time_measure = TimeMeasureService.compute_time_average(
+            [self._create_time_measure(10, return_code=1)]
+        )
+
+        self.assertEqual(average_time_measure.amount_iterations, 0)
+        self.assertIsNone(average_time_measure.average_linux_real_execution_time)
+
+    def test_compute_timing_statistics(self):
+        values = [10, 11, 9, 10, 12, 10, 8, 10, 11, 60]
+
+        timing_statistics = TimeMeasureService.compute_timing_statistics(values, 0.95)
+
+        self.assertEqual(timing_statistics.amount_samples, 10)
+        self.assertEqual(timing_statistics.mean, 15.1)
+        self.assertEqual(timing_statistics.median, 10)
+        self.assertEqual(timing_statistics.mad, 1)
+        self.assertEqual(timing_statistics.outliers, [9])
+        self.assertAlmostEqual(timing_statistics.p5, 8.45)
+        self.assertAlmostEqual(timing_statistics.p95, 38.4)
+        self.assertGreater(timing_statistics.std, timing_statistics.mad)
+        self.assertLessEqual(timing_statistics.ci_low, timing_statistics.median)
+        self.assertGreaterEqual(timing_statistics.ci_high, timing_statistics.median)
+        self.assertEqual(
+            TimeMeasureService.compute_timing_statistics(values, 0.95),
+            timing_statistics,
+        )
+
+    def test_compute_timing_statistics_of_single_value(self):
+        timing_statistics = TimeMeasureService.compute_timing_statistics([5], 0.95)
+
+        self.assertEqual(timing_statistics.std, 0)
+        self.assertEqual(
+            (timing_statistics.ci_low, timing_statistics.ci_high), (5.0, 5.0)
+        )
+        self.assertEqual(timing_statistics.outliers, [])
+
+    @override_settings(
+        SIMULATION_TIMING_MIN_ITERATIONS=5, SIMULATION_TIMING_TARGET_PRECISION=0.01
+    )
+    def test_is_precise_enough(self):
+        stable_time_measures = [self._create_time_measure(100) for _ in range(5)]
+        noisy_time_measures = [
+            self._create_time_measure(time_ms) for time_ms in [50, 100, 150, 80, 120]
+        ]
+
+        self.assertFalse(TimeMeasureService.is_precise_enough(stable_time_measures[:4]))
+        self.assertTrue(TimeMeasureService.is_precise_enough(stable_time_measures))
+        self.assertFalse(TimeMeasureService.is_precise_enough(noisy_time_measures))
+
+        with override_settings(SIMULATION_TIMING_TARGET_PRECISION=0):
+            self.assertFalse(TimeMeasureService.is_precise_enough(stable_time_measures))
+
+    def test_create_timing_report(self):
+        time_measures = [
+            self._create_time_measure(time_ms)
+            for time_ms in [10, 11, 9, 10, 12, 10, 8, 10, 11]
+        ]
+        time_measures.insert(2, self._create_time_measure(1, return_code=1))
+        time_measures.append(self._create_time_measure(60))
+
+        timing_report = TimeMeasureService.create_timing_report(
+            time_measures, max_iterations=100, amount_warmup_iterations=2
+        )
+
+        self.assertEqual(timing_report.amount_iterations, 11)
+        self.assertEqual(timing_report.amount_failed_iterations, 1)
+        self.assertEqual(timing_report.amount_warmup_iterations, 2)
+        self.assertTrue(timing_report.stopped_early)
+        self.assertEqual(
+            list(timing_report.statistics), TimeMeasureService.TIME_MEASURE_FIELDS
+        )
+        real_time_statistics = timing_report.statistics["linux_real_execution_time"]
+        self.assertEqual(real_time_statistics.amount_samples, 10)
+        self.assertEqual(real_time_statistics.outliers, [10])
+
+    @override_settings(
+        SIMULATION_TIMING_WARMUP_ITERATIONS=2,
+        SIMULATION_TIMING_MIN_ITERATIONS=5,
+        SIMULATION_TIMING_TARGET_PRECISION=0.01,
+    )
+    def test_run_single_circuit_simulation_stops_when_precise(self):
+        ngspice_service = NGSpiceService(self.directories_management_service)
+
+        with patch.object(
+            ngspice_service.time_measure_service,
+            "execute_with_time_measure",
+            side_effect=lambda *args, **kwargs: self._create_time_measure(100),
+        ) as mock_execute:
+            time_measures = ngspice_service.run_single_circuit_simulation(100)
+
+        self.assertEqual(len(time_measures), 5)
+        self.assertEqual(mock_execute.call_count, 7)
+        self.assertEqual(mock_execute.call_args_list[0], call(False, warmup=True))
+        self.assertEqual(mock_execute.call_args_list[2], call(False))
+
+        with open(
+            self.directories_management_service.get_timing_report_file_path(), "r"
+        ) as f:
+            timing_report = json.load(f)
+        self.assertEqual(timing_report["max_iterations"], 100)
+        self.assertEqual(timing_report["amount_iterations"], 5)
+        self.assertTrue(timing_report["stopped_early"])
+        self.assertEqual(
+            timing_report["statistics"]["linux_real_execution_time"]["median"], 100
+        )
+        self.assertIn(
+            self.directories_management_service.get_timing_report_file_path(),
+            [
+                file_path
+                for file_path, _ in self.directories_management_service.get_all_simulation_files()
+            ],
+        )
+
+    @override_settings(SIMULATION_TIMING_WARMUP_ITERATIONS=2)
+    def test_run_single_circuit_simulation_once(self):
+        ngspice_service = NGSpiceService(self.directories_management_service)
+
+        with patch.object(
+            ngspice_service.time_measure_service,
+            "execute_with_time_measure",
+            return_value=self._create_time_measure(100),
+        ) as mock_execute:
+            time_measures = ngspice_service.run_single_circuit_simulation(1)
+
+        self.assertEqual(len(time_measures), 1)
+        mock_execute.assert_called_once_with(True)
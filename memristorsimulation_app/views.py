@@ -1,16 +1,76 @@
+import asyncio
 import json
+import time
 
-from django.http import HttpResponse, JsonResponse
+from asgiref.sync import sync_to_async
+from contextlib import nullcontext
+from django.conf import settings
+from django.urls import reverse
+
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.middleware.csrf import CsrfViewMiddleware
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.permissions import IsAdminUser
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from memristorsimulation_app.serializers.simulation import SimulationInputsSerializer
+from memristorsimulation_app.constants import (
+    AdmissionDecision,
+    InvalidSweep,
+    ModelsSimulationFolders,
+    SeriesFormat,
+    SimulationStatus,
+)
+from memristorsimulation_app.serializers.simulation import (
+    SimulationInputsSerializer,
+    SimulationProgressSerializer,
+    SimulationSeriesQuerySerializer,
+    SimulationSeriesSerializer,
+    SimulationWindowQuerySerializer,
+    SweepSimulationInputsSerializer,
+)
 from django.shortcuts import render
+from memristorsimulation_app.services.admissioncontrolservice import (
+    AdmissionControlService,
+)
+from memristorsimulation_app.services.metricsservice import MetricsService
+from memristorsimulation_app.services.profilingservice import (
+    ProfileNotFound,
+    ProfilingService,
+)
+from memristorsimulation_app.services.simulationdataservice import (
+    AmbiguousResultsFile,
+    InvalidSeriesColumn,
+    SimulationDataService,
+    SimulationResultsNotFound,
+)
+from memristorsimulation_app.services.simulationprogressservice import (
+    InvalidProgressId,
+    SimulationCancelled,
+    SimulationProgressService,
+)
+from memristorsimulation_app.services.retentionservice import RetentionService
+from memristorsimulation_app.services.simulationcatalogueservice import (
+    SimulationCatalogueService,
+)
+from memristorsimulation_app.services.simulationcoalescingservice import (
+    CoalescedSimulationFailed,
+    SimulationCoalescingService,
+)
 from memristorsimulation_app.services.simulationservice import SimulationService
+from memristorsimulation_app.services.stagetimingservice import StageTimingService
+from memristorsimulation_app.services.sweepsimulationservice import (
+    SweepSimulationService,
+)
 
 
-class SimulationView(APIView):
-    def post(self, request):
+# Plain async Django view, DRF views are sync only. Under an ASGI server one worker awaits many ngspice processes.
+# CSRF is not enforced, same as the DRF views of the REST API, except for profiling which is granted by the staff session
+@method_decorator(csrf_exempt, name="dispatch")
+class SimulationView(View):
+    async def post(self, request):
         try:
             data = json.loads(request.body)
         except json.JSONDecodeError:
@@ -18,17 +78,79 @@ class SimulationView(APIView):
 
         serializer = SimulationInputsSerializer(data=data)
         if not serializer.is_valid():
-            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+            return JsonResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
         validated_data = serializer.validated_data
+        progress_id = request.headers.get("X-Simulation-Progress-Id")
+
+        profile = self._is_profile_requested(request)
+        if profile:
+            if not (await request.auser()).is_staff:
+                return JsonResponse(
+                    {"ERROR": "Only admins can profile simulations"},
+                    status=status.HTTP_403_FORBIDDEN,
+                )
+
+            csrf_rejection = await sync_to_async(self._check_csrf)(request)
+            if csrf_rejection is not None:
+                return csrf_rejection
+
+        try:
+            simulation_service = SimulationService(
+                request_parameters=validated_data,
+                progress_id=progress_id,
+                profile=profile,
+            )
+        except InvalidProgressId as e:
+            return JsonResponse({"ERROR": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
         try:
-            simulation_service = SimulationService(request_parameters=validated_data)
-            zip_buffer = simulation_service.simulate_and_create_results_zip()
+            cost_estimate = await asyncio.to_thread(
+                AdmissionControlService(simulation_service.simulation_inputs).evaluate
+            )
+        except (ValueError, ArithmeticError) as e:
+            return JsonResponse({"ERROR": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-            folder_name = (
-                simulation_service.simulation_inputs.export_parameters.folder_name
+        await asyncio.to_thread(
+            MetricsService.increment_counter,
+            "memristor_simulation_admissions_total",
+            decision=cost_estimate.decision.value,
+        )
+        if cost_estimate.decision == AdmissionDecision.REJECT:
+            return JsonResponse(
+                {
+                    "ERROR": f"Estimated simulation time of {cost_estimate.estimated_time_ms / 1000:.1f} s exceeds "
+                    f"the budget of {settings.SIMULATION_COST_REJECT_SECONDS} s",
+                    "estimatedTimeMs": cost_estimate.estimated_time_ms,
+                },
+                status=status.HTTP_400_BAD_REQUEST,
             )
+
+        lane = (
+            AdmissionControlService.low_priority_slot()
+            if cost_estimate.decision == AdmissionDecision.LOW_PRIORITY
+            else nullcontext()
+        )
+
+        started_at = time.time()
+        await asyncio.to_thread(
+            MetricsService.increment_gauge, "memristor_simulation_requests_in_progress"
+        )
+        try:
+            async with lane:
+                # Identical requests already running are joined instead of simulated again
+                simulation_artifact = await SimulationCoalescingService(
+                    simulation_service
+                ).simulate_and_create_results_zip_async()
+
+            # Coalesced followers did not run ngspice, the run is recorded by the request that did
+            if not simulation_artifact.coalesced:
+                await sync_to_async(SimulationCatalogueService.record_run)(
+                    simulation_service, SimulationStatus.FINISHED, started_at
+                )
+
+            zip_buffer = simulation_artifact.zip_buffer
+            folder_name = simulation_artifact.folder_name
             zip_filename = f"simulation_{folder_name}.zip"
 
             response = HttpResponse(
@@ -36,14 +158,312 @@ class SimulationView(APIView):
             )
             response["Content-Disposition"] = f'attachment; filename="{zip_filename}"'
             response["Content-Length"] = len(zip_buffer.getvalue())
+            response["X-Simulation-Folder"] = folder_name
+            response["X-Simulation-Coalesced"] = str(
+                simulation_artifact.coalesced
+            ).lower()
+            response["X-Simulation-Admission"] = cost_estimate.decision.value
+            response["X-Simulation-Estimated-Time"] = round(
+                cost_estimate.estimated_time_ms
+            )
+            # Coalesced followers only time their own parsing, the spans of the shared run are in its folder
+            response["Server-Timing"] = (
+                simulation_service.stage_timing_service.get_server_timing_header()
+            )
+            if progress_id:
+                response["X-Simulation-Progress-Id"] = progress_id
+            if profile:
+                response["X-Simulation-Profile"] = reverse(
+                    "simulation_profile",
+                    args=[
+                        simulation_service.simulation_inputs.export_parameters.model_simulation_folder.value,
+                        folder_name,
+                    ],
+                )
+            await asyncio.to_thread(
+                self._record_request_metrics,
+                SimulationStatus.FINISHED,
+                started_at,
+                stage_timing_service=simulation_service.stage_timing_service,
+                coalesced=simulation_artifact.coalesced,
+            )
+            await asyncio.to_thread(RetentionService.enforce_retention_in_background)
 
             return response
 
+        except SimulationCancelled as e:
+            await sync_to_async(SimulationCatalogueService.record_run)(
+                simulation_service, SimulationStatus.CANCELLED, started_at
+            )
+            await asyncio.to_thread(
+                self._record_request_metrics, SimulationStatus.CANCELLED, started_at
+            )
+            return JsonResponse({"ERROR": str(e)}, status=status.HTTP_409_CONFLICT)
+
         except Exception as e:
+            if not isinstance(e, CoalescedSimulationFailed):
+                await sync_to_async(SimulationCatalogueService.record_run)(
+                    simulation_service,
+                    SimulationStatus.FAILED,
+                    started_at,
+                    error=str(e),
+                )
+            await asyncio.to_thread(
+                self._record_request_metrics, SimulationStatus.FAILED, started_at
+            )
             return JsonResponse(
                 {"ERROR": f"Simulation and export failed: {str(e)}"},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
+        finally:
+            await asyncio.to_thread(
+                MetricsService.decrement_gauge,
+                "memristor_simulation_requests_in_progress",
+            )
 
-    def get(self, request):
+    async def get(self, request):
         return render(request, "form.html", {})
+
+    @staticmethod
+    def _check_csrf(request) -> HttpResponse:
+        """
+        Runs the CSRF check the view is exempt from, returns the rejection response or None if the request passes it
+        """
+        return CsrfViewMiddleware(lambda request: None).process_view(
+            request, None, (), {}
+        )
+
+    @staticmethod
+    def _is_profile_requested(request) -> bool:
+        profile = request.headers.get(
+            "X-Simulation-Profile", request.GET.get("profile", "")
+        )
+
+        return profile.lower() in ("true", "1", "yes")
+
+    @staticmethod
+    def _record_request_metrics(
+        simulation_status: SimulationStatus,
+        started_at: float,
+        stage_timing_service: StageTimingService = None,
+        coalesced: bool = None,
+    ) -> None:
+        MetricsService.increment_counter(
+            "memristor_simulation_requests_total", status=simulation_status.value
+        )
+        MetricsService.observe_histogram(
+            "memristor_simulation_request_duration_seconds",
+            time.time() - started_at,
+            status=simulation_status.value,
+        )
+        if coalesced is not None:
+            MetricsService.increment_counter(
+                "memristor_cache_requests_total",
+                cache="coalescing",
+                result="hit" if coalesced else "miss",
+            )
+        if stage_timing_service is not None:
+            for stage, duration in stage_timing_service.get_stage_durations().items():
+                MetricsService.observe_histogram(
+                    "memristor_simulation_stage_duration_seconds",
+                    duration / 1000,
+                    stage=stage,
+                )
+
+
+class SimulationSeriesView(APIView):
+    query_serializer_class = SimulationSeriesQuerySerializer
+
+    def get(self, request, model_simulation_folder: str, folder_name: str):
+        query_serializer = self.query_serializer_class(data=request.query_params)
+        if not query_serializer.is_valid():
+            return Response(query_serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        query = query_serializer.validated_data
+
+        try:
+            simulation_data_service = SimulationDataService(
+                ModelsSimulationFolders(model_simulation_folder),
+                folder_name,
+                file_name=query.get("file_name"),
+            )
+            series = simulation_data_service.get_series(
+                columns=query.get("columns"),
+                max_points=query.get("max_points"),
+                t0=query.get("t0"),
+                t1=query.get("t1"),
+            )
+        except (ValueError, SimulationResultsNotFound) as e:
+            return JsonResponse({"ERROR": str(e)}, status=status.HTTP_404_NOT_FOUND)
+        except (AmbiguousResultsFile, InvalidSeriesColumn) as e:
+            return JsonResponse({"ERROR": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        if query["response_format"] == SeriesFormat.JSON:
+            return Response(SimulationSeriesSerializer(series).data)
+
+        if query["response_format"] == SeriesFormat.BINARY:
+            response = HttpResponse(
+                simulation_data_service.series_to_binary(series),
+                content_type="application/octet-stream",
+            )
+        else:
+            response = HttpResponse(
+                simulation_data_service.series_to_csv(series), content_type="text/csv"
+            )
+            response["Content-Disposition"] = (
+                f'attachment; filename="{series.csv_file_name_no_extension}_window.csv"'
+            )
+        response["X-Series-Columns"] = ",".join(series.columns)
+        response["X-Series-Points"] = series.returned_points
+        response["X-Series-Total-Points"] = series.total_points
+
+        return response
+
+
+class SimulationWindowView(SimulationSeriesView):
+    """
+    Requested columns inside the [t0, t1] time window, not decimated unless maxPoints is given
+    """
+
+    query_serializer_class = SimulationWindowQuerySerializer
+
+
+class SimulationProfileView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, model_simulation_folder: str, folder_name: str):
+        try:
+            summary = ProfilingService.load_summary(
+                ModelsSimulationFolders(model_simulation_folder), folder_name
+            )
+        except (ValueError, ProfileNotFound) as e:
+            return JsonResponse({"ERROR": str(e)}, status=status.HTTP_404_NOT_FOUND)
+
+        return Response(summary)
+
+
+class SimulationProgressView(APIView):
+    def get(self, request, progress_id: str):
+        try:
+            progress_service = SimulationProgressService(progress_id)
+        except InvalidProgressId as e:
+            return JsonResponse({"ERROR": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        response = StreamingHttpResponse(
+            self._progress_events(progress_service), content_type="text/event-stream"
+        )
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"
+
+        return response
+
+    def delete(self, request, progress_id: str):
+        try:
+            progress_service = SimulationProgressService(progress_id)
+        except InvalidProgressId as e:
+            return JsonResponse({"ERROR": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        progress_service.request_cancel()
+
+        return Response(status=status.HTTP_202_ACCEPTED)
+
+    @staticmethod
+    async def _progress_events(progress_service: SimulationProgressService):
+        # Async so subscribed clients do not hold a worker thread each while the run progresses
+        async for progress in progress_service.follow_progress_async():
+            data = json.dumps(SimulationProgressSerializer(progress).data)
+            yield f"event: progress\ndata: {data}\n\n"
+
+        yield "event: end\ndata: {}\n\n"
+
+
+class SweepSimulationView(APIView):
+    def post(self, request):
+        try:
+            data = json.loads(request.body)
+        except json.JSONDecodeError:
+            return JsonResponse({"error": "Invalid JSON"}, status=400)
+
+        serializer = SweepSimulationInputsSerializer(data=data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        validated_data = serializer.validated_data
+
+        try:
+            sweep_simulation_service = SweepSimulationService(
+                base_request_parameters=validated_data["base"],
+                parameters=validated_data["parameters"],
+                mode=validated_data["mode"],
+                max_workers=validated_data.get("max_workers"),
+            )
+        except InvalidSweep as e:
+            return JsonResponse(
+                {"ERROR": e.args[0]}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        # The points run for this single request, so the sweep is admitted on their summed cost
+        try:
+            cost_estimate = AdmissionControlService.evaluate_batch(
+                sweep_simulation_service.get_simulations_inputs()
+            )
+        except (ValueError, ArithmeticError) as e:
+            return JsonResponse({"ERROR": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        MetricsService.increment_counter(
+            "memristor_simulation_admissions_total",
+            decision=cost_estimate.decision.value,
+        )
+        if cost_estimate.decision == AdmissionDecision.REJECT:
+            return JsonResponse(
+                {
+                    "ERROR": f"Estimated sweep time of {cost_estimate.estimated_time_ms / 1000:.1f} s exceeds "
+                    f"the budget of {settings.SIMULATION_COST_REJECT_SECONDS} s",
+                    "estimatedTimeMs": cost_estimate.estimated_time_ms,
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        lane = (
+            AdmissionControlService.low_priority_slot_blocking()
+            if cost_estimate.decision == AdmissionDecision.LOW_PRIORITY
+            else nullcontext()
+        )
+
+        try:
+            with lane:
+                results = sweep_simulation_service.simulate()
+            for result in results:
+                if result.run_fields:
+                    SimulationCatalogueService.save_run(result.run_fields)
+            zip_buffer = sweep_simulation_service.create_results_zip(results)
+
+            folder_name = validated_data["base"]["export_parameters"]["folder_name"]
+            zip_filename = f"sweep_{folder_name}.zip"
+
+            response = HttpResponse(
+                zip_buffer.getvalue(), content_type="application/zip"
+            )
+            response["Content-Disposition"] = f'attachment; filename="{zip_filename}"'
+            response["Content-Length"] = len(zip_buffer.getvalue())
+            response["X-Simulation-Admission"] = cost_estimate.decision.value
+            response["X-Simulation-Estimated-Time"] = round(
+                cost_estimate.estimated_time_ms
+            )
+            RetentionService.enforce_retention_in_background()
+
+            return response
+
+        except Exception as e:
+            return JsonResponse(
+                {"ERROR": f"Sweep simulation and export failed: {str(e)}"},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+
+class MetricsView(View):
+    def get(self, request):
+        return HttpResponse(
+            MetricsService.render(),
+            content_type="text/plain; version=0.0.4; charset=utf-8",
+        )